@@ -10,34 +10,41 @@ from __future__ import division, print_function, unicode_literals
 __version__ = "3.3.0"
 __author__ = "TzuYuan Yin"
 
-# 核心模組匯入
-from .core.grid_manager import GridManager
-
-# 有條件匯入 GlyphsEventHandler（需要 Glyphs.app 環境）
-try:
-    from .core.event_handler import GlyphsEventHandler
-except ImportError:
-    # 在非 Glyphs 環境中跳過
-    GlyphsEventHandler = None
-
-# UI 模組匯入（純 AppKit 實作）
-try:
-    from .ui.preview_view import NineBoxPreviewView, create_preview_view
-    from .ui.search_panel import SearchPanel
-    from .ui.controls_panel import ControlsPanelView
-    from .ui.lock_fields_panel import LockFieldsPanel
-except ImportError:
-    # 在沒有 AppKit 的環境中跳過 UI 匯入
-    pass
-
-# 資料模組匯入
-from .data.preferences import PreferencesManager
+# 延遲匯入：Glyphs 啟動時只註冊選單項目，套件內容於第一次 showWindow_ 時才載入
+# 名稱 → (子模組, 屬性)
+_LAZY_EXPORTS = {
+    'GridManager': ('.core.grid_manager', 'GridManager'),
+    'NineBoxEventHandler': ('.core.event_handler', 'NineBoxEventHandler'),
+    'GlyphsEventHandler': ('.core.event_handler', 'NineBoxEventHandler'),  # 舊名稱（相容性別名）
+    'NineBoxPreviewView': ('.ui.preview_view', 'NineBoxPreviewView'),
+    'create_preview_view': ('.ui.preview_view', 'create_preview_view'),
+    'SearchPanel': ('.ui.search_panel', 'SearchPanel'),
+    'ControlsPanelView': ('.ui.controls_panel', 'ControlsPanelView'),
+    'LockFieldsPanel': ('.ui.lock_fields_panel', 'LockFieldsPanel'),
+    'PreferencesManager': ('.data.preferences', 'PreferencesManager'),
+}
+
+
+def __getattr__(name):
+    """首次存取時才匯入對應的子模組（PEP 562）"""
+    target = _LAZY_EXPORTS.get(name)
+    if target is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+    import importlib
+    module_name, attribute = target
+    value = getattr(importlib.import_module(module_name, __name__), attribute)
+    globals()[name] = value
+    return value
+
 
 # 便利函數
 def create_grid_manager():
     """建立 GridManager 實例的便利函數"""
+    from .core.grid_manager import GridManager
     return GridManager()
 
 def get_preferences():
     """獲取偏好設定管理器的便利函數"""
-    return PreferencesManager
\ No newline at end of file
+    from .data.preferences import PreferencesManager
+    return PreferencesManager
@@ -21,5 +21,30 @@ __all__ = [
     'input_recognition',
     'theme_detector',
     'light_table_support',
-    'random_arrangement'
+    'random_arrangement',
+    'tab_layer_index',
+    'master_strip',
+    'grid_shape',
+    'vector_export',
+    'outline_geometry',
+    'ink_bounds',
+    'kerning_table',
+    'first_frame_metric',
+    'update_gate',
+    'redraw_scheduler',
+    'redraw_policy',
+    'metrics',
+    'font_identity',
+    'document_state',
+    'glyph_index',
+    'font_query',
+    'glyph_sources',
+    'glyph_completion',
+    'glyph_suggestions',
+    'index_store',
+    'index_builder',
+    'compute_executor',
+    'grid_layout',
+    'cell_index',
+    'interactive_edit'
 ]
\ No newline at end of file
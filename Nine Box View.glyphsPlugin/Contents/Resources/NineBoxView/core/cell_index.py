@@ -0,0 +1,136 @@
+# encoding: utf-8
+
+"""
+CellIndex - 字符名稱到格子位置的反查表
+與預覽視圖合成後的顯示排列保持同步（排列變更時只重新解析有變動的位置），
+編輯某個字符的圖層時可直接取得顯示該字符的所有格子，只讓這些格子失效；
+沒有搜尋輸入時所有格子顯示同一個中央字符，反查表即涵蓋全部格子
+"""
+
+from __future__ import division, print_function, unicode_literals
+
+
+class GlyphCellIndex(object):
+    """字符名稱 → 顯示該字符的格子位置"""
+
+    def __init__(self):
+        """初始化反查表"""
+        self._arrangement = []
+        self._names = []        # 每個位置解析後的字符名稱（空白格為 None）
+        self._cells = {}        # 字符名稱 → 位置集合
+        self._stats = {
+            'rebuilds': 0,
+            'updates': 0,
+            'resolved': 0,
+            'lookups': 0,
+            'hits': 0
+        }
+
+    def sync(self, arrangement, resolve):
+        """與顯示排列同步（長度相同時只處理有變動的位置）
+
+        Args:
+            arrangement (list): 顯示排列（字元或字符名稱）
+            resolve (callable): resolve(字元或名稱) → 字符名稱或 None
+
+        Returns:
+            bool: True 如果反查表有變更
+        """
+        arrangement = list(arrangement or [])
+        if len(arrangement) != len(self._arrangement):
+            self._rebuild(arrangement, resolve)
+            return True
+
+        changed = False
+        for position, entry in enumerate(arrangement):
+            if entry == self._arrangement[position]:
+                continue
+            self._assign(position, self._resolve(entry, resolve))
+            changed = True
+        if changed:
+            self._arrangement = arrangement
+            self._stats['updates'] += 1
+        return changed
+
+    def positions_for(self, name):
+        """取得顯示字符的格子位置
+
+        Args:
+            name (str): 字符名稱
+
+        Returns:
+            list: 位置索引（遞增）
+        """
+        self._stats['lookups'] += 1
+        positions = self._cells.get(name)
+        if not positions:
+            return []
+        self._stats['hits'] += 1
+        return sorted(positions)
+
+    def positions_for_names(self, names):
+        """取得顯示任一字符的格子位置
+
+        Args:
+            names: 字符名稱序列
+
+        Returns:
+            list: 位置索引（遞增，不重複）
+        """
+        positions = set()
+        for name in names:
+            positions.update(self.positions_for(name))
+        return sorted(positions)
+
+    def name_at(self, position):
+        """取得格子顯示的字符名稱（空白格或超出範圍時為 None）"""
+        if 0 <= position < len(self._names):
+            return self._names[position]
+        return None
+
+    def clear(self):
+        """清除反查表（字型變更時，下一次同步重新解析所有位置）"""
+        self._arrangement = []
+        self._names = []
+        self._cells = {}
+
+    def get_stats(self):
+        """取得反查表統計資訊
+
+        Returns:
+            dict: 統計字典（重建次數、增量更新次數、解析次數、查詢次數、命中次數、字符數）
+        """
+        stats = self._stats.copy()
+        stats['glyphs'] = len(self._cells)
+        return stats
+
+    def _rebuild(self, arrangement, resolve):
+        """重新解析所有位置"""
+        self._arrangement = arrangement
+        self._names = [None] * len(arrangement)
+        self._cells = {}
+        for position, entry in enumerate(arrangement):
+            self._assign(position, self._resolve(entry, resolve))
+        self._stats['rebuilds'] += 1
+
+    def _resolve(self, entry, resolve):
+        """解析排列項目為字符名稱"""
+        if not entry:
+            return None
+        self._stats['resolved'] += 1
+        return resolve(entry)
+
+    def _assign(self, position, name):
+        """更新單一位置的字符名稱"""
+        previous = self._names[position]
+        if previous == name:
+            return
+        if previous is not None:
+            positions = self._cells.get(previous)
+            if positions is not None:
+                positions.discard(position)
+                if not positions:
+                    del self._cells[previous]
+        self._names[position] = name
+        if name is not None:
+            self._cells.setdefault(name, set()).add(position)
@@ -0,0 +1,236 @@
+# encoding: utf-8
+
+"""
+ComputeExecutor - 純計算的背景執行層
+不需要 Cocoa 或 Glyphs 物件的計算（大量輸入的斷詞、大型字符來源的抽樣與快取鍵）
+交給背景執行緒，結果以 ComputeFuture 在主執行緒回呼；
+同一個鍵的新工作會取代尚未完成的舊工作（例如連續鍵入時只保留最新的輸入）
+
+呼叫端只傳入不可變的快照（字串、tuple），背景執行緒不存取字型或視圖；
+無法排程到主執行緒時（例如沒有 Foundation）直接在呼叫端執行
+"""
+
+from __future__ import division, print_function, unicode_literals
+import threading
+import time
+import traceback
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+from .index_builder import dispatch_to_main
+
+# 輸入文字達到此長度時在背景斷詞
+OFFLOAD_TEXT_LENGTH = 2000
+
+# 字符來源達到此數量時在背景抽樣
+OFFLOAD_SOURCE_SIZE = 5000
+
+
+def main_queue_available():
+    """檢查是否能排程回主執行緒"""
+    try:
+        from Foundation import NSOperationQueue
+        return NSOperationQueue is not None
+    except ImportError:
+        return False
+
+
+class ComputeFuture(object):
+    """背景計算的結果（回呼一律在主執行緒執行）"""
+
+    def __init__(self, key):
+        """初始化結果
+
+        Args:
+            key (str): 工作鍵（同鍵的新工作會取代舊工作）
+        """
+        self.key = key
+        self._result = None
+        self._error = None
+        self._cancelled = False
+        self._delivered = False     # 只在主執行緒設定
+        self._callbacks = []
+
+    def cancel(self):
+        """取消工作（尚未執行時略過執行，已完成時不回呼）"""
+        self._cancelled = True
+        self._callbacks = []
+
+    def cancelled(self):
+        """工作是否已取消"""
+        return self._cancelled
+
+    def done(self):
+        """結果是否已送達主執行緒"""
+        return self._delivered
+
+    def result(self):
+        """取得結果（計算失敗時重新拋出例外）"""
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def add_done_callback(self, callback):
+        """加入完成回呼（已完成時立即呼叫）
+
+        Args:
+            callback (callable): callback(future)，在主執行緒執行
+        """
+        if self._cancelled:
+            return
+        if self._delivered:
+            self._invoke(callback)
+        else:
+            self._callbacks.append(callback)
+
+    def _deliver(self):
+        """主執行緒：送達結果並呼叫回呼"""
+        if self._cancelled or self._delivered:
+            return
+        self._delivered = True
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            self._invoke(callback)
+
+    def _invoke(self, callback):
+        """呼叫單一回呼"""
+        try:
+            callback(self)
+        except Exception:
+            print(traceback.format_exc())
+
+
+class ComputeExecutor(object):
+    """純計算背景執行器（單一背景執行緒，依提交順序執行）"""
+
+    def __init__(self, dispatch=dispatch_to_main, offload=None):
+        """初始化執行器
+
+        Args:
+            dispatch (callable): dispatch(callback)，排程在主執行緒執行回呼
+            offload (bool): 是否使用背景執行緒（None 時依 Foundation 是否可用決定）
+        """
+        self._dispatch = dispatch
+        self._offload = main_queue_available() if offload is None else offload
+        self._tasks = Queue()
+        self._latest = {}       # 工作鍵 → 最新的 ComputeFuture（主執行緒）
+        self._worker = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'submitted': 0,
+            'inline': 0,
+            'completed': 0,
+            'superseded': 0,
+            'skipped': 0,
+            'errors': 0,
+            'last_ms': 0.0,
+            'max_ms': 0.0
+        }
+
+    def submit(self, key, function, *args):
+        """提交純計算工作（主執行緒呼叫）
+
+        同鍵尚未完成的工作會被取消；function 不可存取 Cocoa 或 Glyphs 物件
+
+        Args:
+            key (str): 工作鍵
+            function (callable): 純計算函數
+            *args: 參數（應為不可變的快照）
+
+        Returns:
+            ComputeFuture: 計算結果
+        """
+        previous = self._latest.get(key)
+        if previous is not None and not previous.done():
+            previous.cancel()
+            self._stats['superseded'] += 1
+
+        future = ComputeFuture(key)
+        self._latest[key] = future
+        self._stats['submitted'] += 1
+
+        if not self._offload:
+            self._stats['inline'] += 1
+            self._execute(future, function, args)
+            self._deliver(future)
+            return future
+
+        self._ensure_worker()
+        self._tasks.put((future, function, args))
+        return future
+
+    def cancel(self, key):
+        """取消指定鍵尚未完成的工作
+
+        Args:
+            key (str): 工作鍵
+        """
+        future = self._latest.pop(key, None)
+        if future is not None and not future.done():
+            future.cancel()
+
+    def get_stats(self):
+        """取得背景執行統計資訊
+
+        Returns:
+            dict: 統計字典（提交數、直接執行數、完成數、被取代數、略過數、錯誤數、最近一次與最長耗時、佇列長度）
+        """
+        stats = self._stats.copy()
+        stats['queued'] = self._tasks.qsize()
+        return stats
+
+    def _ensure_worker(self):
+        """啟動背景執行緒（第一次提交時）"""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='NineBoxView-Compute')
+                self._worker.daemon = True
+                self._worker.start()
+
+    def _run(self):
+        """背景執行緒：依序執行工作，結果排程回主執行緒"""
+        while True:
+            future, function, args = self._tasks.get()
+            if future.cancelled():
+                self._stats['skipped'] += 1
+                continue
+            self._execute(future, function, args)
+            self._dispatch(lambda future=future: self._deliver(future))
+
+    def _execute(self, future, function, args):
+        """執行工作並記錄結果或例外"""
+        started = time.time()
+        try:
+            future._result = function(*args)
+        except Exception as error:
+            print(traceback.format_exc())
+            future._error = error
+            self._stats['errors'] += 1
+        elapsed = (time.time() - started) * 1000.0
+        self._stats['last_ms'] = elapsed
+        self._stats['max_ms'] = max(self._stats['max_ms'], elapsed)
+
+    def _deliver(self, future):
+        """主執行緒：送達結果（已被取代的工作不回呼）"""
+        if self._latest.get(future.key) is future:
+            del self._latest[future.key]
+        if future.cancelled():
+            return
+        self._stats['completed'] += 1
+        future._deliver()
+
+
+# 全域執行器實例
+_compute_executor = ComputeExecutor()
+
+
+def get_compute_executor():
+    """獲取純計算背景執行器實例
+
+    Returns:
+        ComputeExecutor: 執行器實例
+    """
+    return _compute_executor
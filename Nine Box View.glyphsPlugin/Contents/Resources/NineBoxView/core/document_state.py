@@ -0,0 +1,169 @@
+# encoding: utf-8
+
+"""
+DocumentStateStore - 每份文件的排列狀態
+在多個開啟的字型之間切換時，控制器的排列、鎖定、搜尋內容與鎖定模式
+依字型序號（保存後不變）保存於有上限的 LRU 中；切換回最近使用過的字型時直接還原，
+不需重新解析輸入、驗證字符或重新隨機排列
+"""
+
+from __future__ import division, print_function, unicode_literals
+from collections import OrderedDict
+
+# 保留的文件狀態數量上限
+MAX_DOCUMENT_STATES = 8
+
+# 快照包含的控制器屬性
+STATE_ATTRIBUTES = (
+    'base_arrangement',
+    'lock_inputs',
+    'lastInput',
+    'isLockFieldsActive',
+)
+
+
+class DocumentState(object):
+    """單一文件的狀態快照"""
+
+    __slots__ = ('values', 'shape_key', 'validated_inputs', 'layout', 'layout_key')
+
+    def __init__(self, values, shape_key, validated_inputs=None, layout=None, layout_key=None):
+        """初始化快照
+
+        Args:
+            values (dict): 控制器屬性名稱 → 值（列表已複製）
+            shape_key (tuple): 擷取時的網格形狀
+            validated_inputs (dict): 已驗證的輸入解析結果
+            layout (GridLayout): 預覽視圖的佈局快取
+            layout_key (tuple): 佈局快取鍵
+        """
+        self.values = values
+        self.shape_key = shape_key
+        self.validated_inputs = validated_inputs or {}
+        self.layout = layout
+        self.layout_key = layout_key
+
+
+def capture_state(controller, shape_key, layout=None, layout_key=None):
+    """擷取控制器目前的文件狀態
+
+    Args:
+        controller: NineBoxViewController 實例
+        shape_key (tuple): 目前的網格形狀
+        layout (GridLayout): 預覽視圖的佈局快取
+        layout_key (tuple): 佈局快取鍵
+
+    Returns:
+        DocumentState: 狀態快照
+    """
+    values = {}
+    for name in STATE_ATTRIBUTES:
+        value = getattr(controller, name, None)
+        values[name] = value[:] if isinstance(value, list) else value
+    return DocumentState(
+        values, shape_key,
+        dict(getattr(controller, '_validated_inputs', None) or {}),
+        layout, layout_key
+    )
+
+
+def apply_state(controller, state):
+    """將狀態快照套用到控制器
+
+    Args:
+        controller: NineBoxViewController 實例
+        state (DocumentState): 狀態快照
+    """
+    for name, value in state.values.items():
+        setattr(controller, name, value[:] if isinstance(value, list) else value)
+    controller._validated_inputs = dict(state.validated_inputs)
+
+
+class DocumentStateStore(object):
+    """依字型識別碼保存文件狀態的 LRU"""
+
+    def __init__(self, max_states=MAX_DOCUMENT_STATES):
+        """初始化儲存區
+
+        Args:
+            max_states (int): 保留的文件狀態數量上限
+        """
+        self._states = OrderedDict()
+        self._max_states = max(1, max_states)
+        self._stats = {
+            'saved': 0,
+            'restored': 0,
+            'misses': 0,
+            'evicted': 0
+        }
+
+    def save(self, serial, state):
+        """保存文件狀態（超過上限時移除最久未使用的狀態）
+
+        Args:
+            serial (str): 字型序號（font_identity.get_font_serial）
+            state (DocumentState): 狀態快照
+        """
+        if serial is None or state is None:
+            return
+        self._states.pop(serial, None)
+        self._states[serial] = state
+        self._stats['saved'] += 1
+
+        while len(self._states) > self._max_states:
+            self._states.popitem(last=False)
+            self._stats['evicted'] += 1
+
+    def restore(self, serial, shape_key):
+        """取出文件狀態（網格形狀不同時視為未命中）
+
+        Args:
+            serial (str): 字型序號（font_identity.get_font_serial）
+            shape_key (tuple): 目前的網格形狀
+
+        Returns:
+            DocumentState or None: 狀態快照
+        """
+        state = self._states.get(serial)
+        if state is None or state.shape_key != shape_key:
+            self._stats['misses'] += 1
+            return None
+
+        self._states.move_to_end(serial)
+        self._stats['restored'] += 1
+        return state
+
+    def discard(self, serial):
+        """移除文件狀態（文件關閉時）
+
+        Args:
+            serial (str): 字型序號（font_identity.get_font_serial）
+        """
+        self._states.pop(serial, None)
+
+    def clear(self):
+        """清除所有文件狀態"""
+        self._states.clear()
+
+    def get_stats(self):
+        """取得儲存區統計資訊
+
+        Returns:
+            dict: 統計字典（保存、還原、未命中、淘汰次數與目前保存的文件數）
+        """
+        stats = self._stats.copy()
+        stats['documents'] = len(self._states)
+        return stats
+
+
+# 全域儲存區實例
+_document_state_store = DocumentStateStore()
+
+
+def get_document_state_store():
+    """獲取文件狀態儲存區實例
+
+    Returns:
+        DocumentStateStore: 儲存區實例
+    """
+    return _document_state_store
@@ -9,9 +9,8 @@ from __future__ import division, print_function, unicode_literals
 from GlyphsApp import Glyphs
 import traceback
 
-# 平面座標系統常數
-CENTER_POSITION = 4  # 中央位置
-GRID_SIZE_TOTAL = 9  # 總共9個位置 (0-8)
+# 平面座標系統：網格形狀（預設 3×3，0-8 座標）由 grid_shape 模組統一提供
+from .grid_shape import get_grid_shape
 
 class NineBoxEventHandler:
     """
@@ -37,6 +36,11 @@ class NineBoxEventHandler:
             if not self.plugin.has_active_window():
                 return
 
+            # 變更閘門：相關狀態（選取圖層、主板、中央圖層變更戳記、分頁）未變時直接略過
+            from .update_gate import get_update_gate, compute_interface_fingerprint
+            if not get_update_gate().should_process(compute_interface_fingerprint(Glyphs.font)):
+                return
+
             # 修復：恢復寬度快取清理，確保寬度資訊最新
             # 這是被動檢測模式的必要步驟
             try:
@@ -50,12 +54,126 @@ class NineBoxEventHandler:
             if hasattr(self.plugin, '_update_base_glyphs'):
                 self.plugin._update_base_glyphs()
 
+            # 圖層編輯：只讓顯示被編輯字符的格子重繪
+            self._invalidate_edited_glyph_cells()
+
+            # 多主板並排模式：只使正在編輯的主板格子失效
+            if getattr(self.plugin, 'masterStripMode', False):
+                self._invalidate_edited_master_tiles()
+            
+            # 字偶距排列模式：增量更新被編輯字符的字偶距項目
+            if getattr(self.plugin, 'kerningRowMode', False):
+                self._refresh_edited_kerning()
+            
+            # 字符索引：增量更新被編輯的字符（僅在索引已建立時）
+            self._refresh_edited_glyph_index()
+
         except Exception:
             print(traceback.format_exc())
 
         # 避免 sender 參數未使用警告
         _ = sender
     
+    def _invalidate_edited_glyph_cells(self):
+        """同步顯示排列後，以格子反查表標記顯示被編輯字符的格子（互動模式中重複副本節流更新）"""
+        try:
+            font = Glyphs.font
+            if not font or not font.selectedLayers:
+                return
+
+            glyph_names = set()
+            for layer in font.selectedLayers:
+                glyph = getattr(layer, 'parent', None) if layer else None
+                if glyph is not None and glyph.name:
+                    glyph_names.add(glyph.name)
+            if not glyph_names:
+                return
+
+            # 拖曳節點時進入互動模式：中央格每次重繪，重複副本節流更新
+            from .interactive_edit import get_interactive_edit_tracker
+            from .outline_geometry import layer_key, layer_version
+            layer = font.selectedLayers[0]
+            tracker = get_interactive_edit_tracker()
+            was_active = tracker.active
+            tracker.observe(layer_key(layer), layer_version(layer), glyph_names)
+            if was_active and not tracker.active:
+                # 互動中切換了選取：先以完整品質重繪上一次編輯的字符
+                self.plugin.invalidate_preview_glyphs(tracker.glyph_names)
+
+            # 排列有變動時由預覽視圖標記變動的格子，並同步反查表
+            self.plugin.update_preview_view()
+            master_id = getattr(layer, 'associatedMasterId', None)
+            self.plugin.invalidate_preview_glyphs(
+                glyph_names, master_id, include_copies=tracker.should_refresh_copies())
+        except Exception:
+            print(traceback.format_exc())
+
+    def _invalidate_edited_master_tiles(self):
+        """使目前編輯圖層所屬主板的並排格子失效"""
+        try:
+            from .glyphs_service import get_glyphs_service
+            font, _ = get_glyphs_service().get_current_font_context()
+            if not font or not font.selectedLayers:
+                return
+
+            layer = font.selectedLayers[0]
+            master_id = getattr(layer, 'associatedMasterId', None)
+            if master_id:
+                from .master_strip import get_master_path_cache
+                get_master_path_cache().invalidate_master(master_id)
+        except Exception:
+            print(traceback.format_exc())
+
+    def _refresh_edited_kerning(self):
+        """重新讀取目前可能被編輯字偶距的左側字符（選取圖層與游標前一個圖層）"""
+        try:
+            from .glyphs_service import get_glyphs_service
+            glyphs_service = get_glyphs_service()
+            font, _ = glyphs_service.get_current_font_context()
+            if not font or not font.selectedLayers:
+                return
+
+            layers = list(font.selectedLayers)
+            master_id = getattr(layers[0], 'associatedMasterId', None)
+            if not master_id:
+                return
+
+            # 編輯視圖中字偶距位於游標前一個圖層與目前圖層之間
+            tab = font.currentTab
+            if tab:
+                cursor = glyphs_service.get_tab_cursor(tab)
+                if cursor and 0 < cursor <= len(tab.layers):
+                    layers.append(tab.layers[cursor - 1])
+
+            glyph_names = set()
+            for layer in layers:
+                glyph = getattr(layer, 'parent', None) if layer else None
+                if glyph and glyph.name:
+                    glyph_names.add(glyph.name)
+
+            from .kerning_table import get_kerning_pair_table
+            get_kerning_pair_table().refresh_left_glyphs(font, master_id, glyph_names)
+        except Exception:
+            print(traceback.format_exc())
+
+    def _refresh_edited_glyph_index(self):
+        """以 lastChange 增量更新選取圖層所屬字符的索引項目"""
+        try:
+            font = Glyphs.font
+            if not font or not font.selectedLayers:
+                return
+
+            glyphs = []
+            for layer in font.selectedLayers:
+                glyph = getattr(layer, 'parent', None) if layer else None
+                if glyph is not None and glyph not in glyphs:
+                    glyphs.append(glyph)
+
+            from .glyph_index import get_glyph_index_registry
+            get_glyph_index_registry().refresh_glyphs(font, glyphs)
+        except Exception:
+            print(traceback.format_exc())
+
     def handle_document_opened(self, sender):
         """處理文件開啟事件（DOCUMENTOPENED）- 完整初始化"""
         try:
@@ -130,7 +248,9 @@ class NineBoxEventHandler:
             from .input_recognition import InputGuardService
             
             def update_callback(chars):
-                """更新回呼：填充字符到九宮格"""
+                """更新回呼：填充字符到九宮格（大型字符來源在背景抽樣）"""
+                if self._fill_grid_from_chars_async(chars, search_text):
+                    return
                 self._fill_grid_from_chars(chars)
                 self.update_and_redraw_grid()
             
@@ -153,8 +273,45 @@ class NineBoxEventHandler:
         except Exception:
             print(traceback.format_exc())
 
+    def _fill_grid_from_chars_async(self, chars, search_text):
+        """在背景執行緒抽樣並填充網格所有位置（大型字符來源）
+        
+        抽樣完成時搜尋輸入已變更則捨棄結果
+        
+        Args:
+            chars (list): 字符列表
+            search_text (str): 觸發填充的搜尋文字
+            
+        Returns:
+            bool: True 如果已提交背景工作（結果由回呼套用）
+        """
+        try:
+            grid_manager = getattr(self.plugin, 'grid_manager', None)
+            if not grid_manager or not chars:
+                return False
+            
+            def apply_arrangement(arrangement):
+                if getattr(self.plugin, 'lastInput', None) != search_text:
+                    return
+                grid_manager.grid_glyphs = arrangement
+                self.plugin.base_arrangement = grid_manager.displayArrangement()
+                self.update_and_redraw_grid()
+            
+            from .random_arrangement import get_random_service
+            from .utils import FontManager
+            context_font, master = FontManager.getCurrentFontContext()
+            future = get_random_service().randomize_unlocked_positions_async(
+                self.plugin.base_arrangement[:], list(range(get_grid_shape().total)), chars,
+                apply_arrangement, context_font, master, key='fill_search'
+            )
+            return future is not None
+            
+        except Exception:
+            print(traceback.format_exc())
+            return False
+    
     def _fill_grid_from_chars(self, chars):
-        """從字符列表隨機填充九宮格（使用隨機排列服務）"""
+        """從字符列表隨機填充網格所有位置（使用隨機排列服務）"""
         try:
             # 兩層架構：使用 GridManager 填充基礎排列層
             if (hasattr(self.plugin, 'grid_manager') and 
@@ -164,7 +321,7 @@ class NineBoxEventHandler:
                 self.plugin.grid_manager.grid_glyphs = self.plugin.base_arrangement[:]
                 
                 # 獲取所有位置（包含中央位置）
-                all_positions = [0, 1, 2, 3, 4, 5, 6, 7, 8]
+                all_positions = list(range(get_grid_shape().total))
                 
                 # 使用隨機服務填充所有位置
                 changed = self.plugin.grid_manager.randomize_positions(all_positions, chars)
@@ -177,7 +334,7 @@ class NineBoxEventHandler:
                     from .random_arrangement import get_random_service
                     random_service = get_random_service()
                     if random_service and chars:
-                        all_positions = [0, 1, 2, 3, 4, 5, 6, 7, 8]
+                        all_positions = list(range(get_grid_shape().total))
                         random_chars = random_service.create_non_repeating_batch(chars, len(all_positions))
                         for i, pos in enumerate(all_positions):
                             self.plugin.base_arrangement[pos] = random_chars[i] if i < len(random_chars) else ''
@@ -185,7 +342,7 @@ class NineBoxEventHandler:
                         raise ImportError("隨機服務不可用")
                 except ImportError:
                     # 最終復原方案：填充基礎排列層
-                    positions = [0, 1, 2, 3, 4, 5, 6, 7, 8]
+                    positions = range(get_grid_shape().total)
                     for i, pos in enumerate(positions):
                         if i < len(chars):
                             self.plugin.base_arrangement[pos] = chars[i]
@@ -194,7 +351,7 @@ class NineBoxEventHandler:
         except Exception:
             print(traceback.format_exc())
             # 安全復原：直接操作基礎排列層
-            positions = [0, 1, 2, 3, 4, 5, 6, 7, 8]
+            positions = range(get_grid_shape().total)
             for i, pos in enumerate(positions):
                 if i < len(chars):
                     self.plugin.base_arrangement[pos] = chars[i]
@@ -208,7 +365,7 @@ class NineBoxEventHandler:
             position = field.position
             
             # 第一層防護：變更檢查（防止重複處理相同輸入）
-            current_lock_value = getattr(self.plugin, 'lock_inputs', [None] * 9)[position] if hasattr(self.plugin, 'lock_inputs') else None
+            current_lock_value = getattr(self.plugin, 'lock_inputs', [None] * get_grid_shape().total)[position] if hasattr(self.plugin, 'lock_inputs') else None
             if current_lock_value == text:
                 return  # 沒有變更，直接返回
             
@@ -242,7 +399,7 @@ class NineBoxEventHandler:
         """清除所有鎖定位置（減法重構：不觸發隨機排列）"""
         try:
             # 清空鎖定數組（排除中央位置）
-            positions = [0, 1, 2, 3, 5, 6, 7, 8]
+            positions = get_grid_shape().surrounding_positions()
             for pos in positions:
                 self.plugin.lock_inputs[pos] = ''
             
@@ -352,9 +509,15 @@ class NineBoxEventHandler:
                     # 一般更新使用輕量重繪
                     self.plugin.trigger_preview_redraw(use_refresh=False)
 
-                # 精確控制全域重繪：只在真正必要時觸發
+                # 隨機排列與字型變更填充只影響外掛預覽，不觸發 Glyphs 全域重繪
                 if should_randomize or force_font_change_fill:
-                    Glyphs.redraw()
+                    from .redraw_policy import (
+                        get_redraw_policy, REASON_RANDOMIZE, REASON_FONT_FILL
+                    )
+                    get_redraw_policy().request(
+                        REASON_RANDOMIZE if should_randomize else REASON_FONT_FILL,
+                        self.plugin.trigger_preview_redraw
+                    )
 
         except Exception:
             print(traceback.format_exc())
@@ -419,7 +582,9 @@ class NineBoxEventHandler:
             
             # 檢查是否有上次的字型記錄
             last_font_id = getattr(self.plugin, '_last_font_id', None)
-            current_font_id = id(current_font)
+            # 以序號識別字型（保存只改變快取版本，不視為切換字型）
+            from .font_identity import get_font_serial
+            current_font_id = get_font_serial(current_font)
             
             # 更新字型記錄
             self.plugin._last_font_id = current_font_id
@@ -451,8 +616,9 @@ class NineBoxEventHandler:
             invalid_base_positions = []    # 第二層無效位置
             
             # 檢查鎖定層
-            for pos in range(GRID_SIZE_TOTAL):
-                if pos != CENTER_POSITION and self.plugin.lock_inputs[pos]:
+            shape = get_grid_shape()
+            for pos in shape.surrounding_positions():
+                if self.plugin.lock_inputs[pos]:
                     char = self.plugin.lock_inputs[pos].strip()
                     if char:
                         glyph = get_glyph_with_fallback(new_font, char, new_master)
@@ -460,7 +626,7 @@ class NineBoxEventHandler:
                             invalid_lock_positions.append(pos)
             
             # 檢查第二層（獨立檢查，不受鎖定層影響）
-            for pos in range(GRID_SIZE_TOTAL):
+            for pos in range(shape.total):
                 if self.plugin.base_arrangement[pos]:
                     char = self.plugin.base_arrangement[pos]
                     glyph = get_glyph_with_fallback(new_font, char, new_master)
@@ -510,6 +676,11 @@ class NineBoxEventHandler:
                 if not parsed_chars:
                     return []  # 解析失敗，返回空列表
                 
+                # 範圍與萬用字元已依新字型的索引展開，不需逐一驗證
+                from NineBoxView.core.glyph_sources import is_lazy_glyph_set
+                if is_lazy_glyph_set(parsed_chars):
+                    return parsed_chars
+                
             except ImportError:
                 # 復原：簡單按空格分割
                 parsed_chars = last_input.strip().split()
@@ -613,6 +784,12 @@ class NineBoxEventHandler:
             notification: Glyphs 通知物件
         """
         try:
+            # 更新字型識別碼版本（保存後字符集可能已變更）
+            from .font_identity import get_font_identity_service, font_from_notification
+            get_font_identity_service().on_document_saved(
+                font_from_notification(notification) or Glyphs.font
+            )
+            
             # 文件保存時也可能影響字符有效性（例如新增字符）
             from .input_recognition import VisualFeedbackService
             VisualFeedbackService.refresh_all_annotations_on_font_change(self.plugin)
@@ -659,8 +836,9 @@ class NineBoxEventHandler:
         """
         try:
             # 僅清空視覺顯示相關的資料結構（保留使用者設定）
-            self.plugin.base_glyphs = [''] * GRID_SIZE_TOTAL
-            self.plugin.base_arrangement = [''] * GRID_SIZE_TOTAL  
+            grid_total = get_grid_shape().total
+            self.plugin.base_glyphs = [''] * grid_total
+            self.plugin.base_arrangement = [''] * grid_total
             
             # 保留使用者設定：
             # - self.plugin.lock_inputs 不清空（保留使用者的鎖定輸入框設定）
@@ -676,7 +854,7 @@ class NineBoxEventHandler:
             # 如果有活動視窗，觸發重繪以顯示空內容
             if self.plugin.has_active_window():
                 # 更新預覽視圖為空排列
-                self.plugin.update_preview_view([''] * GRID_SIZE_TOTAL)
+                self.plugin.update_preview_view([''] * grid_total)
                 
                 # 觸發重繪
                 self.plugin.trigger_preview_redraw(use_refresh=True)
@@ -0,0 +1,86 @@
+# encoding: utf-8
+
+"""
+FirstFrameMetric - 視窗開啟的首幀延遲量測
+記錄從 makeKeyAndOrderFront 開始到預覽視圖第一次完成 drawRect_ 的時間，
+並保留最近數次的樣本，讓分階段開啟流程的效能退化可被觀察
+"""
+
+from __future__ import division, print_function, unicode_literals
+import time
+from collections import deque
+
+# 保留的樣本數
+MAX_SAMPLES = 20
+
+
+class FirstFrameMetric(object):
+    """首幀延遲量測器"""
+
+    def __init__(self):
+        """初始化量測器"""
+        self._started_at = None
+        self._opened_at = None
+        self._samples = deque(maxlen=MAX_SAMPLES)
+        self._stage_marks = {}
+
+    def start(self):
+        """開始量測（視窗開啟流程的起點）"""
+        self._started_at = self._opened_at = time.time()
+        self._stage_marks = {}
+
+    def is_pending(self):
+        """檢查是否正在等待首幀"""
+        return self._started_at is not None
+
+    def mark_frame(self):
+        """記錄一次繪製完成（僅第一次有效）
+
+        Returns:
+            float or None: 首幀延遲（毫秒），非首幀時為 None
+        """
+        if self._started_at is None:
+            return None
+        elapsed = (time.time() - self._started_at) * 1000.0
+        self._samples.append(elapsed)
+        self._stage_marks['first_frame'] = elapsed
+        self._started_at = None
+        return elapsed
+
+    def mark_stage(self, stage_name):
+        """記錄開啟流程中某個階段的完成時間（相對於開啟起點）
+
+        Args:
+            stage_name (str): 階段名稱
+        """
+        if self._opened_at is not None:
+            self._stage_marks[stage_name] = (time.time() - self._opened_at) * 1000.0
+
+    def get_stats(self):
+        """取得量測統計資訊
+
+        Returns:
+            dict: 統計字典（最近一次、最佳、最差、平均首幀延遲與各階段完成時間，單位毫秒）
+        """
+        samples = list(self._samples)
+        return {
+            'count': len(samples),
+            'last_ms': samples[-1] if samples else None,
+            'best_ms': min(samples) if samples else None,
+            'worst_ms': max(samples) if samples else None,
+            'mean_ms': sum(samples) / len(samples) if samples else None,
+            'stages': dict(self._stage_marks)
+        }
+
+
+# 全域量測器實例
+_first_frame_metric = FirstFrameMetric()
+
+
+def get_first_frame_metric():
+    """獲取首幀延遲量測器實例
+
+    Returns:
+        FirstFrameMetric: 量測器實例
+    """
+    return _first_frame_metric
@@ -0,0 +1,202 @@
+# encoding: utf-8
+
+"""
+FontIdentityService - 統一的字型識別服務
+每個 GSFont 在開啟（或第一次被查詢）時取得一個穩定的序號，
+文件保存時更新版本（字符集可能已變更），關閉時移除；
+識別檢查只是字典查詢，不再對字型檔案執行 os.path.getmtime
+
+- 序號（get_font_serial）：字型識別，保存後不變，用於判斷是否切換了字型
+- 識別碼（get_font_token）：「序號.版本」，保存後改變，只用於快取失效
+"""
+
+from __future__ import division, print_function, unicode_literals
+import traceback
+
+
+def font_from_notification(notification):
+    """從 Glyphs 通知物件取得字型
+
+    Args:
+        notification: Glyphs 通知物件（object() 為 GSDocument 或 GSFont）
+
+    Returns:
+        GSFont or None: 字型物件
+    """
+    try:
+        obj = notification.object() if hasattr(notification, 'object') else None
+        if obj is None:
+            return None
+
+        # GSDocument → GSFont
+        font = getattr(obj, 'font', None)
+        if callable(font):
+            font = font()
+        if font is not None:
+            return font
+
+        # 通知物件本身即為字型
+        if hasattr(obj, 'glyphs') and hasattr(obj, 'masters'):
+            return obj
+
+    except Exception:
+        print(traceback.format_exc())
+    return None
+
+
+class FontIdentityService(object):
+    """字型識別服務
+
+    識別碼格式為「序號.版本」：序號於字型開啟時分配，版本於每次保存時遞增。
+    條目保留字型物件的參照，直到字型關閉為止，因此 id(font) 不會被其他物件重複使用。
+    """
+
+    def __init__(self):
+        """初始化服務"""
+        self._entries = {}      # id(font) → [font, 序號, 版本]
+        self._next_serial = 1
+        self._stats = {
+            'lookups': 0,
+            'assigned': 0,
+            'saved': 0,
+            'closed': 0
+        }
+
+    def get_serial(self, font):
+        """取得字型的序號（未登記的字型會自動登記；保存後不變）
+
+        Args:
+            font: GSFont 物件
+
+        Returns:
+            str or None: 序號
+        """
+        entry = self._lookup(font)
+        return '%d' % entry[1] if entry is not None else None
+
+    def get_token(self, font):
+        """取得字型的快取識別碼「序號.版本」（保存後改變，只用於快取失效）
+
+        Args:
+            font: GSFont 物件
+
+        Returns:
+            str or None: 識別碼
+        """
+        entry = self._lookup(font)
+        return '%d.%d' % (entry[1], entry[2]) if entry is not None else None
+
+    def on_document_opened(self, font):
+        """文件開啟：分配新的識別碼
+
+        Args:
+            font: GSFont 物件
+        """
+        if font is not None:
+            self._register(font)
+
+    def on_document_saved(self, font):
+        """文件保存：遞增版本
+
+        Args:
+            font: GSFont 物件
+        """
+        if font is None:
+            return
+        entry = self._entries.get(id(font))
+        if entry is None or entry[0] is not font:
+            self._register(font)
+            return
+        entry[2] += 1
+        self._stats['saved'] += 1
+
+    def on_document_closed(self, font):
+        """文件關閉：移除識別碼
+
+        Args:
+            font: GSFont 物件
+        """
+        if font is None:
+            return
+        entry = self._entries.get(id(font))
+        if entry is not None and entry[0] is font:
+            del self._entries[id(font)]
+            self._stats['closed'] += 1
+
+    def prune(self, open_fonts):
+        """移除已不在開啟清單中的字型
+
+        Args:
+            open_fonts: 目前開啟的字型序列
+        """
+        open_ids = set(id(font) for font in open_fonts or ())
+        for font_id in list(self._entries):
+            if font_id not in open_ids:
+                del self._entries[font_id]
+                self._stats['closed'] += 1
+
+    def get_stats(self):
+        """取得識別服務統計資訊
+
+        Returns:
+            dict: 統計字典（查詢數、分配數、保存數、關閉數、登記中的字型數）
+        """
+        stats = self._stats.copy()
+        stats['tracked'] = len(self._entries)
+        return stats
+
+    def _lookup(self, font):
+        """取得字型的條目（未登記的字型會自動登記）"""
+        if font is None:
+            return None
+
+        self._stats['lookups'] += 1
+        entry = self._entries.get(id(font))
+        if entry is None or entry[0] is not font:
+            entry = self._register(font)
+        return entry
+
+    def _register(self, font):
+        """登記字型並分配新序號"""
+        entry = [font, self._next_serial, 0]
+        self._entries[id(font)] = entry
+        self._next_serial += 1
+        self._stats['assigned'] += 1
+        return entry
+
+
+# 全域識別服務實例
+_font_identity_service = FontIdentityService()
+
+
+def get_font_identity_service():
+    """獲取字型識別服務實例
+
+    Returns:
+        FontIdentityService: 識別服務實例
+    """
+    return _font_identity_service
+
+
+def get_font_serial(font):
+    """取得字型序號的便捷函數（字型識別，保存後不變）
+
+    Args:
+        font: GSFont 物件
+
+    Returns:
+        str or None: 序號
+    """
+    return _font_identity_service.get_serial(font)
+
+
+def get_font_token(font):
+    """取得字型快取識別碼的便捷函數（保存後改變）
+
+    Args:
+        font: GSFont 物件
+
+    Returns:
+        str or None: 識別碼
+    """
+    return _font_identity_service.get_token(font)
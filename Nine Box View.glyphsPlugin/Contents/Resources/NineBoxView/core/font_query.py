@@ -0,0 +1,199 @@
+# encoding: utf-8
+
+"""
+FontQuery - 以字符索引回答的參考字符查詢
+搜尋輸入框中的查詢標記會展開為符合條件的字符名稱：
+
+    category:Letter            分類
+    category:Letter/Uppercase  分類/子分類
+    script:han                 書寫系統
+    block:CJK_Ext_A            Unicode 區塊（忽略大小寫、空白與底線，Extension 可縮寫為 Ext）
+    component:A                使用元件 A 的字符
+    label:red                  顏色標籤
+
+以 & 連接多個條件取交集，例如 script:han&label:red；
+查詢標記在 CJK 斷字之前辨識，值可以是 CJK 字符，例如 component:天
+"""
+
+from __future__ import division, print_function, unicode_literals
+import re
+import traceback
+from itertools import islice
+
+from .glyph_index import (
+    FIELD_CATEGORY, FIELD_SUBCATEGORY, FIELD_SCRIPT,
+    FIELD_BLOCK, FIELD_COMPONENT, FIELD_LABEL,
+    describe_glyph, normalize_key, get_glyph_index_registry
+)
+
+# 查詢鍵（含別名）→ 索引欄位
+QUERY_FIELDS = {
+    'category': FIELD_CATEGORY,
+    'cat': FIELD_CATEGORY,
+    'subcategory': FIELD_SUBCATEGORY,
+    'sub': FIELD_SUBCATEGORY,
+    'script': FIELD_SCRIPT,
+    'block': FIELD_BLOCK,
+    'component': FIELD_COMPONENT,
+    'comp': FIELD_COMPONENT,
+    'label': FIELD_LABEL,
+    'color': FIELD_LABEL,
+}
+
+_CLAUSE_PATTERN = re.compile(r'^([A-Za-z]+)[:=](.+)$')
+
+# 索引背景建立中，每次查詢直接檢查的未合併字符數量上限
+MAX_DIRECT_SCAN = 500
+
+
+def parse_query(text):
+    """解析查詢標記
+
+    Args:
+        text (str): 查詢標記，例如 "script:han&label:red"
+
+    Returns:
+        list or None: [(欄位, 值), ...]，不是查詢標記時為 None
+    """
+    if not text:
+        return None
+
+    clauses = []
+    for part in text.split('&'):
+        match = _CLAUSE_PATTERN.match(part.strip())
+        if not match:
+            return None
+        field = QUERY_FIELDS.get(match.group(1).lower())
+        if field is None:
+            return None
+        value = match.group(2)
+        # 「分類/子分類」只有在分類欄位中才有意義
+        if field == FIELD_CATEGORY and '/' in value:
+            field = FIELD_SUBCATEGORY
+        clauses.append((field, value))
+    return clauses
+
+
+def is_query_token(text):
+    """檢查文字是否為查詢標記
+
+    Args:
+        text (str): 輸入片段
+
+    Returns:
+        bool: True 如果是查詢標記
+    """
+    return parse_query(text) is not None
+
+
+def execute_query(index, clauses):
+    """在索引上執行查詢（成本正比於各條件的結果數量）
+
+    Args:
+        index (GlyphIndex): 字符索引
+        clauses (list): [(欄位, 值), ...]
+
+    Returns:
+        list: 依字型順序排列的字符名稱
+    """
+    if index is None or not clauses:
+        return []
+
+    # 由最小的集合開始取交集
+    sets = sorted((index.lookup(field, value) for field, value in clauses), key=len)
+    result = set(sets[0])
+    for names in sets[1:]:
+        if not result:
+            break
+        result.intersection_update(names)
+
+    # 背景建立中：尚未合併的字符直接由 font.glyphs 檢查
+    if not index.complete:
+        result.update(_iter_pending(index, clauses))
+    return index.ordered(result)
+
+
+def iter_query_matches(index, clauses):
+    """逐一產生符合查詢的字符名稱（不排序，不建立完整結果）
+
+    Args:
+        index (GlyphIndex): 字符索引
+        clauses (list): [(欄位, 值), ...]
+
+    Yields:
+        str: 字符名稱
+    """
+    if index is None or not clauses:
+        return
+
+    sets = sorted((index.lookup(field, value) for field, value in clauses), key=len)
+    others = sets[1:]
+    for name in sets[0]:
+        if all(name in names for names in others):
+            yield name
+
+    if not index.complete:
+        for name in _iter_pending(index, clauses):
+            yield name
+
+
+def _iter_pending(index, clauses):
+    """直接檢查尚未合併到索引的字符（數量有上限）
+
+    Args:
+        index (GlyphIndex): 建立中的字符索引
+        clauses (list): [(欄位, 值), ...]
+
+    Yields:
+        str: 符合條件的字符名稱
+    """
+    keys = [(field, value if field == FIELD_COMPONENT else normalize_key(value)) for field, value in clauses]
+    for name in list(islice(index.pending_names(), MAX_DIRECT_SCAN)):
+        glyph = index.direct_glyph(name)
+        if glyph is None:
+            continue
+        values = describe_glyph(glyph)
+        if all(key in values[field] for field, key in keys):
+            yield name
+
+
+def query_glyph_names(font, text):
+    """以查詢標記取得字型中符合條件的字符名稱
+
+    Args:
+        font: GSFont 物件
+        text (str): 查詢標記
+
+    Returns:
+        list: 字符名稱（不是查詢標記或查無結果時為空列表）
+    """
+    try:
+        clauses = parse_query(text)
+        if not clauses or font is None:
+            return []
+        index = get_glyph_index_registry().get_index(font)
+        return execute_query(index, clauses)
+    except Exception:
+        print(traceback.format_exc())
+        return []
+
+
+def query_has_match(font, text):
+    """檢查查詢標記在字型中是否有符合的字符（找到第一個即停止）
+
+    Args:
+        font: GSFont 物件
+        text (str): 查詢標記
+
+    Returns:
+        bool: True 如果至少有一個符合的字符
+    """
+    try:
+        clauses = parse_query(text)
+        if not clauses or font is None:
+            return False
+        index = get_glyph_index_registry().get_index(font)
+        return next(iter_query_matches(index, clauses), None) is not None
+    except Exception:
+        print(traceback.format_exc())
+        return False
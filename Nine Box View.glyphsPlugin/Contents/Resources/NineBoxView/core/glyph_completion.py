@@ -0,0 +1,241 @@
+# encoding: utf-8
+
+"""
+GlyphCompletion - 字符名稱自動完成
+以字符索引的排序名稱列表回答前綴查詢（二分搜尋，成本與字型大小的對數及候選數量成正比），
+六萬字符的字型也能在一次按鍵間隔內回應；先列出大小寫相符的名稱，再補上不分大小寫的名稱。
+候選名稱在回傳前確認仍存在於字型中，已改名或刪除的名稱會從索引移除；
+完成請求不建立或重建索引：尚未建立時排入閒置處理，字型新增的字符以增量更新加入，
+建立中或尚未同步時回傳已有的部分結果
+"""
+
+from __future__ import division, print_function, unicode_literals
+import time
+import traceback
+
+from .glyph_index import get_glyph_index_registry
+from .index_builder import dispatch_to_main
+
+# 候選名稱數量上限
+MAX_COMPLETIONS = 20
+
+# 觸發自動完成的最短前綴
+MIN_PREFIX_LENGTH = 2
+
+
+def completion_token(text, end):
+    """取得游標前的輸入標記（以空白分隔）
+
+    Args:
+        text (str): 完整輸入文字
+        end (int): 標記結束位置（游標位置）
+
+    Returns:
+        str: 標記
+    """
+    start = end
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+    return text[start:end]
+
+
+def should_complete(token):
+    """檢查標記是否適合自動完成
+
+    查詢、範圍、萬用字元標記與 CJK 字符不提供名稱完成
+
+    Args:
+        token (str): 輸入標記
+
+    Returns:
+        bool: True 如果應提供自動完成
+    """
+    if len(token) < MIN_PREFIX_LENGTH:
+        return False
+    try:
+        from .input_recognition import InputRecognitionService
+        if any(InputRecognitionService._is_cjk_char(char) for char in token):
+            return False
+        from .font_query import is_query_token
+        from .glyph_sources import is_lazy_token
+        return not (is_query_token(token) or is_lazy_token(token))
+    except Exception:
+        print(traceback.format_exc())
+        return False
+
+
+def should_trigger_completion(previous_length, text, cursor, selection_length):
+    """檢查文字變更是否為一般鍵入（觸發自動完成彈出視窗）
+
+    只有文字增加且沒有選取範圍時才觸發；自動完成插入的暫定文字會被選取，
+    藉此避免彈出視窗在暫定插入時重複觸發
+
+    Args:
+        previous_length (int): 變更前的文字長度
+        text (str): 變更後的文字
+        cursor (int): 游標位置
+        selection_length (int): 目前選取範圍長度
+
+    Returns:
+        bool: True 如果應觸發自動完成
+    """
+    if selection_length or len(text) <= previous_length:
+        return False
+    return should_complete(completion_token(text, cursor))
+
+
+def completions_for_range(text, location, length, limit=MAX_COMPLETIONS):
+    """計算文字檢視自動完成的取代字串
+
+    文字檢視只取代 partial word range（可能只是名稱中 '.' 之後的部分），
+    因此以游標前的整個標記查詢，回傳時去掉範圍之前已輸入的部分
+
+    Args:
+        text (str): 完整輸入文字
+        location (int): partial word range 起點
+        length (int): partial word range 長度
+        limit (int): 候選名稱數量上限
+
+    Returns:
+        list: 取代字串
+    """
+    try:
+        token = completion_token(text, location + length)
+        if not should_complete(token):
+            return []
+
+        from .glyphs_service import get_glyphs_service
+        font = get_glyphs_service().get_current_font()
+        names = _glyph_name_completer.complete(font, token, limit)
+
+        lead = len(token) - length
+        return [name[lead:] for name in names if len(name) > lead]
+    except Exception:
+        print(traceback.format_exc())
+        return []
+
+
+class GlyphNameCompleter(object):
+    """字符名稱自動完成器"""
+
+    def __init__(self):
+        """初始化完成器"""
+        self._stats = {
+            'queries': 0,
+            'deferred_builds': 0,
+            'added_glyphs': 0,
+            'stale_removed': 0,
+            'last_ms': 0.0,
+            'max_ms': 0.0
+        }
+
+    def complete(self, font, prefix, limit=MAX_COMPLETIONS):
+        """列出以 prefix 開頭的字符名稱
+
+        Args:
+            font: GSFont 物件
+            prefix (str): 名稱前綴
+            limit (int): 候選名稱數量上限
+
+        Returns:
+            list: 候選名稱（大小寫相符者在前；索引尚未建立時只有完全相符的名稱）
+        """
+        if font is None or not prefix:
+            return []
+
+        started = time.time()
+        try:
+            registry = get_glyph_index_registry()
+            index = registry.peek(font)
+            if index is None:
+                # 不在按鍵間隔內建立索引：排入閒置處理（沒有主執行緒佇列時直接建立）
+                self._stats['deferred_builds'] += 1
+                if not dispatch_to_main(lambda: registry.get_index(font)):
+                    registry.get_index(font)
+                return self._exact_match(font, prefix)
+
+            if not index.building and len(index) != len(font.glyphs):
+                # 字型新增了字符：以增量更新加入輸入中的名稱，不重建整個索引
+                self._add_new_glyph(registry, font, index, prefix)
+
+            names = index.sorted_names
+            start, end = index.prefix_range(prefix)
+            candidates = names[start:min(end, start + limit)]
+
+            if len(candidates) < limit:
+                seen = set(candidates)
+                folded = index.sorted_folded_names
+                start, end = index.folded_prefix_range(prefix)
+                for position in range(start, end):
+                    name = folded[position][1]
+                    if name not in seen:
+                        candidates.append(name)
+                        if len(candidates) >= limit:
+                            break
+
+            return self._drop_stale(font, index, candidates)
+
+        except Exception:
+            print(traceback.format_exc())
+            return []
+
+        finally:
+            elapsed = (time.time() - started) * 1000.0
+            self._stats['queries'] += 1
+            self._stats['last_ms'] = elapsed
+            self._stats['max_ms'] = max(self._stats['max_ms'], elapsed)
+
+    def _exact_match(self, font, prefix):
+        """字型中與前綴完全相符的名稱（索引尚未建立時的部分結果）"""
+        try:
+            glyph = font.glyphs[prefix]
+        except (KeyError, IndexError):
+            glyph = None
+        if glyph is not None and glyph.name == prefix:
+            return [prefix]
+        return []
+
+    def _add_new_glyph(self, registry, font, index, prefix):
+        """將字型中與前綴完全相符、尚未加入索引的字符增量加入"""
+        if prefix in index:
+            return
+        glyph = index.direct_glyph(prefix)
+        if glyph is not None and glyph.name == prefix:
+            registry.refresh_glyphs(font, [glyph])
+            self._stats['added_glyphs'] += 1
+
+    def _drop_stale(self, font, index, candidates):
+        """移除已不存在於字型中的名稱（改名或刪除的字符）"""
+        valid = []
+        for name in candidates:
+            try:
+                glyph = font.glyphs[name]
+            except (KeyError, IndexError):
+                glyph = None
+            if glyph is not None and glyph.name == name:
+                valid.append(name)
+            else:
+                index.remove_glyph(name)
+                self._stats['stale_removed'] += 1
+        return valid
+
+    def get_stats(self):
+        """取得自動完成統計資訊
+
+        Returns:
+            dict: 統計字典（查詢數、延後建立次數、增量加入的字符數、移除的過期名稱數、最近一次與最長的查詢時間）
+        """
+        return self._stats.copy()
+
+
+# 全域完成器實例
+_glyph_name_completer = GlyphNameCompleter()
+
+
+def get_glyph_name_completer():
+    """獲取字符名稱自動完成器實例
+
+    Returns:
+        GlyphNameCompleter: 完成器實例
+    """
+    return _glyph_name_completer
@@ -0,0 +1,995 @@
+# encoding: utf-8
+
+"""
+GlyphIndex - 每個字型的字符次要索引
+依分類、子分類、書寫系統、Unicode 區塊、元件使用者與顏色標籤建立反查表，
+讓「所有漢字」、「使用元件 X 的字符」等查詢只需成本正比於結果數量的集合運算，
+不必在每次點擊時掃描整個 font.glyphs；編輯中的字符以 lastChange 增量更新，
+改名以字符 ID 追蹤，新增與刪除的字符逐一補齊而不重建整個索引
+"""
+
+from __future__ import division, print_function, unicode_literals
+import traceback
+from bisect import bisect_left, bisect_right, insort
+
+# 索引欄位
+FIELD_CATEGORY = 'category'
+FIELD_SUBCATEGORY = 'subcategory'
+FIELD_SCRIPT = 'script'
+FIELD_BLOCK = 'block'
+FIELD_COMPONENT = 'component'
+FIELD_LABEL = 'label'
+
+INDEX_FIELDS = (
+    FIELD_CATEGORY, FIELD_SUBCATEGORY, FIELD_SCRIPT,
+    FIELD_BLOCK, FIELD_COMPONENT, FIELD_LABEL
+)
+
+# Glyphs 顏色標籤索引（glyph.color）
+LABEL_NAMES = (
+    'red', 'orange', 'brown', 'yellow', 'lightgreen', 'darkgreen',
+    'lightblue', 'darkblue', 'purple', 'magenta', 'lightgray', 'charcoal'
+)
+
+# Unicode 區塊（起點, 終點, 名稱），依起點排序
+UNICODE_BLOCKS = (
+    (0x0000, 0x007F, 'Basic Latin'),
+    (0x0080, 0x00FF, 'Latin-1 Supplement'),
+    (0x0100, 0x017F, 'Latin Extended-A'),
+    (0x0180, 0x024F, 'Latin Extended-B'),
+    (0x0250, 0x02AF, 'IPA Extensions'),
+    (0x02B0, 0x02FF, 'Spacing Modifier Letters'),
+    (0x0300, 0x036F, 'Combining Diacritical Marks'),
+    (0x0370, 0x03FF, 'Greek and Coptic'),
+    (0x0400, 0x04FF, 'Cyrillic'),
+    (0x0500, 0x052F, 'Cyrillic Supplement'),
+    (0x0530, 0x058F, 'Armenian'),
+    (0x0590, 0x05FF, 'Hebrew'),
+    (0x0600, 0x06FF, 'Arabic'),
+    (0x0900, 0x097F, 'Devanagari'),
+    (0x0E00, 0x0E7F, 'Thai'),
+    (0x1100, 0x11FF, 'Hangul Jamo'),
+    (0x1E00, 0x1EFF, 'Latin Extended Additional'),
+    (0x1F00, 0x1FFF, 'Greek Extended'),
+    (0x2000, 0x206F, 'General Punctuation'),
+    (0x2070, 0x209F, 'Superscripts and Subscripts'),
+    (0x20A0, 0x20CF, 'Currency Symbols'),
+    (0x2100, 0x214F, 'Letterlike Symbols'),
+    (0x2150, 0x218F, 'Number Forms'),
+    (0x2190, 0x21FF, 'Arrows'),
+    (0x2200, 0x22FF, 'Mathematical Operators'),
+    (0x2460, 0x24FF, 'Enclosed Alphanumerics'),
+    (0x2500, 0x257F, 'Box Drawing'),
+    (0x25A0, 0x25FF, 'Geometric Shapes'),
+    (0x2E80, 0x2EFF, 'CJK Radicals Supplement'),
+    (0x2F00, 0x2FDF, 'Kangxi Radicals'),
+    (0x2FF0, 0x2FFF, 'Ideographic Description Characters'),
+    (0x3000, 0x303F, 'CJK Symbols and Punctuation'),
+    (0x3040, 0x309F, 'Hiragana'),
+    (0x30A0, 0x30FF, 'Katakana'),
+    (0x3100, 0x312F, 'Bopomofo'),
+    (0x3130, 0x318F, 'Hangul Compatibility Jamo'),
+    (0x31A0, 0x31BF, 'Bopomofo Extended'),
+    (0x31C0, 0x31EF, 'CJK Strokes'),
+    (0x31F0, 0x31FF, 'Katakana Phonetic Extensions'),
+    (0x3200, 0x32FF, 'Enclosed CJK Letters and Months'),
+    (0x3300, 0x33FF, 'CJK Compatibility'),
+    (0x3400, 0x4DBF, 'CJK Unified Ideographs Extension A'),
+    (0x4E00, 0x9FFF, 'CJK Unified Ideographs'),
+    (0xA960, 0xA97F, 'Hangul Jamo Extended-A'),
+    (0xAC00, 0xD7AF, 'Hangul Syllables'),
+    (0xD7B0, 0xD7FF, 'Hangul Jamo Extended-B'),
+    (0xE000, 0xF8FF, 'Private Use Area'),
+    (0xF900, 0xFAFF, 'CJK Compatibility Ideographs'),
+    (0xFB00, 0xFB4F, 'Alphabetic Presentation Forms'),
+    (0xFE30, 0xFE4F, 'CJK Compatibility Forms'),
+    (0xFF00, 0xFFEF, 'Halfwidth and Fullwidth Forms'),
+    (0x1B000, 0x1B0FF, 'Kana Supplement'),
+    (0x1B100, 0x1B12F, 'Kana Extended-A'),
+    (0x1B130, 0x1B16F, 'Small Kana Extension'),
+    (0x1F300, 0x1F5FF, 'Miscellaneous Symbols and Pictographs'),
+    (0x1F600, 0x1F64F, 'Emoticons'),
+    (0x20000, 0x2A6DF, 'CJK Unified Ideographs Extension B'),
+    (0x2A700, 0x2B73F, 'CJK Unified Ideographs Extension C'),
+    (0x2B740, 0x2B81F, 'CJK Unified Ideographs Extension D'),
+    (0x2B820, 0x2CEAF, 'CJK Unified Ideographs Extension E'),
+    (0x2CEB0, 0x2EBEF, 'CJK Unified Ideographs Extension F'),
+    (0x2EBF0, 0x2EE5F, 'CJK Unified Ideographs Extension I'),
+    (0x2F800, 0x2FA1F, 'CJK Compatibility Ideographs Supplement'),
+    (0x30000, 0x3134F, 'CJK Unified Ideographs Extension G'),
+    (0x31350, 0x323AF, 'CJK Unified Ideographs Extension H'),
+)
+
+_BLOCK_STARTS = [block[0] for block in UNICODE_BLOCKS]
+
+# 正規化結果快取（分類、書寫系統與區塊名稱重複率極高）
+_NORMALIZED_KEYS = {}
+MAX_NORMALIZED_KEYS = 4096
+
+# 名稱變更記錄的長度上限（超過時捨棄較舊的一半，落後的讀取端重新開始）
+MAX_NAME_LOG = 8192
+
+
+def normalize_key(value):
+    """正規化索引值（小寫、移除空白與標點；區塊名稱的 Extension 縮寫為 Ext）
+
+    例如 "CJK Ext A"、"cjk_unified_ideographs_extension_a" 都正規化為 "cjkexta"；
+    保留「分類/子分類」的斜線
+
+    Args:
+        value: 原始值
+
+    Returns:
+        str: 正規化後的值
+    """
+    text = '%s' % value
+    key = _NORMALIZED_KEYS.get(text)
+    if key is None:
+        key = text.lower()
+        key = key.replace('unified ideographs', '').replace('unified_ideographs', '')
+        key = key.replace('extension', 'ext')
+        key = ''.join(char for char in key if char.isalnum() or char == '/')
+        if len(_NORMALIZED_KEYS) < MAX_NORMALIZED_KEYS:
+            _NORMALIZED_KEYS[text] = key
+    return key
+
+
+def block_for_codepoint(code_point):
+    """查詢碼位所屬的 Unicode 區塊
+
+    Args:
+        code_point (int): Unicode 碼位
+
+    Returns:
+        str or None: 區塊名稱
+    """
+    position = bisect_right(_BLOCK_STARTS, code_point) - 1
+    if position >= 0:
+        start, end, name = UNICODE_BLOCKS[position]
+        if start <= code_point <= end:
+            return name
+    return None
+
+
+def label_key(color):
+    """將 glyph.color 轉為標籤索引值
+
+    Args:
+        color: glyph.color（未設定時為 None 或超出範圍的整數）
+
+    Returns:
+        str or None: 標籤名稱
+    """
+    try:
+        color = int(color)
+    except (TypeError, ValueError):
+        return None
+    if 0 <= color < len(LABEL_NAMES):
+        return LABEL_NAMES[color]
+    return None
+
+
+def glyph_unicodes(glyph):
+    """讀取字符的 Unicode 十六進位字串
+
+    Args:
+        glyph: GSGlyph 物件
+
+    Returns:
+        tuple: 十六進位字串
+    """
+    unicodes = getattr(glyph, 'unicodes', None) or ()
+    if not unicodes and getattr(glyph, 'unicode', None):
+        unicodes = (glyph.unicode,)
+    return tuple(unicodes)
+
+
+def glyph_codepoints(glyph):
+    """讀取字符的 Unicode 碼位
+
+    Args:
+        glyph: GSGlyph 物件
+
+    Returns:
+        tuple: 碼位（整數）
+    """
+    return parse_codepoints(glyph_unicodes(glyph))
+
+
+def parse_codepoints(unicodes):
+    """將 Unicode 十六進位字串轉為碼位（純 Python，可在背景執行緒執行）
+
+    Args:
+        unicodes: 十六進位字串序列
+
+    Returns:
+        tuple: 碼位（整數）
+    """
+    code_points = []
+    for unicode_hex in unicodes:
+        try:
+            code_points.append(int(unicode_hex, 16))
+        except (TypeError, ValueError):
+            pass
+    return tuple(code_points)
+
+
+def block_keys(code_points):
+    """取得碼位所屬 Unicode 區塊的索引值（純 Python，可在背景執行緒執行）
+
+    Args:
+        code_points: 碼位序列
+
+    Returns:
+        set: 正規化後的區塊名稱
+    """
+    keys = set()
+    for code_point in code_points:
+        block = block_for_codepoint(code_point)
+        if block:
+            keys.add(normalize_key(block))
+    return keys
+
+
+def describe_glyph(glyph):
+    """讀取字符在各索引欄位的值
+
+    Args:
+        glyph: GSGlyph 物件
+
+    Returns:
+        dict: 欄位 → 值的集合（正規化後）
+    """
+    values = describe_glyph_attributes(glyph)
+    values[FIELD_BLOCK] = block_keys(glyph_codepoints(glyph))
+    return values
+
+
+def describe_glyph_attributes(glyph):
+    """讀取需要存取字符物件的欄位值（分類、書寫系統、元件、標籤；須在主執行緒執行）
+
+    Args:
+        glyph: GSGlyph 物件
+
+    Returns:
+        dict: 欄位 → 值的集合（區塊欄位為空集合）
+    """
+    values = dict((field, set()) for field in INDEX_FIELDS)
+
+    category = getattr(glyph, 'category', None)
+    subcategory = getattr(glyph, 'subCategory', None)
+    if category:
+        values[FIELD_CATEGORY].add(normalize_key(category))
+        if subcategory:
+            values[FIELD_SUBCATEGORY].add(normalize_key(category) + '/' + normalize_key(subcategory))
+    if subcategory:
+        values[FIELD_SUBCATEGORY].add(normalize_key(subcategory))
+
+    script = getattr(glyph, 'script', None)
+    if script:
+        values[FIELD_SCRIPT].add(normalize_key(script))
+
+    for layer in getattr(glyph, 'layers', None) or ():
+        for component in getattr(layer, 'components', None) or ():
+            component_name = getattr(component, 'componentName', None)
+            if component_name:
+                values[FIELD_COMPONENT].add(component_name)
+
+    label = label_key(getattr(glyph, 'color', None))
+    if label:
+        values[FIELD_LABEL].add(label)
+
+    return values
+
+
+class GlyphIndex(object):
+    """單一字型的字符次要索引
+
+    除了欄位反查表，也維護排序後的字符名稱、反轉名稱、小寫名稱與碼位列表，
+    讓前綴、後綴與碼位範圍以二分搜尋取得連續區段
+    （供延遲展開的字符來源與名稱自動完成使用，相當於攤平成陣列的前綴樹）
+    """
+
+    def __init__(self, font):
+        """初始化索引（不立即建立）
+
+        Args:
+            font: GSFont 物件
+        """
+        self.font = font
+        self.revision = 0
+        self._order = {}      # 字符名稱 → 字型中的順序
+        self._entries = {}    # 字符名稱 → (lastChange, 欄位值字典, 碼位)
+        self._names_by_id = {}  # 字符 ID → 最後一次索引時的名稱（偵測改名）
+        self._fields = dict((field, {}) for field in INDEX_FIELDS)
+        self._next_order = 0
+        self._sorted_names = []
+        self._sorted_reversed = []
+        self._sorted_folded = []    # (小寫名稱, 名稱)
+        self._code_points = []
+        self._code_point_names = {}
+        self._pending = set()       # 背景建立中尚未合併的字符名稱
+        self._unsorted = False      # 排序列表有尚未排序的附加條目
+        self._resolution = None     # (版本, 名稱集合, 碼位 → 名稱) 不可變快照
+        self._name_log = []         # [(名稱, 是否加入), ...] 名稱集合的增量變更
+        self._name_log_base = 0     # 記錄第一筆的位置
+        self.name_epoch = 0         # 清除索引時遞增（名稱變更記錄重新開始）
+        self.building = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    @property
+    def complete(self):
+        """索引是否涵蓋所有字符（背景建立完成）"""
+        return not self.building
+
+    def begin_progressive(self, names):
+        """開始背景建立：清除索引，之後由 merge_chunk() 逐段合併
+
+        Args:
+            names (list): 字符名稱快照（依字型順序）
+        """
+        self._reset()
+        self._pending = set(names)
+        self._next_order = len(names)
+        self.building = True
+        self.revision += 1
+
+    def merge_chunk(self, chunk):
+        """合併背景執行緒完成的一段條目（在主執行緒讀取需要字符物件的欄位）
+
+        Args:
+            chunk (list): [(字型中的順序, 名稱, 碼位, 區塊索引值), ...]
+
+        Returns:
+            int: 合併的字符數量
+        """
+        merged = 0
+        for position, name, code_points, blocks in chunk:
+            self._pending.discard(name)
+            if name in self._entries:
+                # 建立期間已由增量更新加入
+                continue
+            glyph = self.direct_glyph(name)
+            if glyph is None or glyph.name != name:
+                continue
+            values = describe_glyph_attributes(glyph)
+            values[FIELD_BLOCK] = set(blocks)
+            self._track_id(glyph, name)
+            self._order[name] = position
+            self._insert_entry(name, getattr(glyph, 'lastChange', None), values, code_points, bulk=True)
+            self._log_name(name, True)
+            merged += 1
+        # 排序延後到下一次前綴、後綴或碼位查詢，避免每段都重新排序整個列表
+        self._unsorted = True
+        self.revision += 1
+        return merged
+
+    def finish_progressive(self):
+        """結束背景建立"""
+        self._pending.clear()
+        self.building = False
+        self.revision += 1
+
+    def pending_names(self):
+        """背景建立中尚未合併的字符名稱（請勿修改）"""
+        return self._pending
+
+    def name_log_position(self):
+        """目前名稱變更記錄的位置
+
+        Returns:
+            tuple: (epoch, 位置)
+        """
+        return self.name_epoch, self._name_log_base + len(self._name_log)
+
+    def name_changes(self, epoch, position):
+        """取得指定位置之後的名稱變更（不掃描所有名稱）
+
+        Args:
+            epoch (int): 讀取端記錄的 epoch
+            position (int): 讀取端記錄的位置
+
+        Returns:
+            tuple or None: (新位置, [(名稱, 是否加入), ...])；索引已清除或記錄已截斷時為 None
+        """
+        if epoch != self.name_epoch or position < self._name_log_base:
+            return None
+        end = self._name_log_base + len(self._name_log)
+        return end, self._name_log[position - self._name_log_base:]
+
+    def _log_name(self, name, added):
+        """記錄名稱集合的變更"""
+        log = self._name_log
+        log.append((name, added))
+        if len(log) > MAX_NAME_LOG:
+            dropped = len(log) // 2
+            del log[:dropped]
+            self._name_log_base += dropped
+
+    def resolution_snapshot(self):
+        """取得名稱與碼位的不可變快照（供背景執行緒解析輸入；每個版本建立一次）
+
+        Returns:
+            tuple or None: (版本, 名稱 frozenset, 碼位 → 名稱 dict)；背景建立中為 None
+        """
+        if self.building:
+            return None
+        if self._resolution is None or self._resolution[0] != self.revision:
+            self._resolution = (self.revision, frozenset(self._entries), dict(self._code_point_names))
+        return self._resolution
+
+    def direct_glyph(self, name_or_char):
+        """直接由 font.glyphs 取得字符（索引尚未涵蓋時的後備）
+
+        Args:
+            name_or_char (str): 字符名稱或字元
+
+        Returns:
+            GSGlyph or None: 字符
+        """
+        try:
+            return self.font.glyphs[name_or_char]
+        except (KeyError, IndexError, TypeError):
+            return None
+
+    def build(self):
+        """完整建立索引（掃描一次 font.glyphs）"""
+        self._reset()
+        for glyph in self.font.glyphs:
+            self._insert(glyph, bulk=True)
+        self._finish_bulk()
+
+    def restore_snapshot(self, names, code_points, fields):
+        """由序列化的快照還原索引（不掃描字型）
+
+        還原的條目沒有 lastChange 與欄位值；移除時由反查表找出欄位值，
+        第一次增量更新時以字型內容重新建立
+
+        Args:
+            names (list): 字符名稱（依字型順序）
+            code_points (dict): 字符名稱 → 碼位
+            fields (dict): 欄位 → {值: 字符名稱集合}
+        """
+        self._reset()
+        for name in names:
+            glyph_code_points = code_points.get(name, ())
+            self._entries[name] = (None, None, glyph_code_points)
+            self._order[name] = self._next_order
+            self._next_order += 1
+            self._sorted_names.append(name)
+            self._sorted_reversed.append(name[::-1])
+            self._sorted_folded.append((name.lower(), name))
+            for code_point in glyph_code_points:
+                if code_point not in self._code_point_names:
+                    self._code_point_names[code_point] = name
+                    self._code_points.append(code_point)
+        for field in INDEX_FIELDS:
+            self._fields[field].update(fields.get(field, {}))
+        self._finish_bulk()
+
+    def export_snapshot(self):
+        """匯出索引快照（供磁碟快取序列化）
+
+        Returns:
+            tuple: (字符名稱列表, 名稱 → 碼位, 欄位 → {值: 字符名稱集合})
+        """
+        names = self.ordered(self._entries)
+        code_points = dict((name, entry[2]) for name, entry in self._entries.items() if entry[2])
+        return names, code_points, self._fields
+
+    def _reset(self):
+        """清除所有欄位與排序列表"""
+        self._order.clear()
+        self._entries.clear()
+        for field in INDEX_FIELDS:
+            self._fields[field].clear()
+        self._next_order = 0
+        del self._sorted_names[:]
+        del self._sorted_reversed[:]
+        del self._sorted_folded[:]
+        del self._code_points[:]
+        self._code_point_names.clear()
+        self._names_by_id.clear()
+        self._pending.clear()
+        self._unsorted = False
+        del self._name_log[:]
+        self._name_log_base = 0
+        self.name_epoch += 1
+        self.building = False
+
+    def _finish_bulk(self):
+        """排序大量加入的條目並遞增版本"""
+        self._unsorted = True
+        self._ensure_sorted()
+        self.revision += 1
+
+    def _ensure_sorted(self):
+        """排序附加的條目（既有區段已排序，sort() 以接近線性的時間合併）"""
+        if self._unsorted:
+            self._sorted_names.sort()
+            self._sorted_reversed.sort()
+            self._sorted_folded.sort()
+            self._code_points.sort()
+            self._unsorted = False
+
+    def update_glyph(self, glyph):
+        """增量更新單一字符（lastChange 未變時略過）
+
+        字符改名時（同一字符 ID 先前以其他名稱索引）移除舊名稱，新名稱沿用原本的字型順序
+
+        Args:
+            glyph: GSGlyph 物件
+
+        Returns:
+            bool: True 如果索引有變更
+        """
+        name = getattr(glyph, 'name', None)
+        if not name:
+            return False
+
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == getattr(glyph, 'lastChange', None):
+            self._track_id(glyph, name)
+            return False
+
+        previous = self._renamed_from(glyph, name)
+        if previous is not None:
+            position = self._order.get(previous)
+            self.remove_glyph(previous)
+            if position is not None and name not in self._order:
+                self._order[name] = position
+
+        self._remove(name)
+        self._insert(glyph)
+        if entry is None:
+            self._log_name(name, True)
+        self.revision += 1
+        return True
+
+    def reconcile(self):
+        """依字型目前的字符列表補齊索引（新增、改名與刪除的字符），既有條目不重新讀取
+
+        只讀取每個字符的名稱與 ID，僅對新名稱讀取欄位值，
+        成本遠低於重新建立整個索引
+
+        Returns:
+            int: 變更的字符數量
+        """
+        changed = 0
+        seen = set()
+        for glyph in self.font.glyphs:
+            name = getattr(glyph, 'name', None)
+            if not name:
+                continue
+            seen.add(name)
+            if name in self._entries:
+                self._track_id(glyph, name)
+            elif self.update_glyph(glyph):
+                changed += 1
+
+        for name in [name for name in self._entries if name not in seen]:
+            self.remove_glyph(name)
+            changed += 1
+        return changed
+
+    def tracked_name(self, glyph):
+        """取得字符 ID 最後一次被索引時的名稱
+
+        Args:
+            glyph: GSGlyph 物件
+
+        Returns:
+            str or None: 名稱（未追蹤時為 None）
+        """
+        glyph_id = getattr(glyph, 'id', None)
+        return self._names_by_id.get(glyph_id) if glyph_id else None
+
+    def _track_id(self, glyph, name):
+        """記錄字符 ID 對應的名稱"""
+        glyph_id = getattr(glyph, 'id', None)
+        if glyph_id:
+            self._names_by_id[glyph_id] = name
+
+    def _renamed_from(self, glyph, name):
+        """檢查字符是否由其他名稱改名而來
+
+        Returns:
+            str or None: 仍留在索引中的舊名稱
+        """
+        previous = self.tracked_name(glyph)
+        if previous is None or previous == name or previous not in self._entries:
+            return None
+        # 舊名稱已被另一個字符使用時不是改名
+        current = self.direct_glyph(previous)
+        if current is not None and getattr(current, 'id', None) != getattr(glyph, 'id', None):
+            return None
+        return previous
+
+    def remove_glyph(self, name):
+        """移除字符
+
+        Args:
+            name (str): 字符名稱
+        """
+        if name in self._entries:
+            self._remove(name)
+            self._order.pop(name, None)
+            self._log_name(name, False)
+            self.revision += 1
+
+    def lookup(self, field, value):
+        """查詢欄位值對應的字符名稱集合
+
+        Args:
+            field (str): 索引欄位
+            value (str): 欄位值（元件欄位為字符名稱，其餘會正規化）
+
+        Returns:
+            set: 字符名稱集合（請勿修改）
+        """
+        key = value if field == FIELD_COMPONENT else normalize_key(value)
+        return self._fields.get(field, {}).get(key, frozenset())
+
+    def values(self, field):
+        """列出欄位中所有出現過的值
+
+        Args:
+            field (str): 索引欄位
+
+        Returns:
+            list: 欄位值
+        """
+        return sorted(self._fields.get(field, {}))
+
+    @property
+    def sorted_names(self):
+        """依名稱排序的字符名稱列表（請勿修改）"""
+        self._ensure_sorted()
+        return self._sorted_names
+
+    @property
+    def sorted_reversed_names(self):
+        """依反轉字串排序的字符名稱列表（請勿修改）"""
+        self._ensure_sorted()
+        return self._sorted_reversed
+
+    @property
+    def code_points(self):
+        """排序後的碼位列表（請勿修改）"""
+        self._ensure_sorted()
+        return self._code_points
+
+    def name_for_codepoint(self, code_point):
+        """取得碼位對應的字符名稱
+
+        Args:
+            code_point (int): Unicode 碼位
+
+        Returns:
+            str or None: 字符名稱
+        """
+        name = self._code_point_names.get(code_point)
+        if name is None and self.building:
+            # 背景建立中：直接查詢字型
+            glyph = self.direct_glyph(chr(code_point))
+            name = glyph.name if glyph is not None else None
+        return name
+
+    def prefix_range(self, prefix):
+        """取得名稱以 prefix 開頭的字符在 sorted_names 中的區段
+
+        Args:
+            prefix (str): 名稱前綴
+
+        Returns:
+            tuple: (起點, 終點)，不含終點
+        """
+        self._ensure_sorted()
+        names = self._sorted_names
+        start = bisect_left(names, prefix)
+        end = bisect_left(names, prefix + '\U0010FFFF', start)
+        return start, end
+
+    def suffix_range(self, suffix):
+        """取得名稱以 suffix 結尾的字符在 sorted_reversed_names 中的區段
+
+        Args:
+            suffix (str): 名稱後綴
+
+        Returns:
+            tuple: (起點, 終點)，不含終點
+        """
+        return self._reversed_prefix_range(suffix[::-1])
+
+    def folded_prefix_range(self, prefix):
+        """取得小寫名稱以 prefix（不分大小寫）開頭的字符在 sorted_folded_names 中的區段
+
+        Args:
+            prefix (str): 名稱前綴
+
+        Returns:
+            tuple: (起點, 終點)，不含終點
+        """
+        self._ensure_sorted()
+        folded = prefix.lower()
+        names = self._sorted_folded
+        start = bisect_left(names, (folded,))
+        end = bisect_left(names, (folded + '\U0010FFFF',), start)
+        return start, end
+
+    @property
+    def sorted_folded_names(self):
+        """依小寫名稱排序的 (小寫名稱, 名稱) 列表（請勿修改）"""
+        self._ensure_sorted()
+        return self._sorted_folded
+
+    def codepoint_range(self, first, last):
+        """取得碼位介於 first 與 last（含）之間的字符在 code_points 中的區段
+
+        Args:
+            first (int): 起始碼位
+            last (int): 結束碼位
+
+        Returns:
+            tuple: (起點, 終點)，不含終點
+        """
+        self._ensure_sorted()
+        start = bisect_left(self._code_points, first)
+        end = bisect_right(self._code_points, last, start)
+        return start, end
+
+    def _reversed_prefix_range(self, reversed_prefix):
+        """在反轉名稱列表中以前綴取得區段"""
+        self._ensure_sorted()
+        names = self._sorted_reversed
+        start = bisect_left(names, reversed_prefix)
+        end = bisect_left(names, reversed_prefix + '\U0010FFFF', start)
+        return start, end
+
+    def ordered(self, names):
+        """依字型中的順序排列字符名稱
+
+        Args:
+            names: 字符名稱集合
+
+        Returns:
+            list: 排序後的字符名稱
+        """
+        order = self._order
+        return sorted(names, key=lambda name: order.get(name, 0))
+
+    def _insert(self, glyph, bulk=False):
+        """加入字符到所有欄位（bulk 時只附加，由 build() 統一排序）"""
+        name = glyph.name
+        if not name:
+            return
+        self._track_id(glyph, name)
+        self._insert_entry(
+            name, getattr(glyph, 'lastChange', None),
+            describe_glyph(glyph), glyph_codepoints(glyph), bulk
+        )
+
+    def _insert_entry(self, name, last_change, values, code_points, bulk=False):
+        """加入一筆條目到所有欄位"""
+        self._entries[name] = (last_change, values, code_points)
+        if name not in self._order:
+            self._order[name] = self._next_order
+            self._next_order += 1
+
+        if not bulk:
+            self._ensure_sorted()
+        add = list.append if bulk else insort
+        add(self._sorted_names, name)
+        add(self._sorted_reversed, name[::-1])
+        add(self._sorted_folded, (name.lower(), name))
+        for code_point in code_points:
+            if code_point not in self._code_point_names:
+                self._code_point_names[code_point] = name
+                add(self._code_points, code_point)
+
+        for field, keys in values.items():
+            table = self._fields[field]
+            for key in keys:
+                table.setdefault(key, set()).add(name)
+
+    def _remove(self, name):
+        """從所有欄位移除字符（保留順序）"""
+        entry = self._entries.pop(name, None)
+        if entry is None:
+            return
+        self._ensure_sorted()
+        self._discard_sorted(self._sorted_names, name)
+        self._discard_sorted(self._sorted_reversed, name[::-1])
+        self._discard_sorted(self._sorted_folded, (name.lower(), name))
+        for code_point in entry[2]:
+            if self._code_point_names.get(code_point) == name:
+                del self._code_point_names[code_point]
+                self._discard_sorted(self._code_points, code_point)
+        values = entry[1] if entry[1] is not None else self._values_from_tables(name)
+        for field, keys in values.items():
+            table = self._fields[field]
+            for key in keys:
+                names = table.get(key)
+                if names is not None:
+                    names.discard(name)
+                    if not names:
+                        del table[key]
+
+    def _values_from_tables(self, name):
+        """由反查表找出字符的欄位值（由快照還原的條目）"""
+        values = {}
+        for field, table in self._fields.items():
+            keys = [key for key, names in table.items() if name in names]
+            if keys:
+                values[field] = keys
+        return values
+
+    @staticmethod
+    def _discard_sorted(values, value):
+        """從排序列表移除一個值（不存在時略過）"""
+        position = bisect_left(values, value)
+        if position < len(values) and values[position] == value:
+            del values[position]
+
+
+class GlyphIndexRegistry(object):
+    """每個開啟字型的索引登記處
+
+    條目保留字型物件的參照，直到 discard() 為止；
+    第一次建立時先嘗試由磁碟快取還原，字符數量與索引不符（新增、刪除或改名）時增量補齊；
+    大型字型在背景建立，建立期間回傳部分索引
+    """
+
+    def __init__(self):
+        """初始化登記處"""
+        self._indexes = {}    # id(font) → GlyphIndex
+        self._stats = {
+            'builds': 0,
+            'background_builds': 0,
+            'restores': 0,
+            'incremental_updates': 0,
+            'reconciles': 0,
+            'queries': 0
+        }
+
+    def get_index(self, font):
+        """取得字型的索引（尚未建立時建立，字符數量變更時增量補齊）
+
+        Args:
+            font: GSFont 物件
+
+        Returns:
+            GlyphIndex or None: 索引
+        """
+        if font is None:
+            return None
+
+        self._stats['queries'] += 1
+        index = self.peek(font)
+        try:
+            from .index_builder import get_index_builder, BACKGROUND_BUILD_THRESHOLD
+            builder = get_index_builder()
+            if index is None:
+                index = GlyphIndex(font)
+                self._indexes[id(font)] = index
+                from .index_store import get_glyph_index_store
+                if get_glyph_index_store().load(font, index):
+                    self._stats['restores'] += 1
+
+            if index.building:
+                # 背景建立中：合併已完成的段落，回傳部分索引
+                builder.pump()
+            elif not index.revision:
+                if len(font.glyphs) >= BACKGROUND_BUILD_THRESHOLD and builder.start(font, index):
+                    self._stats['background_builds'] += 1
+                else:
+                    index.build()
+                    self._stats['builds'] += 1
+            elif len(index) != len(font.glyphs):
+                index.reconcile()
+                self._stats['reconciles'] += 1
+        except Exception:
+            print(traceback.format_exc())
+            return None
+        return index
+
+    def peek(self, font):
+        """取得已建立的索引（不建立）
+
+        Args:
+            font: GSFont 物件
+
+        Returns:
+            GlyphIndex or None: 索引
+        """
+        index = self._indexes.get(id(font))
+        if index is not None and index.font is font:
+            return index
+        return None
+
+    def get_revision(self, font):
+        """取得字型索引的版本（尚未建立時為 0）
+
+        Args:
+            font: GSFont 物件
+
+        Returns:
+            int: 索引版本
+        """
+        index = self.peek(font)
+        return index.revision if index is not None else 0
+
+    def refresh_glyphs(self, font, glyphs):
+        """增量更新被編輯的字符（僅在索引已建立時）
+
+        Args:
+            font: GSFont 物件
+            glyphs: GSGlyph 物件序列
+        """
+        index = self.peek(font)
+        if index is None:
+            return
+        try:
+            from .index_store import get_glyph_index_store
+            store = get_glyph_index_store()
+            for glyph in glyphs:
+                if glyph is None:
+                    continue
+                previous = index.tracked_name(glyph)
+                if index.update_glyph(glyph):
+                    # 被編輯字符的圖層度量已過期（改名時舊名稱的度量一併移除）
+                    store.forget_glyph(font, glyph.name)
+                    if previous and previous != glyph.name:
+                        store.forget_glyph(font, previous)
+                    self._stats['incremental_updates'] += 1
+        except Exception:
+            print(traceback.format_exc())
+
+    def discard(self, font):
+        """移除字型的索引（字型關閉時，先寫入磁碟快取）
+
+        Args:
+            font: GSFont 物件
+        """
+        index = self.peek(font)
+        if index is not None:
+            from .index_builder import get_index_builder
+            from .index_store import get_glyph_index_store
+            get_index_builder().cancel(index)
+            store = get_glyph_index_store()
+            if index.complete:
+                store.persist(font, index)
+            store.discard(font)
+            del self._indexes[id(font)]
+
+    def clear(self):
+        """清除所有索引"""
+        self._indexes.clear()
+
+    def get_stats(self):
+        """取得索引統計資訊
+
+        Returns:
+            dict: 統計字典（建立次數、背景建立次數、由磁碟快取還原次數、增量更新次數、增量補齊次數、查詢次數、已建立索引的字型數）
+        """
+        stats = self._stats.copy()
+        stats['fonts'] = len(self._indexes)
+        return stats
+
+
+# 全域索引登記處實例
+_glyph_index_registry = GlyphIndexRegistry()
+
+
+def get_glyph_index_registry():
+    """獲取字符索引登記處實例
+
+    Returns:
+        GlyphIndexRegistry: 登記處實例
+    """
+    return _glyph_index_registry
@@ -0,0 +1,322 @@
+# encoding: utf-8
+
+"""
+GlyphSources - 範圍與萬用字元的延遲字符來源
+參考輸入中的範圍與萬用字元標記不會展開成列表，而是表示為字符索引上的區段：
+
+    uni4E00-uni9FFF    碼位範圍（端點可為單一字符、uniXXXX、uXXXXX 或 U+XXXX）
+    A-Z                單一字符端點的碼位範圍
+    a.*                名稱前綴
+    *.ss01             名稱後綴
+    a*.ss0?            其他萬用字元樣式（以前綴區段篩選）
+
+隨機抽樣直接從區段抽取位置，涵蓋兩萬個表意文字的參考集合每次隨機排列的成本
+只與抽樣數量有關，也幾乎不佔用記憶體
+"""
+
+from __future__ import division, print_function, unicode_literals
+import random
+import re
+import traceback
+from bisect import bisect_right
+from fnmatch import fnmatchcase
+from itertools import chain, islice
+
+from .glyph_index import get_glyph_index_registry
+
+_CODEPOINT_NAME = re.compile(r'^(?:uni|u|U\+)([0-9A-Fa-f]{4,6})$')
+_WILDCARD_CHARS = ('*', '?', '[')
+
+
+def parse_codepoint(text):
+    """解析範圍端點為碼位
+
+    Args:
+        text (str): 單一字符、uniXXXX、uXXXXX 或 U+XXXX
+
+    Returns:
+        int or None: 碼位
+    """
+    if not text:
+        return None
+    if len(text) == 1:
+        return ord(text)
+    match = _CODEPOINT_NAME.match(text)
+    if match:
+        return int(match.group(1), 16)
+    return None
+
+
+def parse_range(text):
+    """解析碼位範圍標記
+
+    Args:
+        text (str): 例如 "A-Z" 或 "uni4E00-uni9FFF"
+
+    Returns:
+        tuple or None: (起始碼位, 結束碼位)
+    """
+    first, separator, last = text.partition('-')
+    if not separator:
+        return None
+    first_code, last_code = parse_codepoint(first), parse_codepoint(last)
+    if first_code is None or last_code is None or first_code > last_code:
+        return None
+    return first_code, last_code
+
+
+def is_wildcard(text):
+    """檢查文字是否包含萬用字元"""
+    return any(char in text for char in _WILDCARD_CHARS)
+
+
+def is_lazy_token(text):
+    """檢查文字是否為範圍或萬用字元標記
+
+    Args:
+        text (str): 輸入片段
+
+    Returns:
+        bool: True 如果是延遲展開的標記
+    """
+    return bool(text) and (is_wildcard(text) or parse_range(text) is not None)
+
+
+class _IndexSliceSource(object):
+    """索引區段來源的基底：每次使用時以二分搜尋取得區段，索引更新後自動反映"""
+
+    def __init__(self, index):
+        self._index = index
+
+    def _bounds(self):
+        """回傳 (序列, 起點, 終點)"""
+        raise NotImplementedError
+
+    def _item(self, sequence, position):
+        """將序列中的元素轉為字符名稱"""
+        return sequence[position]
+
+    def __len__(self):
+        _, start, end = self._bounds()
+        return end - start
+
+    def __iter__(self):
+        sequence, start, end = self._bounds()
+        for position in range(start, end):
+            yield self._item(sequence, position)
+
+    def item_at(self, offset):
+        """取得區段中第 offset 個字符名稱"""
+        sequence, start, _ = self._bounds()
+        return self._item(sequence, start + offset)
+
+
+class PrefixSource(_IndexSliceSource):
+    """名稱前綴來源（a.*）"""
+
+    def __init__(self, index, prefix):
+        super(PrefixSource, self).__init__(index)
+        self._prefix = prefix
+
+    def _bounds(self):
+        start, end = self._index.prefix_range(self._prefix)
+        return self._index.sorted_names, start, end
+
+
+class SuffixSource(_IndexSliceSource):
+    """名稱後綴來源（*.ss01）"""
+
+    def __init__(self, index, suffix):
+        super(SuffixSource, self).__init__(index)
+        self._suffix = suffix
+
+    def _bounds(self):
+        start, end = self._index.suffix_range(self._suffix)
+        return self._index.sorted_reversed_names, start, end
+
+    def _item(self, sequence, position):
+        return sequence[position][::-1]
+
+
+class CodepointRangeSource(_IndexSliceSource):
+    """碼位範圍來源（uni4E00-uni9FFF、A-Z）"""
+
+    def __init__(self, index, first, last):
+        super(CodepointRangeSource, self).__init__(index)
+        self._first = first
+        self._last = last
+
+    def _bounds(self):
+        start, end = self._index.codepoint_range(self._first, self._last)
+        return self._index.code_points, start, end
+
+    def _item(self, sequence, position):
+        return self._index.name_for_codepoint(sequence[position])
+
+
+class PatternSource(_IndexSliceSource):
+    """一般萬用字元樣式來源：以樣式的字面前綴取得區段後篩選，結果依索引版本快取"""
+
+    def __init__(self, index, pattern):
+        super(PatternSource, self).__init__(index)
+        self._pattern = pattern
+        prefix_length = min(
+            [pattern.index(char) for char in _WILDCARD_CHARS if char in pattern] or [len(pattern)]
+        )
+        self._prefix = pattern[:prefix_length]
+        self._matches = ()
+        self._revision = None
+
+    def _bounds(self):
+        if self._revision != self._index.revision:
+            start, end = self._index.prefix_range(self._prefix)
+            names = self._index.sorted_names
+            self._matches = tuple(
+                name for name in islice(names, start, end) if fnmatchcase(name, self._pattern)
+            )
+            self._revision = self._index.revision
+        return self._matches, 0, len(self._matches)
+
+
+def build_lazy_source(index, text):
+    """依標記建立延遲字符來源
+
+    Args:
+        index (GlyphIndex): 字符索引
+        text (str): 範圍或萬用字元標記
+
+    Returns:
+        來源物件或 None
+    """
+    if index is None or not text:
+        return None
+
+    if is_wildcard(text):
+        head, rest = text[:-1], text[1:]
+        if text.endswith('*') and not is_wildcard(head):
+            return PrefixSource(index, head)
+        if text.startswith('*') and not is_wildcard(rest):
+            return SuffixSource(index, rest)
+        return PatternSource(index, text)
+
+    code_range = parse_range(text)
+    if code_range is not None:
+        return CodepointRangeSource(index, code_range[0], code_range[1])
+    return None
+
+
+class LazyGlyphSet(object):
+    """由明確字符列表與延遲來源組成的參考字符集合
+
+    行為接近唯讀列表（len、迭代、索引、切片、布林值），
+    另提供 sample() 直接從各來源抽取不重複的字符
+    """
+
+    def __init__(self, parts, key, index=None):
+        """初始化集合
+
+        Args:
+            parts (list): 字符名稱列表或延遲來源
+            key (str): 產生此集合的輸入文字
+            index (GlyphIndex): 字符索引（用於快取鍵的版本）
+        """
+        self._parts = parts
+        self._key = key
+        self._index = index
+
+    @property
+    def cache_key(self):
+        """快取鍵（輸入文字與索引版本）"""
+        revision = self._index.revision if self._index is not None else 0
+        return (self._key, revision)
+
+    def _offsets(self):
+        """回傳各部分的累計起點與總長度"""
+        offsets = []
+        total = 0
+        for part in self._parts:
+            offsets.append(total)
+            total += len(part)
+        return offsets, total
+
+    def __len__(self):
+        return sum(len(part) for part in self._parts)
+
+    def __bool__(self):
+        return any(len(part) for part in self._parts)
+
+    __nonzero__ = __bool__
+
+    def __iter__(self):
+        return chain.from_iterable(self._parts)
+
+    def __getitem__(self, item):
+        offsets, total = self._offsets()
+        if isinstance(item, slice):
+            return [self._item_at(offsets, position) for position in range(*item.indices(total))]
+
+        if item < 0:
+            item += total
+        if not 0 <= item < total:
+            raise IndexError('LazyGlyphSet index out of range')
+        return self._item_at(offsets, item)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyGlyphSet):
+            return self.cache_key == other.cache_key
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        return hash(self.cache_key)
+
+    def __repr__(self):
+        return 'LazyGlyphSet(%r, %d glyphs)' % (self._key, len(self))
+
+    def sample(self, count, rng=random):
+        """抽取不重複的字符（成本與抽樣數量成正比）
+
+        Args:
+            count (int): 抽樣數量（不可超過集合大小）
+            rng: 亂數來源
+
+        Returns:
+            list: 字符名稱
+        """
+        offsets, total = self._offsets()
+        return [self._item_at(offsets, position) for position in rng.sample(range(total), count)]
+
+    def _item_at(self, offsets, position):
+        """依全域位置取得字符名稱"""
+        part_index = bisect_right(offsets, position) - 1
+        part = self._parts[part_index]
+        offset = position - offsets[part_index]
+        if isinstance(part, list):
+            return part[offset]
+        return part.item_at(offset)
+
+
+def is_lazy_glyph_set(value):
+    """檢查值是否為延遲字符集合"""
+    return isinstance(value, LazyGlyphSet)
+
+
+def lazy_source_for_font(font, text):
+    """為字型建立延遲字符來源（索引尚未建立時建立）
+
+    Args:
+        font: GSFont 物件
+        text (str): 範圍或萬用字元標記
+
+    Returns:
+        tuple: (來源物件或 None, 字符索引或 None)
+    """
+    try:
+        index = get_glyph_index_registry().get_index(font)
+        return build_lazy_source(index, text), index
+    except Exception:
+        print(traceback.format_exc())
+        return None, None
@@ -0,0 +1,482 @@
+# encoding: utf-8
+
+"""
+GlyphSuggestions - 無效標記的「你是不是要找」建議
+以三字元組（trigram）索引找出與無效標記共享片段的字符名稱，再以有上限的編輯距離篩選；
+每次呼叫的處理標記數、掃描的索引條目數與耗時都有上限，貼上大量錯字也不會卡住主執行緒。
+三字元組索引依字符索引的名稱變更記錄增量同步，首次建立在主執行緒閒置時分段進行；
+字符索引的建立不計入建議的時間預算（尚未建立時排入閒置處理，先回傳部分結果）
+"""
+
+from __future__ import division, print_function, unicode_literals
+import re
+import time
+import traceback
+from collections import OrderedDict
+from itertools import islice
+
+from .font_query import is_query_token
+from .glyph_index import get_glyph_index_registry
+from .glyph_sources import is_lazy_token
+from .index_builder import dispatch_to_main
+from .input_recognition import InputRecognitionService
+
+# 每個標記的建議數量上限
+MAX_SUGGESTIONS = 3
+
+# 每次呼叫處理的無效標記數量上限
+MAX_SUGGESTED_TOKENS = 5
+
+# 觸發建議的最短標記長度
+MIN_TOKEN_LENGTH = 2
+
+# 編輯距離上限（短標記為 1）
+MAX_EDIT_DISTANCE = 2
+SHORT_TOKEN_LENGTH = 4
+
+# 每個標記掃描的索引條目上限與進行編輯距離計算的候選數上限
+MAX_POSTINGS_SCANNED = 20000
+MAX_CANDIDATES = 64
+
+# 每次呼叫的時間預算（毫秒），不含字符索引的建立
+SUGGESTION_BUDGET_MS = 8.0
+
+# 每次呼叫中用於分段建立三字元組索引的預算比例（其餘留給標記）
+SYNC_BUDGET_SHARE = 0.5
+
+# 閒置時每一步分段建立的時間預算（毫秒）
+IDLE_STEP_MS = 4.0
+
+# 一次加入的變更超過此數量時排入分段建立，而非立即加入
+MAX_INCREMENTAL_CHANGES = 256
+
+# 分段建立每批加入的名稱數量
+SYNC_BATCH_SIZE = 256
+
+# 建議結果快取數量上限
+MAX_CACHED_SUGGESTIONS = 128
+
+GRAM_SIZE = 3
+_BOUNDARY_START = '^'
+_BOUNDARY_END = '$'
+
+
+def name_grams(name):
+    """取得名稱的三字元組（小寫，含首尾邊界）
+
+    Args:
+        name (str): 字符名稱或輸入標記
+
+    Returns:
+        set: 三字元組
+    """
+    padded = _BOUNDARY_START + name.lower() + _BOUNDARY_END
+    return set(padded[i:i + GRAM_SIZE] for i in range(len(padded) - GRAM_SIZE + 1))
+
+
+def bounded_edit_distance(first, second, limit):
+    """計算有上限的編輯距離（Levenshtein）
+
+    距離超過 limit 時提早結束並回傳 limit + 1
+
+    Args:
+        first (str): 字串 A
+        second (str): 字串 B
+        limit (int): 距離上限
+
+    Returns:
+        int: 編輯距離（超過上限時為 limit + 1）
+    """
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    if len(first) > len(second):
+        first, second = second, first
+
+    previous = list(range(len(first) + 1))
+    for row, char in enumerate(second, 1):
+        current = [row]
+        row_min = row
+        for column, other in enumerate(first, 1):
+            cost = min(
+                previous[column] + 1,
+                current[column - 1] + 1,
+                previous[column - 1] + (char != other)
+            )
+            current.append(cost)
+            if cost < row_min:
+                row_min = cost
+        if row_min > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+
+def distance_limit(token):
+    """依標記長度決定編輯距離上限"""
+    return 1 if len(token) <= SHORT_TOKEN_LENGTH else MAX_EDIT_DISTANCE
+
+
+def should_suggest(token):
+    """檢查標記是否適合提供名稱建議
+
+    單一字元、CJK 字符、查詢與範圍/萬用字元標記不提供建議
+
+    Args:
+        token (str): 無效標記
+
+    Returns:
+        bool: True 如果應提供建議
+    """
+    if not token or len(token) < MIN_TOKEN_LENGTH:
+        return False
+    try:
+        if any(InputRecognitionService._is_cjk_char(char) for char in token):
+            return False
+        return not (is_query_token(token) or is_lazy_token(token))
+    except Exception:
+        print(traceback.format_exc())
+        return False
+
+
+def find_token_range(text, token):
+    """找出標記在文字中的位置（優先以空白分隔的完整標記）
+
+    Args:
+        text (str): 完整輸入文字
+        token (str): 標記
+
+    Returns:
+        tuple or None: (起點, 長度)
+    """
+    if not text or not token:
+        return None
+    match = re.search(r'(?<!\S)' + re.escape(token) + r'(?!\S)', text)
+    if match:
+        return match.start(), len(token)
+    position = text.find(token)
+    if position >= 0:
+        return position, len(token)
+    return None
+
+
+def replace_token(text, token, replacement):
+    """以建議名稱取代文字中的標記（只取代第一個）
+
+    Args:
+        text (str): 完整輸入文字
+        token (str): 無效標記
+        replacement (str): 建議名稱
+
+    Returns:
+        str: 取代後的文字（找不到標記時為原文字）
+    """
+    token_range = find_token_range(text, token)
+    if token_range is None:
+        return text
+    start, length = token_range
+    return text[:start] + replacement + text[start + length:]
+
+
+class _GramIndex(object):
+    """單一字型的三字元組索引
+
+    索引條目以列表保存（比集合節省記憶體）；移除的名稱只從 live 集合刪除，掃描時略過，
+    又被加回時直接恢復（名稱的三字元組不變）。依字符索引的名稱變更記錄同步，
+    不比對整個名稱集合；記錄無法接續（索引清除或記錄截斷）時才重新開始
+    """
+
+    def __init__(self, glyph_index):
+        self.glyph_index = glyph_index
+        self.revision = None
+        self._log_position = None   # 已套用的名稱變更記錄位置 (epoch, 位置)
+        self._postings = {}     # 三字元組 → 名稱列表
+        self._live = set()
+        self._dead = set()
+        self._pending = []      # 尚待加入索引的名稱（分段建立）
+        self._skipped = set()   # 排入後又被移除的名稱
+
+    @property
+    def complete(self):
+        """索引是否已建立完成"""
+        return not self._pending
+
+    def sync(self, deadline):
+        """套用字符索引的名稱變更，並在期限內繼續分段建立
+
+        Args:
+            deadline (float): 截止時間（time.time()）
+        """
+        glyph_index = self.glyph_index
+        if self.revision != glyph_index.revision:
+            changes = None
+            if self._log_position is not None:
+                changes = glyph_index.name_changes(*self._log_position)
+            if changes is None:
+                self._restart(glyph_index.sorted_names)
+            else:
+                self._apply(changes[1])
+            self._log_position = glyph_index.name_log_position()
+            self.revision = glyph_index.revision
+
+        pending = self._pending
+        while pending and time.time() < deadline:
+            batch = pending[-SYNC_BATCH_SIZE:]
+            del pending[-SYNC_BATCH_SIZE:]
+            for name in batch:
+                if name in self._skipped:
+                    self._skipped.discard(name)
+                else:
+                    self._add(name)
+
+    def _apply(self, changes):
+        """套用名稱變更（大量加入時排入分段建立）"""
+        live = self._live
+        dead = self._dead
+        queue = len(changes) > MAX_INCREMENTAL_CHANGES
+        for name, added in changes:
+            if added:
+                if name in dead:
+                    dead.discard(name)
+                    live.add(name)
+                elif name in self._skipped:
+                    # 仍在待加入列表中
+                    self._skipped.discard(name)
+                elif name not in live:
+                    if queue:
+                        self._pending.append(name)
+                    else:
+                        self._add(name)
+            elif name in live:
+                live.discard(name)
+                dead.add(name)
+            elif name in self._pending:
+                # 尚未加入：分段建立時略過（只在建立期間刪除字符時發生）
+                self._skipped.add(name)
+
+    def _restart(self, names):
+        """清除索引並排入所有名稱"""
+        self._postings = {}
+        self._live = set()
+        self._dead = set()
+        self._skipped = set()
+        self._pending = list(names)
+
+    def _add(self, name):
+        """加入名稱到索引"""
+        if name in self._live:
+            return
+        self._live.add(name)
+        postings = self._postings
+        for gram in name_grams(name):
+            postings.setdefault(gram, []).append(name)
+
+    def candidates(self, token, limit):
+        """找出與標記共享最多三字元組的名稱
+
+        Args:
+            token (str): 輸入標記
+            limit (int): 編輯距離上限（用於長度篩選）
+
+        Returns:
+            list: 候選名稱（依共享數量遞減）
+        """
+        lists = [self._postings[gram] for gram in name_grams(token) if gram in self._postings]
+        lists.sort(key=len)
+
+        counts = {}
+        scanned = 0
+        live = self._live
+        length = len(token)
+        for names in lists:
+            remaining = MAX_POSTINGS_SCANNED - scanned
+            if remaining <= 0:
+                break
+            scanned += min(len(names), remaining)
+            for name in islice(names, remaining):
+                if name in live and abs(len(name) - length) <= limit:
+                    counts[name] = counts.get(name, 0) + 1
+
+        ranked = sorted(counts, key=lambda name: -counts[name])
+        return ranked[:MAX_CANDIDATES]
+
+    def __len__(self):
+        return len(self._live)
+
+
+class GlyphSuggestionService(object):
+    """字符名稱建議服務"""
+
+    def __init__(self):
+        """初始化服務"""
+        self._indexes = {}      # id(GlyphIndex) → _GramIndex
+        self._cache = OrderedDict()
+        self._idle_font = None  # 閒置時分段建立索引的字型
+        self._idle_scheduled = False
+        self._stats = {
+            'tokens': 0,
+            'cache_hits': 0,
+            'skipped_tokens': 0,
+            'idle_steps': 0,
+            'last_ms': 0.0,
+            'max_ms': 0.0
+        }
+
+    def suggest(self, font, tokens, budget_ms=SUGGESTION_BUDGET_MS):
+        """為無效標記找出相近的字符名稱
+
+        超過處理數量或時間預算的標記不提供建議；字符索引尚未建立時排入閒置處理，
+        三字元組索引未完成時只在預算的一部分內繼續建立，其餘由閒置處理完成
+
+        Args:
+            font: GSFont 物件
+            tokens (list): 無效標記
+            budget_ms (float): 時間預算（毫秒）
+
+        Returns:
+            OrderedDict: 標記 → 建議名稱列表（只包含有建議的標記）
+        """
+        suggestions = OrderedDict()
+        if font is None or not tokens:
+            return suggestions
+
+        glyph_index = get_glyph_index_registry().peek(font)
+        if glyph_index is None:
+            # 字符索引的建立不計入預算：排入閒置處理，這次沒有建議
+            # （沒有主執行緒佇列時直接建立）
+            if self._schedule_idle(font):
+                return suggestions
+            glyph_index = get_glyph_index_registry().get_index(font)
+            if glyph_index is None:
+                return suggestions
+
+        started = time.time()
+        deadline = started + budget_ms / 1000.0
+        try:
+            gram_index = self._gram_index(glyph_index)
+            gram_index.sync(started + budget_ms * SYNC_BUDGET_SHARE / 1000.0)
+            if not gram_index.complete:
+                self._schedule_idle(font)
+
+            handled = 0
+            for token in tokens:
+                if token in suggestions or not should_suggest(token):
+                    continue
+                if handled >= MAX_SUGGESTED_TOKENS or time.time() >= deadline:
+                    self._stats['skipped_tokens'] += 1
+                    continue
+                handled += 1
+                names = self._suggest_token(gram_index, token)
+                if names:
+                    suggestions[token] = names
+
+        except Exception:
+            print(traceback.format_exc())
+
+        finally:
+            elapsed = (time.time() - started) * 1000.0
+            self._stats['last_ms'] = elapsed
+            self._stats['max_ms'] = max(self._stats['max_ms'], elapsed)
+
+        return suggestions
+
+    def _schedule_idle(self, font):
+        """排程在主執行緒閒置時建立索引（同一時間只排程一次）
+
+        Returns:
+            bool: True 如果已排程
+        """
+        self._idle_font = font
+        if self._idle_scheduled:
+            return True
+        self._idle_scheduled = dispatch_to_main(self._idle_step)
+        return self._idle_scheduled
+
+    def _idle_step(self):
+        """閒置時建立字符索引並分段建立三字元組索引（未完成時重新排程）"""
+        self._idle_scheduled = False
+        font = self._idle_font
+        try:
+            glyph_index = get_glyph_index_registry().get_index(font)
+            if glyph_index is None:
+                self._idle_font = None
+                return
+            gram_index = self._gram_index(glyph_index)
+            gram_index.sync(time.time() + IDLE_STEP_MS / 1000.0)
+            self._stats['idle_steps'] += 1
+            if gram_index.complete:
+                self._idle_font = None
+            else:
+                self._schedule_idle(font)
+        except Exception:
+            print(traceback.format_exc())
+
+    def _gram_index(self, glyph_index):
+        """取得字符索引對應的三字元組索引"""
+        key = id(glyph_index)
+        gram_index = self._indexes.get(key)
+        if gram_index is None or gram_index.glyph_index is not glyph_index:
+            # 清除已失效字型的三字元組索引
+            for stale_key in [k for k, v in self._indexes.items()
+                              if get_glyph_index_registry().peek(v.glyph_index.font) is not v.glyph_index]:
+                del self._indexes[stale_key]
+            gram_index = _GramIndex(glyph_index)
+            self._indexes[key] = gram_index
+        return gram_index
+
+    def _suggest_token(self, gram_index, token):
+        """計算單一標記的建議（結果依索引版本快取）"""
+        self._stats['tokens'] += 1
+        cache_key = (id(gram_index), gram_index.revision, gram_index.complete, token)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            self._cache.move_to_end(cache_key)
+            self._stats['cache_hits'] += 1
+            return cached
+
+        limit = distance_limit(token)
+        folded = token.lower()
+        scored = []
+        for name in gram_index.candidates(token, limit):
+            if name == token:
+                continue
+            distance = bounded_edit_distance(folded, name.lower(), limit)
+            if distance <= limit:
+                # 大小寫完全相符的名稱優先
+                exact = bounded_edit_distance(token, name, limit + 1)
+                scored.append((distance, exact, len(name), name))
+        scored.sort()
+        result = [entry[3] for entry in scored[:MAX_SUGGESTIONS]]
+
+        self._cache[cache_key] = result
+        while len(self._cache) > MAX_CACHED_SUGGESTIONS:
+            self._cache.popitem(last=False)
+        return result
+
+    def clear(self):
+        """清除所有三字元組索引與快取"""
+        self._indexes.clear()
+        self._cache.clear()
+        self._idle_font = None
+
+    def get_stats(self):
+        """取得建議服務統計資訊
+
+        Returns:
+            dict: 統計字典（處理標記數、快取命中、略過標記數、閒置建立步數、最近一次與最長的耗時、已索引名稱數）
+        """
+        stats = self._stats.copy()
+        stats['indexed_names'] = sum(len(index) for index in self._indexes.values())
+        return stats
+
+
+# 全域建議服務實例
+_glyph_suggestion_service = GlyphSuggestionService()
+
+
+def get_glyph_suggestion_service():
+    """獲取字符名稱建議服務實例
+
+    Returns:
+        GlyphSuggestionService: 建議服務實例
+    """
+    return _glyph_suggestion_service
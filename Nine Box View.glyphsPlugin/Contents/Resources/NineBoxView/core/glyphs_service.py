@@ -7,7 +7,6 @@ GlyphsService - 統一的 Glyphs API 服務介面
 """
 
 from __future__ import division, print_function, unicode_literals
-import time
 import traceback
 
 # 唯一允許直接匯入 GlyphsApp 的模組
@@ -204,9 +203,12 @@ class GlyphsService(object):
             return True  # 例外時假設在 Font View
     
     @staticmethod
-    def get_visible_tab_layers():
+    def get_visible_tab_layers(radius=None):
         """取得當前分頁中可見的圖層列表（Edit View 專用）
         
+        Args:
+            radius (int): 游標前後的視窗半徑，None 時回傳全部圖層
+        
         Returns:
             list: 可見圖層列表
         """
@@ -219,12 +221,169 @@ class GlyphsService(object):
             if not hasattr(current_tab, 'layers') or not current_tab.layers:
                 return []
             
+            if radius is not None:
+                return list(GlyphsService.iter_tab_layers_near_cursor(current_tab, radius))
+            
             return list(current_tab.layers)
             
         except Exception:
             print(traceback.format_exc())
             return []
     
+    @staticmethod
+    def get_tab_index(font, current_tab):
+        """取得分頁在字型分頁列表中的位置（跨事件穩定的分頁識別）
+        
+        Args:
+            font: GSFont 物件
+            current_tab: GSEditViewController 分頁物件
+            
+        Returns:
+            int or None: 分頁位置，找不到時為 None
+        """
+        try:
+            if font is None or current_tab is None:
+                return None
+            for position, tab in enumerate(font.tabs):
+                if tab == current_tab:
+                    return position
+        except Exception:
+            print(traceback.format_exc())
+        return None
+    
+    @staticmethod
+    def get_tab_cursor(current_tab):
+        """取得分頁游標所在的圖層位置
+        
+        Args:
+            current_tab: GSEditViewController 分頁物件
+            
+        Returns:
+            int: 圖層位置（優先使用 layersCursor，否則使用 textCursor）
+        """
+        try:
+            cursor = getattr(current_tab, 'layersCursor', None)
+            if cursor is None:
+                cursor = getattr(current_tab, 'textCursor', 0)
+            return int(cursor or 0)
+        except Exception:
+            return 0
+    
+    @staticmethod
+    def iter_tab_layers_near_cursor(current_tab, radius=None):
+        """由游標附近向外延遲走訪分頁圖層（不展開整個圖層列表）
+        
+        Args:
+            current_tab: GSEditViewController 分頁物件
+            radius (int): 最大搜尋半徑，None 時使用預設值
+            
+        Yields:
+            GSLayer: 依與游標距離排序的圖層
+        """
+        from .tab_layer_index import iter_window_indices, TAB_LAYER_SEARCH_RADIUS
+        
+        try:
+            layers = getattr(current_tab, 'layers', None)
+            if layers is None:
+                return
+            total = len(layers)
+        except Exception:
+            print(traceback.format_exc())
+            return
+        
+        if radius is None:
+            radius = TAB_LAYER_SEARCH_RADIUS
+        cursor = GlyphsService.get_tab_cursor(current_tab)
+        
+        for i in iter_window_indices(cursor, total, radius):
+            try:
+                yield layers[i]
+            except (IndexError, KeyError):
+                return
+    
+    @staticmethod
+    def get_tab_signature(current_tab, master=None):
+        """取得分頁圖層索引的簽章（不讀取分頁文字）
+        
+        以圖層數量、游標位置、選取的主板，加上搜尋視窗內固定取樣點（含視窗兩端與游標）
+        的圖層識別鍵判斷分頁內容是否變更：圖層數量不變的替換編輯只要落在取樣點上即可察覺，
+        每次呼叫最多觸及 TAB_SIGNATURE_SAMPLES + 1 個圖層
+        
+        Args:
+            current_tab: GSEditViewController 分頁物件
+            master: 選取的 GSFontMaster
+            
+        Returns:
+            tuple: (圖層數量, 游標位置, 取樣圖層識別鍵, 主板 ID)
+        """
+        from .outline_geometry import layer_key
+        from .tab_layer_index import window_sample_indices
+        
+        cursor = GlyphsService.get_tab_cursor(current_tab)
+        count = 0
+        sample_keys = ()
+        try:
+            layers = getattr(current_tab, 'layers', None)
+            if layers is not None:
+                count = len(layers)
+                sample_keys = tuple(
+                    layer_key(layers[i]) for i in window_sample_indices(cursor, count)
+                )
+        except Exception:
+            print(traceback.format_exc())
+        return (count, cursor, sample_keys, getattr(master, 'id', None))
+    
+    @staticmethod
+    def sync_tab_layer_index():
+        """同步分頁圖層索引（僅在分頁切換、圖層、游標或主板變更時重置）
+        
+        Returns:
+            TabLayerIndex or None: 已同步的索引，無分頁時為 None
+        """
+        try:
+            from .tab_layer_index import get_tab_layer_index
+            
+            index = get_tab_layer_index()
+            font, master = GlyphsService.get_current_font_context()
+            current_tab = font.currentTab if font else None
+            if not current_tab:
+                index.invalidate()
+                return None
+            
+            signature = GlyphsService.get_tab_signature(current_tab, master)
+            if not index.is_current(current_tab, signature):
+                index.rebuild(
+                    current_tab,
+                    GlyphsService.iter_tab_layers_near_cursor(current_tab),
+                    signature
+                )
+            return index
+            
+        except Exception:
+            print(traceback.format_exc())
+            return None
+    
+    @staticmethod
+    def find_layer_in_current_tab(char_or_name):
+        """在當前分頁中尋找字符對應的圖層（透過分頁圖層索引）
+        
+        Args:
+            char_or_name (str): 字符或字符名稱
+            
+        多個圖層相符時回傳最接近游標者（而非分頁中的第一個），
+        超出搜尋半徑的圖層不會被找到
+        
+        Returns:
+            GSLayer or None: 游標附近最接近的相符圖層
+        """
+        if not char_or_name:
+            return None
+        
+        index = GlyphsService.sync_tab_layer_index()
+        if index is None:
+            return None
+        return index.lookup(char_or_name)
+    
     @staticmethod
     def show_notification(title, message):
         """顯示 Glyphs 通知
@@ -247,36 +406,15 @@ class GlyphsService(object):
         """獲取當前字型的唯一標識
         
         Returns:
-            str or None: 字型唯一標識（檔案路徑 + 修改時間）
+            str or None: 字型識別碼（由 FontIdentityService 分配，不涉及檔案 I/O）
         """
         try:
             font = GlyphsService.get_current_font()
             if not font:
                 return None
-                
-            # 使用檔案路徑作為主要識別
-            font_path = getattr(font, 'filepath', None)
-            if font_path:
-                try:
-                    import os
-                    # 結合檔案路徑和修改時間作為唯一標識
-                    mtime = os.path.getmtime(font_path)
-                    return f"{font_path}#{mtime}"
-                except (OSError, AttributeError):
-                    # 檔案不存在或無法存取時，僅使用路徑
-                    return font_path
-            
-            # 使用字型核心屬性生成穩定的雜湊值（Gemini 建議）
-            try:
-                master_ids = "".join(sorted([m.id for m in font.masters]) if hasattr(font, 'masters') else [])
-                glyph_count = len(font.glyphs) if hasattr(font, 'glyphs') else 0
-                family_name = getattr(font, 'familyName', 'unknown')
-                font_hash_key = f"{family_name}-{glyph_count}-{master_ids}"
-                return str(hash(font_hash_key))
-            except Exception:
-                print(traceback.format_exc())
-                # 最終復原：使用時間戳
-                return f"font_{int(time.time() * 1000)}"
+            
+            from .font_identity import get_font_token
+            return get_font_token(font)
             
         except Exception:
             print(traceback.format_exc())
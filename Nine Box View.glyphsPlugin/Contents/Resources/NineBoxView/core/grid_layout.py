@@ -0,0 +1,257 @@
+# encoding: utf-8
+
+"""
+GridLayout - 網格佈局的純計算與佈局記錄
+由視圖尺寸、最大字身寬度與字符高度計算網格度量與各格子的位置；
+不存取 Cocoa 或 Glyphs 物件（輸入由呼叫端在主執行緒讀取），可在任何執行緒執行
+
+度量、格子、主板區塊與佈局以 __slots__ 記錄保存（建立後禁止設定屬性），
+幾何未變時跨畫格沿用同一組物件，繪製與點擊判斷只讀取屬性與預先計算的邊界，
+不必每格查詢字典鍵或建立矩形
+"""
+
+from __future__ import division, print_function, unicode_literals
+
+MARGIN_RATIO = 0.08  # 邊距比例
+SPACING_RATIO = 0.0  # 間距比例（原版設為 0）
+VERTICAL_OFFSET_RATIO = 0.02  # 向上偏移比例
+DIRTY_RECT_PADDING = 2.0  # 局部重繪範圍的抗鋸齒餘量（點）
+
+_NO_OVERFLOW = (0, 0, 0, 0)
+
+
+class _Record(object):
+    """__slots__ 記錄的基底：建立後禁止設定或刪除屬性"""
+
+    __slots__ = ()
+
+    def _assign(self, **values):
+        """建立時設定屬性（只供 __init__ 使用）"""
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("%s is immutable" % type(self).__name__)
+
+    def __delattr__(self, name):
+        raise AttributeError("%s is immutable" % type(self).__name__)
+
+
+class GridMetrics(_Record):
+    """網格度量（不可變，以值比較）"""
+
+    __slots__ = (
+        'cell_width', 'grid_width', 'grid_height', 'spacing',
+        'start_x', 'start_y', 'scale', 'ink_reference'
+    )
+
+    def __init__(self, cell_width, grid_width, grid_height, spacing, start_x, start_y, scale,
+                 ink_reference=None):
+        self._assign(
+            cell_width=cell_width, grid_width=grid_width, grid_height=grid_height,
+            spacing=spacing, start_x=start_x, start_y=start_y, scale=scale,
+            ink_reference=ink_reference
+        )
+
+    def _values(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return isinstance(other, GridMetrics) and self._values() == other._values()
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self._values())
+
+    def __repr__(self):
+        return "GridMetrics(cell=%.1f, grid=%.1f×%.1f, scale=%.3f)" % (
+            self.cell_width, self.grid_width, self.grid_height, self.scale)
+
+
+class GridCell(_Record):
+    """單一格子的位置（不可變）
+
+    預先計算點擊邊界；字偶距排列模式另附 transform (scale, x, y)。
+    局部重繪範圍隨格子內容的墨跡而定，由 GridLayout.dirty_rect() 計算
+    """
+
+    __slots__ = (
+        'center_x', 'center_y', 'cell_width', 'cell_height', 'transform',
+        'left', 'right', 'bottom', 'top'
+    )
+
+    def __init__(self, center_x, center_y, cell_width, cell_height, transform=None):
+        half_width = cell_width / 2
+        half_height = cell_height / 2
+        self._assign(
+            center_x=center_x, center_y=center_y,
+            cell_width=cell_width, cell_height=cell_height, transform=transform,
+            left=center_x - half_width, right=center_x + half_width,
+            bottom=center_y - half_height, top=center_y + half_height
+        )
+
+    def contains(self, x, y):
+        """檢查點是否在格子內（含邊界）"""
+        return self.left <= x <= self.right and self.bottom <= y <= self.top
+
+    def __repr__(self):
+        return "GridCell(%.1f, %.1f, %.1f×%.1f)" % (
+            self.center_x, self.center_y, self.cell_width, self.cell_height)
+
+
+class GridTile(_Record):
+    """多主板並排中單一主板區塊的位置（不可變）"""
+
+    __slots__ = ('master_id', 'offset_x')
+
+    def __init__(self, master_id, offset_x):
+        self._assign(master_id=master_id, offset_x=offset_x)
+
+    def __repr__(self):
+        return "GridTile(%s, %.1f)" % (self.master_id, self.offset_x)
+
+
+class GridLayout(_Record):
+    """預覽佈局（不可變）
+
+    Attributes:
+        cells (tuple): GridCell，依位置索引排列
+        metrics (GridMetrics): 網格度量
+        shape_key (str): 網格形狀識別字串
+        kerned (bool): 是否為字偶距排列模式
+        arrangement (tuple): 佈局對應的排列（總格數個元素）
+        tiles (tuple): 多主板並排的 GridTile（單一主板時為空）
+        tile_width (float): 每個主板區塊的寬度
+        overflow (tuple): 各格子墨跡超出格子的距離 (左, 下, 右, 上)（點；未量測時為空）
+    """
+
+    __slots__ = ('cells', 'metrics', 'shape_key', 'kerned', 'arrangement', 'tiles', 'tile_width',
+                 'overflow')
+
+    def __init__(self, cells, metrics, shape_key, kerned, arrangement, tiles, tile_width, overflow=()):
+        self._assign(
+            cells=tuple(cells), metrics=metrics, shape_key=shape_key, kerned=kerned,
+            arrangement=tuple(arrangement), tiles=tuple(tiles), tile_width=tile_width,
+            overflow=tuple(overflow)
+        )
+
+    def dirty_rect(self, position, offset_x=0):
+        """取得格子的局部重繪範圍（格子加上實際量測的墨跡超出範圍）
+
+        Args:
+            position (int): 位置索引
+            offset_x (float): 多主板並排時主板的水平位移
+
+        Returns:
+            tuple: ((x, y), (width, height))，可直接作為 NSRect 傳給 Cocoa
+        """
+        cell = self.cells[position]
+        left, bottom, right, top = self.overflow[position] if position < len(self.overflow) else _NO_OVERFLOW
+        left += DIRTY_RECT_PADDING
+        bottom += DIRTY_RECT_PADDING
+        return (
+            (cell.left - left + offset_x, cell.bottom - bottom),
+            (cell.cell_width + left + right + DIRTY_RECT_PADDING,
+             cell.cell_height + bottom + top + DIRTY_RECT_PADDING)
+        )
+
+    def dirty_rect_union(self, other, position, offset_x=0):
+        """兩個佈局中同一格子重繪範圍的聯集（內容變更時舊墨跡也需清除）"""
+        (x1, y1), (w1, h1) = self.dirty_rect(position, offset_x)
+        (x2, y2), (w2, h2) = other.dirty_rect(position, offset_x)
+        x, y = min(x1, x2), min(y1, y2)
+        return ((x, y), (max(x1 + w1, x2 + w2) - x, max(y1 + h1, y2 + h2) - y))
+
+    def cell_at_point(self, x, y):
+        """取得點所在的格子索引（多主板並排時折回第一個主板）
+
+        Args:
+            x (float): 視圖座標 X
+            y (float): 視圖座標 Y
+
+        Returns:
+            int or None: 位置索引
+        """
+        if self.tiles and self.tile_width:
+            x = x % self.tile_width
+        for index, cell in enumerate(self.cells):
+            if cell.contains(x, y):
+                return index
+        return None
+
+
+def compute_grid_metrics(width, height, max_width, glyph_height, rows, columns, ink_reference=None):
+    """計算網格度量
+
+    Args:
+        width (float): 佈局區域寬度
+        height (float): 佈局區域高度
+        max_width (float): 最大字身寬度（字型單位）
+        glyph_height (float): 字符高度（字型單位）
+        rows (int): 列數
+        columns (int): 欄數
+        ink_reference (tuple): 墨跡邊界模式的參考邊界（原樣放入度量）
+
+    Returns:
+        GridMetrics or None: 網格度量（區域不合法時為 None）
+    """
+    if width <= 0 or height <= 0:
+        return None
+
+    margin = min(width, height) * MARGIN_RATIO
+
+    # 基於字身寬度計算間距與單元格寬度
+    spacing = max_width * SPACING_RATIO
+    cell_width = max_width + spacing
+
+    # 計算網格總寬度和高度
+    grid_width = columns * cell_width + (columns - 1) * spacing
+    grid_height = rows * glyph_height + (rows - 1) * spacing
+
+    # 計算縮放比例（只使用自適應縮放）
+    available_width = width - 2 * margin
+    available_height = height - 2 * margin
+    scale = min(available_width / grid_width, available_height / grid_height, 1.0)
+
+    # 更新網格尺寸
+    cell_width *= scale
+    grid_width *= scale
+    grid_height *= scale
+    spacing *= scale
+
+    # 計算繪製起始位置（固定的佈局，向上偏移）
+    start_x = width / 2 - grid_width / 2
+    start_y = (height + grid_height) / 2 + height * VERTICAL_OFFSET_RATIO
+
+    return GridMetrics(cell_width, grid_width, grid_height, spacing, start_x, start_y, scale, ink_reference)
+
+
+def compute_cell_positions(metrics, rows, columns):
+    """計算各格子的位置資訊（復刻自原版公式，一般化為 N×M）
+
+    Args:
+        metrics (GridMetrics): compute_grid_metrics() 的結果
+        rows (int): 列數
+        columns (int): 欄數
+
+    Returns:
+        tuple: GridCell，依位置索引排列
+    """
+    cells = []
+    row_height = metrics.grid_height / rows
+
+    # 計算單元格高度
+    cell_height = row_height - metrics.spacing
+
+    for i in range(rows * columns):
+        row = i // columns
+        col = i % columns
+
+        # 計算目前單元格的中心位置（精確復刻原版公式）
+        center_x = metrics.start_x + (col + 0.5) * metrics.cell_width + col * metrics.spacing
+        center_y = metrics.start_y - (row + 0.5) * row_height
+
+        cells.append(GridCell(center_x, center_y, metrics.cell_width, cell_height))
+    return tuple(cells)
@@ -2,7 +2,7 @@
 
 """
 GridManager - 九宮格平面座標管理
-採用直觀的 0-8 座標系統，避免複雜的三層架構
+採用直觀的平面座標系統（預設 0-8），網格形狀由 grid_shape 模組提供
 """
 
 from __future__ import division, print_function, unicode_literals
@@ -11,10 +11,12 @@ try:
     # 在正常執行環境中使用相對匯入
     from ..data.cache import get_glyph_with_fallback, create_width_change_detector
     from .random_arrangement import get_random_service
+    from .grid_shape import get_grid_shape
 except (ImportError, ValueError):
     # 在測試環境中使用絕對匯入
     from data.cache import get_glyph_with_fallback, create_width_change_detector
     from core.random_arrangement import get_random_service
+    from core.grid_shape import get_grid_shape
 import traceback
 
 class GridManager(object):
@@ -26,11 +28,19 @@ class GridManager(object):
     3 | 4 | 5  ← 位置4為中心格
     ---------
     6 | 7 | 8
+    
+    其他 N×M 網格依相同的列優先規則編號，中心格由 GridShape 計算
     """
     
-    # 常數定義
-    GRID_SIZE = 9
-    CENTER_POSITION = 4
+    @property
+    def GRID_SIZE(self):
+        """目前網格的總格數"""
+        return get_grid_shape().total
+    
+    @property
+    def CENTER_POSITION(self):
+        """目前網格的中心位置"""
+        return get_grid_shape().center
     
     def __init__(self):
         """初始化網格管理器（整合進階重繪支援）"""
@@ -80,7 +90,7 @@ class GridManager(object):
         """獲取當前顯示排列
         
         Returns:
-            list: 長度為9的字符陣列
+            list: 長度為總格數的字符陣列
         """
         return self.grid_glyphs[:]
         
@@ -130,7 +140,7 @@ class GridManager(object):
     # === 中心格管理 ===
     
     def set_center_glyph(self, glyph_name):
-        """設定中心格字符（位置4）
+        """設定中心格字符（3×3 時為位置4）
         
         Args:
             glyph_name (str): 字符名稱
@@ -215,12 +225,12 @@ class GridManager(object):
         """設定周圍格（非中心格）的字符模式
         
         Args:
-            pattern_chars (list): 8個字符的列表，對應位置 0,1,2,3,5,6,7,8
+            pattern_chars (list): 周圍格數量的字符列表，依序對應所有非中心位置
         """
-        if len(pattern_chars) != 8:
+        positions = get_grid_shape().surrounding_positions()  # 排除中心位置
+        if len(pattern_chars) != len(positions):
             return
             
-        positions = [0, 1, 2, 3, 5, 6, 7, 8]  # 排除中心位置4
         for i, pos in enumerate(positions):
             if not self.is_position_locked(pos):
                 self.set_glyph_at_position(pos, pattern_chars[i])
@@ -260,7 +270,7 @@ class GridManager(object):
         Returns:
             bool: True 如果有變化
         """
-        surrounding_positions = [0, 1, 2, 3, 5, 6, 7, 8]  # 排除中心位置4
+        surrounding_positions = get_grid_shape().surrounding_positions()  # 排除中心位置
         unlocked_surrounding = [pos for pos in surrounding_positions 
                                if not self.is_position_locked(pos)]
         return self.randomize_positions(unlocked_surrounding, source_chars)
@@ -272,33 +282,40 @@ class GridManager(object):
         """將位置索引轉換為二維座標
         
         Args:
-            position (int): 位置索引 (0-8)
+            position (int): 位置索引（3×3 時為 0-8）
             
         Returns:
-            tuple: (row, col) 座標 (0-2, 0-2)
+            tuple: (row, col) 座標（3×3 時為 0-2, 0-2）
         """
-        if 0 <= position < 9:
-                return (position // 3, position % 3)
-        return (0, 0)
+        return get_grid_shape().position_to_coordinates(position)
         
     @staticmethod
     def coordinates_to_position(row, col):
         """將二維座標轉換為位置索引
         
         Args:
-            row (int): 行座標 (0-2)
-            col (int): 列座標 (0-2)
+            row (int): 行座標（3×3 時為 0-2）
+            col (int): 列座標（3×3 時為 0-2）
             
         Returns:
-            int: 位置索引 (0-8)
+            int: 位置索引（3×3 時為 0-8）
         """
-        if 0 <= row < 3 and 0 <= col < 3:
-                return row * 3 + col
-        return 0
-        return 0
+        position = get_grid_shape().coordinates_to_position(row, col)
+        return position if position is not None else 0
         
     # === 狀態管理 ===
     
+    def resize_to_shape(self, from_shape):
+        """網格形狀變更後，以中心對齊方式搬移字符與鎖定狀態
+        
+        Args:
+            from_shape (GridShape): 變更前的網格形狀
+        """
+        shape = get_grid_shape()
+        self.grid_glyphs = shape.remap_array(self.grid_glyphs, from_shape, '')
+        self.locked_positions = shape.remap_array(self.locked_positions, from_shape, False)
+        self._last_arrangement = None
+    
     def reset_all(self):
         """重置所有狀態"""
         self.grid_glyphs = [''] * self.GRID_SIZE
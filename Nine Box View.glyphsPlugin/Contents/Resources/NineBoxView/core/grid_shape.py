@@ -0,0 +1,186 @@
+# encoding: utf-8
+
+"""
+GridShape - 網格形狀定義
+將原本固定的 3×3（0-8）平面座標系統一般化為 N×M 網格
+所有模組透過 get_grid_shape() 取得目前的列數、欄數、總格數與中央位置
+"""
+
+from __future__ import division, print_function, unicode_literals
+
+# 預設網格（九宮格）
+DEFAULT_ROWS = 3
+DEFAULT_COLUMNS = 3
+
+# 單邊最大格數
+MAX_GRID_DIMENSION = 9
+
+# 選單提供的預設網格 (rows, columns)
+GRID_PRESETS = ((3, 3), (5, 5), (7, 7), (3, 5), (5, 7))
+
+
+class GridShape(object):
+    """N×M 網格形狀（不可變）
+
+    座標系統（以 3×5 為例）：
+     0 |  1 |  2 |  3 |  4
+    ----------------------
+     5 |  6 |  7 |  8 |  9   ← 位置 7 為中心格
+    ----------------------
+    10 | 11 | 12 | 13 | 14
+    """
+
+    __slots__ = ('rows', 'columns', 'total', 'center', '_surrounding')
+
+    def __init__(self, rows=DEFAULT_ROWS, columns=DEFAULT_COLUMNS):
+        """初始化網格形狀
+
+        Args:
+            rows (int): 列數（1 至 MAX_GRID_DIMENSION）
+            columns (int): 欄數（1 至 MAX_GRID_DIMENSION）
+        """
+        self.rows = self._clamp_dimension(rows, DEFAULT_ROWS)
+        self.columns = self._clamp_dimension(columns, DEFAULT_COLUMNS)
+        self.total = self.rows * self.columns
+        self.center = (self.rows // 2) * self.columns + self.columns // 2
+        self._surrounding = tuple(
+            pos for pos in range(self.total) if pos != self.center
+        )
+
+    def __eq__(self, other):
+        return (isinstance(other, GridShape) and
+                self.rows == other.rows and self.columns == other.columns)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash((self.rows, self.columns))
+
+    def __repr__(self):
+        return "GridShape(%d, %d)" % (self.rows, self.columns)
+
+    @property
+    def key(self):
+        """形狀識別字串，例如 '5x5'"""
+        return "%dx%d" % (self.rows, self.columns)
+
+    def surrounding_positions(self):
+        """取得所有周圍位置（排除中心格）
+
+        Returns:
+            tuple: 位置索引
+        """
+        return self._surrounding
+
+    def position_to_coordinates(self, position):
+        """將位置索引轉換為二維座標
+
+        Args:
+            position (int): 位置索引
+
+        Returns:
+            tuple: (row, col) 座標，超出範圍時為 (0, 0)
+        """
+        if 0 <= position < self.total:
+            return (position // self.columns, position % self.columns)
+        return (0, 0)
+
+    def coordinates_to_position(self, row, col):
+        """將二維座標轉換為位置索引
+
+        Args:
+            row (int): 列座標
+            col (int): 欄座標
+
+        Returns:
+            int or None: 位置索引，超出範圍時為 None
+        """
+        if 0 <= row < self.rows and 0 <= col < self.columns:
+            return row * self.columns + col
+        return None
+
+    def empty_array(self, filler=''):
+        """建立符合此形狀的空陣列"""
+        return [filler] * self.total
+
+    def remap_array(self, values, from_shape, filler=''):
+        """將另一形狀的陣列以中心對齊方式搬移到此形狀
+
+        放大網格時原有內容保留在中心附近，縮小時裁掉外圍位置。
+
+        Args:
+            values (list): 原陣列
+            from_shape (GridShape): 原陣列的形狀
+            filler: 新位置的填充值
+
+        Returns:
+            list: 長度為 self.total 的新陣列
+        """
+        result = self.empty_array(filler)
+        if not values or from_shape is None:
+            return result
+
+        row_offset = self.rows // 2 - from_shape.rows // 2
+        col_offset = self.columns // 2 - from_shape.columns // 2
+
+        for position in range(min(len(values), from_shape.total)):
+            row, col = from_shape.position_to_coordinates(position)
+            target = self.coordinates_to_position(row + row_offset, col + col_offset)
+            if target is not None:
+                result[target] = values[position]
+        return result
+
+    @staticmethod
+    def _clamp_dimension(value, default):
+        """將維度限制在合法範圍內"""
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            return default
+        return max(1, min(value, MAX_GRID_DIMENSION))
+
+
+def parse_grid_shape_key(key):
+    """解析 '5x5' 形式的形狀字串
+
+    Args:
+        key (str): 形狀字串
+
+    Returns:
+        GridShape or None: 解析失敗時為 None
+    """
+    try:
+        rows, columns = str(key).lower().split('x', 1)
+        return GridShape(int(rows), int(columns))
+    except (TypeError, ValueError):
+        return None
+
+
+# 目前使用中的網格形狀
+_current_shape = GridShape()
+
+
+def get_grid_shape():
+    """獲取目前的網格形狀
+
+    Returns:
+        GridShape: 網格形狀
+    """
+    return _current_shape
+
+
+def set_grid_shape(rows, columns):
+    """設定目前的網格形狀
+
+    Args:
+        rows (int): 列數
+        columns (int): 欄數
+
+    Returns:
+        GridShape: 變更前的網格形狀
+    """
+    global _current_shape
+    previous = _current_shape
+    _current_shape = GridShape(rows, columns)
+    return previous
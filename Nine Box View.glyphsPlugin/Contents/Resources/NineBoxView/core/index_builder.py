@@ -0,0 +1,226 @@
+# encoding: utf-8
+
+"""
+IndexBuilder - 字符索引的背景建立
+大型字型的索引不在主執行緒一次建立：
+1. 主執行緒擷取字符名稱與 Unicode 的快照（只讀取兩個屬性）
+2. 背景執行緒以純 Python 處理快照（解析碼位、查詢 Unicode 區塊），分段放入佇列
+3. 每段完成後排程主執行緒合併（讀取分類、書寫系統、元件與標籤），每次合併有時間預算
+
+建立期間索引以已合併的部分回答查詢，尚未合併的字符由呼叫端直接查詢 font.glyphs；
+無法排程到主執行緒時（例如沒有 Foundation），由下一次取得索引時合併
+"""
+
+from __future__ import division, print_function, unicode_literals
+import threading
+import time
+import traceback
+
+try:
+    from queue import Queue, Empty
+except ImportError:
+    from Queue import Queue, Empty
+
+from .glyph_index import glyph_unicodes, parse_codepoints, block_keys
+
+# 字符數量達到此值時改為背景建立
+BACKGROUND_BUILD_THRESHOLD = 2000
+
+# 每段的字符數量
+CHUNK_SIZE = 256
+
+# 每次主執行緒合併的時間預算（毫秒）
+MERGE_BUDGET_MS = 8.0
+
+# 結束標記
+_DONE = None
+
+
+def dispatch_to_main(callback):
+    """排程在主執行緒執行回呼（沒有 Foundation 時不排程，改由取得索引時合併）
+
+    Args:
+        callback (callable): 無參數回呼
+
+    Returns:
+        bool: True 如果已排程
+    """
+    try:
+        from Foundation import NSOperationQueue
+        NSOperationQueue.mainQueue().addOperationWithBlock_(callback)
+        return True
+    except ImportError:
+        pass
+    except Exception:
+        print(traceback.format_exc())
+    return False
+
+
+class _BuildJob(object):
+    """單一字型索引的背景建立工作"""
+
+    def __init__(self, index, snapshot):
+        """初始化工作
+
+        Args:
+            index (GlyphIndex): 目標索引
+            snapshot (list): [(名稱, Unicode 十六進位字串), ...]
+        """
+        self.index = index
+        self.snapshot = snapshot
+        self.chunks = Queue()
+        self.cancelled = False
+        self.started = time.time()
+
+    def run(self, notify):
+        """背景執行緒：處理快照並分段放入佇列
+
+        Args:
+            notify (callable): 每段完成後呼叫（排程主執行緒合併）
+        """
+        try:
+            snapshot = self.snapshot
+            for start in range(0, len(snapshot), CHUNK_SIZE):
+                if self.cancelled:
+                    return
+                chunk = []
+                for position in range(start, min(start + CHUNK_SIZE, len(snapshot))):
+                    name, unicodes = snapshot[position]
+                    code_points = parse_codepoints(unicodes)
+                    chunk.append((position, name, code_points, block_keys(code_points)))
+                self.chunks.put(chunk)
+                notify()
+        except Exception:
+            print(traceback.format_exc())
+        finally:
+            self.chunks.put(_DONE)
+            notify()
+
+
+class BackgroundIndexBuilder(object):
+    """字符索引背景建立器"""
+
+    def __init__(self, dispatch=dispatch_to_main):
+        """初始化建立器
+
+        Args:
+            dispatch (callable): dispatch(callback)，排程在主執行緒執行回呼
+        """
+        self._dispatch = dispatch
+        self._jobs = {}         # id(GlyphIndex) → _BuildJob
+        self._scheduled = False
+        self._lock = threading.Lock()
+        self._stats = {
+            'builds': 0,
+            'chunks': 0,
+            'cancelled': 0,
+            'last_build_ms': 0.0
+        }
+
+    def start(self, font, index):
+        """開始背景建立索引（主執行緒）
+
+        Args:
+            font: GSFont 物件
+            index (GlyphIndex): 目標索引
+
+        Returns:
+            bool: True 如果已開始
+        """
+        try:
+            self.cancel(index)
+            snapshot = [(glyph.name, glyph_unicodes(glyph)) for glyph in font.glyphs if glyph.name]
+            job = _BuildJob(index, snapshot)
+            index.begin_progressive([entry[0] for entry in snapshot])
+            self._jobs[id(index)] = job
+
+            worker = threading.Thread(target=job.run, args=(self._notify,), name='NineBoxView-IndexBuilder')
+            worker.daemon = True
+            worker.start()
+            self._stats['builds'] += 1
+            return True
+
+        except Exception:
+            print(traceback.format_exc())
+            self._jobs.pop(id(index), None)
+            return False
+
+    def pump(self, budget_ms=MERGE_BUDGET_MS):
+        """在主執行緒合併已完成的段落（有時間預算）
+
+        Args:
+            budget_ms (float): 時間預算（毫秒）
+
+        Returns:
+            bool: True 如果仍有建立中的索引
+        """
+        with self._lock:
+            self._scheduled = False
+
+        deadline = time.time() + budget_ms / 1000.0
+        for key, job in list(self._jobs.items()):
+            try:
+                while time.time() < deadline:
+                    chunk = job.chunks.get_nowait()
+                    if chunk is _DONE:
+                        job.index.finish_progressive()
+                        del self._jobs[key]
+                        self._stats['last_build_ms'] = (time.time() - job.started) * 1000.0
+                        break
+                    job.index.merge_chunk(chunk)
+                    self._stats['chunks'] += 1
+            except Empty:
+                pass
+            except Exception:
+                print(traceback.format_exc())
+
+        # 預算用完仍有段落待合併時，再排程一次
+        if any(not job.chunks.empty() for job in self._jobs.values()):
+            self._notify()
+        return bool(self._jobs)
+
+    def cancel(self, index):
+        """取消索引的背景建立（字型關閉或重新建立時）
+
+        Args:
+            index (GlyphIndex): 目標索引
+        """
+        job = self._jobs.pop(id(index), None)
+        if job is not None:
+            job.cancelled = True
+            self._stats['cancelled'] += 1
+
+    def is_building(self, index):
+        """檢查索引是否正在背景建立"""
+        return id(index) in self._jobs
+
+    def get_stats(self):
+        """取得背景建立統計資訊
+
+        Returns:
+            dict: 統計字典（建立次數、合併段數、取消次數、最近一次建立耗時、建立中的索引數）
+        """
+        stats = self._stats.copy()
+        stats['active'] = len(self._jobs)
+        return stats
+
+    def _notify(self):
+        """排程主執行緒合併（同一時間只排程一次；可由背景執行緒呼叫）"""
+        with self._lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._dispatch(self.pump)
+
+
+# 全域建立器實例
+_index_builder = BackgroundIndexBuilder()
+
+
+def get_index_builder():
+    """獲取字符索引背景建立器實例
+
+    Returns:
+        BackgroundIndexBuilder: 建立器實例
+    """
+    return _index_builder
@@ -0,0 +1,544 @@
+# encoding: utf-8
+
+"""
+GlyphIndexStore - 字符索引與圖層度量的磁碟快取
+以字型檔案的路徑、修改時間與大小識別快取檔，保存字符索引（名稱、碼位、分類等欄位）
+與本次工作階段量測過的圖層度量（字身寬度、墨跡邊界）；下次開啟同一份檔案時以一次讀取載入，
+不必走訪整個字型
+
+檔案格式（緊湊、可記憶體映射）：
+    'NBVI' + 版本 (uint16) + 標頭長度 (uint32) + JSON 標頭 + 8 位元組對齊的資料區段
+    資料區段為原生位元組序的 array 緩衝（字串表、名稱、碼位、欄位值、度量），
+    載入時以 mmap 直接切片轉為 array，標頭記錄區段位置與 CRC32
+檔案識別不符、版本或位元組序不同、校驗失敗時視為過期或損壞，刪除後由字型重新建立
+"""
+
+from __future__ import division, print_function, unicode_literals
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import traceback
+import zlib
+from array import array
+
+from .glyph_index import INDEX_FIELDS
+
+# 快取檔格式
+CACHE_MAGIC = b'NBVI'
+CACHE_FORMAT_VERSION = 1
+CACHE_SUFFIX = '.nbvi'
+CACHE_DIRECTORY = os.path.join('~', 'Library', 'Caches', 'NineBoxView', 'GlyphIndex')
+
+# 快取檔數量上限（超過時刪除最舊的檔案）
+MAX_CACHE_FILES = 32
+
+_PREAMBLE = struct.Struct('<4sHI')
+_ALIGNMENT = 8
+_NO_BOUNDS = float('nan')
+
+
+class CacheError(Exception):
+    """快取檔損壞或格式不相容"""
+
+
+class StaleCacheError(CacheError):
+    """快取檔與目前的字型檔案不符"""
+
+
+def font_disk_identity(font):
+    """取得字型檔案的磁碟識別（路徑、修改時間、大小）
+
+    只在載入與寫入快取時呼叫；尚未保存的字型沒有識別
+
+    Args:
+        font: GSFont 物件
+
+    Returns:
+        dict or None: {'path', 'mtime', 'size'}
+    """
+    path = getattr(font, 'filepath', None) if font is not None else None
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return {'path': '%s' % path, 'mtime': stat.st_mtime, 'size': stat.st_size}
+
+
+def cache_path_for(identity, directory=CACHE_DIRECTORY):
+    """取得字型檔案對應的快取檔路徑（以路徑雜湊命名）"""
+    digest = hashlib.sha1(identity['path'].encode('utf-8')).hexdigest()
+    return os.path.join(os.path.expanduser(directory), digest + CACHE_SUFFIX)
+
+
+class _StringTable(object):
+    """字串表：相同字串只保存一次"""
+
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def add(self, value):
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def encode(self):
+        """回傳 (UTF-8 資料, 位移 array('I'))"""
+        offsets = array('I', [0])
+        chunks = []
+        total = 0
+        for value in self.strings:
+            data = value.encode('utf-8')
+            chunks.append(data)
+            total += len(data)
+            offsets.append(total)
+        return b''.join(chunks), offsets
+
+
+def encode_index(identity, snapshot, metrics, master_ids):
+    """序列化字符索引與圖層度量
+
+    Args:
+        identity (dict): 字型檔案的磁碟識別
+        snapshot (tuple): GlyphIndex.export_snapshot() 的結果
+        metrics (dict): (名稱, 主板 ID) → (字身寬度, 邊界或 None, 圖層版本)
+        master_ids (list): 主板 ID
+
+    Returns:
+        bytes: 快取檔內容
+    """
+    glyph_names, glyph_code_points, field_tables = snapshot
+    strings = _StringTable()
+    positions = {}
+    names = array('I')
+    code_points = array('I')
+    fields = dict((field, array('I')) for field in INDEX_FIELDS)
+
+    for position, name in enumerate(glyph_names):
+        positions[name] = position
+        names.append(strings.add(name))
+        for code_point in glyph_code_points.get(name, ()):
+            code_points.extend((position, code_point))
+
+    # 欄位值以 (值, 字符位置) 配對保存
+    for field in INDEX_FIELDS:
+        pairs = fields[field]
+        for key, key_names in field_tables.get(field, {}).items():
+            key_id = strings.add(key)
+            for name in key_names:
+                if name in positions:
+                    pairs.extend((key_id, positions[name]))
+
+    master_positions = dict((master_id, index) for index, master_id in enumerate(master_ids))
+    metric_values = array('d')
+    for (name, master_id), entry in metrics.items():
+        width, bounds = entry[0], entry[1]
+        if name not in positions or master_id not in master_positions:
+            continue
+        metric_values.extend((positions[name], master_positions[master_id], width))
+        metric_values.extend(bounds if bounds is not None else (_NO_BOUNDS,) * 4)
+
+    string_data, string_offsets = strings.encode()
+    sections = [('strings', string_data, 'B'), ('string_offsets', string_offsets.tobytes(), 'I'),
+                ('names', names.tobytes(), 'I'), ('code_points', code_points.tobytes(), 'I'),
+                ('metrics', metric_values.tobytes(), 'd')]
+    sections.extend(('field_' + field, fields[field].tobytes(), 'I') for field in INDEX_FIELDS)
+
+    payload = bytearray()
+    layout = {}
+    for section_name, data, typecode in sections:
+        payload.extend(b'\0' * (-len(payload) % _ALIGNMENT))
+        layout[section_name] = [len(payload), len(data), typecode]
+        payload.extend(data)
+
+    header = dict(identity)
+    header.update({
+        'byteorder': sys.byteorder,
+        'itemsize': array('I').itemsize,
+        'glyphs': len(glyph_names),
+        'masters': list(master_ids),
+        'fields': list(INDEX_FIELDS),
+        'sections': layout,
+        'crc': zlib.crc32(bytes(payload)) & 0xFFFFFFFF,
+    })
+    header_data = json.dumps(header, sort_keys=True).encode('utf-8')
+    header_data += b' ' * (-(_PREAMBLE.size + len(header_data)) % _ALIGNMENT)
+    return _PREAMBLE.pack(CACHE_MAGIC, CACHE_FORMAT_VERSION, len(header_data)) + header_data + bytes(payload)
+
+
+def decode_index(buffer, identity):
+    """由快取檔內容還原字符索引條目與圖層度量
+
+    Args:
+        buffer: 快取檔內容（bytes 或 mmap）
+        identity (dict): 目前字型檔案的磁碟識別
+
+    Returns:
+        tuple: ((字符名稱列表, 名稱 → 碼位, 欄位 → {值: 字符名稱集合}), 度量字典)
+
+    Raises:
+        CacheError: 快取過期或損壞
+    """
+    view = memoryview(buffer)
+    payload = None
+    try:
+        if len(view) < _PREAMBLE.size:
+            raise CacheError('truncated preamble')
+        magic, version, header_length = _PREAMBLE.unpack(view[:_PREAMBLE.size].tobytes())
+        if magic != CACHE_MAGIC or version != CACHE_FORMAT_VERSION:
+            raise CacheError('unknown format')
+
+        payload_start = _PREAMBLE.size + header_length
+        try:
+            header = json.loads(view[_PREAMBLE.size:payload_start].tobytes().decode('utf-8'))
+        except ValueError:
+            raise CacheError('corrupt header')
+
+        for key in ('path', 'mtime', 'size'):
+            if header.get(key) != identity.get(key):
+                raise StaleCacheError('stale cache')
+        if (header.get('byteorder') != sys.byteorder or header.get('itemsize') != array('I').itemsize
+                or header.get('fields') != list(INDEX_FIELDS)):
+            raise CacheError('incompatible cache')
+
+        payload = view[payload_start:]
+        if zlib.crc32(payload) & 0xFFFFFFFF != header.get('crc'):
+            raise CacheError('checksum mismatch')
+
+        def section(name):
+            try:
+                offset, length, typecode = header['sections'][name]
+            except (KeyError, TypeError, ValueError):
+                raise CacheError('missing section %s' % name)
+            if offset + length > len(payload):
+                raise CacheError('truncated section %s' % name)
+            if typecode == 'B':
+                return payload[offset:offset + length].tobytes()
+            values = array(str(typecode))
+            values.frombytes(payload[offset:offset + length])
+            return values
+
+        string_data = section('strings')
+        string_offsets = section('string_offsets')
+        strings = [
+            string_data[string_offsets[i]:string_offsets[i + 1]].decode('utf-8')
+            for i in range(len(string_offsets) - 1)
+        ]
+
+        names = [strings[string_id] for string_id in section('names')]
+        if len(names) != header.get('glyphs'):
+            raise CacheError('glyph count mismatch')
+
+        code_points = {}
+        pairs = section('code_points')
+        for i in range(0, len(pairs), 2):
+            name = names[pairs[i]]
+            code_points[name] = code_points.get(name, ()) + (pairs[i + 1],)
+
+        fields = {}
+        for field in INDEX_FIELDS:
+            table = fields[field] = {}
+            pairs = section('field_' + field)
+            for i in range(0, len(pairs), 2):
+                key = strings[pairs[i]]
+                key_names = table.get(key)
+                if key_names is None:
+                    key_names = table[key] = set()
+                key_names.add(names[pairs[i + 1]])
+
+        masters = header.get('masters') or []
+        metrics = {}
+        metric_values = section('metrics')
+        for i in range(0, len(metric_values), 7):
+            bounds = tuple(metric_values[i + 3:i + 7])
+            metrics[(names[int(metric_values[i])], masters[int(metric_values[i + 1])])] = (
+                metric_values[i + 2], None if bounds[0] != bounds[0] else bounds
+            )
+
+        return (names, code_points, fields), metrics
+
+    except (IndexError, UnicodeDecodeError, struct.error) as error:
+        raise CacheError('corrupt cache: %s' % error)
+    finally:
+        # 釋放緩衝後 mmap 才能關閉
+        if payload is not None:
+            payload.release()
+        view.release()
+
+
+class GlyphIndexStore(object):
+    """字符索引與圖層度量的磁碟快取
+
+    圖層度量在工作階段中由預覽視圖記錄，字符被編輯時移除；
+    只在文件沒有未保存變更時寫入，確保快取內容與磁碟上的檔案一致
+
+    記憶體內的度量附帶圖層版本：由磁碟載入的度量在第一次使用時綁定當時的圖層版本，
+    之後圖層版本不符（例如只修改外框、字身寬度未變）即視為過期
+    """
+
+    def __init__(self, directory=CACHE_DIRECTORY):
+        """初始化快取
+
+        Args:
+            directory (str): 快取檔目錄
+        """
+        self._directory = directory
+        self._metrics = {}      # id(font) → (font, {(名稱, 主板 ID): (寬度, 邊界, 圖層版本)})
+        self._stats = {
+            'loads': 0,
+            'misses': 0,
+            'stale': 0,
+            'corrupt': 0,
+            'writes': 0,
+            'metric_hits': 0,
+            'metric_stale': 0
+        }
+
+    def load(self, font, index):
+        """以快取檔還原字型的索引（一次讀取）
+
+        Args:
+            font: GSFont 物件
+            index (GlyphIndex): 要還原的索引
+
+        Returns:
+            bool: True 如果成功由快取還原
+        """
+        identity = font_disk_identity(font)
+        if identity is None:
+            return False
+
+        path = cache_path_for(identity, self._directory)
+        try:
+            with open(path, 'rb') as handle:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    snapshot, metrics = decode_index(mapped, identity)
+                finally:
+                    mapped.close()
+        except StaleCacheError:
+            self._stats['stale'] += 1
+            self._remove(path)
+            return False
+        except CacheError:
+            self._stats['corrupt'] += 1
+            self._remove(path)
+            return False
+        except (IOError, OSError, ValueError, BufferError):
+            # 沒有快取檔（或空檔案無法映射）
+            self._stats['misses'] += 1
+            return False
+
+        try:
+            if len(snapshot[0]) != len(font.glyphs):
+                # 字符數量不符（檔案以外的方式變更）
+                self._stats['stale'] += 1
+                self._remove(path)
+                return False
+            index.restore_snapshot(*snapshot)
+            # 磁碟上的度量尚未綁定圖層版本（第一次使用時綁定）
+            self._metrics[id(font)] = (font, dict(
+                (key, (width, bounds, None)) for key, (width, bounds) in metrics.items()
+            ))
+            self._stats['loads'] += 1
+            return True
+        except Exception:
+            print(traceback.format_exc())
+            return False
+
+    def persist(self, font, index):
+        """寫入字型的快取檔（文件有未保存的變更時略過）
+
+        Args:
+            font: GSFont 物件
+            index (GlyphIndex): 字型的索引
+
+        Returns:
+            bool: True 如果已寫入
+        """
+        if font is None or index is None or self._has_unsaved_changes(font):
+            return False
+
+        identity = font_disk_identity(font)
+        if identity is None:
+            return False
+
+        try:
+            master_ids = [master.id for master in font.masters]
+            data = encode_index(identity, index.export_snapshot(), self._font_metrics(font), master_ids)
+
+            path = cache_path_for(identity, self._directory)
+            directory = os.path.dirname(path)
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+
+            # 先寫入暫存檔再換名，避免留下寫到一半的快取檔
+            temporary = path + '.tmp'
+            with open(temporary, 'wb') as handle:
+                handle.write(data)
+            os.rename(temporary, path)
+            self._stats['writes'] += 1
+            self._prune(directory)
+            return True
+
+        except Exception:
+            print(traceback.format_exc())
+            return False
+
+    def get_layer_metrics(self, font, name, master_id, version=None):
+        """取得記錄的圖層度量
+
+        Args:
+            font: GSFont 物件
+            name (str): 字符名稱
+            master_id (str): 主板 ID
+            version (tuple): 目前的圖層版本（outline_geometry.layer_version）
+
+        Returns:
+            tuple or None: (字身寬度, 邊界或 None)；圖層版本不符時為 None
+        """
+        metrics = self._font_metrics(font, create=False)
+        key = (name, master_id)
+        entry = metrics.get(key) if metrics else None
+        if entry is None:
+            return None
+        if version is not None:
+            if entry[2] is None:
+                # 磁碟載入的度量：綁定第一次使用時的圖層版本
+                entry = metrics[key] = (entry[0], entry[1], version)
+            elif entry[2] != version:
+                # 圖層已被編輯：度量過期
+                del metrics[key]
+                self._stats['metric_stale'] += 1
+                return None
+        self._stats['metric_hits'] += 1
+        return entry[0], entry[1]
+
+    def record_layer_metrics(self, font, name, master_id, width=None, bounds=None, version=None):
+        """記錄圖層度量（寬度與邊界可分開記錄）
+
+        Args:
+            font: GSFont 物件
+            name (str): 字符名稱
+            master_id (str): 主板 ID
+            width (float): 字身寬度（None 表示保留原值）
+            bounds (tuple): 墨跡邊界（None 表示保留原值）
+            version (tuple): 量測時的圖層版本（與記錄的版本不同時捨棄舊值）
+        """
+        if font is None or not name:
+            return
+        metrics = self._font_metrics(font)
+        previous = metrics.get((name, master_id))
+        if previous is not None and version is not None and previous[2] not in (None, version):
+            previous = None
+        if previous is None:
+            # 只記錄邊界時以圖層讀取寬度，確保寫入的寬度有效
+            if width is None:
+                width = self._layer_width(font, name, master_id)
+            previous = (width, None, version)
+        metrics[(name, master_id)] = (
+            previous[0] if width is None else width,
+            previous[1] if bounds is None else tuple(bounds),
+            previous[2] if version is None else version
+        )
+
+    def forget_glyph(self, font, name):
+        """移除字符的圖層度量（字符被編輯時）
+
+        Args:
+            font: GSFont 物件
+            name (str): 字符名稱
+        """
+        metrics = self._font_metrics(font, create=False)
+        if metrics:
+            for key in [key for key in metrics if key[0] == name]:
+                del metrics[key]
+
+    def discard(self, font):
+        """移除字型的記憶體內度量（字型關閉時）
+
+        Args:
+            font: GSFont 物件
+        """
+        self._metrics.pop(id(font), None)
+
+    def get_stats(self):
+        """取得快取統計資訊
+
+        Returns:
+            dict: 統計字典（載入、未命中、過期、損壞、寫入次數與度量命中、過期數）
+        """
+        stats = self._stats.copy()
+        stats['fonts'] = len(self._metrics)
+        return stats
+
+    def _font_metrics(self, font, create=True):
+        """取得字型的度量字典"""
+        entry = self._metrics.get(id(font))
+        if entry is not None and entry[0] is font:
+            return entry[1]
+        if not create:
+            return None
+        metrics = {}
+        self._metrics[id(font)] = (font, metrics)
+        return metrics
+
+    @staticmethod
+    def _layer_width(font, name, master_id):
+        """讀取圖層的字身寬度"""
+        try:
+            return font.glyphs[name].layers[master_id].width
+        except Exception:
+            return 0
+
+    @staticmethod
+    def _has_unsaved_changes(font):
+        """檢查文件是否有未保存的變更"""
+        try:
+            document = getattr(font, 'parent', None)
+            if document is not None and hasattr(document, 'isDocumentEdited'):
+                return bool(document.isDocumentEdited())
+        except Exception:
+            print(traceback.format_exc())
+        return False
+
+    @staticmethod
+    def _remove(path):
+        """刪除過期或損壞的快取檔"""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _prune(directory):
+        """快取檔超過上限時刪除最舊的檔案"""
+        try:
+            paths = [os.path.join(directory, name) for name in os.listdir(directory)
+                     if name.endswith(CACHE_SUFFIX)]
+            if len(paths) > MAX_CACHE_FILES:
+                paths.sort(key=os.path.getmtime)
+                for path in paths[:len(paths) - MAX_CACHE_FILES]:
+                    os.remove(path)
+        except OSError:
+            pass
+
+
+# 全域快取實例
+_glyph_index_store = GlyphIndexStore()
+
+
+def get_glyph_index_store():
+    """獲取字符索引磁碟快取實例
+
+    Returns:
+        GlyphIndexStore: 快取實例
+    """
+    return _glyph_index_store
@@ -0,0 +1,133 @@
+# encoding: utf-8
+
+"""
+InkBounds - 墨跡邊界佈局支援
+以實際外框邊界（而非字身寬度與主板上下緣）決定格子的參考尺寸，
+避免超出上下緣的字形被裁切、零寬度的附加符號無法顯示
+
+單一字形的邊界由外框幾何快取依圖層版本保存（切換模式或縮放視窗不會重新計算外框）；
+整個網格的聯集邊界則隨格子內容變動增量維護
+"""
+
+from __future__ import division, print_function, unicode_literals
+
+
+def union_of(first, second):
+    """合併兩個邊界（任一為 None 時回傳另一個）
+
+    Args:
+        first (tuple or None): (xMin, yMin, xMax, yMax)
+        second (tuple or None): (xMin, yMin, xMax, yMax)
+
+    Returns:
+        tuple or None: 聯集邊界
+    """
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return (
+        min(first[0], second[0]), min(first[1], second[1]),
+        max(first[2], second[2]), max(first[3], second[3])
+    )
+
+
+class InkBoundsTracker(object):
+    """網格聯集邊界的增量維護
+
+    每個格子保存自己的邊界：
+    - 新邊界只會擴大聯集時直接合併（O(1)）
+    - 舊邊界位於聯集邊緣且被縮小或移除時，才從各格子的邊界重新合併（不觸及外框）
+    """
+
+    def __init__(self):
+        """初始化追蹤器"""
+        self._cells = []
+        self._union = None
+        self._stats = {
+            'updates': 0,
+            'recomputes': 0
+        }
+
+    def resize(self, total):
+        """調整格子數量（網格形狀改變時清空所有邊界）
+
+        Args:
+            total (int): 總格數
+        """
+        if len(self._cells) != total:
+            self._cells = [None] * total
+            self._union = None
+
+    def update_cell(self, position, bounds):
+        """更新單一格子的邊界
+
+        Args:
+            position (int): 格子位置
+            bounds (tuple or None): 新邊界，None 表示空白格
+
+        Returns:
+            bool: True 如果聯集邊界因此改變
+        """
+        if not 0 <= position < len(self._cells):
+            return False
+
+        previous = self._cells[position]
+        if previous == bounds:
+            return False
+
+        self._cells[position] = bounds
+        self._stats['updates'] += 1
+        old_union = self._union
+
+        if previous is not None and self._touches_edge(previous):
+            self._recompute()
+        else:
+            self._union = union_of(self._union, bounds)
+
+        return self._union != old_union
+
+    def get_union(self):
+        """取得目前的聯集邊界
+
+        Returns:
+            tuple or None: (xMin, yMin, xMax, yMax)，所有格子皆空白時為 None
+        """
+        return self._union
+
+    def get_stats(self):
+        """取得統計資訊
+
+        Returns:
+            dict: 統計字典（更新次數、重新合併次數）
+        """
+        return self._stats.copy()
+
+    def _touches_edge(self, bounds):
+        """檢查邊界是否位於聯集邊緣"""
+        union = self._union
+        if union is None:
+            return False
+        return (bounds[0] <= union[0] or bounds[1] <= union[1] or
+                bounds[2] >= union[2] or bounds[3] >= union[3])
+
+    def _recompute(self):
+        """從各格子的邊界重新合併"""
+        self._stats['recomputes'] += 1
+        union = None
+        for bounds in self._cells:
+            union = union_of(union, bounds)
+        self._union = union
+
+
+# 全域追蹤器實例（對應預覽中目前主板的網格）
+_ink_bounds_tracker = InkBoundsTracker()
+
+
+def get_ink_bounds_tracker():
+    """獲取網格聯集邊界追蹤器實例
+
+    Returns:
+        InkBoundsTracker: 追蹤器實例
+    """
+    return _ink_bounds_tracker
@@ -7,7 +7,9 @@ Nine Box Preview Plugin - Unified Glyph Input Recognition System
 """
 
 from __future__ import division, print_function, unicode_literals
+import re
 import traceback
+from collections import OrderedDict
 
 # 僅匯入保留的前台本地化功能（錯誤訊息已移除）
 
@@ -35,6 +37,62 @@ except ImportError:
 # 統一匯入快取管理系統
 # 移除舊的快取匯入，統一使用 glyphs_service
 
+# 大量輸入的斷詞與解析結果快取（由背景工作填入，驗證與解析共用）
+# 文字 → (標記, 各標記的解析狀態或 None, 快照鍵)
+MAX_CACHED_SEGMENTS = 16
+_segment_cache = OrderedDict()
+
+# 可能是 Unicode 十六進制的標記（font.glyphs 可直接解析，需在主執行緒查詢）
+_HEX_TOKEN = re.compile(r'^[0-9A-Fa-f]{4,6}$')
+
+
+def resolve_segments(text, names, code_point_names):
+    """分割輸入並以名稱快照解析每個標記（純計算，可在背景執行緒執行）
+
+    解析狀態：True 為字型中的字符，False 為無效，
+    None 為需要在主執行緒處理的標記（查詢、範圍、萬用字元、十六進制碼位）
+
+    Args:
+        text (str): 輸入文字
+        names (frozenset): 字符名稱快照（None 時只分割）
+        code_point_names (dict): 碼位 → 字符名稱快照
+
+    Returns:
+        tuple: (標記 tuple, 解析狀態 tuple 或 None)
+    """
+    segments = tuple(InputRecognitionService._smart_split_text(text))
+    if names is None:
+        return segments, None
+
+    from .font_query import is_query_token
+    from .glyph_sources import is_lazy_token
+
+    def status(segment):
+        if not segment or is_query_token(segment):
+            return None
+        if segment in names or (len(segment) == 1 and ord(segment) in code_point_names):
+            return True
+        if is_lazy_token(segment) or _HEX_TOKEN.match(segment):
+            return None
+        return False
+
+    return segments, tuple(status(segment) for segment in segments)
+
+
+def _resolution_index(font):
+    """取得已完整建立的字型索引（尚未建立或背景建立中為 None）"""
+    if font is None:
+        return None
+    from .glyph_index import get_glyph_index_registry
+    index = get_glyph_index_registry().peek(font)
+    return index if index is not None and index.complete else None
+
+
+def _snapshot_key(font, index):
+    """名稱快照的識別鍵（字型識別碼, 索引版本）"""
+    from .font_identity import get_font_token
+    return (get_font_token(font), index.revision) if index is not None else None
+
 
 
 class InputGuardService:
@@ -151,12 +209,14 @@ class InputRecognitionService:
             master: GSFontMaster 物件（用於生成快取鍵）
             
         Returns:
-            list: 有效字符列表
+            list or LazyGlyphSet: 有效字符列表（含範圍或萬用字元時為延遲展開的集合）
             
         Examples:
             # 多字符搜尋：parse_glyph_input("天天") → ['天', '天']
             # 鎖定輸入框：parse_glyph_input("天天")[0] → '天' （呼叫方取第一個）
             # Nice Names：parse_glyph_input("u-bopomofo abc") → ['u-bopomofo', 'a', 'b', 'c']
+            # 索引查詢：parse_glyph_input("script:han") → 字型中所有漢字的字符名稱
+            # 範圍與萬用字元：parse_glyph_input("uni4E00-uni9FFF *.ss01") → LazyGlyphSet（延遲展開）
             # 無效輸入：parse_glyph_input("xyz") → []
             # 空白字符：parse_glyph_input("   ") → []
         """
@@ -168,8 +228,10 @@ class InputRecognitionService:
             return []
         
         # 使用 font.tempData 快取解析結果
+        # 查詢標記的結果隨字符屬性變動，由字符索引負責保持最新，不寫入快取
         current_font = font or Glyphs.font
-        if current_font and hasattr(current_font, 'tempData') and master:
+        use_cache = bool(master) and not InputRecognitionService._contains_dynamic_token(text)
+        if current_font and hasattr(current_font, 'tempData') and use_cache:
             # 生成快取鍵
             text_hash = hash(text.strip())
             max_glyphs_key = f"_{max_glyphs}" if max_glyphs else ""
@@ -187,8 +249,8 @@ class InputRecognitionService:
         # 統一使用多字符解析邏輯（減法重構：消除複雜分支）
         result = InputRecognitionService._parse_multi_glyph_input(text, max_glyphs, current_font, master)
         
-        # 快取結果
-        if current_font and hasattr(current_font, 'tempData') and master:
+        # 快取結果（延遲展開的集合引用字符索引，不寫入 tempData）
+        if current_font and hasattr(current_font, 'tempData') and use_cache and isinstance(result, list):
             current_font.tempData[cache_key] = result[:]
         
         return result
@@ -197,17 +259,39 @@ class InputRecognitionService:
     def _parse_multi_glyph_input(text, max_glyphs=None, font=None, master=None):
         """多字符輸入解析（整合 font.tempData 快取支援）"""
         glyphs = []
-        segments = InputRecognitionService._smart_split_text(text)
+        lazy_parts = []     # 範圍與萬用字元來源（與其前後的明確字符依序排列）
+        lazy_index = None
+        current_font = font or Glyphs.font
+        segments, statuses = InputRecognitionService.resolved_segments(text, current_font)
         
         # 避免未使用參數警告（master 保留供未來快取功能使用）
         _ = master
         
-        for segment in segments:
+        for position, segment in enumerate(segments):
             if not segment:
                 continue
             
-            # 使用統一服務進行字符尋找（享受 tempData 快取優化）
-            current_font = font or Glyphs.font
+            # 背景工作已解析的標記不需查詢字型
+            status = statuses[position] if statuses else None
+            if status is False:
+                continue
+            if status is True:
+                glyphs.append(segment)
+                if max_glyphs and len(glyphs) >= max_glyphs:
+                    break
+                continue
+            
+            # 查詢標記：由字符索引展開為符合條件的字符名稱
+            from .font_query import is_query_token, query_glyph_names
+            if is_query_token(segment):
+                names = query_glyph_names(current_font, segment)
+                if max_glyphs:
+                    names = names[:max_glyphs - len(glyphs)]
+                glyphs.extend(names)
+                if max_glyphs and len(glyphs) >= max_glyphs:
+                    break
+                continue
+            
             try:
                 from .glyphs_service import get_glyphs_service
                 glyphs_service = get_glyphs_service()
@@ -219,6 +303,16 @@ class InputRecognitionService:
                     # 檢查是否達到最大限制
                     if max_glyphs and len(glyphs) >= max_glyphs:
                         break
+                else:
+                    # 範圍與萬用字元：建立延遲來源，不展開成列表
+                    from .glyph_sources import is_lazy_token, lazy_source_for_font
+                    if is_lazy_token(segment):
+                        source, lazy_index = lazy_source_for_font(current_font, segment)
+                        if source is not None and len(source):
+                            if glyphs:
+                                lazy_parts.append(glyphs)
+                                glyphs = []
+                            lazy_parts.append(source)
                 # 如果不是有效字符或 Nice Name，直接跳過（不進行任何分解）
                 # 用戶期望：只有完全匹配有效字符名稱時才有效，絕不分解
                 
@@ -226,12 +320,116 @@ class InputRecognitionService:
                 # 復原到原始方法（測試環境或匯入失敗時）
                 pass
         
-        return glyphs
+        if not lazy_parts:
+            return glyphs
+        
+        from itertools import islice
+        from .glyph_sources import LazyGlyphSet
+        if glyphs:
+            lazy_parts.append(glyphs)
+        lazy_set = LazyGlyphSet(lazy_parts, text.strip(), lazy_index)
+        if max_glyphs:
+            return list(islice(lazy_set, max_glyphs))
+        return lazy_set
     
+    @staticmethod
+    def _contains_dynamic_token(text):
+        """檢查輸入是否包含查詢、範圍或萬用字元標記（結果隨字型內容變動）
+        
+        以與解析相同的斷字結果判斷，緊接在 CJK 字符後的標記（例如 天A-Z）也能辨識
+        """
+        from .font_query import is_query_token
+        from .glyph_sources import is_lazy_token
+        return any(
+            is_query_token(segment) or is_lazy_token(segment)
+            for segment in InputRecognitionService.split_segments(text)
+        )
+    
+    @staticmethod
+    def split_segments(text):
+        """分割輸入文字（大量輸入優先使用背景斷詞的結果）
+
+        Args:
+            text: 輸入文字
+
+        Returns:
+            list: 分割後的標記
+        """
+        entry = _segment_cache.get(text)
+        if entry is not None:
+            _segment_cache.move_to_end(text)
+            return list(entry[0])
+        return InputRecognitionService._smart_split_text(text)
+
+    @staticmethod
+    def resolved_segments(text, font):
+        """取得分割後的標記與背景解析狀態（狀態與目前字型索引不符時為 None）
+
+        Args:
+            text: 輸入文字
+            font: GSFont 物件
+
+        Returns:
+            tuple: (標記列表, 解析狀態 tuple 或 None)
+        """
+        entry = _segment_cache.get(text)
+        if entry is None:
+            return InputRecognitionService._smart_split_text(text), None
+        _segment_cache.move_to_end(text)
+        statuses = entry[1]
+        if statuses is not None and entry[2] != _snapshot_key(font, _resolution_index(font)):
+            statuses = None
+        return list(entry[0]), statuses
+
+    @staticmethod
+    def tokenize_async(text, key='tokenize'):
+        """在背景執行緒分割並解析大量輸入文字（主執行緒呼叫）
+
+        字符名稱與碼位的解析以索引的不可變快照在背景執行，
+        主執行緒的驗證與解析只需處理查詢、範圍等少數標記；
+        短文字或已有相符的結果時不提交工作；同鍵的新輸入會取代尚未完成的工作
+
+        Args:
+            text: 輸入文字
+            key (str): 工作鍵（每個輸入框一個）
+
+        Returns:
+            ComputeFuture or None: 完成後在主執行緒回呼；不需背景處理時為 None
+        """
+        from .compute_executor import get_compute_executor, OFFLOAD_TEXT_LENGTH
+        executor = get_compute_executor()
+        if not text or len(text) < OFFLOAD_TEXT_LENGTH:
+            executor.cancel(key)
+            return None
+
+        font = Glyphs.font if Glyphs else None
+        index = _resolution_index(font)
+        snapshot_key = _snapshot_key(font, index)
+        entry = _segment_cache.get(text)
+        if entry is not None and (snapshot_key is None or entry[2] == snapshot_key):
+            executor.cancel(key)
+            return None
+        snapshot = index.resolution_snapshot() if index is not None else None
+
+        def store_segments(future):
+            result = future.result()
+            if result is not None:
+                _segment_cache[text] = (result[0], result[1], snapshot_key)
+                while len(_segment_cache) > MAX_CACHED_SEGMENTS:
+                    _segment_cache.popitem(last=False)
+
+        names, code_point_names = (snapshot[1], snapshot[2]) if snapshot else (None, None)
+        future = executor.submit(key, resolve_segments, text, names, code_point_names)
+        future.add_done_callback(store_segments)
+        return future
     
     @staticmethod
     def _smart_split_text(text):
-        """智慧分割文字，區分CJK字符和非CJK群組"""
+        """智慧分割文字，區分CJK字符和非CJK群組
+        
+        查詢標記（欄位:值）與範圍標記（X-Y）在 CJK 斷字之前辨識，整個保留為一個標記
+        （例如 component:天、一-十）
+        """
         if not text:
             return []
         
@@ -239,6 +437,9 @@ class InputRecognitionService:
         if not text.strip():
             return []
         
+        from .font_query import is_query_token
+        from .glyph_sources import parse_range
+        
         segments = []
         i = 0
         
@@ -250,8 +451,28 @@ class InputRecognitionService:
                 i += 1
                 continue
             
+            # 查詢與範圍標記：以空白分隔的整個片段，不拆開其中的 CJK 字符（只在片段開頭檢查一次）
+            if i == 0 or text[i - 1].isspace():
+                end = i
+                while end < len(text) and not text[end].isspace():
+                    end += 1
+                word = text[i:end]
+                if (('-' in word and parse_range(word) is not None)
+                        or ((':' in word or '=' in word) and is_query_token(word))):
+                    segments.append(word)
+                    i = end
+                    continue
+            
             # 判斷是否為CJK字符
             if InputRecognitionService._is_cjk_char(char):
+                # 緊接在其他字符後的單字元 CJK 範圍（例如 天一-十 中的 一-十）
+                if (i + 2 < len(text) and text[i + 1] == '-'
+                        and InputRecognitionService._is_cjk_char(text[i + 2])
+                        and parse_range(text[i:i + 3]) is not None):
+                    segments.append(text[i:i + 3])
+                    i += 3
+                    continue
+                
                 # CJK字符：每個字符單獨處理
                 segments.append(char)
                 i += 1
@@ -430,11 +651,29 @@ class InputRecognitionService:
                 'invalid_chars': []
             }
         
-        segments = InputRecognitionService._smart_split_text(text)
+        segments, statuses = InputRecognitionService.resolved_segments(text, Glyphs.font)
         valid_glyphs = []
         invalid_chars = []
         
-        for segment in segments:
+        for position, segment in enumerate(segments):
+            # 背景工作已解析的標記不需查詢字型
+            status = statuses[position] if statuses else None
+            if status is True:
+                valid_glyphs.append(segment)
+                continue
+            if status is False:
+                invalid_chars.append(segment)
+                continue
+            
+            # 查詢標記：有結果即為有效（找到第一個符合的字符即停止）
+            from .font_query import is_query_token, query_has_match
+            if is_query_token(segment):
+                if query_has_match(Glyphs.font, segment):
+                    valid_glyphs.append(segment)
+                else:
+                    invalid_chars.append(segment)
+                continue
+            
             try:
                 from .glyphs_service import get_glyphs_service
                 glyphs_service = get_glyphs_service()
@@ -443,6 +682,13 @@ class InputRecognitionService:
                 if glyph:
                     valid_glyphs.append(segment)
                 else:
+                    # 範圍與萬用字元：有符合的字符即為有效
+                    from .glyph_sources import is_lazy_token, lazy_source_for_font
+                    if is_lazy_token(segment):
+                        source, _ = lazy_source_for_font(Glyphs.font, segment)
+                        if source is not None and len(source):
+                            valid_glyphs.append(segment)
+                            continue
                     # 嚴格匹配策略：整個 segment 無效就視為無效，不分解
                     invalid_chars.append(segment)
                     
@@ -816,6 +1062,59 @@ class VisualFeedbackService:
         except Exception:
             print(traceback.format_exc())
     
+    @staticmethod
+    def get_suggestions(validation_result):
+        """為驗證結果中的無效標記取得「你是不是要找」建議
+
+        Args:
+            validation_result: 驗證結果，包含 'invalid_chars' 列表
+
+        Returns:
+            OrderedDict: 無效標記 → 建議名稱列表（只包含有建議的標記）
+        """
+        try:
+            invalid_chars = (validation_result or {}).get('invalid_chars', [])
+            if not invalid_chars or not Glyphs or not Glyphs.font:
+                return {}
+            from .glyph_suggestions import get_glyph_suggestion_service
+            return get_glyph_suggestion_service().suggest(Glyphs.font, invalid_chars)
+        except Exception:
+            print(traceback.format_exc())
+            return {}
+
+    @staticmethod
+    def get_suggestions_for_text(text):
+        """便捷方法：驗證文字並取得無效標記的建議"""
+        try:
+            if not text:
+                return {}
+            validation_result = InputRecognitionService.validate_glyph_input(text)
+            return VisualFeedbackService.get_suggestions(validation_result)
+        except Exception:
+            print(traceback.format_exc())
+            return {}
+
+    @staticmethod
+    def append_suggestions_to_tooltip(tooltip, suggestions):
+        """在工具提示後附加建議（每個無效標記一行）
+
+        Args:
+            tooltip: 原工具提示文字
+            suggestions: get_suggestions() 的結果
+
+        Returns:
+            str: 附加建議後的工具提示
+        """
+        if not suggestions:
+            return tooltip
+        from ..localization import localize_with_params
+        lines = [tooltip] if tooltip else []
+        for token, names in suggestions.items():
+            lines.append(localize_with_params(
+                'tooltip_did_you_mean', token=token, suggestions=', '.join(names)
+            ))
+        return '\n'.join(lines)
+
     @staticmethod
     def apply_feedback_to_all_inputs(plugin):
         """對所有輸入框執行視覺標注（工具開啟時主動執行）"""
@@ -0,0 +1,163 @@
+# encoding: utf-8
+
+"""
+InteractiveEdit - 拖曳節點時的互動模式
+同一圖層在短時間內連續變更且滑鼠按住時進入互動模式：
+中央格每次變更都重繪，周圍格中被編輯字符的重複副本沿用路徑快照、以較低頻率更新；
+放開滑鼠時結束互動模式，並以完整品質重繪所有副本一次
+"""
+
+from __future__ import division, print_function, unicode_literals
+import time
+
+# 連續編輯判定：兩次圖層變更的最大間隔（秒）
+CONTINUOUS_EDIT_WINDOW = 0.3
+
+# 互動模式中重複副本的更新間隔（秒）
+COPY_REFRESH_INTERVAL = 0.1
+
+# 互動模式中檢查是否放開滑鼠的間隔（秒）
+RELEASE_POLL_INTERVAL = 0.05
+
+
+def mouse_button_pressed():
+    """檢查滑鼠左鍵是否按住（沒有 AppKit 時視為未按住）"""
+    try:
+        from AppKit import NSEvent
+        return bool(NSEvent.pressedMouseButtons() & 1)
+    except ImportError:
+        return False
+
+
+class InteractiveEditTracker(object):
+    """拖曳節點的互動模式追蹤器"""
+
+    def __init__(self, clock=time.time, pressed=mouse_button_pressed):
+        """初始化追蹤器
+
+        Args:
+            clock (callable): 目前時間（秒）
+            pressed (callable): 滑鼠是否按住
+        """
+        self._clock = clock
+        self._pressed = pressed
+        self._layer_key = None
+        self._version = None
+        self._last_edit = 0.0
+        self._last_copy_refresh = 0.0
+        self._glyph_names = frozenset()
+        self.active = False
+        self._stats = {
+            'edits': 0,
+            'sessions': 0,
+            'copy_refreshes': 0,
+            'throttled_copies': 0,
+            'final_passes': 0
+        }
+
+    @property
+    def glyph_names(self):
+        """互動模式中被編輯的字符名稱"""
+        return self._glyph_names
+
+    def observe(self, layer_key, version, glyph_names):
+        """記錄選取圖層的狀態（每次 UPDATEINTERFACE 呼叫）
+
+        同一圖層的版本改變視為一次編輯；連續編輯且滑鼠按住時進入互動模式
+
+        Args:
+            layer_key: 選取圖層的穩定識別鍵（字符名稱, 圖層 ID）
+            version: 圖層版本簽章
+            glyph_names: 被編輯的字符名稱
+
+        Returns:
+            bool: True 如果此次為圖層編輯
+        """
+        now = self._clock()
+        edited = (self._version is not None and layer_key is not None and
+                  layer_key == self._layer_key and version != self._version)
+        self._layer_key = layer_key
+        self._version = version
+
+        if not edited:
+            if self.active and frozenset(glyph_names) != self._glyph_names:
+                # 互動中切換了選取：直接結束（由呼叫端做完整重繪）
+                self.finish()
+            return False
+
+        self._stats['edits'] += 1
+        if (not self.active and now - self._last_edit <= CONTINUOUS_EDIT_WINDOW and
+                self._pressed()):
+            self.active = True
+            self._last_copy_refresh = now
+            self._stats['sessions'] += 1
+        self._last_edit = now
+        self._glyph_names = frozenset(glyph_names)
+        return True
+
+    def should_refresh_copies(self):
+        """檢查此次編輯是否應該更新重複副本（互動模式外一律更新）"""
+        if not self.active:
+            return True
+        now = self._clock()
+        if now - self._last_copy_refresh >= COPY_REFRESH_INTERVAL:
+            self._last_copy_refresh = now
+            self._stats['copy_refreshes'] += 1
+            return True
+        self._stats['throttled_copies'] += 1
+        return False
+
+    def snapshot_is_fresh(self, taken_at):
+        """檢查重複副本的路徑快照是否仍可沿用（僅互動模式中）
+
+        Args:
+            taken_at (float): 快照建立時間
+
+        Returns:
+            bool: True 如果可沿用
+        """
+        return self.active and self._clock() - taken_at < COPY_REFRESH_INTERVAL
+
+    def poll_release(self):
+        """檢查是否已放開滑鼠（互動模式中定期呼叫）
+
+        Returns:
+            bool: True 如果互動模式剛結束（呼叫端應做完整品質重繪）
+        """
+        if self.active and not self._pressed():
+            self.finish()
+            return True
+        return False
+
+    def finish(self):
+        """結束互動模式"""
+        if self.active:
+            self.active = False
+            self._stats['final_passes'] += 1
+
+    def now(self):
+        """目前時間（與追蹤器使用相同時鐘）"""
+        return self._clock()
+
+    def get_stats(self):
+        """取得互動模式統計資訊
+
+        Returns:
+            dict: 統計字典（編輯次數、互動次數、副本更新與略過次數、完整重繪次數、是否互動中）
+        """
+        stats = self._stats.copy()
+        stats['active'] = self.active
+        return stats
+
+
+# 全域追蹤器實例
+_interactive_edit_tracker = InteractiveEditTracker()
+
+
+def get_interactive_edit_tracker():
+    """獲取互動模式追蹤器實例
+
+    Returns:
+        InteractiveEditTracker: 追蹤器實例
+    """
+    return _interactive_edit_tracker
@@ -0,0 +1,289 @@
+# encoding: utf-8
+
+"""
+KerningTable - 按主板預先計算的字偶距查詢表
+供「字偶距排列」模式將每一列當作文字排版，在水平相鄰的字符之間套用主板字偶距
+
+查詢表於首次使用時由 font.kerning 複製建立，之後重新隨機排列只需常數時間查詢；
+編輯字偶距時只重新讀取被編輯字符（左側）相關的項目，不重建整個主板的查詢表
+"""
+
+from __future__ import division, print_function, unicode_literals
+import traceback
+
+# 字偶距群組鍵前綴（Glyphs 內部格式）
+LEFT_GROUP_PREFIX = '@MMK_L_'
+RIGHT_GROUP_PREFIX = '@MMK_R_'
+
+# Glyphs 以極大值表示「無字偶距」（NSNotFound），超過此值的項目視為不存在
+NO_KERNING_THRESHOLD = 1e6
+
+# 已解析字偶對的最大快取數（超過時清空）
+MAX_RESOLVED_PAIRS = 8192
+
+
+class KerningPairTable(object):
+    """按主板分區的字偶距查詢表
+
+    - 查詢表：master_id → {左側鍵: {右側鍵: 值}}，鍵為字符 ID 或群組鍵
+    - 字符鍵：字符名稱 → (字符 ID, 左側群組鍵, 右側群組鍵)
+    - 已解析字偶對：(master_id, 左字符, 右字符) → 值（依例外 → 群組的優先順序解析後快取）
+    """
+
+    def __init__(self):
+        """初始化查詢表"""
+        self._font_id = None
+        self._tables = {}
+        self._glyph_keys = {}
+        self._resolved = {}
+        self._revision = 0
+        self._stats = {
+            'table_builds': 0,
+            'lookups': 0,
+            'resolved_hits': 0,
+            'incremental_updates': 0
+        }
+
+    @property
+    def revision(self):
+        """查詢表版本（字偶距實際變更時遞增，供佈局快取判斷是否重新計算）"""
+        return self._revision
+
+    def get_pair(self, font, master_id, left_name, right_name):
+        """取得兩個字符之間的字偶距
+
+        解析順序（與 Glyphs 相同）：
+        字符-字符例外 → 字符-群組例外 → 群組-字符例外 → 群組-群組
+
+        Args:
+            font: GSFont 物件
+            master_id (str): 主板 ID
+            left_name (str): 左側字符（字符或名稱）
+            right_name (str): 右側字符（字符或名稱）
+
+        Returns:
+            float: 字偶距值（無字偶距時為 0）
+        """
+        if not font or not master_id or not left_name or not right_name:
+            return 0
+
+        self._stats['lookups'] += 1
+        self._check_font(font)
+
+        pair_key = (master_id, left_name, right_name)
+        value = self._resolved.get(pair_key)
+        if value is not None:
+            self._stats['resolved_hits'] += 1
+            return value
+
+        value = self._resolve(font, master_id, left_name, right_name)
+        if len(self._resolved) >= MAX_RESOLVED_PAIRS:
+            self._resolved.clear()
+        self._resolved[pair_key] = value
+        return value
+
+    def refresh_left_glyphs(self, font, master_id, glyph_names):
+        """重新讀取指定字符作為左側時的字偶距項目（編輯字偶距後呼叫）
+
+        Args:
+            font: GSFont 物件
+            master_id (str): 被編輯的主板 ID
+            glyph_names (iterable): 可能被編輯的左側字符
+
+        Returns:
+            bool: True 如果字偶距確實有變更
+        """
+        try:
+            self._check_font(font)
+            table = self._tables.get(master_id)
+            if table is None:
+                # 尚未建立查詢表：下次查詢時會完整建立，無需增量更新
+                return False
+
+            master_kerning = self._get_master_kerning(font, master_id)
+            changed = False
+
+            for name in glyph_names:
+                # 群組可能已變更，重新讀取字符鍵
+                self._glyph_keys.pop(name, None)
+                glyph_id, _, right_side_group = self._keys_for(font, name)
+
+                for left_key in (glyph_id, right_side_group):
+                    if not left_key:
+                        continue
+                    current = self._copy_entry(master_kerning, left_key)
+                    if table.get(left_key, {}) != current:
+                        if current:
+                            table[left_key] = current
+                        else:
+                            table.pop(left_key, None)
+                        changed = True
+
+            if changed:
+                self._stats['incremental_updates'] += 1
+                self._revision += 1
+                self._resolved.clear()
+                # 排列可能以字符（而非名稱）為鍵，一併重新讀取字符鍵
+                self._glyph_keys.clear()
+            return changed
+
+        except Exception:
+            print(traceback.format_exc())
+            return False
+
+    def read_pair_stamp(self, font, master_id, left_name, right_name):
+        """直接由 font.kerning 讀取字偶對相關的原始項目（不使用查詢表）
+
+        供變更閘門偵測只修改字偶距的編輯；只查詢四個鍵組合，不複製整個主板
+
+        Args:
+            font: GSFont 物件
+            master_id (str): 主板 ID
+            left_name (str): 左側字符名稱
+            right_name (str): 右側字符名稱
+
+        Returns:
+            tuple: 四個鍵組合（字符-字符、字符-群組、群組-字符、群組-群組）的值
+        """
+        try:
+            master_kerning = self._get_master_kerning(font, master_id)
+            if not master_kerning:
+                return ()
+            self._glyph_keys.pop(left_name, None)
+            self._glyph_keys.pop(right_name, None)
+            left_id, _, left_group = self._keys_for(font, left_name)
+            right_id, right_group, _ = self._keys_for(font, right_name)
+
+            values = []
+            for left_key in (left_id, left_group):
+                entry = master_kerning[left_key] if left_key and left_key in master_kerning else None
+                for right_key in (right_id, right_group):
+                    value = entry.get(right_key) if entry is not None and right_key else None
+                    values.append(None if value is None else float(value))
+            return tuple(values)
+        except Exception:
+            print(traceback.format_exc())
+            return ()
+
+    def clear(self):
+        """清除所有查詢表與快取"""
+        self._font_id = None
+        self._tables.clear()
+        self._glyph_keys.clear()
+        self._resolved.clear()
+        self._revision += 1
+
+    def get_stats(self):
+        """取得查詢表統計資訊
+
+        Returns:
+            dict: 統計字典（建立次數、查詢次數、快取命中、增量更新次數、主板數）
+        """
+        stats = self._stats.copy()
+        stats['masters'] = len(self._tables)
+        stats['resolved_pairs'] = len(self._resolved)
+        return stats
+
+    def _check_font(self, font):
+        """字型變更時清除所有快取"""
+        from .font_identity import get_font_token
+        font_id = get_font_token(font)
+        if self._font_id != font_id:
+            self.clear()
+            self._font_id = font_id
+
+    def _resolve(self, font, master_id, left_name, right_name):
+        """依優先順序解析字偶距"""
+        table = self._get_table(font, master_id)
+        if not table:
+            return 0
+
+        left_id, _, left_group = self._keys_for(font, left_name)
+        right_id, right_group, _ = self._keys_for(font, right_name)
+
+        for left_key, right_key in (
+            (left_id, right_id),
+            (left_id, right_group),
+            (left_group, right_id),
+            (left_group, right_group)
+        ):
+            if not left_key or not right_key:
+                continue
+            value = table.get(left_key, {}).get(right_key)
+            if value is not None:
+                return value
+        return 0
+
+    def _get_table(self, font, master_id):
+        """取得主板查詢表（首次使用時由 font.kerning 建立）"""
+        table = self._tables.get(master_id)
+        if table is None:
+            table = {}
+            master_kerning = self._get_master_kerning(font, master_id)
+            if master_kerning:
+                for left_key in master_kerning.keys():
+                    entry = self._copy_entry(master_kerning, left_key)
+                    if entry:
+                        table[left_key] = entry
+            self._tables[master_id] = table
+            self._stats['table_builds'] += 1
+        return table
+
+    def _keys_for(self, font, char_or_name):
+        """取得字符的 (字符 ID, 左側群組鍵, 右側群組鍵)（快取）
+
+        左側群組鍵用於字符位於右邊時（@MMK_R_），右側群組鍵用於字符位於左邊時（@MMK_L_）
+        """
+        keys = self._glyph_keys.get(char_or_name)
+        if keys is None:
+            keys = (None, None, None)
+            try:
+                from .glyphs_service import get_glyphs_service
+                glyph = get_glyphs_service().get_glyph_from_font(font, char_or_name)
+                if glyph:
+                    left_group = getattr(glyph, 'leftKerningGroup', None)
+                    right_group = getattr(glyph, 'rightKerningGroup', None)
+                    keys = (
+                        glyph.id,
+                        RIGHT_GROUP_PREFIX + left_group if left_group else None,
+                        LEFT_GROUP_PREFIX + right_group if right_group else None
+                    )
+            except Exception:
+                print(traceback.format_exc())
+            self._glyph_keys[char_or_name] = keys
+        return keys
+
+    @staticmethod
+    def _get_master_kerning(font, master_id):
+        """取得主板的字偶距字典（font.kerning[master_id]）"""
+        try:
+            kerning = font.kerning
+            if kerning and master_id in kerning:
+                return kerning[master_id]
+        except Exception:
+            print(traceback.format_exc())
+        return None
+
+    @staticmethod
+    def _copy_entry(master_kerning, left_key):
+        """複製單一左側鍵的字偶距項目（略過表示無字偶距的極大值）"""
+        if not master_kerning or left_key not in master_kerning:
+            return {}
+        entry = {}
+        for right_key, value in master_kerning[left_key].items():
+            if value is not None and abs(value) < NO_KERNING_THRESHOLD:
+                entry[right_key] = float(value)
+        return entry
+
+
+# 全域查詢表實例
+_kerning_pair_table = KerningPairTable()
+
+
+def get_kerning_pair_table():
+    """獲取字偶距查詢表實例
+
+    Returns:
+        KerningPairTable: 查詢表實例
+    """
+    return _kerning_pair_table
@@ -0,0 +1,157 @@
+# encoding: utf-8
+
+"""
+MasterStrip - 多主板並排預覽支援
+提供多主板模式共用的分格計算與按主板分區的路徑快取
+編輯某個主板時只使該主板的格子失效，其他主板直接沿用快取
+"""
+
+from __future__ import division, print_function, unicode_literals
+import traceback
+
+from .grid_layout import GridTile
+
+# 每個主板最多快取的字符數（超過時清空該主板分區）
+MAX_ENTRIES_PER_MASTER = 256
+
+# 缺少圖層時的空白快取項目（避免每幀重複查詢）
+_EMPTY_ENTRY = (0, None, None)
+
+
+def compute_strip_tiles(total_width, master_ids):
+    """計算並排模式中每個主板格子的水平位置
+
+    Args:
+        total_width (float): 預覽視圖寬度
+        master_ids (list): 主板 ID 列表（依字型順序）
+
+    Returns:
+        tuple: (tileWidth, (GridTile, ...))
+    """
+    count = len(master_ids)
+    if count == 0 or total_width <= 0:
+        return 0, ()
+
+    tile_width = total_width / count
+    tiles = tuple(
+        GridTile(master_id, index * tile_width)
+        for index, master_id in enumerate(master_ids)
+    )
+    return tile_width, tiles
+
+
+class MasterPathCache(object):
+    """按主板分區的字形路徑快取
+
+    快取項目為 (width, fillPath, openPath)，路徑為未變換的副本，
+    繪製時再套用各格子的變換矩陣。
+    """
+
+    def __init__(self):
+        """初始化快取"""
+        self._entries = {}
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'master_invalidations': 0
+        }
+
+    def get(self, master_id, char_or_name):
+        """取得快取項目
+
+        Args:
+            master_id (str): 主板 ID
+            char_or_name (str): 字符或字符名稱
+
+        Returns:
+            tuple or None: (width, fillPath, openPath)，未快取時為 None
+        """
+        entry = self._entries.get(master_id, {}).get(char_or_name)
+        if entry is None:
+            self._stats['misses'] += 1
+        else:
+            self._stats['hits'] += 1
+        return entry
+
+    def store(self, master_id, char_or_name, layer):
+        """由圖層建立並儲存快取項目
+
+        Args:
+            master_id (str): 主板 ID
+            char_or_name (str): 字符或字符名稱
+            layer: GSLayer 或 None
+
+        Returns:
+            tuple: (width, fillPath, openPath)
+        """
+        entry = self._build_entry(layer)
+
+        bucket = self._entries.setdefault(master_id, {})
+        if len(bucket) >= MAX_ENTRIES_PER_MASTER:
+            bucket.clear()
+        bucket[char_or_name] = entry
+        return entry
+
+    def invalidate_master(self, master_id):
+        """使單一主板的所有格子失效
+
+        Args:
+            master_id (str): 主板 ID
+        """
+        if self._entries.pop(master_id, None) is not None:
+            self._stats['master_invalidations'] += 1
+
+    def clear(self):
+        """清除所有主板的快取"""
+        self._entries.clear()
+
+    def get_stats(self):
+        """取得快取統計資訊
+
+        Returns:
+            dict: 統計字典（命中、未命中、主板失效次數、快取主板數）
+        """
+        stats = self._stats.copy()
+        stats['masters'] = len(self._entries)
+        return stats
+
+    @staticmethod
+    def _build_entry(layer):
+        """複製圖層路徑建立快取項目"""
+        if not layer:
+            return _EMPTY_ENTRY
+
+        try:
+            fill_path = layer.completeBezierPath
+            open_path = layer.completeOpenBezierPath
+
+            fill_empty = fill_path is None or fill_path.isEmpty()
+            open_empty = open_path is None or open_path.isEmpty()
+
+            # 兩個路徑皆為空時，嘗試不含組件的 bezierPath
+            if fill_empty and open_empty:
+                fill_path = layer.bezierPath
+                fill_empty = fill_path is None or fill_path.isEmpty()
+
+            return (
+                layer.width,
+                None if fill_empty else fill_path.copy(),
+                None if open_empty else open_path.copy()
+            )
+
+        except Exception:
+            print(traceback.format_exc())
+            return _EMPTY_ENTRY
+
+
+# 全域快取實例
+_master_path_cache = MasterPathCache()
+
+
+def get_master_path_cache():
+    """獲取多主板路徑快取實例
+
+    Returns:
+        MasterPathCache: 快取實例
+    """
+    return _master_path_cache
@@ -325,7 +325,7 @@ class MenuManager:
     def handle_right_mouse_click(preview_view, event):
         """處理右鍵點擊事件，顯示字符資訊選單
         
-        支援所有 9 個格子（包括中心格）的右鍵選單功能：
+        支援所有格子（包括中心格）的右鍵選單功能：
         - 顯示字符資訊（GlyphsName 和 Unicode）
         - 複製 GlyphsName 到剪貼簿
         - 在新分頁開啟字符
@@ -376,7 +376,7 @@ class MenuManager:
             point: 點擊位置 (NSPoint)
             
         Returns:
-            字符格索引 (0-8) 或 None（如果不在有效範圍內）
+            字符格索引（3×3 時為 0-8）或 None（如果不在有效範圍內）
         """
         try:
             # 使用預覽視圖的佈局計算
@@ -384,27 +384,8 @@ class MenuManager:
             if not layout:
                 return None
             
-            positions = layout['positions']
-            
-            # 檢查每個格子的邊界
-            for i, position_info in enumerate(positions):
-                # 從字典取得位置資訊
-                centerX = position_info['centerX']
-                centerY = position_info['centerY']
-                cellWidth = position_info['cellWidth']
-                cellHeight = position_info['cellHeight']
-                
-                # 格子的邊界（從中心點計算邊界）
-                left = centerX - cellWidth / 2
-                right = centerX + cellWidth / 2
-                bottom = centerY - cellHeight / 2
-                top = centerY + cellHeight / 2
-                
-                # 檢查點擊位置是否在此格子內
-                if left <= point.x <= right and bottom <= point.y <= top:
-                    return i
-            
-            return None
+            # 以格子記錄預先計算的邊界判斷（多主板並排模式時折回第一個主板格子）
+            return layout.cell_at_point(point.x, point.y)
             
         except Exception:
             print(traceback.format_exc())
@@ -569,6 +550,54 @@ class MenuManager:
             fallback_menu = NSMenu.alloc().init()
             return fallback_menu
     
+    @staticmethod
+    def add_suggestion_items(menu, suggestions, target_object):
+        """
+        在選單加入「你是不是要找」建議項目（組合器）
+        
+        Args:
+            menu: 要加入項目的選單
+            suggestions: 無效標記 → 建議名稱列表
+            target_object: 選單項目的目標物件（需實作 applyGlyphSuggestion:）
+        
+        Returns:
+            NSMenu: 加入建議後的選單
+        """
+        try:
+            if menu is None or not suggestions:
+                return menu
+            
+            # 建議放在選單最前面，方便修正
+            position = 0
+            header_item = NSMenuItem.alloc().initWithTitle_action_keyEquivalent_(
+                localize('menu_did_you_mean'), None, ""
+            )
+            header_item.setEnabled_(False)
+            menu.insertItem_atIndex_(header_item, position)
+            position += 1
+            
+            for token, names in suggestions.items():
+                for name in names:
+                    suggestion_item = NSMenuItem.alloc().initWithTitle_action_keyEquivalent_(
+                        f"{token} → {name}",
+                        "applyGlyphSuggestion:",
+                        ""
+                    )
+                    suggestion_item.setTarget_(target_object)
+                    suggestion_item.setRepresentedObject_([token, name])
+                    suggestion_item.setIndentationLevel_(1)
+                    menu.insertItem_atIndex_(suggestion_item, position)
+                    position += 1
+            
+            if menu.numberOfItems() > position:
+                menu.insertItem_atIndex_(NSMenuItem.separatorItem(), position)
+            
+            return menu
+            
+        except Exception:
+            print(traceback.format_exc())
+            return menu
+    
     @staticmethod
     def create_field_editor_menu(base_menu, target_object):
         """
@@ -683,6 +712,50 @@ class MenuManager:
                 new_tab_item.setRepresentedObject_(char_info['glyph'])
                 menu.addItem_(new_tab_item)
             
+            # 「網格大小」子選單
+            menu.addItem_(NSMenuItem.separatorItem())
+            menu.addItem_(MenuManager._create_grid_size_menu_item(target_object))
+            
+            # 向量匯出選項（SVG / PDF）
+            for export_format, title_key in (('svg', 'menu_export_svg'), ('pdf', 'menu_export_pdf')):
+                export_item = NSMenuItem.alloc().initWithTitle_action_keyEquivalent_(
+                    localize(title_key), "exportPreview:", ""
+                )
+                export_item.setTarget_(target_object)
+                export_item.setRepresentedObject_(export_format)
+                menu.addItem_(export_item)
+            
+            # 「依墨跡邊界佈局」切換選項
+            plugin = getattr(target_object, 'plugin', None)
+            ink_item = NSMenuItem.alloc().initWithTitle_action_keyEquivalent_(
+                localize('menu_fit_ink_bounds'),
+                "toggleInkBoundsLayout:", ""
+            )
+            ink_item.setTarget_(target_object)
+            ink_item.setState_(1 if getattr(plugin, 'inkBoundsMode', False) else 0)
+            menu.addItem_(ink_item)
+            
+            # 「套用字偶距排列」切換選項
+            kerning_item = NSMenuItem.alloc().initWithTitle_action_keyEquivalent_(
+                localize('menu_kerning_rows'),
+                "toggleKerningRows:", ""
+            )
+            kerning_item.setTarget_(target_object)
+            kerning_item.setState_(1 if getattr(plugin, 'kerningRowMode', False) else 0)
+            menu.addItem_(kerning_item)
+            
+            # 多主板字型：「並排顯示所有主板」切換選項
+            font, _ = FontManager.getCurrentFontContext()
+            if font and len(font.masters) > 1:
+                menu.addItem_(NSMenuItem.separatorItem())
+                strip_item = NSMenuItem.alloc().initWithTitle_action_keyEquivalent_(
+                    localize('menu_show_all_masters'),
+                    "toggleMasterStrip:", ""
+                )
+                strip_item.setTarget_(target_object)
+                strip_item.setState_(1 if getattr(plugin, 'masterStripMode', False) else 0)
+                menu.addItem_(strip_item)
+            
             # 顯示選單
             menu.popUpMenuPositioningItem_atLocation_inView_(
                 None, point, target_object
@@ -695,4 +768,33 @@ class MenuManager:
             return None
 
 
+    @staticmethod
+    def _create_grid_size_menu_item(target_object):
+        """建立「網格大小」子選單項目（列出預設的 N×M 網格）
+        
+        Args:
+            target_object: 選單項目的目標物件
+            
+        Returns:
+            NSMenuItem: 含子選單的選單項目
+        """
+        from .grid_shape import GRID_PRESETS, get_grid_shape
+        
+        current = get_grid_shape()
+        parent_item = NSMenuItem.alloc().initWithTitle_action_keyEquivalent_(
+            localize('menu_grid_size'), None, ""
+        )
+        submenu = NSMenu.alloc().init()
+        for rows, columns in GRID_PRESETS:
+            size_item = NSMenuItem.alloc().initWithTitle_action_keyEquivalent_(
+                f"{rows} × {columns}", "setGridSize:", ""
+            )
+            size_item.setTarget_(target_object)
+            size_item.setRepresentedObject_(f"{rows}x{columns}")
+            size_item.setState_(1 if (rows, columns) == (current.rows, current.columns) else 0)
+            submenu.addItem_(size_item)
+        parent_item.setSubmenu_(submenu)
+        return parent_item
+
+
 # 右鍵選單功能統一管理完成：移除左鍵邏輯，保留右鍵和控制面板選單功能
\ No newline at end of file
@@ -0,0 +1,80 @@
+# encoding: utf-8
+
+"""
+Metrics - 效能統計彙整
+將各快取、閘門、排程器與重繪策略的計數器集中輸出，
+可於 Glyphs 巨集面板執行：
+
+    from NineBoxView.core.metrics import format_metrics
+    print(format_metrics())
+"""
+
+from __future__ import division, print_function, unicode_literals
+import traceback
+
+# 統計來源：名稱 → (模組, 取得實例的函數)
+_METRIC_SOURCES = (
+    ('update_gate', '.update_gate', 'get_update_gate'),
+    ('redraw_policy', '.redraw_policy', 'get_redraw_policy'),
+    ('first_frame', '.first_frame_metric', 'get_first_frame_metric'),
+    ('tab_layer_index', '.tab_layer_index', 'get_tab_layer_index'),
+    ('master_path_cache', '.master_strip', 'get_master_path_cache'),
+    ('geometry_cache', '.outline_geometry', 'get_geometry_cache'),
+    ('ink_bounds', '.ink_bounds', 'get_ink_bounds_tracker'),
+    ('kerning_table', '.kerning_table', 'get_kerning_pair_table'),
+    ('font_identity', '.font_identity', 'get_font_identity_service'),
+    ('document_state', '.document_state', 'get_document_state_store'),
+    ('glyph_index', '.glyph_index', 'get_glyph_index_registry'),
+    ('index_store', '.index_store', 'get_glyph_index_store'),
+    ('index_builder', '.index_builder', 'get_index_builder'),
+    ('compute_executor', '.compute_executor', 'get_compute_executor'),
+    ('interactive_edit', '.interactive_edit', 'get_interactive_edit_tracker'),
+    ('glyph_completion', '.glyph_completion', 'get_glyph_name_completer'),
+    ('glyph_suggestions', '.glyph_suggestions', 'get_glyph_suggestion_service'),
+)
+
+
+def collect_metrics(preview_view=None):
+    """收集所有統計資訊
+
+    Args:
+        preview_view: NineBoxPreviewView 實例（提供時一併收集重繪排程器與格子反查表統計）
+
+    Returns:
+        dict: 名稱 → 統計字典
+    """
+    import importlib
+    metrics = {}
+
+    for name, module_name, getter_name in _METRIC_SOURCES:
+        try:
+            module = importlib.import_module(module_name, __package__)
+            metrics[name] = getattr(module, getter_name)().get_stats()
+        except Exception:
+            print(traceback.format_exc())
+
+    scheduler = getattr(preview_view, '_redraw_scheduler', None) if preview_view else None
+    if scheduler is not None:
+        metrics['redraw_scheduler'] = scheduler.get_stats()
+
+    cell_index = getattr(preview_view, '_cell_index', None) if preview_view else None
+    if cell_index is not None:
+        metrics['cell_index'] = cell_index.get_stats()
+
+    return metrics
+
+
+def format_metrics(preview_view=None):
+    """將統計資訊格式化為文字（每個來源一行）
+
+    Args:
+        preview_view: NineBoxPreviewView 實例
+
+    Returns:
+        str: 格式化後的文字
+    """
+    lines = []
+    for name, stats in sorted(collect_metrics(preview_view).items()):
+        items = ', '.join('%s=%s' % (key, stats[key]) for key in sorted(stats))
+        lines.append('%s: %s' % (name, items))
+    return '\n'.join(lines)
@@ -0,0 +1,581 @@
+# encoding: utf-8
+
+"""
+OutlineGeometry - 陣列化的外框幾何
+以筆（pen）協定記錄圖層外框（向量匯出共用同一套記錄工具），
+一次擷取為緊湊的 array('d') 點緩衝與 array('B') 指令緩衝，
+變換、邊界、扁平化與面積計算皆不依賴 Cocoa（NSBezierPath）
+NumPy 可用時以向量化運算處理點緩衝，否則使用純 Python 迴圈
+
+佈局、匯出與分析功能透過 get_geometry_cache() 共用同一份快取，
+快取以圖層版本（字符最後修改時間、字身寬度、Glyphs 計算的邊界）判斷是否有效
+"""
+
+from __future__ import division, print_function, unicode_literals
+import traceback
+from array import array
+
+# 指令代碼（每個指令消耗的點數：M=1, L=1, C=3, Z=0）
+OP_MOVE = 0
+OP_LINE = 1
+OP_CURVE = 2
+OP_CLOSE = 3
+OP_END = 4
+
+_OP_POINT_COUNT = {OP_MOVE: 1, OP_LINE: 1, OP_CURVE: 3, OP_CLOSE: 0, OP_END: 0}
+
+# 扁平化時每段三次曲線的取樣數
+FLATTEN_STEPS = 8
+
+# 快取上限（超過時清空）
+MAX_CACHED_GEOMETRIES = 1024
+
+# NumPy 模組快取（None 表示尚未嘗試匯入，False 表示不可用）
+_numpy = None
+
+
+def get_numpy():
+    """延遲匯入 NumPy（不可用時回傳 None）"""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+
+# =============================================================================
+# 筆（pen）協定：記錄圖層外框
+# =============================================================================
+
+class RecordingPen(object):
+    """記錄筆 - 將 moveTo / lineTo / curveTo / qCurveTo / closePath / endPath 記錄為指令列表
+
+    相容 Glyphs 的 layer.draw(pen) 與 FontTools 的 segment pen 協定
+    """
+
+    def __init__(self):
+        self.value = []
+
+    def moveTo(self, pt):
+        self.value.append(('moveTo', (tuple(pt),)))
+
+    def lineTo(self, pt):
+        self.value.append(('lineTo', (tuple(pt),)))
+
+    def curveTo(self, *points):
+        self.value.append(('curveTo', tuple(tuple(p) for p in points)))
+
+    def qCurveTo(self, *points):
+        self.value.append(('qCurveTo', tuple(tuple(p) if p is not None else None for p in points)))
+
+    def closePath(self):
+        self.value.append(('closePath', ()))
+
+    def endPath(self):
+        self.value.append(('endPath', ()))
+
+    def addComponent(self, glyphName, transformation):
+        # 組件應在記錄前先分解；未分解時略過
+        _ = glyphName, transformation
+
+
+def record_layer_outline(layer):
+    """以筆協定記錄圖層的完整外框（含分解後的組件）
+
+    Args:
+        layer: GSLayer 物件
+
+    Returns:
+        tuple: 記錄的指令（空圖層時為空 tuple）
+    """
+    if not layer:
+        return ()
+
+    try:
+        source = layer
+        if hasattr(layer, 'copyDecomposedLayer'):
+            decomposed = layer.copyDecomposedLayer()
+            if decomposed is not None:
+                source = decomposed
+
+        pen = RecordingPen()
+        source.draw(pen)
+        return tuple(pen.value)
+
+    except Exception:
+        print(traceback.format_exc())
+        return ()
+
+
+def iter_contours(commands):
+    """將記錄的指令依輪廓切分，並把二次曲線轉為三次曲線
+
+    Args:
+        commands: RecordingPen 記錄的指令
+
+    Yields:
+        tuple: (segments, is_closed)，segments 為 ('M'|'L'|'C', points) 列表
+    """
+    segments = []
+    current = None
+    start = None
+
+    for op, args in commands:
+        if op == 'moveTo':
+            if segments:
+                yield segments, False
+            segments = [('M', args)]
+            current = start = args[0]
+        elif op == 'lineTo':
+            segments.append(('L', args))
+            current = args[0]
+        elif op == 'curveTo':
+            # 多於三點的 curveTo：前段控制點兩兩配對（極少見，取最後三點）
+            points = args[-3:]
+            if len(points) == 3:
+                segments.append(('C', points))
+            current = args[-1]
+        elif op == 'qCurveTo':
+            for cubic in _quadratic_to_cubic(current if current is not None else start, args):
+                segments.append(('C', cubic))
+            if args and args[-1] is not None:
+                current = args[-1]
+        elif op in ('closePath', 'endPath'):
+            if segments:
+                yield segments, op == 'closePath'
+            segments = []
+            current = start = None
+
+    if segments:
+        yield segments, False
+
+
+def _quadratic_to_cubic(start, points):
+    """將 qCurveTo 的點序列（含隱含的曲線上點）轉為三次曲線段"""
+    if start is None or not points or points[-1] is None:
+        return []
+
+    cubics = []
+    off_curve = points[:-1]
+    on_curve = points[-1]
+    p0 = start
+
+    for index, control in enumerate(off_curve):
+        if index + 1 < len(off_curve):
+            following = off_curve[index + 1]
+            end = ((control[0] + following[0]) / 2, (control[1] + following[1]) / 2)
+        else:
+            end = on_curve
+        c1 = (p0[0] + 2 * (control[0] - p0[0]) / 3, p0[1] + 2 * (control[1] - p0[1]) / 3)
+        c2 = (end[0] + 2 * (control[0] - end[0]) / 3, end[1] + 2 * (control[1] - end[1]) / 3)
+        cubics.append((c1, c2, end))
+        p0 = end
+
+    if not off_curve:
+        cubics.append((p0, on_curve, on_curve))
+    return cubics
+
+
+# =============================================================================
+# 陣列化幾何
+# =============================================================================
+
+class OutlineGeometry(object):
+    """以陣列緩衝儲存的外框幾何（建立後不修改）
+
+    ops 為指令代碼序列，points 為攤平的 (x, y) 座標序列，
+    依 _OP_POINT_COUNT 的點數逐一對應。
+    """
+
+    __slots__ = ('ops', 'points', 'width', '_bounds', '_area')
+
+    def __init__(self, ops=None, points=None, width=0):
+        """初始化幾何資料
+
+        Args:
+            ops (array): 指令代碼緩衝（array('B')）
+            points (array): 點座標緩衝（array('d')，x0, y0, x1, y1, ...）
+            width (float): 字身寬度
+        """
+        self.ops = ops if ops is not None else array('B')
+        self.points = points if points is not None else array('d')
+        self.width = width
+        self._bounds = None
+        self._area = None
+
+    @classmethod
+    def from_commands(cls, commands, width=0):
+        """由筆協定記錄的指令建立幾何資料
+
+        Args:
+            commands: RecordingPen 記錄的指令
+            width (float): 字身寬度
+
+        Returns:
+            OutlineGeometry: 幾何資料
+        """
+        ops = array('B')
+        points = array('d')
+        kinds = {'M': OP_MOVE, 'L': OP_LINE, 'C': OP_CURVE}
+
+        for segments, is_closed in iter_contours(commands):
+            for kind, segment_points in segments:
+                ops.append(kinds[kind])
+                for x, y in segment_points:
+                    points.append(x)
+                    points.append(y)
+            ops.append(OP_CLOSE if is_closed else OP_END)
+
+        return cls(ops, points, width)
+
+    @classmethod
+    def from_layer(cls, layer):
+        """由圖層建立幾何資料（透過筆協定記錄外框）
+
+        Args:
+            layer: GSLayer 物件
+
+        Returns:
+            OutlineGeometry: 幾何資料（空圖層時為空幾何）
+        """
+        if not layer:
+            return cls()
+        return cls.from_commands(record_layer_outline(layer), layer.width)
+
+    def is_empty(self):
+        """檢查是否沒有任何點"""
+        return len(self.points) == 0
+
+    def iter_commands(self):
+        """轉回筆協定指令（供向量匯出使用）
+
+        Yields:
+            tuple: (op_name, points)
+        """
+        points = self.points
+        index = 0
+        for op in self.ops:
+            count = _OP_POINT_COUNT[op]
+            args = tuple(
+                (points[index + 2 * i], points[index + 2 * i + 1]) for i in range(count)
+            )
+            index += 2 * count
+            if op == OP_MOVE:
+                yield ('moveTo', args)
+            elif op == OP_LINE:
+                yield ('lineTo', args)
+            elif op == OP_CURVE:
+                yield ('curveTo', args)
+            elif op == OP_CLOSE:
+                yield ('closePath', ())
+            else:
+                yield ('endPath', ())
+
+    def transformed(self, scale, dx=0, dy=0):
+        """回傳縮放並平移後的新幾何資料
+
+        Args:
+            scale (float): 縮放比例
+            dx (float): X 位移
+            dy (float): Y 位移
+
+        Returns:
+            OutlineGeometry: 新幾何資料（指令緩衝共用）
+        """
+        numpy = get_numpy()
+        if numpy is not None and len(self.points):
+            coords = numpy.frombuffer(self.points, dtype=numpy.float64).reshape(-1, 2)
+            result = coords * scale + (dx, dy)
+            points = array('d')
+            points.frombytes(result.ravel().tobytes())
+        else:
+            points = array('d', self.points)
+            for i in range(0, len(points), 2):
+                points[i] = points[i] * scale + dx
+                points[i + 1] = points[i + 1] * scale + dy
+        return OutlineGeometry(self.ops, points, self.width * scale)
+
+    def bounds(self):
+        """計算墨跡邊界（三次曲線取實際極值，不含控制點外擴）
+
+        Returns:
+            tuple or None: (xMin, yMin, xMax, yMax)，空幾何時為 None
+        """
+        if self._bounds is None and len(self.points):
+            self._bounds = self._compute_bounds()
+        return self._bounds
+
+    def flatten(self, steps=FLATTEN_STEPS):
+        """將外框扁平化為多邊形
+
+        Args:
+            steps (int): 每段三次曲線的取樣數
+
+        Returns:
+            list: [(array('d'), is_closed), ...]，每個多邊形為攤平的 (x, y) 座標
+        """
+        polygons = []
+        polygon = None
+        points = self.points
+        index = 0
+
+        for op in self.ops:
+            if op == OP_MOVE:
+                polygon = array('d', (points[index], points[index + 1]))
+                index += 2
+            elif op == OP_LINE:
+                polygon.extend((points[index], points[index + 1]))
+                index += 2
+            elif op == OP_CURVE:
+                x0, y0 = polygon[-2], polygon[-1]
+                x1, y1, x2, y2, x3, y3 = points[index:index + 6]
+                for step in range(1, steps + 1):
+                    t = step / steps
+                    mt = 1 - t
+                    a, b, c, d = mt * mt * mt, 3 * mt * mt * t, 3 * mt * t * t, t * t * t
+                    polygon.append(a * x0 + b * x1 + c * x2 + d * x3)
+                    polygon.append(a * y0 + b * y1 + c * y2 + d * y3)
+                index += 6
+            elif polygon is not None:
+                polygons.append((polygon, op == OP_CLOSE))
+                polygon = None
+
+        return polygons
+
+    def area(self):
+        """計算封閉輪廓的有號面積總和（鞋帶公式，基於扁平化結果）
+
+        逆時針輪廓為正、順時針為負；取絕對值即為墨跡面積近似值。
+
+        Returns:
+            float: 有號面積
+        """
+        if self._area is None:
+            total = 0.0
+            numpy = get_numpy()
+            for polygon, is_closed in self.flatten():
+                if not is_closed or len(polygon) < 6:
+                    continue
+                if numpy is not None:
+                    xy = numpy.frombuffer(polygon, dtype=numpy.float64)
+                    xs, ys = xy[0::2], xy[1::2]
+                    total += 0.5 * float(
+                        numpy.dot(xs, numpy.roll(ys, -1)) - numpy.dot(ys, numpy.roll(xs, -1))
+                    )
+                else:
+                    count = len(polygon) // 2
+                    acc = 0.0
+                    for i in range(count):
+                        j = (i + 1) % count
+                        acc += polygon[2 * i] * polygon[2 * j + 1] - polygon[2 * j] * polygon[2 * i + 1]
+                    total += 0.5 * acc
+            self._area = total
+        return self._area
+
+    def _compute_bounds(self):
+        """計算邊界（曲線端點加上導數為零處的極值點）"""
+        points = self.points
+        numpy = get_numpy()
+
+        # 先以所有曲線上點（含線段端點）取得初始邊界
+        on_curve = array('d')
+        extrema_candidates = []
+        index = 0
+        previous = None
+        for op in self.ops:
+            count = _OP_POINT_COUNT[op]
+            if op == OP_CURVE:
+                x1, y1, x2, y2, x3, y3 = points[index:index + 6]
+                extrema_candidates.append((previous, (x1, y1), (x2, y2), (x3, y3)))
+                on_curve.extend((x3, y3))
+                previous = (x3, y3)
+            elif count:
+                x, y = points[index], points[index + 1]
+                on_curve.extend((x, y))
+                previous = (x, y)
+            index += 2 * count
+
+        if numpy is not None:
+            xy = numpy.frombuffer(on_curve, dtype=numpy.float64)
+            x_min, x_max = float(xy[0::2].min()), float(xy[0::2].max())
+            y_min, y_max = float(xy[1::2].min()), float(xy[1::2].max())
+        else:
+            xs = on_curve[0::2]
+            ys = on_curve[1::2]
+            x_min, x_max, y_min, y_max = min(xs), max(xs), min(ys), max(ys)
+
+        # 控制點超出目前邊界的曲線才需要求極值
+        for p0, p1, p2, p3 in extrema_candidates:
+            if p0 is None:
+                continue
+            if not (x_min <= p1[0] <= x_max and x_min <= p2[0] <= x_max):
+                for value in _cubic_extrema(p0[0], p1[0], p2[0], p3[0]):
+                    x_min = min(x_min, value)
+                    x_max = max(x_max, value)
+            if not (y_min <= p1[1] <= y_max and y_min <= p2[1] <= y_max):
+                for value in _cubic_extrema(p0[1], p1[1], p2[1], p3[1]):
+                    y_min = min(y_min, value)
+                    y_max = max(y_max, value)
+
+        return (x_min, y_min, x_max, y_max)
+
+
+def _cubic_extrema(a, b, c, d):
+    """計算一維三次貝茲曲線在 (0, 1) 內的極值
+
+    Returns:
+        list: 極值處的座標值
+    """
+    # 導數係數：B'(t) / 3 = qa * t^2 + qb * t + qc
+    qa = -a + 3 * b - 3 * c + d
+    qb = 2 * (a - 2 * b + c)
+    qc = b - a
+
+    roots = []
+    if abs(qa) < 1e-12:
+        if abs(qb) > 1e-12:
+            roots.append(-qc / qb)
+    else:
+        discriminant = qb * qb - 4 * qa * qc
+        if discriminant >= 0:
+            sqrt_d = discriminant ** 0.5
+            roots.append((-qb + sqrt_d) / (2 * qa))
+            roots.append((-qb - sqrt_d) / (2 * qa))
+
+    values = []
+    for t in roots:
+        if 0 < t < 1:
+            mt = 1 - t
+            values.append(mt * mt * mt * a + 3 * mt * mt * t * b + 3 * mt * t * t * c + t * t * t * d)
+    return values
+
+
+def layer_version(layer):
+    """取得圖層版本簽章（內容變更時隨之改變）
+
+    Args:
+        layer: GSLayer 物件
+
+    Returns:
+        tuple: (字符最後修改時間, 字身寬度, Glyphs 計算的邊界)
+    """
+    try:
+        glyph = getattr(layer, 'parent', None)
+        last_change = getattr(glyph, 'lastChange', None) if glyph else None
+        bounds = getattr(layer, 'bounds', None)
+        if bounds is not None:
+            bounds = (bounds.origin.x, bounds.origin.y, bounds.size.width, bounds.size.height)
+        return (last_change, layer.width, bounds)
+    except Exception:
+        return (None, getattr(layer, 'width', 0), None)
+
+
+def layer_key(layer):
+    """取得圖層的穩定識別鍵（字符名稱, 圖層 ID）
+
+    PyObjC 每次存取都可能建立新的代理物件，id(layer) 不能作為跨事件的識別
+
+    Args:
+        layer: GSLayer 物件
+
+    Returns:
+        tuple or None: (字符名稱, 圖層 ID)，無法識別時為 None
+    """
+    if layer is None:
+        return None
+    glyph = getattr(layer, 'parent', None)
+    name = getattr(glyph, 'name', None) if glyph else None
+    layer_id = getattr(layer, 'layerId', None) or getattr(layer, 'associatedMasterId', None)
+    return (name, layer_id) if name and layer_id else None
+
+
+class GeometryCache(object):
+    """外框幾何快取
+
+    以 (字符名稱, 圖層 ID) 為鍵；圖層版本改變時自動重建。
+    無法取得穩定識別鍵的圖層（例如未加入字型的暫存圖層）每次直接建立，不寫入快取。
+    """
+
+    def __init__(self):
+        """初始化快取"""
+        self._entries = {}
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'rebuilds': 0,
+            'uncached': 0
+        }
+
+    def get(self, layer):
+        """取得圖層的幾何資料（必要時建立）
+
+        Args:
+            layer: GSLayer 物件
+
+        Returns:
+            OutlineGeometry: 幾何資料（無效圖層時為空幾何）
+        """
+        if not layer:
+            return OutlineGeometry()
+
+        try:
+            key = self._key_for_layer(layer)
+            if key is None:
+                self._stats['uncached'] += 1
+                return OutlineGeometry.from_layer(layer)
+
+            version = layer_version(layer)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._stats['hits'] += 1
+                return entry[1]
+
+            if entry is None:
+                self._stats['misses'] += 1
+            else:
+                self._stats['rebuilds'] += 1
+
+            geometry = OutlineGeometry.from_layer(layer)
+            if len(self._entries) >= MAX_CACHED_GEOMETRIES:
+                self._entries.clear()
+            self._entries[key] = (version, geometry)
+            return geometry
+
+        except Exception:
+            print(traceback.format_exc())
+            return OutlineGeometry()
+
+    def clear(self):
+        """清除所有快取"""
+        self._entries.clear()
+
+    def get_stats(self):
+        """取得快取統計資訊
+
+        Returns:
+            dict: 統計字典（命中、未命中、重建、未快取次數、快取大小）
+        """
+        stats = self._stats.copy()
+        stats['size'] = len(self._entries)
+        return stats
+
+    @staticmethod
+    def _key_for_layer(layer):
+        """建立快取鍵（字符名稱, 圖層 ID；無法識別時為 None）"""
+        return layer_key(layer)
+
+
+# 全域快取實例
+_geometry_cache = GeometryCache()
+
+
+def get_geometry_cache():
+    """獲取外框幾何快取實例
+
+    Returns:
+        GeometryCache: 快取實例
+    """
+    return _geometry_cache
@@ -39,7 +39,7 @@ class RandomArrangementService(object):
         # 使用 font.tempData 快取隨機排列結果
         if font and hasattr(font, 'tempData') and master:
             # 生成快取鍵（基於字符集合和位置）
-            chars_hash = hash(tuple(sorted(source_chars)))
+            chars_hash = self._chars_key(source_chars)
             positions_hash = hash(tuple(positions))
             cache_key = f"random_arrangement_{master.id}_{chars_hash}_{positions_hash}_{total_slots}"
             
@@ -86,6 +86,10 @@ class RandomArrangementService(object):
         Returns:
             list: 長度為 num_slots 的字符列表
         """
+        # 延遲展開的集合：字符充足時直接從來源抽樣，不展開成列表
+        if hasattr(batch_chars, 'sample') and num_slots > 0 and len(batch_chars) >= num_slots:
+            return batch_chars.sample(num_slots)
+        
         chars = list(batch_chars)
         if not chars or num_slots <= 0:
             return []
@@ -102,6 +106,14 @@ class RandomArrangementService(object):
             
         return arrangement
         
+    @staticmethod
+    def _chars_key(source_chars):
+        """字符來源的快取鍵（延遲展開的集合使用其輸入文字與索引版本）"""
+        cache_key = getattr(source_chars, 'cache_key', None)
+        if cache_key is not None:
+            return hash(cache_key)
+        return hash(tuple(sorted(source_chars)))
+        
     def randomize_unlocked_positions(self, current_arrangement, unlocked_positions, source_chars, font=None, master=None):
         """隨機填充未鎖定位置（使用 font.tempData 快取機制）
         
@@ -122,16 +134,9 @@ class RandomArrangementService(object):
         random_chars = None
         if font and hasattr(font, 'tempData') and master:
             # 生成快取鍵
-            chars_hash = hash(tuple(sorted(source_chars)))
-            positions_count = len(unlocked_positions)
-            batch_cache_key = f"random_batch_{master.id}_{chars_hash}_{positions_count}"
-            
-            # 檢查快取
-            if batch_cache_key in font.tempData:
-                cached_batch = font.tempData[batch_cache_key]
-                if (isinstance(cached_batch, list) and 
-                    len(cached_batch) == positions_count):
-                    random_chars = cached_batch
+            chars_hash = self._chars_key(source_chars)
+            batch_cache_key = self._batch_cache_key(master, chars_hash, len(unlocked_positions))
+            random_chars = self._cached_batch(font, batch_cache_key, len(unlocked_positions))
         
         # 如果沒有快取，生成新的隨機字符批次
         if random_chars is None:
@@ -141,11 +146,75 @@ class RandomArrangementService(object):
             if font and hasattr(font, 'tempData') and master:
                 font.tempData[batch_cache_key] = random_chars[:]
             
+        return self._fill_positions(current_arrangement, unlocked_positions, random_chars)
+    
+    def randomize_unlocked_positions_async(self, current_arrangement, unlocked_positions, source_chars,
+                                           callback, font=None, master=None, key='randomize'):
+        """在背景執行緒抽樣並隨機填充未鎖定位置（大型字符來源，主執行緒呼叫）
+
+        來源的排序快取鍵與抽樣在背景計算，tempData 快取在主執行緒讀寫；
+        同鍵的新請求會取代尚未完成的舊請求
+
+        Args:
+            current_arrangement (list): 當前字符陣列
+            unlocked_positions (list): 未鎖定位置的索引列表
+            source_chars (list): 用於隨機填充的字符列表
+            callback (callable): callback(更新後的字符陣列)，在主執行緒執行
+            font: GSFont 物件（用於 tempData 快取）
+            master: GSFontMaster 物件（用於生成快取鍵）
+            key (str): 工作鍵
+
+        Returns:
+            ComputeFuture or None: 不需背景處理時為 None（呼叫端改用 randomize_unlocked_positions）
+        """
+        from .compute_executor import get_compute_executor, OFFLOAD_SOURCE_SIZE
+        # 延遲展開的集合直接從索引抽樣，不需背景處理
+        if (not unlocked_positions or not source_chars or hasattr(source_chars, 'sample') or
+                len(source_chars) < OFFLOAD_SOURCE_SIZE):
+            return None
+        
+        arrangement = current_arrangement[:]
+        positions = list(unlocked_positions)
+        
+        def apply_batch(future):
+            chars_hash, random_chars = future.result()
+            if font and hasattr(font, 'tempData') and master:
+                batch_cache_key = self._batch_cache_key(master, chars_hash, len(positions))
+                cached_batch = self._cached_batch(font, batch_cache_key, len(positions))
+                if cached_batch is not None:
+                    random_chars = cached_batch
+                else:
+                    font.tempData[batch_cache_key] = random_chars[:]
+            callback(self._fill_positions(arrangement, positions, random_chars))
+        
+        # 來源列表（解析結果，不會再被修改）直接交給背景執行緒，複製也在背景進行
+        future = get_compute_executor().submit(key, compute_random_batch, source_chars, len(positions))
+        future.add_done_callback(apply_batch)
+        return future
+    
+    @staticmethod
+    def _batch_cache_key(master, chars_hash, positions_count):
+        """隨機字符批次的 tempData 快取鍵"""
+        return f"random_batch_{master.id}_{chars_hash}_{positions_count}"
+    
+    @staticmethod
+    def _cached_batch(font, batch_cache_key, positions_count):
+        """讀取 tempData 中有效的隨機字符批次（不存在或無效時為 None）"""
+        if batch_cache_key in font.tempData:
+            cached_batch = font.tempData[batch_cache_key]
+            if (isinstance(cached_batch, list) and 
+                len(cached_batch) == positions_count):
+                return cached_batch
+        return None
+    
+    @staticmethod
+    def _fill_positions(current_arrangement, positions, random_chars):
+        """以隨機字符批次填充指定位置（回傳新的陣列）"""
         # 建立結果陣列的副本
         result = current_arrangement[:]
         
         # 填充未鎖定位置
-        for i, pos in enumerate(unlocked_positions):
+        for i, pos in enumerate(positions):
             if i < len(random_chars):
                 result[pos] = random_chars[i]
                 
@@ -227,6 +296,21 @@ class RandomArrangementService(object):
 _random_service = RandomArrangementService()
 
 
+def compute_random_batch(source_chars, num_slots):
+    """計算字符來源的快取鍵與隨機批次（純計算，可在背景執行緒執行）
+
+    Args:
+        source_chars (sequence): 字符來源（在此複製為快照）
+        num_slots (int): 批次長度
+
+    Returns:
+        tuple: (來源快取鍵, 隨機字符列表)
+    """
+    source_chars = tuple(source_chars)
+    return (RandomArrangementService._chars_key(source_chars),
+            _random_service.create_non_repeating_batch(source_chars, num_slots))
+
+
 def get_random_service():
     """獲取隨機排列服務實例
     
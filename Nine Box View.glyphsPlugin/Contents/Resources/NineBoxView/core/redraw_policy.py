@@ -0,0 +1,91 @@
+# encoding: utf-8
+
+"""
+RedrawPolicy - 重繪範圍策略
+外掛自身的變更（隨機排列、字型變更後填充、主題切換）只需要重繪外掛的視圖；
+Glyphs.redraw() 會重繪所有 Glyphs 視窗與視圖，僅在變更確實影響 Glyphs 本身的視圖時才呼叫
+（例如 Glyphs 預覽模式變更）
+計數器記錄本地重繪、全域重繪與省下的全域重繪次數（依原因分類）
+"""
+
+from __future__ import division, print_function, unicode_literals
+import traceback
+
+# 重繪原因（統計分類用）
+REASON_RANDOMIZE = 'randomize'
+REASON_FONT_FILL = 'font_change_fill'
+REASON_PREVIEW_MODE = 'preview_mode_change'
+REASON_SYSTEM_THEME = 'system_theme_change'
+
+
+class RedrawPolicy(object):
+    """重繪範圍策略"""
+
+    def __init__(self):
+        """初始化策略"""
+        self._stats = {
+            'local_redraws': 0,
+            'global_redraws': 0,
+            'global_avoided': 0,
+            'by_reason': {}
+        }
+
+    def request(self, reason, invalidate_local=None, affects_glyphs_views=False):
+        """依變更範圍執行重繪
+
+        Args:
+            reason (str): 重繪原因
+            invalidate_local (callable): 使外掛視圖失效的函數（可為 None）
+            affects_glyphs_views (bool): 變更是否影響 Glyphs 本身的視圖
+
+        Returns:
+            bool: True 如果觸發了全域重繪
+        """
+        by_reason = self._stats['by_reason'].setdefault(reason, {'local': 0, 'global': 0})
+
+        if invalidate_local is not None:
+            try:
+                invalidate_local()
+                self._stats['local_redraws'] += 1
+                by_reason['local'] += 1
+            except Exception:
+                print(traceback.format_exc())
+
+        if not affects_glyphs_views:
+            self._stats['global_avoided'] += 1
+            return False
+
+        try:
+            from GlyphsApp import Glyphs
+            Glyphs.redraw()
+            self._stats['global_redraws'] += 1
+            by_reason['global'] += 1
+            return True
+        except Exception:
+            print(traceback.format_exc())
+            return False
+
+    def get_stats(self):
+        """取得重繪統計資訊
+
+        Returns:
+            dict: 統計字典（本地重繪、全域重繪、省下的全域重繪與依原因分類的次數）
+        """
+        stats = self._stats.copy()
+        stats['by_reason'] = dict(
+            (reason, counts.copy()) for reason, counts in self._stats['by_reason'].items()
+        )
+        return stats
+
+
+# 全域策略實例
+_redraw_policy = RedrawPolicy()
+
+
+def get_redraw_policy():
+    """獲取重繪範圍策略實例
+
+    Returns:
+        RedrawPolicy: 策略實例
+    """
+    return _redraw_policy
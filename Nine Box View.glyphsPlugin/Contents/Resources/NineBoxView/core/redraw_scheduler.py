@@ -0,0 +1,125 @@
+# encoding: utf-8
+
+"""
+RedrawScheduler - 預覽重繪排程器
+單一使用者操作可能連續呼叫 trigger_preview_redraw、update()、refresh() 多次；
+排程器將同一畫面更新週期內的所有重繪請求合併為一次顯示，
+並以可設定的最高幀率限制預覽更新，避免拖曳節點時與主編輯視圖搶占主執行緒
+"""
+
+from __future__ import division, print_function, unicode_literals
+import time
+import traceback
+
+# 預設最高幀率（對應一般螢幕更新率）
+DEFAULT_MAX_FPS = 60
+
+# 最高幀率的合法範圍
+MIN_FPS = 1
+MAX_FPS = 120
+
+
+class RedrawScheduler(object):
+    """重繪請求合併器
+
+    - request(rect)：登記重繪範圍（None 表示整個視圖）；距上次清空已超過最短間隔時立即清空，
+      否則排程一次清空（只有後續畫格被節流）
+    - flush()：由排程回呼執行，將累積的範圍一次交給 perform
+    兩次清空之間至少間隔 1 / max_fps 秒。
+    """
+
+    def __init__(self, schedule, perform, max_fps=DEFAULT_MAX_FPS, clock=time.time):
+        """初始化排程器
+
+        Args:
+            schedule (callable): schedule(delay)，於 delay 秒後呼叫 flush()
+            perform (callable): perform(rects)，rects 為 None 表示整個視圖需要重繪
+            max_fps (int): 最高幀率
+            clock (callable): 時間來源
+        """
+        self._schedule = schedule
+        self._perform = perform
+        self._clock = clock
+        self._interval = 0
+        self.set_max_fps(max_fps)
+
+        self._scheduled = False
+        self._full = False
+        self._rects = []
+        self._last_flush = 0
+        self._stats = {
+            'requests': 0,
+            'coalesced': 0,
+            'frames': 0
+        }
+
+    def set_max_fps(self, max_fps):
+        """設定最高幀率
+
+        Args:
+            max_fps (int): 最高幀率（限制在 MIN_FPS 至 MAX_FPS）
+        """
+        try:
+            max_fps = int(max_fps)
+        except (TypeError, ValueError):
+            max_fps = DEFAULT_MAX_FPS
+        max_fps = max(MIN_FPS, min(max_fps, MAX_FPS))
+        self._interval = 1.0 / max_fps
+
+    def request(self, rect=None):
+        """登記重繪請求
+
+        Args:
+            rect: 需要重繪的範圍（NSRect），None 表示整個視圖
+        """
+        self._stats['requests'] += 1
+        if rect is None:
+            self._full = True
+            self._rects = []
+        elif not self._full:
+            self._rects.append(rect)
+
+        if self._scheduled:
+            self._stats['coalesced'] += 1
+            return
+
+        delay = self._last_flush + self._interval - self._clock()
+        if delay <= 0:
+            # 不在節流間隔內：立即標記（AppKit 會合併同一事件中的多次標記）
+            self.flush()
+            return
+
+        self._scheduled = True
+        try:
+            self._schedule(delay)
+        except Exception:
+            print(traceback.format_exc())
+            # 無法排程時立即執行，避免請求遺失
+            self.flush()
+
+    def flush(self):
+        """執行累積的重繪請求"""
+        self._scheduled = False
+        if not self._full and not self._rects:
+            return
+
+        rects = None if self._full else self._rects
+        self._full = False
+        self._rects = []
+        self._last_flush = self._clock()
+        self._stats['frames'] += 1
+
+        try:
+            self._perform(rects)
+        except Exception:
+            print(traceback.format_exc())
+
+    def get_stats(self):
+        """取得排程統計資訊
+
+        Returns:
+            dict: 統計字典（請求數、被合併的請求數、實際顯示次數、最高幀率）
+        """
+        stats = self._stats.copy()
+        stats['max_fps'] = int(round(1.0 / self._interval))
+        return stats
@@ -0,0 +1,214 @@
+# encoding: utf-8
+
+"""
+TabLayerIndex - 分頁圖層索引
+為中央格 tab.layers 備份機制提供 名稱/字符 → 圖層 的常數時間查詢
+僅在分頁切換、分頁圖層、游標位置或選取主板變更時重置，避免每次重繪線性掃描
+
+大型分頁（例如整套 CJK 字集）不會一次展開：索引由游標附近的視窗化
+迭代器漸進填入，搜尋半徑有上限，每次重置最多觸及 2 × 半徑 + 1 個圖層；
+同一字符在分頁中出現多次時，查詢結果為最接近游標的圖層
+"""
+
+from __future__ import division, print_function, unicode_literals
+import traceback
+
+# 游標前後的最大搜尋半徑（圖層數）
+TAB_LAYER_SEARCH_RADIUS = 256
+
+# 分頁簽章在搜尋視窗內的取樣點數（含視窗兩端）
+TAB_SIGNATURE_SAMPLES = 8
+
+
+def iter_window_indices(cursor, total, radius=TAB_LAYER_SEARCH_RADIUS):
+    """由游標位置向外交錯產生索引（cursor, cursor-1, cursor+1, ...）
+
+    Args:
+        cursor (int): 起始位置
+        total (int): 序列長度
+        radius (int): 最大搜尋半徑
+
+    Yields:
+        int: 位於 [0, total) 且距離游標不超過半徑的索引
+    """
+    if total <= 0:
+        return
+    cursor = max(0, min(cursor, total - 1))
+    yield cursor
+    for offset in range(1, radius + 1):
+        before = cursor - offset
+        after = cursor + offset
+        if before < 0 and after >= total:
+            return
+        if before >= 0:
+            yield before
+        if after < total:
+            yield after
+
+
+def window_sample_indices(cursor, total, radius=TAB_LAYER_SEARCH_RADIUS,
+                          samples=TAB_SIGNATURE_SAMPLES):
+    """取得搜尋視窗內均勻分布的取樣索引（含視窗兩端與游標位置）
+
+    Args:
+        cursor (int): 游標位置
+        total (int): 序列長度
+        radius (int): 搜尋半徑
+        samples (int): 取樣點數
+
+    Returns:
+        list: 遞增且不重複的索引
+    """
+    if total <= 0:
+        return []
+    cursor = max(0, min(cursor, total - 1))
+    start = max(0, cursor - radius)
+    end = min(total - 1, cursor + radius)
+    span = end - start
+    indices = {cursor}
+    steps = max(1, samples - 1)
+    for step in range(steps + 1):
+        indices.add(start + span * step // steps)
+    return sorted(indices)
+
+
+class TabLayerIndex(object):
+    """分頁圖層索引
+
+    以分頁識別與簽章（圖層數量、游標位置、視窗取樣圖層、主板）判斷索引是否有效：
+    - 簽章相同：直接查詢字典
+    - 簽章不同：重置索引並換上新的視窗化圖層迭代器
+
+    查詢未命中時才從迭代器繼續取出圖層填入索引，直到找到或視窗耗盡；
+    視窗耗盡後的未命中查詢不再觸及任何圖層。
+    多個圖層相符時取最接近游標者（不同於逐一掃描分頁的第一個相符者）。
+    """
+
+    def __init__(self):
+        """初始化索引"""
+        self._tab_id = None
+        self._signature = None
+        self._index = {}
+        self._pending = None
+        self._stats = {
+            'builds': 0,
+            'lookups': 0,
+            'hits': 0,
+            'layers_scanned': 0
+        }
+
+    def invalidate(self):
+        """使索引失效（下次查詢時重置）"""
+        self._tab_id = None
+        self._signature = None
+        self._index = {}
+        self._pending = None
+
+    def is_current(self, tab, signature):
+        """檢查索引是否對應指定分頁與簽章
+
+        Args:
+            tab: GSEditViewController 分頁物件
+            signature: 分頁簽章（圖層數量、游標位置、取樣圖層識別鍵、主板 ID）
+
+        Returns:
+            bool: True 如果索引仍然有效
+        """
+        if tab is None:
+            return False
+        return self._tab_id == id(tab) and self._signature == signature
+
+    def rebuild(self, tab, layers, signature):
+        """以新的圖層來源重置索引（延遲填入）
+
+        Args:
+            tab: GSEditViewController 分頁物件
+            layers: 圖層可迭代物件（通常為游標附近的視窗化迭代器）
+            signature: 分頁簽章
+        """
+        self._index = {}
+        self._pending = iter(layers) if layers is not None else None
+        self._tab_id = id(tab) if tab is not None else None
+        self._signature = signature
+        self._stats['builds'] += 1
+
+    def lookup(self, char_or_name):
+        """查詢字符對應的分頁圖層
+
+        Args:
+            char_or_name (str): 字符或字符名稱
+
+        Returns:
+            GSLayer or None: 視窗內最接近游標的相符圖層
+        """
+        if not char_or_name:
+            return None
+        self._stats['lookups'] += 1
+
+        layer = self._index.get(char_or_name)
+        if layer is None and self._pending is not None:
+            layer = self._fill_until(char_or_name)
+
+        if layer is not None:
+            self._stats['hits'] += 1
+        return layer
+
+    def get_stats(self):
+        """取得索引統計資訊
+
+        Returns:
+            dict: 統計字典（重置次數、查詢次數、命中次數、掃描圖層數、索引大小）
+        """
+        stats = self._stats.copy()
+        stats['size'] = len(self._index)
+        return stats
+
+    def _fill_until(self, char_or_name):
+        """從待處理迭代器填入索引，直到找到目標或迭代器耗盡"""
+        index = self._index
+        try:
+            for layer in self._pending:
+                self._stats['layers_scanned'] += 1
+                glyph = getattr(layer, 'parent', None) if layer else None
+                if not glyph:
+                    continue
+                for key in self._keys_for_glyph(glyph):
+                    # 保留第一個取出的圖層（最接近游標）
+                    if key not in index:
+                        index[key] = layer
+                if char_or_name in index:
+                    return index[char_or_name]
+        except Exception:
+            print(traceback.format_exc())
+
+        self._pending = None
+        return index.get(char_or_name)
+
+    @staticmethod
+    def _keys_for_glyph(glyph):
+        """產生字符的索引鍵（字符名稱與 Unicode 字符）"""
+        keys = []
+        name = getattr(glyph, 'name', None)
+        if name:
+            keys.append(name)
+
+        unicode_hex = getattr(glyph, 'unicode', None)
+        if unicode_hex:
+            try:
+                keys.append(chr(int(unicode_hex, 16)))
+            except (ValueError, TypeError, OverflowError):
+                pass
+        return keys
+
+
+# 全域索引實例
+_tab_layer_index = TabLayerIndex()
+
+
+def get_tab_layer_index():
+    """獲取分頁圖層索引實例
+
+    Returns:
+        TabLayerIndex: 索引實例
+    """
+    return _tab_layer_index
@@ -0,0 +1,137 @@
+# encoding: utf-8
+
+"""
+UpdateGate - UPDATEINTERFACE 變更閘門
+Glyphs 在編輯時會以極高頻率觸發 UPDATEINTERFACE；閘門以相關狀態的指紋
+（字型、選取圖層與其變更戳記、主板、分頁、字偶距）判斷事件是否需要處理，
+指紋未變的事件直接略過，並以計數器記錄過濾與處理的比例
+
+指紋只使用跨事件穩定的值（字符名稱、圖層 ID、分頁位置），
+不使用 PyObjC 代理物件的 id()（每次存取可能不同，也可能被重複使用）
+"""
+
+from __future__ import division, print_function, unicode_literals
+import traceback
+
+
+def _kerning_stamp(font, tab, layer, master_id):
+    """取得游標前一個圖層與目前圖層之間的字偶距原始項目（偵測只修改字偶距的編輯）"""
+    if tab is None or layer is None or not master_id:
+        return None
+
+    from .glyphs_service import get_glyphs_service
+    cursor = get_glyphs_service().get_tab_cursor(tab)
+    if cursor <= 0:
+        return None
+    layers = tab.layers
+    if not layers or cursor > len(layers):
+        return None
+
+    previous = layers[cursor - 1]
+    left = getattr(previous, 'parent', None) if previous else None
+    right = getattr(layer, 'parent', None)
+    if left is None or right is None:
+        return None
+
+    from .kerning_table import get_kerning_pair_table
+    return get_kerning_pair_table().read_pair_stamp(font, master_id, left.name, right.name)
+
+
+def compute_interface_fingerprint(font):
+    """計算與預覽相關的介面狀態指紋
+
+    Args:
+        font: GSFont 物件（可為 None）
+
+    Returns:
+        tuple: (字型, 選取圖層鍵與變更戳記, 主板 ID, 分頁位置, 字偶距版本, 字偶距項目)
+    """
+    if font is None:
+        return (None,)
+
+    try:
+        from .outline_geometry import layer_key, layer_version
+        from .glyphs_service import get_glyphs_service
+        from .kerning_table import get_kerning_pair_table
+        from .font_identity import get_font_serial
+
+        selected_layers = list(font.selectedLayers or ())
+        layers = tuple(
+            (layer_key(layer), layer_version(layer)) for layer in selected_layers if layer is not None
+        )
+
+        master = font.selectedFontMaster
+        master_id = master.id if master else None
+        tab = font.currentTab
+        layer = selected_layers[0] if selected_layers else None
+
+        return (
+            get_font_serial(font),
+            layers,
+            master_id,
+            get_glyphs_service().get_tab_index(font, tab),
+            get_kerning_pair_table().revision,
+            _kerning_stamp(font, tab, layer, master_id)
+        )
+
+    except Exception:
+        print(traceback.format_exc())
+        # 無法計算指紋時不過濾（回傳唯一值）
+        return (object(),)
+
+
+class UpdateGate(object):
+    """UPDATEINTERFACE 變更閘門"""
+
+    def __init__(self):
+        """初始化閘門"""
+        self._last_fingerprint = None
+        self._stats = {
+            'filtered': 0,
+            'processed': 0
+        }
+
+    def should_process(self, fingerprint):
+        """檢查事件是否需要處理（指紋與上次不同時才處理）
+
+        Args:
+            fingerprint (tuple): 目前的介面狀態指紋
+
+        Returns:
+            bool: True 如果狀態有變更
+        """
+        if fingerprint == self._last_fingerprint:
+            self._stats['filtered'] += 1
+            return False
+
+        self._last_fingerprint = fingerprint
+        self._stats['processed'] += 1
+        return True
+
+    def reset(self):
+        """重置指紋（下一個事件必定處理）"""
+        self._last_fingerprint = None
+
+    def get_stats(self):
+        """取得閘門統計資訊
+
+        Returns:
+            dict: 統計字典（過濾數、處理數、過濾比例）
+        """
+        stats = self._stats.copy()
+        total = stats['filtered'] + stats['processed']
+        stats['filtered_ratio'] = stats['filtered'] / total if total else 0.0
+        return stats
+
+
+# 全域閘門實例
+_update_gate = UpdateGate()
+
+
+def get_update_gate():
+    """獲取 UPDATEINTERFACE 變更閘門實例
+
+    Returns:
+        UpdateGate: 閘門實例
+    """
+    return _update_gate
@@ -0,0 +1,342 @@
+# encoding: utf-8
+
+"""
+VectorExport - 預覽向量匯出（SVG / PDF）
+透過筆（pen）協定取得每個圖層的點資料，不經由 NSBezierPath 繪製到視圖
+SVG 與 PDF 寫入器皆為純 Python，逐格串流輸出，大型網格不會在記憶體中組出整份文件；
+寫入檔案時先輸出到同目錄的暫存檔，完成後才取代目標檔案，中途失敗不會留下不完整的檔案
+"""
+
+from __future__ import division, print_function, unicode_literals
+import os
+import tempfile
+import traceback
+
+from .outline_geometry import iter_contours
+
+# 支援的匯出格式
+EXPORT_FORMATS = ('svg', 'pdf')
+
+# 開放路徑（Open Path）描邊寬度（與預覽一致）
+OPEN_PATH_LINE_WIDTH = 1.0
+
+
+# =============================================================================
+# 幾何工具
+# =============================================================================
+
+def cell_transform(glyph_width, glyph_height, center_x, center_y, cell_width, cell_height):
+    """計算字形放入格子的縮放與位移（與預覽繪製公式一致）
+
+    Args:
+        glyph_width (float): 字身寬度
+        glyph_height (float): 字形高度（ascender - descender）
+        center_x, center_y (float): 格子中心
+        cell_width, cell_height (float): 格子尺寸
+
+    Returns:
+        tuple: (scale, x, y)，變換為 (px, py) → (x + scale * px, y + scale * py)
+    """
+    scale_x = cell_width / glyph_width if glyph_width > 0 else 1
+    scale_y = cell_height / glyph_height if glyph_height > 0 else 1
+    scale = min(scale_x, scale_y)
+
+    x = center_x - glyph_width * scale / 2
+    y = center_y - glyph_height * scale / 2
+    return scale, x, y
+
+
+def ink_cell_transform(ink_bounds, reference, center_x, center_y, cell_width, cell_height):
+    """墨跡邊界模式的縮放與位移（字形墨跡水平置中，垂直方向對齊整個網格的參考邊界）
+
+    Args:
+        ink_bounds (tuple): 字形墨跡邊界 (xMin, yMin, xMax, yMax)
+        reference (tuple): 網格參考邊界 (xMin, yMin, xMax, yMax)
+        center_x, center_y (float): 格子中心
+        cell_width, cell_height (float): 格子尺寸
+
+    Returns:
+        tuple: (scale, x, y)，變換為 (px, py) → (x + scale * px, y + scale * py)
+    """
+    ink_width = ink_bounds[2] - ink_bounds[0]
+    reference_height = reference[3] - reference[1]
+    scale_x = cell_width / ink_width if ink_width > 0 else 1
+    scale_y = cell_height / reference_height if reference_height > 0 else 1
+    scale = min(scale_x, scale_y)
+
+    x = center_x - (ink_bounds[0] + ink_bounds[2]) / 2 * scale
+    y = center_y - (reference[1] + reference[3]) / 2 * scale
+    return scale, x, y
+
+
+def _fmt(value):
+    """格式化數值（最多兩位小數，去除多餘的零）"""
+    text = '%.2f' % value
+    text = text.rstrip('0').rstrip('.')
+    return '0' if text in ('', '-0') else text
+
+
+# =============================================================================
+# 寫入器
+# =============================================================================
+
+class SVGWriter(object):
+    """SVG 串流寫入器（純 Python）
+
+    預覽座標為 Y 軸向上，輸出時以外層群組翻轉為 SVG 的 Y 軸向下
+    """
+
+    def __init__(self, stream, width, height, is_black=False):
+        """初始化寫入器
+
+        Args:
+            stream: 可寫入 bytes 的串流
+            width, height (float): 文件尺寸
+            is_black (bool): 是否使用深色主題配色
+        """
+        self.stream = stream
+        self.width = width
+        self.height = height
+        self.foreground = '#FFFFFF' if is_black else '#000000'
+        self.background = '#000000' if is_black else '#FFFFFF'
+
+    def _write(self, text):
+        self.stream.write(text.encode('utf-8'))
+
+    def begin(self):
+        """寫入文件開頭"""
+        w, h = _fmt(self.width), _fmt(self.height)
+        self._write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<svg xmlns="http://www.w3.org/2000/svg" version="1.1" '
+            'width="%s" height="%s" viewBox="0 0 %s %s">\n' % (w, h, w, h)
+        )
+        self._write('<rect width="100%%" height="100%%" fill="%s"/>\n' % self.background)
+        self._write('<g transform="matrix(1 0 0 -1 0 %s)">\n' % h)
+
+    def add_outline(self, commands, scale, dx, dy):
+        """寫入一個字形外框
+
+        Args:
+            commands: RecordingPen 記錄的指令
+            scale (float): 縮放
+            dx, dy (float): 位移
+        """
+        filled = []
+        stroked = []
+        for segments, is_closed in iter_contours(commands):
+            data = self._path_data(segments, scale, dx, dy)
+            if is_closed:
+                filled.append(data + 'Z')
+            else:
+                stroked.append(data)
+
+        if filled:
+            self._write('<path d="%s" fill="%s"/>\n' % (''.join(filled), self.foreground))
+        if stroked:
+            self._write(
+                '<path d="%s" fill="none" stroke="%s" stroke-width="%s"/>\n'
+                % (''.join(stroked), self.foreground, _fmt(OPEN_PATH_LINE_WIDTH))
+            )
+
+    def end(self):
+        """寫入文件結尾"""
+        self._write('</g>\n</svg>\n')
+
+    @staticmethod
+    def _path_data(segments, scale, dx, dy):
+        parts = []
+        for kind, points in segments:
+            coords = ' '.join(
+                '%s %s' % (_fmt(dx + scale * x), _fmt(dy + scale * y)) for x, y in points
+            )
+            parts.append(kind + coords)
+        return ''.join(parts)
+
+
+class PDFWriter(object):
+    """PDF 串流寫入器（純 Python，單頁）
+
+    內容串流逐格寫出；串流長度以間接物件於結尾補上，不需預先組出整份內容
+    """
+
+    def __init__(self, stream, width, height, is_black=False):
+        """初始化寫入器
+
+        Args:
+            stream: 可寫入 bytes 的串流
+            width, height (float): 頁面尺寸
+            is_black (bool): 是否使用深色主題配色
+        """
+        self.stream = stream
+        self.width = width
+        self.height = height
+        self.foreground = '1 1 1' if is_black else '0 0 0'
+        self.background = '0 0 0' if is_black else '1 1 1'
+        self._offset = 0
+        self._object_offsets = {}
+        self._content_start = 0
+
+    def _write(self, text):
+        data = text.encode('latin-1')
+        self.stream.write(data)
+        self._offset += len(data)
+
+    def _begin_object(self, number):
+        self._object_offsets[number] = self._offset
+        self._write('%d 0 obj\n' % number)
+
+    def begin(self):
+        """寫入文件開頭與頁面物件，並開始內容串流"""
+        self._write('%PDF-1.4\n')
+
+        self._begin_object(1)
+        self._write('<< /Type /Catalog /Pages 2 0 R >>\nendobj\n')
+
+        self._begin_object(2)
+        self._write('<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n')
+
+        self._begin_object(3)
+        self._write(
+            '<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %s %s] '
+            '/Contents 4 0 R /Resources << >> >>\nendobj\n'
+            % (_fmt(self.width), _fmt(self.height))
+        )
+
+        self._begin_object(4)
+        self._write('<< /Length 5 0 R >>\nstream\n')
+        self._content_start = self._offset
+
+        # 背景與繪製顏色
+        self._write('%s rg 0 0 %s %s re f\n' % (self.background, _fmt(self.width), _fmt(self.height)))
+        self._write('%s rg %s RG %s w\n' % (self.foreground, self.foreground, _fmt(OPEN_PATH_LINE_WIDTH)))
+
+    def add_outline(self, commands, scale, dx, dy):
+        """寫入一個字形外框（封閉輪廓填滿、開放輪廓描邊）"""
+        filled = []
+        stroked = []
+        for segments, is_closed in iter_contours(commands):
+            data = self._path_ops(segments, scale, dx, dy)
+            if is_closed:
+                filled.append(data + 'h\n')
+            else:
+                stroked.append(data)
+
+        if filled:
+            self._write(''.join(filled) + 'f\n')
+        if stroked:
+            self._write(''.join(stroked) + 'S\n')
+
+    def end(self):
+        """結束內容串流並寫入交叉參照表"""
+        content_length = self._offset - self._content_start
+        self._write('endstream\nendobj\n')
+
+        self._begin_object(5)
+        self._write('%d\nendobj\n' % content_length)
+
+        xref_offset = self._offset
+        count = len(self._object_offsets) + 1
+        self._write('xref\n0 %d\n0000000000 65535 f \n' % count)
+        for number in range(1, count):
+            self._write('%010d 00000 n \n' % self._object_offsets[number])
+        self._write('trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (count, xref_offset))
+
+    @staticmethod
+    def _path_ops(segments, scale, dx, dy):
+        operators = {'M': 'm', 'L': 'l', 'C': 'c'}
+        parts = []
+        for kind, points in segments:
+            coords = ' '.join(
+                '%s %s' % (_fmt(dx + scale * x), _fmt(dy + scale * y)) for x, y in points
+            )
+            parts.append('%s %s\n' % (coords, operators[kind]))
+        return ''.join(parts)
+
+
+_WRITERS = {
+    'svg': SVGWriter,
+    'pdf': PDFWriter,
+}
+
+
+def export_cells(stream, export_format, width, height, cells, is_black=False):
+    """逐格串流匯出
+
+    Args:
+        stream: 可寫入 bytes 的串流
+        export_format (str): 'svg' 或 'pdf'
+        width, height (float): 文件尺寸
+        cells: 可迭代的 (commands, scale, dx, dy)，變換由呼叫端依佈局模式計算
+        is_black (bool): 是否使用深色主題配色
+
+    Returns:
+        int: 寫出的格子數
+    """
+    writer_class = _WRITERS.get((export_format or '').lower())
+    if writer_class is None:
+        raise ValueError("Unsupported export format: %r" % (export_format,))
+
+    writer = writer_class(stream, width, height, is_black)
+    writer.begin()
+
+    written = 0
+    for commands, scale, dx, dy in cells:
+        if not commands:
+            continue
+        writer.add_outline(commands, scale, dx, dy)
+        written += 1
+
+    writer.end()
+    return written
+
+
+def format_for_path(path):
+    """依副檔名判斷匯出格式
+
+    Args:
+        path (str): 檔案路徑
+
+    Returns:
+        str or None: 'svg'、'pdf' 或 None
+    """
+    extension = str(path).rsplit('.', 1)[-1].lower() if '.' in str(path) else ''
+    return extension if extension in EXPORT_FORMATS else None
+
+
+def export_cells_to_path(path, width, height, cells, is_black=False):
+    """逐格匯出到檔案（格式依副檔名決定）
+
+    先寫入同目錄的暫存檔，完成後以 os.replace() 取代目標檔案；
+    匯出途中發生例外時刪除暫存檔，目標路徑維持原狀
+
+    Args:
+        path (str): 輸出檔案路徑
+        width, height (float): 文件尺寸
+        cells: 可迭代的 (commands, scale, dx, dy)
+        is_black (bool): 是否使用深色主題配色
+
+    Returns:
+        int: 寫出的格子數
+    """
+    export_format = format_for_path(path)
+    if not export_format:
+        raise ValueError("Unsupported export path: %r" % (path,))
+
+    directory, name = os.path.split(os.path.abspath(path))
+    handle, temp_path = tempfile.mkstemp(prefix='.%s.' % name, suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(handle, 'wb') as stream:
+            written = export_cells(stream, export_format, width, height, cells, is_black)
+        # mkstemp 建立的檔案只有擁有者可讀寫，改回一般檔案的權限
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temp_path, 0o666 & ~umask)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return written
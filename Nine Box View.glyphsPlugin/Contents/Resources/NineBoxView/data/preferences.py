@@ -10,7 +10,7 @@ import objc
 from GlyphsApp import Glyphs
 from Foundation import NSUserDefaults
 
-# 平面座標系統常數
+# 平面座標系統常數（預設九宮格；實際網格形狀由 gridRows / gridColumns 設定決定）
 GRID_SIZE = 9  # 0-8 座標
 CENTER_POSITION = 4  # 中央位置
 
@@ -53,10 +53,18 @@ class PreferencesManager:
         self.user_defaults.setBool_forKey_(bool(value), full_key)
         self.user_defaults.synchronize()
     
-    def get_array(self, key, default=None):
-        """取得陣列偏好設定（平面座標系統適配）"""
+    def get_array(self, key, default=None, size=None):
+        """取得陣列偏好設定（平面座標系統適配）
+        
+        Args:
+            key (str): 偏好設定鍵值
+            default (list): 預設陣列
+            size (int): 陣列長度，None 時依預設陣列長度（皆無時為 9）
+        """
+        if size is None:
+            size = len(default) if default else GRID_SIZE
         if default is None:
-            default = [''] * GRID_SIZE  # 0-8 位置的空字串
+            default = [''] * size  # 各位置的空字串
         
         full_key = self._make_key(key)
         value = self.user_defaults.objectForKey_(full_key)
@@ -65,19 +73,27 @@ class PreferencesManager:
         
         # 確保陣列長度正確
         result = list(value)
-        while len(result) < GRID_SIZE:
+        while len(result) < size:
             result.append('')
         
-        return result[:GRID_SIZE]  # 限制為9個元素
+        return result[:size]  # 限制為網格總格數
     
-    def set_array(self, key, value):
-        """設定陣列偏好設定（平面座標系統適配）"""
+    def set_array(self, key, value, size=None):
+        """設定陣列偏好設定（平面座標系統適配）
+        
+        Args:
+            key (str): 偏好設定鍵值
+            value (list): 陣列
+            size (int): 陣列長度，None 時依陣列本身長度（無效陣列時為 9）
+        """
         if not isinstance(value, (list, tuple)):
-            value = [''] * GRID_SIZE
+            value = [''] * (size or GRID_SIZE)
+        if size is None:
+            size = len(value)
         
-        # 確保陣列長度為9
-        array_value = list(value)[:GRID_SIZE]
-        while len(array_value) < GRID_SIZE:
+        # 確保陣列長度為網格總格數
+        array_value = list(value)[:size]
+        while len(array_value) < size:
             array_value.append('')
         
         full_key = self._make_key(key)
@@ -179,13 +195,13 @@ class PreferencesManager:
         else:
             self.set_string(key, "")
     
-    def get_grid(self, key, default=None):
+    def get_grid(self, key, default=None, size=None):
         """取得網格陣列偏好設定（別名為 get_array）"""
-        return self.get_array(key, default)
+        return self.get_array(key, default, size)
     
-    def set_grid(self, key, value):
+    def set_grid(self, key, value, size=None):
         """設定網格陣列偏好設定（別名為 set_array）"""
-        self.set_array(key, value)
+        self.set_array(key, value, size)
     
     def remove_key(self, key):
         """移除偏好設定鍵值"""
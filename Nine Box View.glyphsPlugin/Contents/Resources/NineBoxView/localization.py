@@ -59,6 +59,54 @@ STRINGS = {
         'ko': u'글리프 이름 복사'
     },
     
+    'menu_grid_size': {
+        'en': u'Grid Size',
+        'zh-Hant': u'網格大小',
+        'zh-Hans': u'网格大小',
+        'ja': u'グリッドサイズ',
+        'ko': u'격자 크기'
+    },
+    
+    'menu_export_svg': {
+        'en': u'Export as SVG...',
+        'zh-Hant': u'匯出為 SVG...',
+        'zh-Hans': u'导出为 SVG...',
+        'ja': u'SVG として書き出す...',
+        'ko': u'SVG로 내보내기...'
+    },
+    
+    'menu_export_pdf': {
+        'en': u'Export as PDF...',
+        'zh-Hant': u'匯出為 PDF...',
+        'zh-Hans': u'导出为 PDF...',
+        'ja': u'PDF として書き出す...',
+        'ko': u'PDF로 내보내기...'
+    },
+    
+    'menu_fit_ink_bounds': {
+        'en': u'Fit to Ink Bounds',
+        'zh-Hant': u'依墨跡邊界佈局',
+        'zh-Hans': u'按墨迹边界布局',
+        'ja': u'インク範囲に合わせる',
+        'ko': u'잉크 경계에 맞추기'
+    },
+    
+    'menu_kerning_rows': {
+        'en': u'Set Rows with Kerning',
+        'zh-Hant': u'套用字偶距排列',
+        'zh-Hans': u'应用字偶距排列',
+        'ja': u'カーニングを適用して並べる',
+        'ko': u'커닝 적용하여 배열'
+    },
+    
+    'menu_show_all_masters': {
+        'en': u'Show All Masters',
+        'zh-Hant': u'並排顯示所有主板',
+        'zh-Hans': u'并排显示所有主板',
+        'ja': u'すべてのマスターを並べて表示',
+        'ko': u'모든 마스터 나란히 보기'
+    },
+    
     
     
     # 前台錯誤訊息（使用者可見的 UI 訊息）
@@ -70,6 +118,21 @@ STRINGS = {
         'ko': u'글리프가 존재하지 않습니다'
     },
     
+    'menu_did_you_mean': {
+        'en': u'Did You Mean',
+        'zh-Hant': u'你是不是要找',
+        'zh-Hans': u'你是不是要找',
+        'ja': u'もしかして',
+        'ko': u'혹시 이것을 찾으셨나요'
+    },
+    
+    'tooltip_did_you_mean': {
+        'en': u'{token} → did you mean: {suggestions}',
+        'zh-Hant': u'{token} → 你是不是要找：{suggestions}',
+        'zh-Hans': u'{token} → 你是不是要找：{suggestions}',
+        'ja': u'{token} → もしかして：{suggestions}',
+        'ko': u'{token} → 혹시: {suggestions}'
+    },
     
     # 視窗標題
     'window_control_panel_suffix': {
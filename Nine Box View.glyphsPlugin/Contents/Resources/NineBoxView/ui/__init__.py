@@ -6,13 +6,28 @@ UI 元件模組
 """
 
 from __future__ import division, print_function, unicode_literals
-import traceback
 
-# UI 元件統一匯出（純 AppKit 實作）
-from .preview_view import NineBoxPreviewView, create_preview_view
-from .search_panel import SearchPanel
-from .controls_panel import ControlsPanelView
-from .lock_fields_panel import LockFieldsPanel
+# UI 元件統一匯出（純 AppKit 實作，延遲至首次存取時才匯入）
+_LAZY_EXPORTS = {
+    'NineBoxPreviewView': '.preview_view',
+    'create_preview_view': '.preview_view',
+    'SearchPanel': '.search_panel',
+    'ControlsPanelView': '.controls_panel',
+    'LockFieldsPanel': '.lock_fields_panel',
+}
+
+
+def __getattr__(name):
+    """首次存取時才匯入對應的 UI 模組（PEP 562）"""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+    import importlib
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     'NineBoxPreviewView', 'create_preview_view',
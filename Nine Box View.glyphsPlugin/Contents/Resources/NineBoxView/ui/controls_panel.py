@@ -133,8 +133,10 @@ class ControlsPanelView(NSView):
             margin = 10  # 左右
             spacing = 0  # 移除間距，讓搜尋框底部填補水平線位置
 
-            # 計算鎖定欄位面板的高度（3x3網格 + 清除按鈕）
-            lock_panel_height = (3 * LOCK_FIELD_HEIGHT + 2 * LOCK_FIELDS_INTERNAL_GRID_SPACING) + LOCK_FIELDS_CLEAR_BUTTON_HEIGHT + LOCK_FIELDS_SPACING_ABOVE_BUTTON
+            # 計算鎖定欄位面板的高度（N 列網格 + 清除按鈕）
+            from NineBoxView.core.grid_shape import get_grid_shape
+            rows = get_grid_shape().rows
+            lock_panel_height = (rows * LOCK_FIELD_HEIGHT + (rows - 1) * LOCK_FIELDS_INTERNAL_GRID_SPACING) + LOCK_FIELDS_CLEAR_BUTTON_HEIGHT + LOCK_FIELDS_SPACING_ABOVE_BUTTON
 
             # 容器可用寬度
             container_content_width = bounds.size.width - 2 * margin
@@ -221,6 +223,15 @@ class ControlsPanelView(NSView):
             # 確保執行標記被重置
             self._ui_update_in_progress = False
     
+    def rebuild_lock_fields(self):
+        """網格形狀變更後重建鎖定欄位並重新佈局"""
+        try:
+            if self.lockFieldsPanel and hasattr(self.lockFieldsPanel, 'rebuild_lock_grid'):
+                self.layoutUI()
+                self.lockFieldsPanel.rebuild_lock_grid()
+        except Exception:
+            print(traceback.format_exc())
+    
     def updatePanelUI_(self, plugin, update_lock_fields=False):
         """更新 UI 狀態（向後相容方法）"""
         # 直接委派給統一方法
@@ -2,7 +2,7 @@
 
 """
 九宮格預覽外掛 - 鎖定欄位面板元件
-基於原版 LockFieldsPanel 的完整復刻，適配平面座標系統 (0-8)
+基於原版 LockFieldsPanel 的完整復刻，適配平面座標系統（預設 0-8，支援 N×M 網格）
 """
 
 from __future__ import division, print_function, unicode_literals
@@ -18,9 +18,8 @@ from AppKit import (
 # 本地化支援
 from ..localization import localize
 
-# 平面座標系統常數
-CENTER_POSITION = 4  # 中央位置
-GRID_SIZE_TOTAL = 9  # 總共9個位置 (0-8)
+# 平面座標系統：網格形狀（預設 3×3，0-8 座標）由 grid_shape 模組統一提供
+from ..core.grid_shape import get_grid_shape
 
 # UI 常數（基於原版設定）
 LOCK_FIELD_HEIGHT = 30
@@ -42,6 +41,7 @@ class LockCharacterField(NSTextField):
             self.position = position
             self.plugin = plugin
             self._programmatic_update = False  # 標記是否為程式化更新
+            self._last_text_length = 0  # 用於判斷是否為一般鍵入（觸發自動完成）
             self._setup_field()
         return self
     
@@ -113,10 +113,39 @@ class LockCharacterField(NSTextField):
             self.plugin.event_handler.handle_lock_field_change(self, text)
         else:
             pass
+        
+        # 一般鍵入時提供字符名稱自動完成
+        if not getattr(self, '_programmatic_update', False):
+            self._trigger_completion(text)
+        self._last_text_length = len(text)
+    
+    def _trigger_completion(self, text):
+        """鍵入名稱時透過 field editor 顯示自動完成彈出視窗"""
+        try:
+            editor = self.currentEditor()
+            if editor is None:
+                return
+            selection = editor.selectedRange()
+            from ..core.glyph_completion import should_trigger_completion
+            if should_trigger_completion(self._last_text_length, text, selection.location, selection.length):
+                editor.complete_(None)
+        except Exception:
+            print(traceback.format_exc())
+    
+    def control_textView_completions_forPartialWordRange_indexOfSelectedItem_(
+            self, control, textView, words, charRange, index):
+        """field editor 自動完成候選名稱（由字符索引以前綴查詢）"""
+        try:
+            from ..core.glyph_completion import completions_for_range
+            completions = completions_for_range(textView.string(), charRange.location, charRange.length)
+            return completions, (0 if completions else -1)
+        except Exception:
+            print(traceback.format_exc())
+            return [], -1
     
     def _update_tooltip(self):
         """更新 tooltip 顯示鎖定字符名稱"""
-        if self.position == CENTER_POSITION:
+        if self.position == get_grid_shape().center:
             self.setToolTip_(None)
             return
         
@@ -137,7 +166,7 @@ class LockCharacterField(NSTextField):
         if not hasattr(self.plugin, 'lock_inputs'):
             return None
         
-        if self.position == CENTER_POSITION:
+        if self.position == get_grid_shape().center:
             return None  # 中心格不能鎖定
             
         locked_char = self.plugin.lock_inputs[self.position]
@@ -171,9 +200,13 @@ class LockCharacterField(NSTextField):
                 invalid_count = len(validation_result['invalid_chars'])
                 if valid_count > 0:
                     first_valid = validation_result['valid_glyphs'][0]
-                    self.setToolTip_(f"位置 {self.position} - 將使用：{first_valid}（{invalid_count} 個無效字符已標記）")
+                    tooltip = f"位置 {self.position} - 將使用：{first_valid}（{invalid_count} 個無效字符已標記）"
                 else:
-                    self.setToolTip_(f"位置 {self.position} - 發現 {invalid_count} 個無效字符")
+                    tooltip = f"位置 {self.position} - 發現 {invalid_count} 個無效字符"
+                
+                # 附加「你是不是要找」建議
+                suggestions = VisualFeedbackService.get_suggestions(validation_result)
+                self.setToolTip_(VisualFeedbackService.append_suggestions_to_tooltip(tooltip, suggestions))
                     
         except Exception:
             import traceback
@@ -238,7 +271,8 @@ class LockCharacterField(NSTextField):
             if menu is None:
                 menu = self._create_emergency_menu()
             
-            return menu
+            # 無效標記的「你是不是要找」建議
+            return self._add_suggestion_items(menu)
             
         except Exception:
             print(traceback.format_exc())
@@ -275,9 +309,44 @@ class LockCharacterField(NSTextField):
                 )
                 glyph_picker_item.setTarget_(self)
                 context_menu.addItem_(glyph_picker_item)
+            
+            # 無效標記的「你是不是要找」建議
+            self._add_suggestion_items(context_menu, textView.string())
         
         return context_menu
     
+    def _add_suggestion_items(self, menu, text=None):
+        """在選單加入無效標記的建議項目"""
+        try:
+            from ..core.menu_manager import MenuManager
+            from ..core.input_recognition import VisualFeedbackService
+            if text is None:
+                text = self.stringValue()
+            suggestions = VisualFeedbackService.get_suggestions_for_text(text)
+            return MenuManager.add_suggestion_items(menu, suggestions, self)
+        except Exception:
+            print(traceback.format_exc())
+            return menu
+    
+    def applyGlyphSuggestion_(self, sender):
+        """以建議的字符名稱取代無效標記"""
+        try:
+            token, name = sender.representedObject()
+            from ..core.glyph_suggestions import replace_token
+            text = self.stringValue()
+            new_text = replace_token(text, token, name)
+            if new_text == text:
+                return
+            
+            self.setStringValue_(new_text)
+            
+            # 觸發與手動編輯相同的完整邏輯鏈
+            if self._validate_event_handler('handle_lock_field_change'):
+                self.plugin.event_handler.handle_lock_field_change(self, new_text)
+            
+        except Exception:
+            print(traceback.format_exc())
+    
     def _create_emergency_menu(self):
         """建立緊急後備選單，確保永遠有可用的選單"""
         try:
@@ -421,8 +490,18 @@ class LockFieldsPanel(NSView):
         self.clearAllButton.setToolTip_(localize('tooltip_clear_all_locks'))
         self.addSubview_(self.clearAllButton)
     
-    def _create_lock_grid(self, bounds):
-        """建立九宮格佈局 - 基於平面座標系統 (0-8)"""
+    def _iter_grid_cells(self, bounds):
+        """依目前網格形狀產生各位置的 frame
+        
+        以 3×3 為例：
+        0 1 2  (上排)
+        3 4 5  (中排，4=中央)
+        6 7 8  (下排)
+        
+        Yields:
+            tuple: (grid_position, x, y, cell_width, cell_height)
+        """
+        shape = get_grid_shape()
         grid_spacing = LOCK_FIELDS_INTERNAL_GRID_SPACING
         button_height = LOCK_FIELDS_CLEAR_BUTTON_HEIGHT
         spacing = LOCK_FIELDS_SPACING_ABOVE_BUTTON
@@ -431,24 +510,44 @@ class LockFieldsPanel(NSView):
         
         # 佈局計算：高度固定，寬度自動適應
         cell_height = LOCK_FIELD_HEIGHT
-        cell_width = (available_width - 2 * grid_spacing) / 3
+        cell_width = (available_width - (shape.columns - 1) * grid_spacing) / shape.columns
         grid_start_x = 0
         current_y = button_height + spacing
         
-        # 建立九宮格各位置 (0-8)
-        # 0 1 2  (上排)
-        # 3 4 5  (中排，4=中央)
-        # 6 7 8  (下排)
-        for row in range(3):
-            for col in range(3):
-                grid_position = row * 3 + col  # 平面座標 0-8
+        for row in range(shape.rows):
+            for col in range(shape.columns):
+                grid_position = row * shape.columns + col  # 平面座標
                 x = grid_start_x + col * (cell_width + grid_spacing)
-                y = current_y + (2 - row) * (cell_height + grid_spacing)  # 反轉Y軸
-                
-                if grid_position == CENTER_POSITION:  # 位置 4 = 中央鎖頭按鈕
-                    self._create_lock_button(x, y, cell_width, cell_height)
-                else:  # 位置 0,1,2,3,5,6,7,8 = 鎖定輸入框
-                    self._create_lock_field(x, y, cell_width, cell_height, grid_position)
+                y = current_y + (shape.rows - 1 - row) * (cell_height + grid_spacing)  # 反轉Y軸
+                yield grid_position, x, y, cell_width, cell_height
+    
+    def _create_lock_grid(self, bounds):
+        """建立網格佈局 - 基於平面座標系統（預設 0-8）"""
+        center = get_grid_shape().center
+        for grid_position, x, y, cell_width, cell_height in self._iter_grid_cells(bounds):
+            if grid_position == center:  # 中央鎖頭按鈕
+                self._create_lock_button(x, y, cell_width, cell_height)
+            else:  # 其他位置 = 鎖定輸入框
+                self._create_lock_field(x, y, cell_width, cell_height, grid_position)
+    
+    def rebuild_lock_grid(self):
+        """網格形狀變更後重建鎖定輸入框與鎖頭按鈕"""
+        try:
+            for field in self.lockFields.values():
+                field.removeFromSuperview()
+            self.lockFields = {}
+            
+            if self.lockButton:
+                self.lockButton.removeFromSuperview()
+                self.lockButton = None
+            
+            self._create_lock_grid(self.bounds())
+            
+            if hasattr(self.plugin, 'lock_inputs'):
+                self.updatePanelUI_(self.plugin)
+            
+        except Exception:
+            print(traceback.format_exc())
     
     def _update_layout_positions(self):
         """更新元件位置 - 不重建元件，只調整位置"""
@@ -467,34 +566,21 @@ class LockFieldsPanel(NSView):
             print(traceback.format_exc())
     
     def _update_grid_positions(self, bounds):
-        """更新九宮格位置"""
-        grid_spacing = LOCK_FIELDS_INTERNAL_GRID_SPACING
-        button_height = LOCK_FIELDS_CLEAR_BUTTON_HEIGHT
-        spacing = LOCK_FIELDS_SPACING_ABOVE_BUTTON
-        
-        available_width = bounds.size.width
-        cell_height = LOCK_FIELD_HEIGHT
-        cell_width = (available_width - 2 * grid_spacing) / 3
-        grid_start_x = 0
-        current_y = button_height + spacing
+        """更新網格位置"""
+        center = get_grid_shape().center
         
         # 更新各位置元件的 frame
-        for row in range(3):
-            for col in range(3):
-                grid_position = row * 3 + col
-                x = grid_start_x + col * (cell_width + grid_spacing)
-                y = current_y + (2 - row) * (cell_height + grid_spacing)
-                
-                if grid_position == CENTER_POSITION and self.lockButton:
-                    button_padding = LOCK_BUTTON_PADDING
-                    lock_rect = NSMakeRect(
-                        x + button_padding, y + button_padding,
-                        cell_width - 2 * button_padding, cell_height - 2 * button_padding
-                    )
-                    self.lockButton.setFrame_(lock_rect)
-                elif grid_position in self.lockFields:
-                    field_rect = NSMakeRect(x, y, cell_width, cell_height)
-                    self.lockFields[grid_position].setFrame_(field_rect)
+        for grid_position, x, y, cell_width, cell_height in self._iter_grid_cells(bounds):
+            if grid_position == center and self.lockButton:
+                button_padding = LOCK_BUTTON_PADDING
+                lock_rect = NSMakeRect(
+                    x + button_padding, y + button_padding,
+                    cell_width - 2 * button_padding, cell_height - 2 * button_padding
+                )
+                self.lockButton.setFrame_(lock_rect)
+            elif grid_position in self.lockFields:
+                field_rect = NSMakeRect(x, y, cell_width, cell_height)
+                self.lockFields[grid_position].setFrame_(field_rect)
     
     def _create_lock_field(self, x, y, cell_width, cell_height, position):
         """建立單一鎖定輸入框"""
@@ -650,13 +736,14 @@ class LockFieldsPanel(NSView):
     
     def updatePanelUI_(self, plugin):
         """更新 UI 狀態（平面架構版本）"""
+        shape = get_grid_shape()
         if not hasattr(plugin, 'lock_inputs'):
-            plugin.lock_inputs = [''] * GRID_SIZE_TOTAL
+            plugin.lock_inputs = [''] * shape.total
         
         for position, field in self.lockFields.items():
             displayed_char = ""
             
-            if position != CENTER_POSITION:
+            if position != shape.center and position < len(plugin.lock_inputs):
                 displayed_char = plugin.lock_inputs[position]
             
             # 設定程式化更新標記，避免觸發視覺標注
@@ -3,7 +3,8 @@
 """
 PreviewView - 九宮格預覽視圖（整合進階重繪機制）
 支援 Light Table、寬度變更偵測、強制重繪等功能
-適配平面座標系統 (0-8) 的現代化架構
+適配平面座標系統（預設 0-8，支援 N×M 網格）的現代化架構
+排列變更時只重繪內容有變動的格子（虛擬化繪製）
 """
 
 from __future__ import division, print_function, unicode_literals
@@ -12,17 +13,16 @@ import objc
 import time
 from AppKit import (
     NSView, NSColor, NSBezierPath, NSRectFill, NSAffineTransform,
-    NSNotificationCenter, NSApp
+    NSNotificationCenter, NSApp, NSMakeRect, NSRunLoopCommonModes
 )
 
 # 透過統一服務介面存取 Glyphs API（移除直接匯入）
 from ..core.glyphs_service import get_glyphs_service
 from ..core.light_table_support import start_light_table_monitoring, stop_light_table_monitoring
+from ..core.grid_shape import get_grid_shape
+from ..core.grid_layout import GridCell, GridLayout, GridTile, compute_grid_metrics, compute_cell_positions
 
 # 佈局常數（適配平面座標系統）
-MARGIN_RATIO = 0.08  # 邊距比例
-SPACING_RATIO = 0.0  # 間距比例（原版設為 0）
-CENTER_POSITION = 4  # 平面座標系統中央位置
 MIN_ZOOM = 0.1
 MAX_ZOOM = 3.0
 
@@ -57,11 +57,44 @@ class NineBoxPreviewView(NSView):
             self._layout_cache_key = None
             self.cachedHeight = 0
             
+            # 墨跡邊界模式的網格參考邊界（None 表示使用字身寬度佈局）
+            self._ink_reference = None
+            
+            # 參考邊界快取：(主板 ID, 主板上下緣, 各格子的 (字符, 圖層版本)) → 參考邊界
+            self._ink_reference_key = None
+            self._ink_reference_cached = None
+            
             # 移除舊的主題快取（改用新的主題偵測器）
             
             # 寬度變更檢測機制
             self._width_change_cache = {}
             self._last_check_time = 0  # 寬度檢測節流機制
+            
+            # 字身寬度快取（排列變更時只查詢新出現的字符）
+            self._advance_width_cache = {}
+            
+            # 字偶距排列的格子位置快取：(鍵, 格子)，鍵含字偶距版本與各字符寬度
+            self._kerned_positions_cache = None
+            
+            # 墨跡超出量測快取：(位置, 主板 ID) → (字符, 圖層版本, 格子, 參考邊界, 超出距離)
+            self._overflow_cache = {}
+            
+            # 字符名稱 → 格子位置反查表（編輯圖層時只讓顯示該字符的格子失效）
+            from ..core.cell_index import GlyphCellIndex
+            self._cell_index = GlyphCellIndex()
+            
+            # 拖曳節點互動模式：重複副本的路徑快照（字符名稱 → 快照）與放開滑鼠的輪詢狀態
+            self._copy_snapshots = {}
+            self._interactive_polling = False
+            self._interactive_start_layout = None
+            
+            # 重繪排程器（合併同一畫面更新週期內的重繪請求，並限制最高幀率）
+            from ..core.redraw_scheduler import RedrawScheduler, DEFAULT_MAX_FPS
+            self._redraw_scheduler = RedrawScheduler(
+                self._schedule_redraw_flush,
+                self._perform_scheduled_redraw,
+                getattr(plugin, 'maxPreviewFPS', DEFAULT_MAX_FPS)
+            )
 
             # 防抖機制狀態（修復聚焦後立即點擊的雙重隨機排列問題）
             self._last_randomize_time = 0
@@ -112,6 +145,8 @@ class NineBoxPreviewView(NSView):
                 if hasattr(self.plugin, 'displayArrangement'):
                     arrangement = self.plugin.displayArrangement()
                     self._currentArrangement = arrangement if arrangement else []
+            
+            self._sync_cell_index()
                     
         except Exception:
             print(traceback.format_exc())
@@ -122,16 +157,43 @@ class NineBoxPreviewView(NSView):
     # 統一重繪介面（官方標準 - 純 NSView 模式）
     # ==========================================================================
     
-    def _trigger_redraw(self):
+    def _trigger_redraw(self, rect=None):
         """統一重繪方法（官方 NSView 標準）
         
-        採用標準 NSView 重繪機制，讓系統決定重繪時機
-        """
-        # 立即標記需要重繪
-        self.setNeedsDisplay_(True)
+        所有重繪請求經由排程器合併，每個畫面更新週期最多標記一次，
+        再由標準 NSView 重繪機制決定實際繪製時機
         
-        # 可選：強制立即處理顯示更新（僅在必要時使用）
-        # self.displayIfNeeded()
+        Args:
+            rect: 需要重繪的範圍，None 表示整個視圖
+        """
+        self._redraw_scheduler.request(rect)
+    
+    @objc.python_method
+    def _perform_after_delay(self, selector, delay):
+        """延遲呼叫選擇器（common modes：滑鼠拖曳的事件追蹤迴圈中也會執行）"""
+        self.performSelector_withObject_afterDelay_inModes_(selector, None, delay, [NSRunLoopCommonModes])
+    
+    @objc.python_method
+    def _schedule_redraw_flush(self, delay):
+        """排程器回呼：於 delay 秒後執行累積的重繪請求"""
+        self._perform_after_delay("flushScheduledRedraw:", delay)
+    
+    def flushScheduledRedraw_(self, sender):
+        """執行排程器累積的重繪請求"""
+        self._redraw_scheduler.flush()
+    
+    @objc.python_method
+    def _perform_scheduled_redraw(self, rects):
+        """標記需要重繪的範圍（rects 為 None 時標記整個視圖）"""
+        if rects is None:
+            self.setNeedsDisplay_(True)
+        else:
+            for rect in rects:
+                self.setNeedsDisplayInRect_(rect)
+    
+    def set_max_fps(self, max_fps):
+        """設定預覽的最高幀率"""
+        self._redraw_scheduler.set_max_fps(max_fps)
     
     def update(self):
         """手動更新介面（官方標準）"""
@@ -147,7 +209,7 @@ class NineBoxPreviewView(NSView):
     
     def redraw(self):
         """標準重繪方法（照抄 RotateView 模式）"""
-        self.setNeedsDisplay_(True)
+        self._trigger_redraw()
     
     # ==========================================================================
     # 屬性存取器（官方屬性驅動重繪模式）
@@ -160,20 +222,26 @@ class NineBoxPreviewView(NSView):
     
     @currentArrangement.setter
     def currentArrangement(self, value):
-        """設定當前字符排列並觸發重繪（官方模式）"""
+        """設定當前字符排列並觸發重繪（官方模式）
+        
+        佈局不變時只標記內容有變動的格子，否則整個視圖重繪；
+        佈局快取鍵包含排列，這裡計算的佈局由下一次繪製直接沿用
+        """
         if self._currentArrangement != value:
+            previous = self._currentArrangement
             self._currentArrangement = value[:] if value is not None else []
-            self._invalidate_layout_cache()
-            self._trigger_redraw()  # 使用統一重繪方法
+            self._sync_cell_index()
+            if not self._invalidate_changed_cells(previous, self._currentArrangement):
+                self._trigger_redraw()  # 使用統一重繪方法
     
         
     def setGridGlyphs_(self, glyphs):
-        """設定九宮格字符陣列（相容性方法）
+        """設定網格字符陣列（相容性方法）
         
         Args:
-            glyphs (list): 長度為9的字符陣列
+            glyphs (list): 長度為網格總格數的字符陣列
         """
-        if len(glyphs) == 9:
+        if len(glyphs) == get_grid_shape().total:
             self.currentArrangement = glyphs[:]
             
     def setGridFont_(self, font):
@@ -203,8 +271,18 @@ class NineBoxPreviewView(NSView):
             from ..core.theme_detector import clear_theme_cache
             clear_theme_cache()
             
-            # 清除高度快取
+            # 清除高度與字身寬度快取
             self.cachedHeight = 0
+            self._ink_reference = None
+            self._ink_reference_key = None
+            self._ink_reference_cached = None
+            self._advance_width_cache.clear()
+            self._kerned_positions_cache = None
+            self._overflow_cache.clear()
+            
+            # 重新解析格子反查表（字型可能已切換）
+            self._cell_index.clear()
+            self._sync_cell_index()
             
         except Exception:
             print(traceback.format_exc())
@@ -255,6 +333,9 @@ class NineBoxPreviewView(NSView):
                                 self._width_change_cache[layer_id] = current_width
                                 if cached_width is not None:  # 只有已有快取時才算變更
                                     width_changed = True
+                                    # 記錄的圖層度量已過期
+                                    from ..core.index_store import get_glyph_index_store
+                                    get_glyph_index_store().forget_glyph(font, glyph.name)
                     except Exception:
                         print(traceback.format_exc())
 
@@ -274,8 +355,10 @@ class NineBoxPreviewView(NSView):
             # 修復：恢復被動寬度變更檢測
             # 這是原版的正確做法：在每次重繪時檢測寬度變更
             width_changed = self._detect_width_changes()
+            previous_layout = self._cached_layout
             if width_changed:
                 # 寬度變更時清理佈局快取並觸發重新計算
+                self._advance_width_cache.clear()
                 self._invalidate_layout_cache()
 
             # === 繪製背景 ===
@@ -298,11 +381,13 @@ class NineBoxPreviewView(NSView):
             # 簡化排列同步檢查
             if arrangement != self._currentArrangement:
                 self._currentArrangement = arrangement[:] if arrangement else []
+                self._sync_cell_index()
                 self._invalidate_layout_cache()
             
             # 標準化排列資料
-            if not isinstance(arrangement, list) or len(arrangement) != 9:
-                arrangement = ["A"] * 9
+            grid_total = get_grid_shape().total
+            if not isinstance(arrangement, list) or len(arrangement) != grid_total:
+                arrangement = ["A"] * grid_total
             else:
                 arrangement = [char if char is not None else "" for char in arrangement]
             
@@ -311,8 +396,22 @@ class NineBoxPreviewView(NSView):
             if not layout:
                 return
             
-            # 繪製九宮格
-            self._draw_grid_with_layout(layout, is_black, font, currentMaster)
+            # 只重繪部分範圍時縮放改變：其餘格子仍是舊的縮放，排程整個視圖重繪
+            if (width_changed and previous_layout is not None and
+                    self._layout_geometry_differs(previous_layout, layout)):
+                self._trigger_redraw()
+            
+            # 繪製九宮格（多主板模式時每個主板各繪製一組）
+            if layout.tiles:
+                self._draw_master_strip_with_layout(layout, is_black, font)
+            else:
+                self._draw_grid_with_layout(layout, is_black, font, currentMaster)
+            
+            # 記錄視窗開啟後的首幀延遲
+            from ..core.first_frame_metric import get_first_frame_metric
+            first_frame_metric = get_first_frame_metric()
+            if first_frame_metric.is_pending():
+                first_frame_metric.mark_frame()
             
         except Exception:
             print(traceback.format_exc())
@@ -322,6 +421,188 @@ class NineBoxPreviewView(NSView):
         self._cached_layout = None
         self._layout_cache_key = None
     
+    @objc.python_method
+    def get_layout_cache(self):
+        """取得目前的佈局快取（供文件狀態保存）
+        
+        Returns:
+            tuple: (佈局, 快取鍵)
+        """
+        return self._cached_layout, self._layout_cache_key
+    
+    @objc.python_method
+    def restore_layout_cache(self, layout, cache_key):
+        """還原先前保存的佈局快取（快取鍵含字型識別碼，不會誤用於其他字型）
+        
+        Args:
+            layout (GridLayout): 佈局
+            cache_key (tuple): 快取鍵
+        """
+        if layout and cache_key:
+            self._cached_layout = layout
+            self._layout_cache_key = cache_key
+    
+    def _invalidate_changed_cells(self, previous, current):
+        """只標記內容有變動的格子需要重繪
+        
+        Args:
+            previous (list): 變更前的排列
+            current (list): 變更後的排列
+            
+        Returns:
+            bool: True 如果已完成局部標記；False 表示需要整個視圖重繪
+        """
+        try:
+            old_layout = self._cached_layout
+            if not old_layout or len(previous) != len(current):
+                return False
+            
+            changed = [i for i in range(len(current)) if previous[i] != current[i]]
+            
+            new_layout = self._calculate_layout()
+            if not new_layout or new_layout.cells is not old_layout.cells:
+                # 網格度量改變（例如最大字身寬度變化）：所有格子位置都會移動
+                return False
+            
+            # 重繪範圍涵蓋新舊內容的墨跡（舊字形超出格子的部分也需清除）
+            cells = new_layout.cells
+            offsets = [tile.offset_x for tile in new_layout.tiles] or [0]
+            for i in changed:
+                if i < len(cells):
+                    for offsetX in offsets:
+                        self._trigger_redraw(self._cell_rect(new_layout.dirty_rect_union(old_layout, i, offsetX)))
+            return True
+            
+        except Exception:
+            print(traceback.format_exc())
+            return False
+    
+    @objc.python_method
+    def _sync_cell_index(self):
+        """將字符名稱 → 格子位置反查表與目前排列同步"""
+        try:
+            self._cell_index.sync(self._currentArrangement, self._resolve_glyph_name)
+        except Exception:
+            print(traceback.format_exc())
+    
+    @objc.python_method
+    def _resolve_glyph_name(self, char_or_name):
+        """將排列項目（字元或名稱）解析為字型中的字符名稱"""
+        font, _ = get_glyphs_service().get_current_font_context()
+        glyph = get_glyphs_service().get_glyph_from_font(font, char_or_name)
+        return glyph.name if glyph else None
+    
+    @objc.python_method
+    def invalidate_glyph_cells(self, glyph_names, master_id=None, include_copies=True):
+        """只讓顯示指定字符的格子失效（圖層編輯時呼叫）
+        
+        多主板並排模式且指定主板時，只標記該主板的格子；
+        拖曳節點的互動模式中，副本更新被節流的編輯只標記中央格
+        
+        Args:
+            glyph_names: 字符名稱序列
+            master_id (str): 被編輯圖層所屬的主板 ID
+            include_copies (bool): 是否包含周圍格的重複副本
+            
+        Returns:
+            int: 標記重繪的格子數量
+        """
+        try:
+            positions = self._cell_index.positions_for_names(glyph_names)
+            previous = self._cached_layout
+            if not positions or not previous:
+                return 0
+            
+            # 編輯可能改變最大字身寬度或墨跡參考邊界：縮放改變時所有格子都需要重繪
+            layout, geometry_changed = self._refresh_layout_for_edit()
+            if layout is None:
+                return 0
+            if geometry_changed:
+                self._trigger_redraw()
+                return len(layout.cells)
+            
+            if not include_copies:
+                center = get_grid_shape().center
+                positions = [position for position in positions if position == center]
+            self._start_interactive_edit_polling()
+            
+            offsets = [tile.offset_x for tile in layout.tiles
+                       if master_id is None or tile.master_id == master_id] if layout.tiles else [0]
+            count = 0
+            for position in positions:
+                if position < len(layout.cells):
+                    for offsetX in offsets:
+                        self._trigger_redraw(self._cell_rect(layout.dirty_rect_union(previous, position, offsetX)))
+                        count += 1
+            return count
+            
+        except Exception:
+            print(traceback.format_exc())
+            return 0
+    
+    @objc.python_method
+    def _refresh_layout_for_edit(self):
+        """圖層編輯後重新計算佈局
+        
+        佈局快取鍵不含圖層版本，因此使佈局快取失效後重新計算；
+        字身寬度與墨跡邊界快取依圖層版本自行更新
+        
+        Returns:
+            tuple: (更新後的佈局或 None, 網格度量或格子位置是否改變)
+        """
+        previous = self._cached_layout
+        self._invalidate_layout_cache()
+        layout = self._calculate_layout()
+        changed = layout is not None and previous is not None and self._layout_geometry_differs(previous, layout)
+        return layout, changed
+    
+    @objc.python_method
+    def _layout_geometry_differs(self, previous, layout):
+        """檢查兩個佈局的網格度量或格子位置是否不同"""
+        if previous.metrics != layout.metrics or previous.kerned != layout.kerned:
+            return True
+        if layout.kerned:
+            return [cell.transform for cell in previous.cells] != [cell.transform for cell in layout.cells]
+        return False
+    
+    @objc.python_method
+    def _start_interactive_edit_polling(self):
+        """互動模式開始時定期檢查是否放開滑鼠（只排程一次）"""
+        from ..core.interactive_edit import get_interactive_edit_tracker, RELEASE_POLL_INTERVAL
+        if self._interactive_polling or not get_interactive_edit_tracker().active:
+            return
+        self._interactive_polling = True
+        self._interactive_start_layout = self._cached_layout
+        self._perform_after_delay("pollInteractiveEdit:", RELEASE_POLL_INTERVAL)
+    
+    def pollInteractiveEdit_(self, sender):
+        """互動模式中檢查滑鼠狀態：放開時以完整品質重繪被編輯字符的所有格子"""
+        try:
+            from ..core.interactive_edit import get_interactive_edit_tracker, RELEASE_POLL_INTERVAL
+            tracker = get_interactive_edit_tracker()
+            if tracker.active and not tracker.poll_release():
+                self._perform_after_delay("pollInteractiveEdit:", RELEASE_POLL_INTERVAL)
+                return
+            
+            self._interactive_polling = False
+            self._copy_snapshots.clear()
+            
+            # 互動期間網格度量改變：節流的副本可能仍是舊縮放，重繪整個視圖
+            start_layout, self._interactive_start_layout = self._interactive_start_layout, None
+            if self.invalidate_glyph_cells(tracker.glyph_names) and start_layout is not None:
+                layout = self._cached_layout
+                if layout is None or self._layout_geometry_differs(start_layout, layout):
+                    self._trigger_redraw()
+            
+        except Exception:
+            self._interactive_polling = False
+            print(traceback.format_exc())
+    
+    def _cell_rect(self, dirty_rect):
+        """將佈局計算的重繪範圍 ((x, y), (width, height)) 轉為 NSRect"""
+        (x, y), (width, height) = dirty_rect
+        return NSMakeRect(x, y, width, height)
+    
     def _calculate_layout(self):
         """計算九宮格佈局（採用官方模式統一上下文）"""
         try:
@@ -333,49 +614,65 @@ class NineBoxPreviewView(NSView):
             if not font or not currentMaster:
                 return None
             
+            # 多主板並排模式：所有主板共用同一份格子佈局
+            strip_master_ids = self._get_strip_master_ids(font)
+            shape = get_grid_shape()
+            
             # 建立快取鍵（簡化版，依賴官方重繪處理字符切換）
+            from ..core.font_identity import get_font_token
             cache_key = (
+                get_font_token(font),
                 frame.size.width, frame.size.height,
-                tuple(self._currentArrangement)
+                tuple(self._currentArrangement),
+                tuple(strip_master_ids),
+                shape.key,
+                self._is_ink_bounds_mode(),
+                self._get_kerning_revision(strip_master_ids)
             )
             
             # 檢查快取
             if self._layout_cache_key == cache_key and self._cached_layout:
                 return self._cached_layout
             
-            # 計算網格度量（使用前8個字符作為參考）
+            # 計算網格度量（使用所有格子的字符作為參考）
             arrangement = self._currentArrangement or []
-            display_chars = arrangement[:8] if len(arrangement) >= 8 else arrangement
-            metrics = self._calculate_grid_metrics(frame, display_chars, currentMaster, font)
+            display_chars = arrangement[:shape.total]
+            
+            tiles = ()
+            layout_rect = frame
+            if strip_master_ids:
+                from ..core.master_strip import compute_strip_tiles
+                tile_width, tiles = compute_strip_tiles(frame.size.width, strip_master_ids)
+                layout_rect = NSMakeRect(0, 0, tile_width, frame.size.height)
+            
+            metrics = self._calculate_grid_metrics(layout_rect, display_chars, currentMaster, font)
             
             if not metrics:
                 return None
             
-            # 建構九宮格位置資訊（復刻自原版）
-            positions = []
-            for i in range(9):
-                row = i // 3
-                col = i % 3
-                
-                # 計算目前單元格的中心位置（精確復刻原版公式）
-                centerX = metrics['startX'] + (col + 0.5) * metrics['cellWidth'] + col * metrics['SPACING']
-                centerY = metrics['startY'] - (row + 0.5) * (metrics['gridHeight'] / 3)
-                
-                # 計算單元格高度
-                cellHeight = metrics['gridHeight'] / 3 - metrics['SPACING']
-                
-                positions.append({
-                    'centerX': centerX,
-                    'centerY': centerY,
-                    'cellWidth': metrics['cellWidth'],
-                    'cellHeight': cellHeight
-                })
-            
-            layout = {
-                'positions': positions,
-                'metrics': metrics,
-                'arrangement': arrangement[:9]  # 確保只有 9 個元素
-            }
+            # 字偶距排列模式：每列當作文字排版，位置隨字符內容改變
+            kerned = self._is_kerning_mode(strip_master_ids)
+            
+            # 網格度量與形狀未變時沿用既有位置資訊（只有字符內容變動）
+            previous = self._cached_layout
+            if kerned:
+                cells = self._build_kerned_positions(metrics, shape, display_chars, font, currentMaster)
+            elif (previous and previous.metrics == metrics and
+                    previous.shape_key == shape.key and not previous.kerned):
+                # 沿用同一組度量與格子記錄（物件不變，局部重繪以此判斷位置未移動）
+                metrics = previous.metrics
+                cells = previous.cells
+            else:
+                cells = self._build_positions(metrics, shape)
+            
+            overflow = self._measure_ink_overflow(
+                cells, display_chars, font, currentMaster, strip_master_ids
+            )
+            layout = GridLayout(
+                cells, metrics, shape.key, kerned,
+                arrangement[:shape.total],  # 確保只有總格數個元素
+                tiles, layout_rect.size.width, overflow
+            )
             
             # 更新快取
             self._cached_layout = layout
@@ -387,6 +684,184 @@ class NineBoxPreviewView(NSView):
             print(traceback.format_exc())
             return None
     
+    @objc.python_method
+    def _measure_ink_overflow(self, cells, display_chars, font, currentMaster, strip_master_ids):
+        """量測各格子字形墨跡超出格子的距離（局部重繪只外擴實際超出的範圍）
+        
+        邊界取自 Glyphs 已計算的 layer.bounds（圖層版本簽章的一部分），不建立外框幾何；
+        格子、字符、圖層版本與參考邊界皆未變的格子沿用上次的量測結果。
+        多主板並排時取各主板的最大值
+        
+        Returns:
+            tuple: 各格子的 (左, 下, 右, 上) 超出距離（點）
+        """
+        from ..core.outline_geometry import layer_version
+        glyphs_service = get_glyphs_service()
+        masters = [currentMaster]
+        if strip_master_ids:
+            masters = [font.masters[master_id] for master_id in strip_master_ids]
+        
+        measured = self._overflow_cache
+        overflow = []
+        for position, cell in enumerate(cells):
+            char_or_name = display_chars[position] if position < len(display_chars) else None
+            glyph = glyphs_service.get_glyph_from_font(font, char_or_name) if char_or_name else None
+            left = bottom = right = top = 0
+            for master in masters:
+                if not glyph or not master:
+                    continue
+                layer = glyph.layers[master.id]
+                if not layer:
+                    continue
+                version = layer_version(layer)
+                key = (position, master.id)
+                entry = measured.get(key)
+                if entry is not None and entry[:4] == (char_or_name, version, cell, self._ink_reference):
+                    value = entry[4]
+                else:
+                    value = self._cell_overflow(version, cell)
+                    measured[key] = (char_or_name, version, cell, self._ink_reference, value)
+                left = max(left, value[0])
+                bottom = max(bottom, value[1])
+                right = max(right, value[2])
+                top = max(top, value[3])
+            overflow.append((left, bottom, right, top))
+        return tuple(overflow)
+    
+    @objc.python_method
+    def _cell_overflow(self, version, cell):
+        """由圖層版本簽章中的字身寬度與邊界計算墨跡超出格子的距離"""
+        _, glyphWidth, bounds = version
+        if not bounds or (not bounds[2] and not bounds[3]):
+            return (0, 0, 0, 0)
+        inkBounds = (bounds[0], bounds[1], bounds[0] + bounds[2], bounds[1] + bounds[3])
+        scale, x, y = self._cell_transform(
+            glyphWidth, inkBounds if self._ink_reference else None, cell
+        )
+        return (
+            max(0, cell.left - (x + inkBounds[0] * scale)),
+            max(0, cell.bottom - (y + inkBounds[1] * scale)),
+            max(0, x + inkBounds[2] * scale - cell.right),
+            max(0, y + inkBounds[3] * scale - cell.top)
+        )
+    
+    def _build_positions(self, metrics, shape):
+        """建構各格子的位置資訊（復刻自原版公式，一般化為 N×M）"""
+        return compute_cell_positions(metrics, shape.rows, shape.columns)
+    
+    def _is_kerning_mode(self, strip_master_ids):
+        """檢查是否啟用字偶距排列模式（多主板並排時各主板字偶距不同，不套用）"""
+        return bool(getattr(self.plugin, 'kerningRowMode', False)) and not strip_master_ids
+    
+    def _get_kerning_revision(self, strip_master_ids):
+        """取得字偶距查詢表版本（字偶距模式外固定為 None，不影響佈局快取）"""
+        if not self._is_kerning_mode(strip_master_ids):
+            return None
+        from ..core.kerning_table import get_kerning_pair_table
+        return get_kerning_pair_table().revision
+    
+    def _build_kerned_positions(self, metrics, shape, display_chars, font, master):
+        """建構字偶距排列模式的位置資訊（每列依字身寬度與字偶距排成一行文字）
+        
+        每個格子的範圍為字符的字身框；另附 transform (scale, x, y) 供繪製與匯出直接使用。
+        空白格保留一個基準寬度的間隔，且不與前一個字符計算字偶距。
+        """
+        from ..core.kerning_table import get_kerning_pair_table
+        from ..core.font_identity import get_font_token
+        kerning_table = get_kerning_pair_table()
+        
+        # 字偶距版本、網格度量、字符與其寬度皆未變時沿用上次的格子
+        widths = tuple(
+            self._get_advance_width(font, master, char_or_name) if char_or_name else None
+            for char_or_name in display_chars
+        )
+        cache_key = (
+            get_font_token(font), master.id, kerning_table.revision,
+            metrics, shape.key, tuple(display_chars), widths
+        )
+        cached = self._kerned_positions_cache
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+        
+        scale = metrics.scale
+        gap = metrics.cell_width / scale if scale > 0 else 0
+        rowHeight = metrics.grid_height / shape.rows
+        cellHeight = rowHeight - metrics.spacing
+        
+        # 第一輪：計算每列各字符的原點與列寬（字型單位）
+        rows = []
+        maxRowWidth = 0
+        for row in range(shape.rows):
+            entries = []
+            penX = 0
+            previous = None
+            for col in range(shape.columns):
+                index = row * shape.columns + col
+                char_or_name = display_chars[index] if index < len(display_chars) else None
+                if char_or_name:
+                    if previous:
+                        penX += kerning_table.get_pair(font, master.id, previous, char_or_name)
+                    advance = self._get_advance_width(font, master, char_or_name)
+                else:
+                    advance = gap
+                entries.append((penX, advance))
+                penX += advance
+                previous = char_or_name
+            rows.append((entries, penX))
+            maxRowWidth = max(maxRowWidth, penX)
+        
+        # 所有列共用同一縮放比例，列寬超出網格寬度時縮小
+        glyphHeight = self.cachedHeight
+        textScale = min(
+            metrics.grid_width / maxRowWidth if maxRowWidth > 0 else 1,
+            cellHeight / glyphHeight if glyphHeight > 0 else 1
+        )
+        
+        # 第二輪：轉換為視圖座標（每列水平置中）
+        positions = []
+        for row, (entries, rowWidth) in enumerate(rows):
+            centerY = metrics.start_y - (row + 0.5) * rowHeight
+            originY = centerY - glyphHeight * textScale / 2
+            rowStartX = metrics.start_x + (metrics.grid_width - rowWidth * textScale) / 2
+            for penX, advance in entries:
+                originX = rowStartX + penX * textScale
+                cellWidth = advance * textScale
+                positions.append(GridCell(
+                    originX + cellWidth / 2, centerY, cellWidth, cellHeight,
+                    (textScale, originX, originY)
+                ))
+        positions = tuple(positions)
+        self._kerned_positions_cache = (cache_key, positions)
+        return positions
+    
+    def _get_advance_width(self, font, master, char_or_name):
+        """取得字符的字身寬度（依圖層版本快取；圖層編輯後自動重新讀取）
+        
+        快取項目為 (圖層版本, 寬度)，版本不符時先查詢磁碟快取記錄的圖層度量，再讀取圖層
+        """
+        from ..core.outline_geometry import layer_version
+        glyph = get_glyphs_service().get_glyph_from_font(font, char_or_name)
+        layer = glyph.layers[master.id] if glyph else None
+        if not layer:
+            return 0
+        
+        version = layer_version(layer)
+        cache_key = (char_or_name, master.id)
+        cached = self._advance_width_cache.get(cache_key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        from ..core.index_store import get_glyph_index_store
+        store = get_glyph_index_store()
+        metrics = store.get_layer_metrics(font, glyph.name, master.id, version)
+        if metrics is not None:
+            width = metrics[0]
+        else:
+            width = layer.width
+            store.record_layer_metrics(font, glyph.name, master.id, width=width, version=version)
+        self._advance_width_cache[cache_key] = (version, width)
+        return width
+    
     def _calculate_grid_metrics(self, rect, display_chars, currentMaster, font):
         """計算網格度量（採用官方模式參數傳遞）"""
         try:
@@ -394,9 +869,9 @@ class NineBoxPreviewView(NSView):
             if rect.size.width <= 0 or rect.size.height <= 0:
                 return None
             
-            # 計算字符高度和邊距
+            # 計算字符高度
             self.cachedHeight = currentMaster.ascender - currentMaster.descender
-            MARGIN = min(rect.size.width, rect.size.height) * MARGIN_RATIO
+            self._ink_reference = None
             
             # === 使用 getBaseWidth 方法取得基準寬度 ===
             try:
@@ -410,107 +885,206 @@ class NineBoxPreviewView(NSView):
                 baseWidth = 1000
             
             # === 計算最大字身寬度（僅使用 layer.width）===
+            # 所有格子（含中央格）的字符皆納入；寬度經快取，只有新字符需要查詢
             maxWidth = 0
+            shape = get_grid_shape()
             
-            # 考慮周圍字符的寬度（過濾掉 None 值）
             if display_chars:
-                # 透過統一服務獲取字符
-                glyphs_service = get_glyphs_service()
                 for char in display_chars:
-                    if char is not None:  # 只處理非 None 的字符
-                        glyph = glyphs_service.get_glyph_from_font(font, char)
-                        if glyph and glyph.layers[currentMaster.id]:
-                            # 僅使用 layer.width（字身寬度）
-                            layer_width = glyph.layers[currentMaster.id].width
-                            maxWidth = max(maxWidth, layer_width)
-            
-            # 減法優化：移除即時字符獲取，改用現有排列中的字符
-            # 原本每次 drawRect_ 都重新獲取 selectedLayers，是性能殺手
-            # 改為直接從 currentArrangement 中獲取中央字符
-            if hasattr(self, '_currentArrangement') and len(self._currentArrangement) > 4:
-                center_char = self._currentArrangement[4]  # 中央位置
-                if center_char:
-                    # 透過統一服務獲取字符
-                    glyph = glyphs_service.get_glyph_from_font(font, center_char)
-                    if glyph and glyph.layers[currentMaster.id]:
-                        center_width = glyph.layers[currentMaster.id].width
-                        maxWidth = max(maxWidth, center_width)
+                    if char:  # 只處理非空的字符
+                        maxWidth = max(maxWidth, self._get_advance_width(font, currentMaster, char))
+            
+            # === 墨跡邊界模式：以網格聯集邊界決定參考寬度與高度 ===
+            if self._is_ink_bounds_mode():
+                reference = self._update_ink_reference(display_chars, currentMaster, font, shape)
+                if reference:
+                    self._ink_reference = reference
+                    self.cachedHeight = reference[3] - reference[1]
+                    maxWidth = max(reference[2] - reference[0], 0)
             
             # 如果沒有有效字符或所有字符寬度為0，則使用 baseWidth
             if maxWidth == 0:
                 maxWidth = baseWidth
             
-            # 基於字身寬度計算間距
-            SPACING = maxWidth * SPACING_RATIO
-            
-            # 計算單元格寬度（基於字身寬度）
-            cellWidth = maxWidth + SPACING
-            
-            # 計算網格總寬度和高度
-            gridWidth = 3 * cellWidth + 2 * SPACING
-            gridHeight = 3 * self.cachedHeight + 2 * SPACING
-            
-            # 計算縮放比例（移除 zoomFactor，只使用自適應縮放）
-            availableWidth = rect.size.width - 2 * MARGIN
-            availableHeight = rect.size.height - 2 * MARGIN
-            scale = min(availableWidth / gridWidth, availableHeight / gridHeight, 1.0)
-            
-            # 更新網格尺寸
-            cellWidth *= scale
-            gridWidth *= scale
-            gridHeight *= scale
-            SPACING *= scale
-            
-            # === 計算繪製起始位置（固定的佈局）===
-            startX = rect.size.width / 2 - gridWidth / 2
-            offsetY = rect.size.height * 0.02  # 向上偏移 2%
-            startY = (rect.size.height + gridHeight) / 2 + offsetY
-            
-            # 回傳穩定的網格度量
-            metrics = {
-                'cellWidth': cellWidth,
-                'gridWidth': gridWidth,
-                'gridHeight': gridHeight,
-                'SPACING': SPACING,
-                'startX': startX,
-                'startY': startY,
-                'scale': scale
-            }
-            
-            return metrics
+            # 間距、縮放與起始位置為純計算（不存取字型）
+            return compute_grid_metrics(
+                rect.size.width, rect.size.height, maxWidth, self.cachedHeight,
+                shape.rows, shape.columns, self._ink_reference
+            )
         
         except Exception:
             print(traceback.format_exc())
             return None
     
-    def _draw_character_at_position(self, layer, centerX, centerY, cellWidth, cellHeight, _scale, is_black):
-        """繪製單個字符（完全復刻原版智慧縮放邏輯）"""
+    def _is_ink_bounds_mode(self):
+        """檢查是否啟用墨跡邊界佈局模式"""
+        return bool(getattr(self.plugin, 'inkBoundsMode', False))
+    
+    def _get_ink_bounds(self, layer):
+        """取得圖層的墨跡邊界（外框幾何快取依圖層版本保存，不會重複計算外框）
+        
+        磁碟快取記錄過的邊界在圖層版本相符時直接使用，不必建立外框幾何
+        """
         if not layer:
-            return
+            return None
+        from ..core.outline_geometry import get_geometry_cache, layer_version
+        from ..core.index_store import get_glyph_index_store
+        store = get_glyph_index_store()
+        glyph = getattr(layer, 'parent', None)
+        font = getattr(glyph, 'parent', None) if glyph else None
+        name = getattr(glyph, 'name', None) if glyph else None
+        master_id = getattr(layer, 'associatedMasterId', None)
         
+        version = layer_version(layer)
+        metrics = store.get_layer_metrics(font, name, master_id, version) if name else None
+        if metrics is not None and metrics[1] is not None:
+            return metrics[1]
+        
+        bounds = get_geometry_cache().get(layer).bounds()
+        if bounds is not None and name:
+            store.record_layer_metrics(font, name, master_id, bounds=bounds, version=version)
+        return bounds
+    
+    def _update_ink_reference(self, display_chars, currentMaster, font, shape):
+        """增量更新網格聯集邊界，並與主板上下緣合併為參考邊界
+        
+        以各格子的圖層版本（與外框幾何快取相同的鍵）判斷是否需要重新計算：
+        版本全部相同時直接沿用上次的參考邊界，否則只讀取版本改變的格子的邊界
+        
+        Returns:
+            tuple or None: (xMin, yMin, xMax, yMax)，所有格子皆無墨跡時為 None
+        """
         try:
-            # === 佈局計算：僅使用字身寬度（layer.width）===
-            glyphWidth = layer.width  # 字身寬度（advance width）- 佈局的唯一依據
-            glyphHeight = self.cachedHeight
-            
-            # 計算字符縮放比例（基於字身寬度）
-            scaleX = cellWidth / glyphWidth if glyphWidth > 0 else 1
-            scaleY = cellHeight / glyphHeight if glyphHeight > 0 else 1
-            glyphScale = min(scaleX, scaleY)
-            
-            # === 位置計算：完全基於字身寬度，確保穩定置中 ===
-            scaledWidth = glyphWidth * glyphScale
-            scaledHeight = glyphHeight * glyphScale
+            from ..core.ink_bounds import get_ink_bounds_tracker
+            from ..core.outline_geometry import layer_version
+            glyphs_service = get_glyphs_service()
             
-            # 計算繪製起始位置（穩定的置中，不受路徑變化影響）
-            x = centerX - scaledWidth / 2
-            y = centerY - scaledHeight / 2
+            layers = []
+            versions = []
+            for position in range(shape.total):
+                char_or_name = display_chars[position] if position < len(display_chars) else None
+                layer = None
+                if char_or_name:
+                    glyph = glyphs_service.get_glyph_from_font(font, char_or_name)
+                    if glyph:
+                        layer = glyph.layers[currentMaster.id]
+                layers.append(layer)
+                versions.append((char_or_name, layer_version(layer)) if layer else None)
+            
+            master_key = (currentMaster.id, currentMaster.ascender, currentMaster.descender)
+            cache_key = (master_key, tuple(versions))
+            previous_key = self._ink_reference_key
+            if cache_key == previous_key:
+                return self._ink_reference_cached
+            
+            tracker = get_ink_bounds_tracker()
+            tracker.resize(shape.total)
+            previous = None
+            if previous_key is not None and previous_key[0][0] == currentMaster.id:
+                previous = previous_key[1]
+                if len(previous) != len(versions):
+                    previous = None
+            
+            for position, version in enumerate(versions):
+                if previous is not None and previous[position] == version:
+                    continue
+                tracker.update_cell(position, self._get_ink_bounds(layers[position]))
+            
+            union = tracker.get_union()
+            reference = None
+            if union is not None:
+                # 垂直方向至少涵蓋主板上下緣，維持不同排列間的基線穩定
+                reference = (
+                    union[0],
+                    min(union[1], currentMaster.descender),
+                    union[2],
+                    max(union[3], currentMaster.ascender)
+                )
+            self._ink_reference_key = cache_key
+            self._ink_reference_cached = reference
+            return reference
             
-            # 建立變換矩陣
-            transform = NSAffineTransform.transform()
-            transform.translateXBy_yBy_(x, y)
-            transform.scaleBy_(glyphScale)
+        except Exception:
+            print(traceback.format_exc())
+            return None
+    
+    def _cell_transform(self, glyphWidth, inkBounds, cell, offsetX=0):
+        """計算字形放入格子的變換 (scale, x, y)（繪製與向量匯出共用）"""
+        from ..core.vector_export import cell_transform, ink_cell_transform
+        
+        fixed = cell.transform
+        if fixed:
+            # 字偶距排列模式：位置已由整列排版決定
+            glyphScale, x, y = fixed
+            return glyphScale, x + offsetX, y
+        
+        centerX = cell.center_x + offsetX
+        centerY = cell.center_y
+        cellWidth = cell.cell_width
+        cellHeight = cell.cell_height
+        
+        if inkBounds is not None and self._ink_reference:
+            # 墨跡邊界模式：墨跡水平置中，垂直對齊網格參考邊界
+            return ink_cell_transform(
+                inkBounds, self._ink_reference, centerX, centerY, cellWidth, cellHeight
+            )
+        
+        # 僅使用字身寬度（layer.width）
+        return cell_transform(
+            glyphWidth, self.cachedHeight, centerX, centerY, cellWidth, cellHeight
+        )
+    
+    @objc.python_method
+    def _draw_copy_snapshot(self, glyph_name, cell, is_black, font, currentMaster, tracker):
+        """以路徑快照繪製互動模式中被編輯字符的重複副本
+        
+        快照過期（超過副本更新間隔）時才重新讀取圖層路徑，
+        同一次繪製中的其他副本共用同一份快照
+        
+        Returns:
+            bool: True 如果已繪製（False 時改走一般繪製流程）
+        """
+        try:
+            key = (glyph_name, currentMaster.id)
+            snapshot = self._copy_snapshots.get(key)
+            if snapshot is None or not tracker.snapshot_is_fresh(snapshot[0]):
+                glyph = font.glyphs[glyph_name]
+                layer = glyph.layers[currentMaster.id] if glyph else None
+                if not layer:
+                    return False
+                fill_path = layer.completeBezierPath
+                open_path = layer.completeOpenBezierPath
+                if fill_path is None or fill_path.isEmpty():
+                    fill_path = layer.bezierPath
+                if (fill_path is None or fill_path.isEmpty()) and (open_path is None or open_path.isEmpty()):
+                    return False
+                snapshot = (
+                    tracker.now(),
+                    layer.width,
+                    fill_path.copy() if fill_path is not None else None,
+                    open_path.copy() if open_path is not None else None,
+                    self._get_ink_bounds(layer) if self._ink_reference else None
+                )
+                self._copy_snapshots[key] = snapshot
+            
+            _, width, fill_path, open_path, inkBounds = snapshot
+            self._draw_paths_at_position(
+                fill_path, open_path,
+                self._cell_transform(width, inkBounds, cell),
+                is_black
+            )
+            return True
             
+        except Exception:
+            print(traceback.format_exc())
+            return False
+    
+    def _draw_character_at_position(self, layer, cell, is_black, offsetX=0):
+        """繪製單個字符（完全復刻原版智慧縮放邏輯；offsetX 為多主板並排的水平位移）"""
+        if not layer:
+            return
+        
+        try:
             # === 內容繪製：使用 completeBezierPath 顯示實際字形 ===
             completeBezierPath = layer.completeBezierPath
             completeOpenBezierPath = layer.completeOpenBezierPath
@@ -524,10 +1098,30 @@ class NineBoxPreviewView(NSView):
                 # 嘗試 bezierPath (不含組件)
                 bezierPath = layer.bezierPath
                 if bezierPath and not bezierPath.isEmpty():
-                    completeBezierPath = bezierPath.copy()
+                    completeBezierPath = bezierPath
                 else:
                     return
             
+            inkBounds = self._get_ink_bounds(layer) if self._ink_reference else None
+            self._draw_paths_at_position(
+                completeBezierPath, completeOpenBezierPath,
+                self._cell_transform(layer.width, inkBounds, cell, offsetX),
+                is_black
+            )
+            
+        except Exception:
+            print(traceback.format_exc())
+    
+    def _draw_paths_at_position(self, completeBezierPath, completeOpenBezierPath, cellTransform, is_black):
+        """依格子變換 (scale, x, y) 將路徑縮放定位並繪製（路徑不會被修改）"""
+        try:
+            glyphScale, x, y = cellTransform
+            
+            # 建立變換矩陣
+            transform = NSAffineTransform.transform()
+            transform.translateXBy_yBy_(x, y)
+            transform.scaleBy_(glyphScale)
+            
             if completeBezierPath and not completeBezierPath.isEmpty():
                 completeBezierPath = completeBezierPath.copy()
                 completeBezierPath.transformUsingAffineTransform_(transform)
@@ -571,100 +1165,116 @@ class NineBoxPreviewView(NSView):
         except:
             return True  # 例外時假設在 Font View
     
-    def _get_visible_tab_layers(self):
-        """取得當前分頁中可見的圖層列表（Edit View 專用，透過統一服務）"""
+    def _find_layer_in_current_tab(self, char_or_name):
+        """在當前分頁中尋找匹配的圖層（Edit View 專用，透過分頁圖層索引）"""
         try:
             glyphs_service = get_glyphs_service()
-            return glyphs_service.get_visible_tab_layers()
+            return glyphs_service.find_layer_in_current_tab(char_or_name)
             
         except Exception:
             print(traceback.format_exc())
-            return []
+            return None
     
-    def _find_layer_in_tab_layers(self, char_or_name, visible_layers):
-        """在分頁圖層中尋找匹配的圖層（Edit View 專用）"""
+    def _get_strip_master_ids(self, font):
+        """取得多主板並排模式的主板 ID 列表（未啟用或單一主板時為空）"""
         try:
-            if not visible_layers or not char_or_name:
-                return None
-            
-            # 按順序檢查每個可見圖層
-            for layer in visible_layers:
-                if not layer or not hasattr(layer, 'parent'):
-                    continue
-                
-                glyph = layer.parent
-                if not glyph:
-                    continue
-                
-                # 檢查字符匹配
-                if self._does_glyph_match_char(glyph, char_or_name):
-                    return layer
-            
-            return None
-            
+            if not getattr(self.plugin, 'masterStripMode', False):
+                return []
+            masters = font.masters if font else None
+            if not masters or len(masters) < 2:
+                return []
+            return [master.id for master in masters]
         except Exception:
             print(traceback.format_exc())
-            return None
+            return []
     
-    def _does_glyph_match_char(self, glyph, char_or_name):
-        """檢查字符是否匹配（Edit View 備份邏輯專用）"""
+    def _draw_master_strip_with_layout(self, layout, is_black, font):
+        """多主板並排繪製（共用佈局，路徑取自按主板分區的快取）"""
         try:
-            if not glyph or not char_or_name:
-                return False
-            
-            # 檢查字符名稱匹配
-            if hasattr(glyph, 'name') and glyph.name == char_or_name:
-                return True
-            
-            # 檢查 Unicode 匹配
-            if hasattr(glyph, 'unicode') and glyph.unicode:
-                try:
-                    unicode_char = chr(int(glyph.unicode, 16))
-                    if unicode_char == char_or_name:
-                        return True
-                except (ValueError, TypeError):
-                    pass
-            
-            # 檢查單字符直接匹配
-            if len(char_or_name) == 1:
-                try:
-                    char_unicode = ord(char_or_name)
-                    if hasattr(glyph, 'unicode') and glyph.unicode:
-                        glyph_unicode = int(glyph.unicode, 16)
-                        if char_unicode == glyph_unicode:
-                            return True
-                except (ValueError, TypeError):
-                    pass
+            from ..core.master_strip import get_master_path_cache
+            path_cache = get_master_path_cache()
+            glyphs_service = get_glyphs_service()
             
-            return False
+            cells = layout.cells
+            arrangement = layout.arrangement
+            center = get_grid_shape().center
             
+            for tile in layout.tiles:
+                master_id = tile.master_id
+                offsetX = tile.offset_x
+                
+                for i, cell in enumerate(cells):
+                    char_or_name = arrangement[i] if i < len(arrangement) else None
+                    if not char_or_name:
+                        continue
+                    
+                    # 虛擬化繪製：跳過不在重繪範圍內的格子
+                    if not self.needsToDrawRect_(layout.dirty_rect(i, offsetX)):
+                        continue
+                    
+                    if i == center:
+                        # 中央格：與單一主板相同的 Light Table 與分頁備份機制（不經路徑快取）
+                        layer = self._resolve_center_layer(char_or_name, font, master_id)
+                        self._draw_character_at_position(layer, cell, is_black, offsetX)
+                        continue
+                    
+                    entry = path_cache.get(master_id, char_or_name)
+                    if entry is None:
+                        layer = None
+                        glyph = glyphs_service.get_glyph_from_font(font, char_or_name)
+                        if glyph:
+                            layer = glyph.layers[master_id]
+                        entry = path_cache.store(master_id, char_or_name, layer)
+                    
+                    glyphWidth, fillPath, openPath = entry
+                    if fillPath is None and openPath is None:
+                        continue
+                    
+                    inkBounds = None
+                    if self._ink_reference:
+                        glyph = glyphs_service.get_glyph_from_font(font, char_or_name)
+                        inkBounds = self._get_ink_bounds(glyph.layers[master_id] if glyph else None)
+                    
+                    self._draw_paths_at_position(
+                        fillPath, openPath,
+                        self._cell_transform(glyphWidth, inkBounds, cell, offsetX),
+                        is_black
+                    )
+                    
         except Exception:
             print(traceback.format_exc())
-            return False
     
     def _draw_grid_with_layout(self, layout, is_black, font, currentMaster):
         """使用佈局設計繪製九宮格（整合中央格進階邏輯）"""
         try:
-            positions = layout['positions']
-            arrangement = layout['arrangement']
-            
-            # === 繪製九宮格字符 ===
-            for i in range(len(positions)):
-                position_info = positions[i]
+            arrangement = layout.arrangement
+            center = get_grid_shape().center
+            
+            # 拖曳節點的互動模式：被編輯字符的重複副本沿用路徑快照
+            from ..core.interactive_edit import get_interactive_edit_tracker
+            tracker = get_interactive_edit_tracker()
+            edited_names = tracker.glyph_names if tracker.active else ()
+            
+            # === 繪製網格字符 ===
+            for i, cell in enumerate(layout.cells):
+                # 虛擬化繪製：跳過不在重繪範圍內的格子（不查詢字符）
+                if not self.needsToDrawRect_(layout.dirty_rect(i)):
+                    continue
+                
+                if i != center and edited_names:
+                    glyph_name = self._cell_index.name_at(i)
+                    if glyph_name in edited_names and self._draw_copy_snapshot(
+                            glyph_name, cell, is_black, font, currentMaster, tracker):
+                        continue
                 
                 # 從排列中取得字符
                 char_or_name = arrangement[i] if i < len(arrangement) else None
                 
                 layer = None
                 if char_or_name is not None:
-                    if i == CENTER_POSITION:
+                    if i == center:
                         # 中央格：根據視圖模式選擇策略
-                        if self._is_in_font_view():
-                            # Font View: 使用簡化邏輯（Light Table → 標準快取）
-                            layer = self._get_center_layer(char_or_name, font)
-                        else:
-                            # Edit View: 使用完整備份機制（Light Table → tab.layers → 標準快取）
-                            layer = self._get_center_layer_with_backup(char_or_name, font)
+                        layer = self._resolve_center_layer(char_or_name, font)
                     else:
                         # 周圍格：透過統一服務獲取
                         glyphs_service = get_glyphs_service()
@@ -675,15 +1285,7 @@ class NineBoxPreviewView(NSView):
                 # 繪製字符（如果有有效的layer）
                 if layer:
                     # 繪製字符
-                    self._draw_character_at_position(
-                        layer, 
-                        position_info['centerX'], 
-                        position_info['centerY'], 
-                        position_info['cellWidth'], 
-                        position_info['cellHeight'], 
-                        layout['metrics']['scale'], 
-                        is_black
-                    )
+                    self._draw_character_at_position(layer, cell, is_black)
                 else:
                     # None 值或無效字符：完全不繪製任何內容，保持背景色
                     pass
@@ -831,12 +1433,152 @@ class NineBoxPreviewView(NSView):
         except Exception:
             print(traceback.format_exc())
     
+    # ==========================================================================
+    # 向量匯出（SVG / PDF）
+    # ==========================================================================
+    
+    def iter_export_cells(self):
+        """逐格產生匯出資料（共用預覽佈局與外框幾何快取）
+        
+        Yields:
+            tuple: (commands, scale, dx, dy)，變換與預覽繪製相同
+        """
+        glyphs_service = get_glyphs_service()
+        font, currentMaster = glyphs_service.get_current_font_context()
+        layout = self._calculate_layout()
+        if not font or not currentMaster or not layout:
+            return
+        
+        from ..core.outline_geometry import get_geometry_cache
+        geometry_cache = get_geometry_cache()
+        arrangement = layout.arrangement
+        center = get_grid_shape().center
+        tiles = layout.tiles or (GridTile(currentMaster.id, 0),)
+        
+        for tile in tiles:
+            master_id = tile.master_id
+            for i, cell in enumerate(layout.cells):
+                char_or_name = arrangement[i] if i < len(arrangement) else None
+                if not char_or_name:
+                    continue
+                
+                if i == center:
+                    # 中央格沿用預覽的備份機制（快取以圖層版本判斷是否需要重建）
+                    layer = self._resolve_center_layer(char_or_name, font, master_id)
+                else:
+                    glyph = glyphs_service.get_glyph_from_font(font, char_or_name)
+                    layer = glyph.layers[master_id] if glyph else None
+                
+                geometry = geometry_cache.get(layer)
+                if geometry.is_empty():
+                    continue
+                inkBounds = geometry.bounds() if self._ink_reference else None
+                scale, dx, dy = self._cell_transform(
+                    geometry.width, inkBounds, cell, tile.offset_x
+                )
+                yield (geometry.iter_commands(), scale, dx, dy)
+    
+    def export_to_path(self, path):
+        """將目前的排列匯出為 SVG 或 PDF（依副檔名決定格式）
+        
+        Args:
+            path (str): 輸出檔案路徑
+            
+        Returns:
+            bool: True 如果匯出成功
+        """
+        try:
+            from ..core.vector_export import export_cells_to_path, format_for_path
+            if not format_for_path(path):
+                return False
+            
+            # 寫入暫存檔後才取代目標檔案（失敗時不留下不完整的檔案）
+            frame = self.frame()
+            export_cells_to_path(
+                path,
+                frame.size.width, frame.size.height,
+                self.iter_export_cells(),
+                self._get_theme_is_black()
+            )
+            return True
+            
+        except Exception:
+            print(traceback.format_exc())
+            return False
+    
+    def exportPreview_(self, sender):
+        """匯出預覽動作處理（顯示儲存對話框）"""
+        try:
+            from AppKit import NSSavePanel, NSModalResponseOK
+            export_format = sender.representedObject() or 'svg'
+            
+            panel = NSSavePanel.savePanel()
+            panel.setAllowedFileTypes_([export_format])
+            panel.setNameFieldStringValue_("NineBoxView.%s" % export_format)
+            if panel.runModal() == NSModalResponseOK:
+                self.export_to_path(panel.URL().path())
+        except Exception:
+            print(traceback.format_exc())
+    
+    def setGridSize_(self, sender):
+        """變更網格大小動作處理"""
+        try:
+            from ..core.grid_shape import parse_grid_shape_key
+            shape = parse_grid_shape_key(sender.representedObject())
+            if shape and hasattr(self.plugin, 'set_grid_dimensions'):
+                self.plugin.set_grid_dimensions(shape.rows, shape.columns)
+        except Exception:
+            print(traceback.format_exc())
+    
+    def toggleKerningRows_(self, sender):
+        """切換字偶距排列模式動作處理"""
+        try:
+            if hasattr(self.plugin, 'toggle_kerning_row_mode'):
+                self.plugin.toggle_kerning_row_mode()
+        except Exception:
+            print(traceback.format_exc())
+    
+    def toggleInkBoundsLayout_(self, sender):
+        """切換墨跡邊界佈局模式動作處理"""
+        try:
+            if hasattr(self.plugin, 'toggle_ink_bounds_mode'):
+                self.plugin.toggle_ink_bounds_mode()
+        except Exception:
+            print(traceback.format_exc())
+    
+    def toggleMasterStrip_(self, sender):
+        """切換多主板並排預覽動作處理"""
+        try:
+            if hasattr(self.plugin, 'toggle_master_strip_mode'):
+                self.plugin.toggle_master_strip_mode()
+        except Exception:
+            print(traceback.format_exc())
+    
     
     # ==========================================================================
     # 中央格處理方法（整合 Light Table 支援）
     # ==========================================================================
     
-    def _get_center_layer(self, char_or_name, font):
+    def _resolve_center_layer(self, char_or_name, font, master_id=None):
+        """
+        取得中央格顯示圖層（依視圖模式選擇策略，單一主板、多主板並排與匯出共用）
+        
+        - Font View: 簡化邏輯（標準快取）
+        - Edit View: 完整備份機制（Light Table → tab.layers → 標準快取）
+        
+        Args:
+            char_or_name (str): 字符或字符名稱
+            font: 當前字型
+            master_id (str): 主板 ID，None 時使用選取的主板
+            
+        Returns:
+            GSLayer or None: 中央格要顯示的圖層
+        """
+        if self._is_in_font_view():
+            return self._get_center_layer(char_or_name, font, master_id)
+        return self._get_center_layer_with_backup(char_or_name, font, master_id)
+    
+    def _get_center_layer(self, char_or_name, font, master_id=None):
         """
         取得中央格顯示圖層（Font View 簡化版本）
         
@@ -845,6 +1587,7 @@ class NineBoxPreviewView(NSView):
         Args:
             char_or_name (str): 字符或字符名稱
             font: 當前字型
+            master_id (str): 主板 ID，None 時使用選取的主板
             
         Returns:
             GSLayer or None: 中央格要顯示的圖層
@@ -853,12 +1596,14 @@ class NineBoxPreviewView(NSView):
             # 基本類型檢查
             if not isinstance(char_or_name, str):
                 return None
-                        
+            
+            master_id = master_id or (font.selectedFontMaster.id if font.selectedFontMaster else None)
+            
             # 透過統一服務獲取字符
             glyphs_service = get_glyphs_service()
             glyph = glyphs_service.get_glyph_from_font(font, char_or_name)
-            if glyph and font.selectedFontMaster:
-                return glyph.layers[font.selectedFontMaster.id]
+            if glyph and master_id:
+                return glyph.layers[master_id]
             
             return None
                 
@@ -866,7 +1611,7 @@ class NineBoxPreviewView(NSView):
             print(traceback.format_exc())
             return None
     
-    def _get_center_layer_with_backup(self, char_or_name, font):
+    def _get_center_layer_with_backup(self, char_or_name, font, master_id=None):
         """
         取得中央格顯示圖層（Edit View 完整備份版本）
         
@@ -878,6 +1623,7 @@ class NineBoxPreviewView(NSView):
         Args:
             char_or_name (str): 字符或字符名稱
             font: 當前字型
+            master_id (str): 主板 ID，None 時使用選取的主板
             
         Returns:
             GSLayer or None: 中央格要顯示的圖層
@@ -887,6 +1633,8 @@ class NineBoxPreviewView(NSView):
             if not isinstance(char_or_name, str):
                 return None
             
+            master_id = master_id or (font.selectedFontMaster.id if font.selectedFontMaster else None)
+            
             # === 第一層：Light Table 比較版本 ===
             from ..core.light_table_support import should_use_comparison_version, get_comparison_font
             
@@ -895,24 +1643,23 @@ class NineBoxPreviewView(NSView):
                 if comparison_font:
                     glyphs_service = get_glyphs_service()
                     glyph = glyphs_service.get_glyph_from_font(comparison_font, char_or_name)
-                    if glyph and font.selectedFontMaster:
+                    if glyph and master_id:
                         try:
-                            return glyph.layers[font.selectedFontMaster.id]
+                            return glyph.layers[master_id]
                         except (KeyError, IndexError):
                             # Master ID 不匹配時使用第一個圖層
                             return glyph.layers[0] if glyph.layers else None
             
-            # === 第二層：tab.layers 備份機制（Edit View 專用）===
-            visible_layers = self._get_visible_tab_layers()
-            layer = self._find_layer_in_tab_layers(char_or_name, visible_layers)
-            if layer:
+            # === 第二層：tab.layers 備份機制（Edit View 專用，僅採用屬於該主板的分頁圖層）===
+            layer = self._find_layer_in_current_tab(char_or_name)
+            if layer and getattr(layer, 'associatedMasterId', master_id) == master_id:
                 return layer
             
             # === 第三層：標準 cache 機制 ===
             glyphs_service = get_glyphs_service()
             glyph = glyphs_service.get_glyph_from_font(font, char_or_name)
-            if glyph and font.selectedFontMaster:
-                return glyph.layers[font.selectedFontMaster.id]
+            if glyph and master_id:
+                return glyph.layers[master_id]
             
             return None
                 
@@ -27,6 +27,7 @@ class SearchTextView(NSTextView):
         if self:
             self.plugin = plugin
             self._programmatic_update = False  # 標記是否為程式化更新
+            self._last_text_length = 0  # 用於判斷是否為一般鍵入（觸發自動完成）
             self._setup_basic_properties()
             self._register_notifications()
             
@@ -84,26 +85,71 @@ class SearchTextView(NSTextView):
             # 保存當前游標位置
             current_selection = self.selectedRange()
             
-            # 執行即時字符驗證
+            # 如果是程式化更新，不驗證也不委派
             if not self._programmatic_update:
-                self._perform_real_time_validation()
-            
-            # 委派給事件處理器  
-            if (hasattr(self, 'plugin') and self.plugin and 
-                hasattr(self.plugin, 'event_handler')):
-                # 如果是程式化更新，直接返回
-                if not self._programmatic_update:
-                    self.plugin.event_handler.search_field_callback(self)
+                # 大量輸入先在背景執行緒斷詞並解析字符名稱，完成後才驗證並更新（鍵入不被阻塞）
+                from ..core.input_recognition import InputRecognitionService
+                text = self.string()
+                future = InputRecognitionService.tokenize_async(text, key='tokenize_search')
+                if future is None:
+                    self._process_text_change()
+                else:
+                    future.add_done_callback(lambda done: self._apply_deferred_text_change(text))
                     
             # 恢復游標位置
             self.setSelectedRange_(current_selection)
             
+            # 一般鍵入時提供字符名稱自動完成
+            if not self._programmatic_update:
+                self._trigger_completion(current_selection)
+            self._last_text_length = len(self.string())
+            
         except Exception:
             print(traceback.format_exc())
         
         # 避免 notification 參數未使用警告
         _ = notification
     
+    def _process_text_change(self):
+        """執行即時字符驗證並委派給事件處理器"""
+        self._perform_real_time_validation()
+        
+        if (hasattr(self, 'plugin') and self.plugin and 
+            hasattr(self.plugin, 'event_handler')):
+            self.plugin.event_handler.search_field_callback(self)
+    
+    @objc.python_method
+    def _apply_deferred_text_change(self, text):
+        """背景斷詞完成後處理文字變更（文字已再次變更時略過）"""
+        try:
+            if self.string() != text:
+                return
+            current_selection = self.selectedRange()
+            self._process_text_change()
+            self.setSelectedRange_(current_selection)
+        except Exception:
+            print(traceback.format_exc())
+    
+    def _trigger_completion(self, selection):
+        """鍵入名稱時顯示自動完成彈出視窗"""
+        try:
+            from ..core.glyph_completion import should_trigger_completion
+            text = self.string()
+            if should_trigger_completion(self._last_text_length, text, selection.location, selection.length):
+                self.complete_(None)
+        except Exception:
+            print(traceback.format_exc())
+    
+    def completionsForPartialWordRange_indexOfSelectedItem_(self, charRange, index):
+        """自動完成候選名稱（由字符索引以前綴查詢）"""
+        try:
+            from ..core.glyph_completion import completions_for_range
+            completions = completions_for_range(self.string(), charRange.location, charRange.length)
+            return completions, (0 if completions else -1)
+        except Exception:
+            print(traceback.format_exc())
+            return [], -1
+    
     def _perform_real_time_validation(self):
         """執行即時驗證並套用視覺標注（整合 VisualFeedbackService）"""
         try:
@@ -132,9 +178,13 @@ class SearchTextView(NSTextView):
                 valid_count = len(validation_result['valid_glyphs'])
                 invalid_count = len(validation_result['invalid_chars'])
                 if valid_count > 0:
-                    self.setToolTip_(f"搜尋文字：{valid_count} 個有效字符，{invalid_count} 個無效字符")
+                    tooltip = f"搜尋文字：{valid_count} 個有效字符，{invalid_count} 個無效字符"
                 else:
-                    self.setToolTip_(f"發現 {invalid_count} 個無效字符")
+                    tooltip = f"發現 {invalid_count} 個無效字符"
+                
+                # 附加「你是不是要找」建議
+                suggestions = VisualFeedbackService.get_suggestions(validation_result)
+                self.setToolTip_(VisualFeedbackService.append_suggestions_to_tooltip(tooltip, suggestions))
                 
         except Exception:
             print(traceback.format_exc())
@@ -179,15 +229,36 @@ class SearchTextView(NSTextView):
         """建立並返回搜尋文字框右鍵選單（官方推薦方式）"""
         try:
             from ..core.menu_manager import MenuManager
-            return MenuManager.create_text_field_menu(
+            from ..core.input_recognition import VisualFeedbackService
+            menu = MenuManager.create_text_field_menu(
                 self, 
                 include_glyph_picker=True, 
                 include_tab_actions=True
             )
+            
+            # 無效標記的「你是不是要找」建議
+            suggestions = VisualFeedbackService.get_suggestions_for_text(self.string())
+            return MenuManager.add_suggestion_items(menu, suggestions, self)
         except Exception:
             print(traceback.format_exc())
             return None
     
+    def applyGlyphSuggestion_(self, sender):
+        """以建議的字符名稱取代無效標記（支援復原）"""
+        try:
+            token, name = sender.representedObject()
+            from ..core.glyph_suggestions import find_token_range
+            token_range = find_token_range(self.string(), token)
+            if token_range is None:
+                return
+            
+            # 選取無效標記後以 insertText: 取代，觸發與手動編輯相同的流程
+            self.setSelectedRange_(token_range)
+            self.insertText_(name)
+            
+        except Exception:
+            print(traceback.format_exc())
+    
     def pickGlyphAction_(self, sender):
         """字符選擇器 action - 搜尋框特殊的多字符插入邏輯"""
         try:
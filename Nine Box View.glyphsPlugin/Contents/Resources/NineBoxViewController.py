@@ -11,9 +11,8 @@ import time
 import traceback
 from GlyphsApp import Glyphs
 
-# 平面座標系統常數
-GRID_TOTAL = 9  # 0-8 座標
-CENTER_POSITION = 4  # 中央位置
+# 平面座標系統：網格形狀（預設 3×3，0-8 座標）由 grid_shape 模組統一提供
+from NineBoxView.core.grid_shape import get_grid_shape, set_grid_shape
 
 # 匯入進階重繪支援
 try:
@@ -23,6 +22,10 @@ except ImportError:
     # 復原方案：可能在初始化期間
     GridManager = None
 
+# 已驗證輸入解析結果的保留數量上限
+MAX_VALIDATED_INPUTS = 32
+
+
 class NineBoxViewController:
     """
     九宮格外掛主控制器
@@ -46,9 +49,10 @@ class NineBoxViewController:
         self.name = self._parent_plugin.name
         
         # 三層架構：平面座標系統統一九宮格資料
-        self.base_glyphs = [''] * GRID_TOTAL      # 最底層：當前字符讀取（不持久化）
-        self.base_arrangement = [''] * GRID_TOTAL # 第二層：搜尋輸入框狀態（持久化）  
-        self.lock_inputs = [''] * GRID_TOTAL      # 最上層：鎖定輸入框狀態（持久化）
+        grid_total = get_grid_shape().total
+        self.base_glyphs = [''] * grid_total      # 最底層：當前字符讀取（不持久化）
+        self.base_arrangement = [''] * grid_total # 第二層：搜尋輸入框狀態（持久化）  
+        self.lock_inputs = [''] * grid_total      # 最上層：鎖定輸入框狀態（持久化）
         
         # 向後相容：保留舊的 grid 屬性（指向 base_arrangement）
         self.grid = self.base_arrangement
@@ -63,6 +67,22 @@ class NineBoxViewController:
         self.lastInput = ""
         self.isLockFieldsActive = True
         
+        # 多主板並排預覽模式
+        self.masterStripMode = False
+        
+        # 墨跡邊界佈局模式
+        self.inkBoundsMode = False
+        
+        # 字偶距排列模式
+        self.kerningRowMode = False
+        
+        # 預覽最高幀率（重繪排程器上限）
+        self.maxPreviewFPS = 60
+        
+        # 每份文件的狀態：目前作用中的字型序號與已驗證的輸入解析結果
+        self._active_font_serial = None
+        self._validated_inputs = {}
+        
         
         # 載入偏好設定
         self.loadPreferences()
@@ -112,18 +132,27 @@ class NineBoxViewController:
                 self.isLockFieldsActive = not old_clear_mode
             self.controlsPanelVisible = prefs.get_bool('controlsPanelVisible', False)
             self.controlsPanelWidth = prefs.get_int('controlsPanelWidth', 150)
+            self.masterStripMode = prefs.get_bool('masterStripMode', False)
+            self.inkBoundsMode = prefs.get_bool('inkBoundsMode', False)
+            self.kerningRowMode = prefs.get_bool('kerningRowMode', False)
+            self.maxPreviewFPS = prefs.get_int('maxPreviewFPS', 60)
             
             # 載入視窗狀態
             self.windowSize = prefs.get_size('windowSize', (500, 400))
             self.windowPosition = prefs.get_point('windowPosition', None)
             
+            # 載入網格形狀（需在陣列之前載入，陣列長度依形狀決定）
+            set_grid_shape(prefs.get_int('gridRows', 3), prefs.get_int('gridColumns', 3))
+            grid_total = get_grid_shape().total
+            self.base_glyphs = [''] * grid_total
+            
             # 載入兩層分離的資料結構
-            self.base_arrangement = prefs.get_grid('base_arrangement', [''] * GRID_TOTAL)  # 第一層：基礎排列
-            self.lock_inputs = prefs.get_grid('lock_inputs', [''] * GRID_TOTAL)            # 第二層：鎖定覆寫
+            self.base_arrangement = prefs.get_grid('base_arrangement', [''] * grid_total)  # 第一層：基礎排列
+            self.lock_inputs = prefs.get_grid('lock_inputs', [''] * grid_total)            # 第二層：鎖定覆寫
             
             # 向後相容性：如果存在舊的 grid 資料，遷移到新架構
             if prefs.has_key('grid') and not prefs.has_key('base_arrangement'):
-                old_grid = prefs.get_grid('grid', [''] * GRID_TOTAL)
+                old_grid = prefs.get_grid('grid', [''] * grid_total)
                 self.base_arrangement = old_grid[:]
             
         except Exception:
@@ -145,6 +174,12 @@ class NineBoxViewController:
             prefs.set_bool('isLockFieldsActive', self.isLockFieldsActive)
             prefs.set_bool('controlsPanelVisible', self.controlsPanelVisible)
             prefs.set_int('controlsPanelWidth', self.controlsPanelWidth)
+            prefs.set_bool('masterStripMode', self.masterStripMode)
+            prefs.set_bool('inkBoundsMode', self.inkBoundsMode)
+            prefs.set_bool('kerningRowMode', self.kerningRowMode)
+            prefs.set_int('maxPreviewFPS', self.maxPreviewFPS)
+            prefs.set_int('gridRows', get_grid_shape().rows)
+            prefs.set_int('gridColumns', get_grid_shape().columns)
             
             # 儲存視窗狀態
             prefs.set_size('windowSize', self.windowSize)
@@ -167,25 +202,28 @@ class NineBoxViewController:
         """取得中央格顯示的字符
         
         Returns:
-            str: 中央格字符（位置4）
+            str: 中央格字符（3×3 時為位置4）
         """
+        center = get_grid_shape().center
         # 兩層架構：優先鎖定層，否則使用基礎層
-        if self.lock_inputs[CENTER_POSITION]:
-            return self.lock_inputs[CENTER_POSITION]
-        return self.base_arrangement[CENTER_POSITION]
+        if self.lock_inputs[center]:
+            return self.lock_inputs[center]
+        return self.base_arrangement[center]
     
     def set_center_glyph(self, glyph):
         """設定中央格字符（操作基礎層）"""
-        self.base_arrangement[CENTER_POSITION] = glyph or ''
+        self.base_arrangement[get_grid_shape().center] = glyph or ''
     
     def _update_base_glyphs(self):
         """更新最底層 base_glyphs 陣列（全格位即時更新，不持久化）
         
-        所有 9 個位置都使用即時更新：
+        所有位置都使用即時更新：
         - 中央格：即時 get_selected_glyph() + 三層備份機制
         - 周圍格：即時標準模式重繪（基於中央格的相關字符）
         """
         try:
+            shape = get_grid_shape()
+            
             # 匯入必要模組（有條件匯入，避免測試環境報錯）
             try:
                 from NineBoxView.core.utils import FontManager
@@ -196,7 +234,7 @@ class NineBoxViewController:
             
             if not font or not master:
                 # 沒有有效字型時，清空 base_glyphs
-                self.base_glyphs = [''] * GRID_TOTAL
+                self.base_glyphs = [''] * shape.total
                 return
             
             # === 中央格：即時選擇 + 三層備份機制 ===
@@ -210,23 +248,14 @@ class NineBoxViewController:
                     # 三層備份機制：當沒有選中字符時的備份邏輯
                     center_char = self._get_center_char_with_backup(font, master)
             
-            self.base_glyphs[CENTER_POSITION] = center_char
-            
             # === 周圍格：簡化邏輯，直接使用當前字符填滿所有位置 ===
-            if center_char:
-                # 將當前字符填入所有周圍格
-                surrounding_positions = [0, 1, 2, 3, 5, 6, 7, 8]
-                for pos in surrounding_positions:
-                    self.base_glyphs[pos] = center_char
-            else:
-                # 中央格為空時，清空所有周圍格
-                for pos in [0, 1, 2, 3, 5, 6, 7, 8]:
-                    self.base_glyphs[pos] = ''
+            # 中央格為空時，所有周圍格同樣清空
+            self.base_glyphs = [center_char] * shape.total
                     
         except Exception:
             print(traceback.format_exc())
             # 例外時清空所有位置
-            self.base_glyphs = [''] * GRID_TOTAL
+            self.base_glyphs = [''] * get_grid_shape().total
     
     def _get_center_char_with_backup(self, font, master):
         """中央格三層備份機制（當沒有選中字符時使用）
@@ -309,6 +338,8 @@ class NineBoxViewController:
         # 確保 base_glyphs 是最新的（包括周圍格即時跟隨）
         self._update_base_glyphs()
         
+        shape = get_grid_shape()
+        
         # 第一層：從最底層 base_glyphs 開始
         arrangement = self.base_glyphs[:]
         
@@ -317,15 +348,15 @@ class NineBoxViewController:
         if self.lastInput:  # 有任何輸入內容就處理（恢復即時重繪）
             if self.has_valid_search_input():
                 # 有效輸入：使用搜尋排列結果
-                for pos in range(GRID_TOTAL):
+                for pos in range(shape.total):
                     if self.base_arrangement[pos]:
                         arrangement[pos] = self.base_arrangement[pos]
             # 無效輸入：保持 base_glyphs 即時內容（維持您的核心改進：與空輸入行為一致）
         
         # 第三層：只在上鎖狀態時套用鎖定覆寫層（排除中央格）
         if self.isLockFieldsActive:
-            for pos in range(GRID_TOTAL):
-                if pos != CENTER_POSITION and self.lock_inputs[pos]:
+            for pos in shape.surrounding_positions():
+                if self.lock_inputs[pos]:
                     # 顯示時解析鎖定輸入，取第一個有效字符
                     raw_input = self.lock_inputs[pos]
                     try:
@@ -345,9 +376,9 @@ class NineBoxViewController:
         if self.event_handler:
             current_glyph = self.event_handler.get_selected_glyph()
             if current_glyph:  # 即時字符選擇具有最高優先級
-                arrangement[CENTER_POSITION] = current_glyph
+                arrangement[shape.center] = current_glyph
             else:  # 沒有選中字符時，中央格始終為空
-                arrangement[CENTER_POSITION] = ''
+                arrangement[shape.center] = ''
         
         return arrangement
     
@@ -454,7 +485,7 @@ class NineBoxViewController:
             
             if not chars:
                 # 沒有可用字符時，基礎排列全部設為空字符
-                self.base_arrangement = [''] * GRID_TOTAL
+                self.base_arrangement = [''] * get_grid_shape().total
             else:
                 # 使用 GridManager 的隨機填充功能
                 if hasattr(self, 'grid_manager') and self.grid_manager:
@@ -473,15 +504,16 @@ class NineBoxViewController:
                         random_service = get_random_service()
                         if random_service:
                             # 填充整個基礎排列層（包含中央格）
-                            random_chars = random_service.create_non_repeating_batch(chars, GRID_TOTAL)
-                            for i in range(GRID_TOTAL):
+                            grid_total = get_grid_shape().total
+                            random_chars = random_service.create_non_repeating_batch(chars, grid_total)
+                            for i in range(grid_total):
                                 self.base_arrangement[i] = random_chars[i] if i < len(random_chars) else ''
                         else:
                             raise ImportError("隨機服務不可用")
                     except ImportError:
                         # 最終復原方案：簡單隨機分配到基礎排列層
                         import random
-                        for pos in range(GRID_TOTAL):
+                        for pos in range(get_grid_shape().total):
                             self.base_arrangement[pos] = random.choice(chars)
             
         except Exception:
@@ -531,8 +563,7 @@ class NineBoxViewController:
             # 有選擇當前字符時
             if self.lastInput:
                 # lastInput 有內容 → 使用內容填充
-                from NineBoxView.core.input_recognition import parse_glyph_input
-                chars = parse_glyph_input(self.lastInput, master=master)
+                chars = self._parse_input(self.lastInput, master=master)
                 if chars:
                     return chars  # 有效輸入：使用解析結果
                 else:
@@ -545,8 +576,7 @@ class NineBoxViewController:
             # 沒有選擇字符時
             if self.lastInput:
                 # lastInput 有內容 → 使用內容填充
-                from NineBoxView.core.input_recognition import parse_glyph_input
-                chars = parse_glyph_input(self.lastInput, master=master)
+                chars = self._parse_input(self.lastInput, master=master)
                 if chars:
                     return chars  # 有效輸入：使用解析結果
                 else:
@@ -570,8 +600,7 @@ class NineBoxViewController:
             return []
         
         try:
-            from NineBoxView.core.input_recognition import parse_glyph_input
-            return parse_glyph_input(self.lastInput)
+            return self._parse_input(self.lastInput)
         except Exception:
             # 解析失敗時返回空列表
             return []
@@ -591,13 +620,48 @@ class NineBoxViewController:
             return False
         
         try:
-            from NineBoxView.core.input_recognition import parse_glyph_input
-            parsed_chars = parse_glyph_input(self.lastInput)
+            parsed_chars = self._parse_input(self.lastInput)
             return bool(parsed_chars)
         except Exception:
             # 解析失敗時視為無效輸入
             return False
     
+    def _parse_input(self, text, master=None):
+        """解析搜尋輸入（依字型、主板與字符數記住已驗證的結果）
+        
+        Args:
+            text (str): 輸入文字
+            master: 主板物件（可為 None）
+            
+        Returns:
+            list: 解析出的有效字符列表
+        """
+        from NineBoxView.core.input_recognition import parse_glyph_input
+        
+        font = Glyphs.font
+        if font is None:
+            return parse_glyph_input(text, master=master)
+        
+        from NineBoxView.core.font_identity import get_font_token
+        from NineBoxView.core.glyph_index import get_glyph_index_registry
+        key = (
+            text,
+            get_font_token(font),
+            master.id if master is not None else None,
+            len(font.glyphs),
+            get_glyph_index_registry().get_revision(font)
+        )
+        chars = self._validated_inputs.get(key)
+        if chars is None:
+            chars = parse_glyph_input(text, master=master)
+            if len(self._validated_inputs) >= MAX_VALIDATED_INPUTS:
+                self._validated_inputs.clear()
+            self._validated_inputs[key] = chars
+        
+        # 延遲展開的集合為唯讀，不需複製
+        from NineBoxView.core.glyph_sources import is_lazy_glyph_set
+        return chars if is_lazy_glyph_set(chars) else list(chars)
+    
     # ============================================================================
     # 視窗管理介面（委派給視窗層）
     # ============================================================================
@@ -622,8 +686,7 @@ class NineBoxViewController:
             # 3. 搜尋框有內容且有效 → 用內容填充，不需要隨機化  
             if self.lastInput and self.lastInput.strip():
                 try:
-                    from NineBoxView.core.input_recognition import parse_glyph_input
-                    chars = parse_glyph_input(self.lastInput.strip())
+                    chars = self._parse_input(self.lastInput.strip())
                     if chars:  # 有有效字符就不需要隨機化
                         return False
                 except ImportError:
@@ -683,6 +746,10 @@ class NineBoxViewController:
             # 首次顯示時載入偏好設定
             self.loadPreferences()
             
+            # 視窗重新開啟後的第一個 UPDATEINTERFACE 必定處理
+            from NineBoxView.core.update_gate import get_update_gate
+            get_update_gate().reset()
+            
             # 使用智慧內容感知邏輯初始化九宮格（減法重構：避免盲目隨機化）
             self.initialize_grid_content()
             
@@ -760,6 +827,32 @@ class NineBoxViewController:
             print(traceback.format_exc())
             return False
     
+    def invalidate_preview_glyphs(self, glyph_names, master_id=None, include_copies=True):
+        """只讓預覽中顯示指定字符的格子重繪（抽象視窗介面）
+        
+        Args:
+            glyph_names: 字符名稱序列
+            master_id: 被編輯圖層所屬的主板 ID
+            include_copies (bool): 是否包含周圍格的重複副本（False 時只重繪中央格）
+            
+        Returns:
+            int: 標記重繪的格子數量
+        """
+        try:
+            if not self.has_active_window():
+                return 0
+            
+            if self._parent_plugin and hasattr(self._parent_plugin, 'get_preview_view'):
+                preview_view = self._parent_plugin.get_preview_view()
+                if preview_view and hasattr(preview_view, 'invalidate_glyph_cells'):
+                    return preview_view.invalidate_glyph_cells(glyph_names, master_id, include_copies)
+                
+            return 0
+            
+        except Exception:
+            print(traceback.format_exc())
+            return 0
+    
     # ============================================================================
     # 主要功能方法（純業務邏輯介面）
     # ============================================================================
@@ -782,8 +875,17 @@ class NineBoxViewController:
     def handle_document_opened(self, sender):
         """處理文件開啟事件（DOCUMENTOPENED）- 完整初始化"""
         try:
+            # 為新開啟的字型分配識別碼
+            from NineBoxView.core.font_identity import get_font_identity_service, font_from_notification
+            font = font_from_notification(sender) or Glyphs.font
+            get_font_identity_service().on_document_opened(font)
+            
+            # 保存離開文件的狀態（新開啟的字型沒有可還原的狀態）
+            self._swap_document_state(font)
+            
             # 清除快取（開啟新檔案時清理所有快取）
             clear_all_cache()
+            self._clear_master_path_cache()
             
             # 重新載入偏好設定（新檔案可能需要不同設定）
             self.loadPreferences()
@@ -798,8 +900,23 @@ class NineBoxViewController:
     def handle_document_activated(self, sender):
         """處理文件啟動事件（DOCUMENTACTIVATED）- 輕量狀態同步"""
         try:
+            # 移除已關閉字型的識別條目（關閉通知未附帶字型時）
+            from NineBoxView.core.font_identity import get_font_identity_service, font_from_notification
+            get_font_identity_service().prune(Glyphs.fonts)
+            
+            # 切換文件狀態：最近使用過的字型直接還原排列、鎖定與佈局快取，只需重繪
+            if self._swap_document_state(font_from_notification(sender) or Glyphs.font):
+                if self._parent_plugin and hasattr(self._parent_plugin, 'refresh_controls_panel'):
+                    self._parent_plugin.refresh_controls_panel()
+                if self._parent_plugin and hasattr(self._parent_plugin, 'get_preview_view'):
+                    preview_view = self._parent_plugin.get_preview_view()
+                    if preview_view:
+                        preview_view.redraw()
+                return
+            
             # 清除快取（切換檔案時清理舊快取）
             clear_all_cache()
+            self._clear_master_path_cache()
             
             # 委派給事件處理器的文件啟動處理
             if self.event_handler:
@@ -811,6 +928,21 @@ class NineBoxViewController:
     def handle_document_will_close(self, sender):
         """處理文件即將關閉事件（DOCUMENTWILLCLOSE）- 檢查全關閉狀態"""
         try:
+            # 移除即將關閉字型的識別碼與文件狀態（索引先寫入磁碟快取）
+            from NineBoxView.core.font_identity import get_font_identity_service, get_font_serial, font_from_notification
+            from NineBoxView.core.document_state import get_document_state_store
+            font = font_from_notification(sender)
+            if font is not None:
+                from NineBoxView.core.glyph_index import get_glyph_index_registry
+                get_glyph_index_registry().discard(font)
+                serial = get_font_serial(font)
+                get_document_state_store().discard(serial)
+                if serial == self._active_font_serial:
+                    self._active_font_serial = None
+            get_font_identity_service().on_document_closed(font)
+            # 通知未附帶字型時，移除已不在開啟清單中的字型條目
+            get_font_identity_service().prune(Glyphs.fonts)
+            
             # 委派給事件處理器的文件關閉處理
             if self.event_handler:
                 self.event_handler.handle_document_will_close(sender)
@@ -818,6 +950,149 @@ class NineBoxViewController:
         except Exception:
             print(traceback.format_exc())
     
+    def _swap_document_state(self, font):
+        """切換作用中文件：保存離開文件的狀態，並還原目標文件先前的狀態
+        
+        Args:
+            font: 目標字型
+            
+        Returns:
+            bool: True 如果還原了目標文件先前的狀態
+        """
+        try:
+            from NineBoxView.core.font_identity import get_font_serial
+            from NineBoxView.core.document_state import (
+                get_document_state_store, capture_state, apply_state
+            )
+            
+            serial = get_font_serial(font)
+            if serial is None or serial == self._active_font_serial:
+                return False
+            
+            store = get_document_state_store()
+            shape_key = get_grid_shape().key
+            preview_view = None
+            if self._parent_plugin and hasattr(self._parent_plugin, 'get_preview_view'):
+                preview_view = self._parent_plugin.get_preview_view()
+            
+            # 保存離開文件的狀態
+            if self._active_font_serial is not None:
+                layout, layout_key = preview_view.get_layout_cache() if preview_view else (None, None)
+                store.save(self._active_font_serial, capture_state(self, shape_key, layout, layout_key))
+            self._active_font_serial = serial
+            
+            # 還原目標文件的狀態
+            state = store.restore(serial, shape_key)
+            if state is None:
+                return False
+            
+            apply_state(self, state)
+            self.grid = self.base_arrangement
+            if self.grid_manager:
+                self.grid_manager.grid_glyphs = self.base_arrangement[:]
+            if preview_view:
+                preview_view.restore_layout_cache(state.layout, state.layout_key)
+            
+            # 已驗證過的狀態不需要再走字型變更的無效字符處理
+            self._last_font_id = serial
+            return True
+            
+        except Exception:
+            print(traceback.format_exc())
+            return False
+    
+    # ============================================================================
+    # 網格形狀（N×M）
+    # ============================================================================
+    
+    def set_grid_dimensions(self, rows, columns):
+        """變更網格形狀，並以中心對齊方式搬移既有排列與鎖定內容
+        
+        Args:
+            rows (int): 列數
+            columns (int): 欄數
+            
+        Returns:
+            bool: True 如果形狀有變更
+        """
+        try:
+            previous = get_grid_shape()
+            if previous.rows == rows and previous.columns == columns:
+                return False
+            
+            set_grid_shape(rows, columns)
+            shape = get_grid_shape()
+            
+            # 持久化的兩層資料以中心對齊搬移
+            self.base_arrangement = shape.remap_array(self.base_arrangement, previous)
+            self.lock_inputs = shape.remap_array(self.lock_inputs, previous)
+            self.grid = self.base_arrangement
+            self.base_glyphs = [''] * shape.total
+            
+            if self.grid_manager:
+                self.grid_manager.resize_to_shape(previous)
+            
+            # 新增的外圍位置以目前的字符來源填入
+            if self.has_valid_search_input():
+                self.randomize_grid()
+            
+            self.savePreferences()
+            
+            # 重建鎖定輸入框並重繪預覽
+            if (self._parent_plugin and 
+                hasattr(self._parent_plugin, 'rebuild_controls_panel')):
+                self._parent_plugin.rebuild_controls_panel()
+            self.update_preview_view()
+            self.trigger_preview_redraw(use_refresh=True)
+            return True
+            
+        except Exception:
+            print(traceback.format_exc())
+            return False
+    
+    # ============================================================================
+    # 多主板並排預覽
+    # ============================================================================
+    
+    def toggle_master_strip_mode(self):
+        """切換多主板並排預覽模式"""
+        try:
+            self.masterStripMode = not self.masterStripMode
+            self._clear_master_path_cache()
+            self.savePreferences()
+            self.trigger_preview_redraw(use_refresh=True)
+        except Exception:
+            print(traceback.format_exc())
+    
+    def toggle_ink_bounds_mode(self):
+        """切換墨跡邊界佈局模式（邊界由幾何快取保存，切換時不清除快取）"""
+        try:
+            self.inkBoundsMode = not self.inkBoundsMode
+            self.savePreferences()
+            self.trigger_preview_redraw(use_refresh=True)
+        except Exception:
+            print(traceback.format_exc())
+    
+    def toggle_kerning_row_mode(self):
+        """切換字偶距排列模式"""
+        try:
+            self.kerningRowMode = not self.kerningRowMode
+            self.savePreferences()
+            self.trigger_preview_redraw(use_refresh=True)
+        except Exception:
+            print(traceback.format_exc())
+    
+    def _clear_master_path_cache(self):
+        """清除多主板路徑快取
+        
+        外框幾何快取以圖層版本驗證、字偶距查詢表以字型識別自行失效，不需一併清除
+        """
+        try:
+            from NineBoxView.core.master_strip import get_master_path_cache
+            get_master_path_cache().clear()
+        except Exception:
+            print(traceback.format_exc())
+    
     # ============================================================================
     # 中央格同步機制（對外介面）
     # ============================================================================
@@ -550,12 +550,10 @@ class NineBoxWindow(NSWindowController):
             # 更新控制面板按鈕顏色
             self._update_settings_button_color()
             
-            # 通知預覽視圖主題已變更
+            # 通知預覽視圖主題已變更（Glyphs 自身視圖由系統處理，不觸發全域重繪）
+            from NineBoxView.core.redraw_policy import get_redraw_policy, REASON_SYSTEM_THEME
             if hasattr(self, 'previewView') and self.previewView:
-                self.previewView.update()
-            
-            # 觸發官方重繪
-            Glyphs.redraw()
+                get_redraw_policy().request(REASON_SYSTEM_THEME, self.previewView.update)
             
         except Exception:
             print(traceback.format_exc())
@@ -738,8 +736,15 @@ class NineBoxWindow(NSWindowController):
             print(traceback.format_exc())
 
     def makeKeyAndOrderFront(self):
-        """顯示並啟動視窗"""
+        """顯示並啟動視窗（分階段開啟）
+        
+        第一階段（同步）：定位並顯示視窗，立即繪製第一幀（中央格字符）
+        第二階段（下一輪 run loop）：載入偏好設定、初始化排列、建立控制面板
+        第三階段（再下一輪 run loop）：驗證輸入並套用鎖定欄位視覺標注
+        """
         try:
+            from NineBoxView.core.first_frame_metric import get_first_frame_metric
+            get_first_frame_metric().start()
             
             # 設定視窗位置
             if self.plugin.windowPosition:
@@ -752,6 +757,29 @@ class NineBoxWindow(NSWindowController):
             # 顯示主視窗
             self.window().makeKeyAndOrderFront_(None)
             
+            # 立即繪製第一幀（排列由 displayArrangement 的 base_glyphs 層提供中央格字符）
+            if self.previewView:
+                self.previewView.display()
+            
+            # 其餘工作延後至之後的 run loop 執行，不阻擋第一幀
+            self._open_stage_token = getattr(self, '_open_stage_token', 0) + 1
+            self.performSelector_withObject_afterDelay_(
+                "openStageContent:", self._open_stage_token, 0
+            )
+                
+        except Exception:
+            print(traceback.format_exc())
+    
+    def openStageContent_(self, token):
+        """開啟第二階段：業務邏輯初始化、控制面板與完整排列"""
+        try:
+            if not self._is_open_stage_current(token):
+                return
+            
+            # 委派給控制器處理業務邏輯（偏好設定、隨機排列）
+            if hasattr(self.plugin, 'show_window'):
+                self.plugin.show_window(window_controller=self)
+            
             # 檢查並重建控制面板
             if self.controlsPanelVisible:
                 if not self.controlsPanelWindow:
@@ -762,27 +790,46 @@ class NineBoxWindow(NSWindowController):
                     if self.controlsPanelView:
                         self.controlsPanelView.update_ui(self.plugin, update_lock_fields=True, force_update=True)
             
-            # 委派給控制器處理業務邏輯
-            if hasattr(self.plugin, 'show_window'):
-                self.plugin.show_window(window_controller=self)
-            
-            # 工具視窗開啟時主動執行視覺標注
-            try:
-                from NineBoxView.core.input_recognition import VisualFeedbackService
-                VisualFeedbackService.apply_feedback_to_all_inputs(self.plugin)
-            except Exception:
-                print(traceback.format_exc())
-
-            # 設定初始資料到預覽視圖
+            # 設定完整資料到預覽視圖
             if self.previewView:
                 new_arrangement = self.plugin.displayArrangement()
                 self.previewView.currentArrangement = new_arrangement
-                # 立即更新預覽視圖
                 self.previewView.update()
             
-                
+            from NineBoxView.core.first_frame_metric import get_first_frame_metric
+            get_first_frame_metric().mark_stage('content')
+            
+            self.performSelector_withObject_afterDelay_("openStageFeedback:", token, 0)
+            
         except Exception:
             print(traceback.format_exc())
+    
+    def openStageFeedback_(self, token):
+        """開啟第三階段：輸入驗證與鎖定欄位視覺標注"""
+        try:
+            if not self._is_open_stage_current(token):
+                return
+            
+            from NineBoxView.core.input_recognition import VisualFeedbackService
+            VisualFeedbackService.apply_feedback_to_all_inputs(self.plugin)
+            
+            from NineBoxView.core.first_frame_metric import get_first_frame_metric
+            get_first_frame_metric().mark_stage('feedback')
+            
+        except Exception:
+            print(traceback.format_exc())
+    
+    @objc.python_method
+    def _is_open_stage_current(self, token):
+        """檢查延遲階段是否仍屬於最近一次開啟且視窗仍可見"""
+        try:
+            if token != getattr(self, '_open_stage_token', None):
+                return False
+            window = self.window()
+            return bool(window and window.isVisible())
+        except Exception:
+            print(traceback.format_exc())
+            return False
 
 
     def _handleGlyphsPreviewModeChange_(self, notification):
@@ -797,15 +844,15 @@ class NineBoxWindow(NSWindowController):
                 from NineBoxView.core.theme_detector import clear_theme_cache
                 clear_theme_cache()
                 
-                # 觸發預覽視圖重繪
-                self.previewView.update()  # 使用官方標準方法
+                # 觸發預覽視圖重繪；預覽模式也改變 Glyphs 自身視圖的顯示，一併全域重繪
+                from NineBoxView.core.redraw_policy import get_redraw_policy, REASON_PREVIEW_MODE
+                get_redraw_policy().request(
+                    REASON_PREVIEW_MODE, self.previewView.update, affects_glyphs_views=True
+                )
             
             # 更新設定按鈕顏色（修復 Glyphs 預覽模式變更時按鈕不重繪的問題）
             self._update_settings_button_color()
             
-            # 觸發官方重繪
-            Glyphs.redraw()
-            
         except Exception:
             print(traceback.format_exc())
 
@@ -819,6 +866,10 @@ class NineBoxWindow(NSWindowController):
             # 更新控制面板按鈕顏色（可能會因 tab 的主題不同而改變）
             self._update_settings_button_color()
 
+            # 同步分頁圖層索引（僅在分頁切換、文字或游標變更時重置）
+            from NineBoxView.core.glyphs_service import get_glyphs_service
+            get_glyphs_service().sync_tab_layer_index()
+
             # 通知預覽視圖 tab 已變更
             if hasattr(self, 'previewView') and self.previewView:
                 self.previewView.update()
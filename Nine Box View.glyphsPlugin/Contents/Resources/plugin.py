@@ -139,6 +139,34 @@ class NineBoxView(GeneralPlugin):
             print(traceback.format_exc())
             return False
     
+    @objc.python_method
+    def get_preview_view(self):
+        """取得預覽視圖（抽象視窗介面實作）
+        
+        Returns:
+            NineBoxPreviewView or None: 預覽視圖
+        """
+        if self.has_active_preview_window():
+            return self.window_controller.previewView
+        return None
+    
+    @objc.python_method
+    def refresh_controls_panel(self):
+        """以控制器目前的狀態重新載入控制面板內容（抽象視窗介面實作）
+        
+        Returns:
+            bool: True 如果更新成功
+        """
+        try:
+            controls_view = getattr(self.window_controller, 'controlsPanelView', None)
+            if controls_view:
+                controls_view.update_ui(self.controller, update_lock_fields=True, force_update=True)
+                return True
+            return False
+        except Exception:
+            print(traceback.format_exc())
+            return False
+    
     @objc.python_method
     def trigger_preview_redraw(self, use_refresh=False):
         """觸發預覽重繪（抽象視窗介面實作）
@@ -155,7 +183,25 @@ class NineBoxView(GeneralPlugin):
                 if use_refresh and hasattr(preview_view, 'refresh'):
                     preview_view.refresh()  # 清除快取的完整重繪
                 else:
-                    preview_view.setNeedsDisplay_(True)
+                    preview_view.update()  # 經由重繪排程器合併
+                return True
+            return False
+        except Exception:
+            print(traceback.format_exc())
+            return False
+    
+    @objc.python_method
+    def rebuild_controls_panel(self):
+        """網格形狀變更後重建控制面板的鎖定欄位（抽象視窗介面實作）
+        
+        Returns:
+            bool: True 如果重建成功
+        """
+        try:
+            if (self.window_controller and 
+                hasattr(self.window_controller, 'controlsPanelView') and
+                self.window_controller.controlsPanelView):
+                self.window_controller.controlsPanelView.rebuild_lock_fields()
                 return True
             return False
         except Exception:
@@ -0,0 +1,17 @@
+# encoding: utf-8
+
+"""
+測試設定：將外掛的 Contents/Resources 加入匯入路徑
+只測試不需要 Glyphs 或 AppKit 的純 Python 模組
+"""
+
+import os
+import sys
+
+RESOURCES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'Nine Box View.glyphsPlugin', 'Contents', 'Resources'
+)
+
+if RESOURCES not in sys.path:
+    sys.path.insert(0, RESOURCES)
@@ -0,0 +1,128 @@
+# encoding: utf-8
+
+"""
+延遲字符來源測試：範圍解析、LazyGlyphSet 的索引、切片與抽樣
+"""
+
+import random
+
+import pytest
+
+from NineBoxView.core.glyph_index import GlyphIndex
+from NineBoxView.core.glyph_sources import (
+    LazyGlyphSet, build_lazy_source, is_lazy_token, parse_range
+)
+
+
+class FakeGlyph(object):
+    def __init__(self, name, unicode_hex=None):
+        self.name = name
+        self.id = 'id-' + name
+        self.unicode = unicode_hex
+        self.unicodes = (unicode_hex,) if unicode_hex else ()
+        self.lastChange = 1
+        self.category = None
+        self.subCategory = None
+        self.script = None
+        self.layers = ()
+        self.color = None
+
+
+class FakeGlyphs(list):
+    """以名稱或字元查詢的字符列表（類似 font.glyphs）"""
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return list.__getitem__(self, key)
+        for glyph in self:
+            if glyph.name == key or (glyph.unicode and chr(int(glyph.unicode, 16)) == key):
+                return glyph
+        raise KeyError(key)
+
+
+class FakeFont(object):
+    def __init__(self, glyphs):
+        self.glyphs = FakeGlyphs(glyphs)
+
+
+@pytest.fixture
+def index():
+    glyphs = [FakeGlyph(chr(code), '%04X' % code) for code in range(ord('A'), ord('Z') + 1)]
+    glyphs += [FakeGlyph('uni%04X' % code, '%04X' % code) for code in range(0x4E00, 0x4E0A)]
+    glyphs += [FakeGlyph(name) for name in ('a.ss01', 'b.ss01', 'a.ss02', 'a.sc')]
+    glyph_index = GlyphIndex(FakeFont(glyphs))
+    glyph_index.build()
+    return glyph_index
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('A-Z', (0x41, 0x5A)),
+    ('uni4E00-uni9FFF', (0x4E00, 0x9FFF)),
+    ('u20000-u2A6DF', (0x20000, 0x2A6DF)),
+    ('U+0041-U+0043', (0x41, 0x43)),
+    ('一-十', (0x4E00, 0x5341)),
+    ('Z-A', None),
+    ('A-', None),
+    ('abc-def', None),
+    ('A', None),
+])
+def test_parse_range(text, expected):
+    assert parse_range(text) == expected
+
+
+def test_is_lazy_token():
+    assert is_lazy_token('A-Z') and is_lazy_token('*.ss01') and is_lazy_token('a.*')
+    assert not is_lazy_token('a.ss01') and not is_lazy_token('') and not is_lazy_token('-')
+
+
+def test_sources(index):
+    assert list(build_lazy_source(index, 'A-E')) == ['A', 'B', 'C', 'D', 'E']
+    assert list(build_lazy_source(index, 'uni4E00-uni4E02')) == ['uni4E00', 'uni4E01', 'uni4E02']
+    assert list(build_lazy_source(index, 'a.*')) == ['a.sc', 'a.ss01', 'a.ss02']
+    assert sorted(build_lazy_source(index, '*.ss01')) == ['a.ss01', 'b.ss01']
+    assert list(build_lazy_source(index, 'a.ss0?')) == ['a.ss01', 'a.ss02']
+    assert len(build_lazy_source(index, 'uni9000-uni9FFF')) == 0
+
+
+def test_lazy_set_indexing_and_slicing(index):
+    parts = [['x'], build_lazy_source(index, 'A-C'), ['y', 'z'], build_lazy_source(index, 'a.*')]
+    glyph_set = LazyGlyphSet(parts, 'x A-C yz a.*', index)
+    expected = ['x', 'A', 'B', 'C', 'y', 'z', 'a.sc', 'a.ss01', 'a.ss02']
+
+    assert len(glyph_set) == len(expected) and bool(glyph_set)
+    assert list(glyph_set) == expected
+    assert [glyph_set[i] for i in range(len(expected))] == expected
+    assert glyph_set[-1] == 'a.ss02'
+    assert glyph_set[2:7] == expected[2:7]
+    assert glyph_set[::3] == expected[::3]
+    assert glyph_set[::-1] == expected[::-1]
+    with pytest.raises(IndexError):
+        glyph_set[len(expected)]
+
+
+def test_lazy_set_sampling(index):
+    glyph_set = LazyGlyphSet([build_lazy_source(index, 'A-Z'), ['extra']], 'A-Z extra', index)
+    rng = random.Random(7)
+
+    sample = glyph_set.sample(10, rng)
+    assert len(sample) == 10 and len(set(sample)) == 10
+    assert set(sample) <= set(glyph_set)
+
+    # 抽取全部時涵蓋每個字符一次
+    assert sorted(glyph_set.sample(len(glyph_set), rng)) == sorted(glyph_set)
+    with pytest.raises(ValueError):
+        glyph_set.sample(len(glyph_set) + 1, rng)
+
+
+def test_lazy_set_follows_index_updates(index):
+    glyph_set = LazyGlyphSet([build_lazy_source(index, 'a.*')], 'a.*', index)
+    key = glyph_set.cache_key
+    index.update_glyph(FakeGlyph('a.alt'))
+
+    assert 'a.alt' in list(glyph_set)
+    assert glyph_set.cache_key != key
+
+
+def test_empty_lazy_set(index):
+    glyph_set = LazyGlyphSet([build_lazy_source(index, 'uni9000-uni9FFF')], 'uni9000-uni9FFF', index)
+    assert not glyph_set and len(glyph_set) == 0 and glyph_set[0:5] == []
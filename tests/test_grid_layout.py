@@ -0,0 +1,90 @@
+# encoding: utf-8
+
+"""
+網格佈局記錄測試：局部重繪範圍、點擊定位與不可變性
+"""
+
+import pytest
+
+from NineBoxView.core.grid_layout import (
+    DIRTY_RECT_PADDING, GridCell, GridLayout, GridTile,
+    compute_cell_positions, compute_grid_metrics
+)
+
+
+def make_layout(overflow=(), tiles=(), tile_width=0):
+    """建立 3×3、每格 100 × 100、左下角位於原點的佈局"""
+    cells = [
+        GridCell(50 + 100 * (i % 3), 250 - 100 * (i // 3), 100, 100)
+        for i in range(9)
+    ]
+    return GridLayout(cells, None, '3x3', False, ['A'] * 9, tiles, tile_width, overflow)
+
+
+def test_dirty_rect_without_overflow():
+    layout = make_layout()
+    (x, y), (width, height) = layout.dirty_rect(4)
+    assert (x, y) == (100 - DIRTY_RECT_PADDING, 100 - DIRTY_RECT_PADDING)
+    assert (width, height) == (100 + 2 * DIRTY_RECT_PADDING, 100 + 2 * DIRTY_RECT_PADDING)
+
+
+def test_dirty_rect_includes_overflow_and_offset():
+    overflow = [(0, 0, 0, 0)] * 9
+    overflow[4] = (10, 20, 30, 40)
+    layout = make_layout(overflow)
+
+    (x, y), (width, height) = layout.dirty_rect(4, offset_x=300)
+    assert (x, y) == (300 + 100 - 10 - DIRTY_RECT_PADDING, 100 - 20 - DIRTY_RECT_PADDING)
+    assert x + width == 300 + 200 + 30 + DIRTY_RECT_PADDING
+    assert y + height == 200 + 40 + DIRTY_RECT_PADDING
+
+
+def test_dirty_rect_union_covers_both_layouts():
+    overflow = [(0, 0, 0, 0)] * 9
+    overflow[0] = (25, 0, 0, 50)
+    before, after = make_layout(), make_layout(overflow)
+
+    (x, y), (width, height) = before.dirty_rect_union(after, 0)
+    for layout in (before, after):
+        (ox, oy), (ow, oh) = layout.dirty_rect(0)
+        assert x <= ox and y <= oy
+        assert x + width >= ox + ow and y + height >= oy + oh
+
+
+@pytest.mark.parametrize('point, expected', [
+    ((150, 150), 4),
+    ((10, 290), 0),
+    ((299, 1), 8),
+    ((100, 150), 3),     # 共用邊界取第一個相符的格子
+    ((-1, 150), None),
+    ((150, 301), None),
+])
+def test_cell_at_point(point, expected):
+    assert make_layout().cell_at_point(*point) == expected
+
+
+def test_cell_at_point_wraps_master_tiles():
+    tiles = (GridTile('m1', 0), GridTile('m2', 300))
+    layout = make_layout(tiles=tiles, tile_width=300)
+    assert layout.cell_at_point(450, 150) == 4
+    assert layout.cell_at_point(310, 290) == 0
+
+
+def test_records_are_immutable():
+    layout = make_layout()
+    with pytest.raises(AttributeError):
+        layout.cells = ()
+    with pytest.raises(AttributeError):
+        del layout.cells[0].center_x
+    with pytest.raises(AttributeError):
+        GridTile('m1', 0).offset_x = 10
+
+
+def test_computed_cells_tile_the_grid():
+    metrics = compute_grid_metrics(600, 400, 1000, 1200, 3, 5)
+    cells = compute_cell_positions(metrics, 3, 5)
+    assert len(cells) == 15
+    # 同一列的格子水平相鄰、同一欄的格子垂直相鄰
+    assert cells[1].left == pytest.approx(cells[0].right)
+    assert cells[5].top == pytest.approx(cells[0].bottom)
+    assert cells[0].left == pytest.approx(metrics.start_x)
@@ -0,0 +1,66 @@
+# encoding: utf-8
+
+"""
+網格形狀測試：中心位置、座標轉換與中心對齊的陣列搬移
+"""
+
+import pytest
+
+from NineBoxView.core.grid_shape import MAX_GRID_DIMENSION, GridShape, parse_grid_shape_key
+
+
+def labelled(shape):
+    """以 'row,col' 標記每個位置的陣列"""
+    return ['%d,%d' % shape.position_to_coordinates(i) for i in range(shape.total)]
+
+
+@pytest.mark.parametrize('rows, columns, center', [
+    (3, 3, 4), (5, 5, 12), (3, 5, 7), (1, 1, 0), (4, 4, 10),
+])
+def test_center(rows, columns, center):
+    assert GridShape(rows, columns).center == center
+
+
+def test_coordinates_round_trip():
+    shape = GridShape(3, 5)
+    for position in range(shape.total):
+        assert shape.coordinates_to_position(*shape.position_to_coordinates(position)) == position
+    assert shape.coordinates_to_position(3, 0) is None
+    assert shape.coordinates_to_position(0, -1) is None
+
+
+def test_dimensions_are_clamped():
+    assert GridShape(0, 100).key == '1x%d' % MAX_GRID_DIMENSION
+    assert GridShape('x', None) == GridShape(3, 3)
+    assert parse_grid_shape_key('5X7') == GridShape(5, 7)
+    assert parse_grid_shape_key('five') is None
+
+
+def test_remap_grow_keeps_content_centred():
+    small, large = GridShape(3, 3), GridShape(5, 5)
+    result = large.remap_array(labelled(small), small)
+
+    assert len(result) == 25
+    assert result[large.center] == '1,1'
+    assert result[large.coordinates_to_position(1, 1)] == '0,0'
+    assert result[large.coordinates_to_position(3, 3)] == '2,2'
+    assert result.count('') == 25 - 9
+
+
+def test_remap_shrink_crops_outer_ring():
+    large, small = GridShape(5, 5), GridShape(3, 3)
+    result = small.remap_array(labelled(large), large)
+    assert result == ['%d,%d' % (row, col) for row in (1, 2, 3) for col in (1, 2, 3)]
+
+
+def test_remap_round_trip_preserves_inner_cells():
+    small, wide = GridShape(3, 3), GridShape(3, 7)
+    values = labelled(small)
+    assert small.remap_array(wide.remap_array(values, small), wide) == values
+
+
+def test_remap_handles_short_or_missing_input():
+    shape = GridShape(3, 3)
+    assert shape.remap_array([], shape, filler=None) == [None] * 9
+    assert shape.remap_array(['A'], None) == [''] * 9
+    assert shape.remap_array(['A', 'B'], shape)[:3] == ['A', 'B', '']
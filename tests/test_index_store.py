@@ -0,0 +1,91 @@
+# encoding: utf-8
+
+"""
+字符索引磁碟快取測試：序列化往返、過期與損壞偵測
+"""
+
+import pytest
+
+from NineBoxView.core.glyph_index import INDEX_FIELDS
+from NineBoxView.core.index_store import (
+    CacheError, StaleCacheError, decode_index, encode_index
+)
+
+IDENTITY = {'path': '/fonts/Sample.glyphs', 'mtime': 1700000000.5, 'size': 4096}
+MASTERS = ['master-regular', 'master-bold']
+
+
+def sample_snapshot():
+    """建立與 GlyphIndex.export_snapshot() 相同結構的快照"""
+    names = ['A', 'B', 'uni4E00', 'a.ss01']
+    code_points = {'A': (0x41,), 'B': (0x42,), 'uni4E00': (0x4E00, 0xF900)}
+    fields = dict((field, {}) for field in INDEX_FIELDS)
+    fields['category'] = {'letter': {'A', 'B', 'a.ss01'}, 'ideograph': {'uni4E00'}}
+    fields['script'] = {'latin': {'A', 'B', 'a.ss01'}, 'han': {'uni4E00'}}
+    fields['component'] = {'A': {'a.ss01'}}
+    return names, code_points, fields
+
+
+def sample_metrics():
+    return {
+        ('A', 'master-regular'): (600.0, (10.0, 0.0, 590.0, 700.0), None),
+        ('uni4E00', 'master-bold'): (1000.0, None, None),
+        # 不在索引中的字符與主板不會被寫入
+        ('missing', 'master-regular'): (500.0, None, None),
+        ('A', 'master-unknown'): (500.0, None, None),
+    }
+
+
+def test_round_trip():
+    data = encode_index(IDENTITY, sample_snapshot(), sample_metrics(), MASTERS)
+    (names, code_points, fields), metrics = decode_index(data, IDENTITY)
+
+    expected_names, expected_code_points, expected_fields = sample_snapshot()
+    assert names == expected_names
+    assert code_points == expected_code_points
+    for field in INDEX_FIELDS:
+        assert fields[field] == expected_fields[field]
+    assert metrics == {
+        ('A', 'master-regular'): (600.0, (10.0, 0.0, 590.0, 700.0)),
+        ('uni4E00', 'master-bold'): (1000.0, None),
+    }
+
+
+def test_empty_index_round_trip():
+    snapshot = ([], {}, dict((field, {}) for field in INDEX_FIELDS))
+    (names, code_points, fields), metrics = decode_index(encode_index(IDENTITY, snapshot, {}, []), IDENTITY)
+    assert names == [] and code_points == {} and metrics == {}
+    assert all(not fields[field] for field in INDEX_FIELDS)
+
+
+@pytest.mark.parametrize('key, value', [
+    ('path', '/fonts/Other.glyphs'),
+    ('mtime', 1700000001.5),
+    ('size', 4097),
+])
+def test_stale_identity(key, value):
+    data = encode_index(IDENTITY, sample_snapshot(), sample_metrics(), MASTERS)
+    identity = dict(IDENTITY)
+    identity[key] = value
+    with pytest.raises(StaleCacheError):
+        decode_index(data, identity)
+
+
+def test_corrupt_payload():
+    data = bytearray(encode_index(IDENTITY, sample_snapshot(), sample_metrics(), MASTERS))
+    data[-1] ^= 0xFF
+    with pytest.raises(CacheError) as error:
+        decode_index(bytes(data), IDENTITY)
+    assert not isinstance(error.value, StaleCacheError)
+
+
+@pytest.mark.parametrize('mangle', [
+    lambda data: data[:5],                       # 截斷的前導區
+    lambda data: b'XXXX' + data[4:],             # 未知的檔案標記
+    lambda data: data[:10] + b'}' + data[11:],   # 損壞的 JSON 標頭
+    lambda data: data[:-8],                      # 截斷的資料區段
+])
+def test_corrupt_structure(mangle):
+    data = encode_index(IDENTITY, sample_snapshot(), sample_metrics(), MASTERS)
+    with pytest.raises(CacheError):
+        decode_index(mangle(data), IDENTITY)
@@ -0,0 +1,88 @@
+# encoding: utf-8
+
+"""
+墨跡邊界追蹤測試：聯集的增量擴大與邊緣格子縮小時的重新合併
+"""
+
+from NineBoxView.core.ink_bounds import InkBoundsTracker, union_of
+
+
+def make_tracker(total=9):
+    tracker = InkBoundsTracker()
+    tracker.resize(total)
+    return tracker
+
+
+def test_union_of():
+    assert union_of(None, None) is None
+    assert union_of((0, 0, 1, 1), None) == (0, 0, 1, 1)
+    assert union_of((0, -5, 10, 10), (-2, 0, 8, 12)) == (-2, -5, 10, 12)
+
+
+def test_growth_merges_without_recompute():
+    tracker = make_tracker()
+    assert tracker.update_cell(0, (0, 0, 100, 100))
+    assert tracker.update_cell(1, (-10, -20, 50, 120))
+    assert not tracker.update_cell(2, (10, 10, 90, 90))
+
+    assert tracker.get_union() == (-10, -20, 100, 120)
+    assert tracker.get_stats() == {'updates': 3, 'recomputes': 0}
+
+
+def test_unchanged_bounds_are_ignored():
+    tracker = make_tracker()
+    tracker.update_cell(0, (0, 0, 100, 100))
+    assert not tracker.update_cell(0, (0, 0, 100, 100))
+    assert tracker.get_stats()['updates'] == 1
+
+
+def test_shrinking_edge_cell_recomputes():
+    tracker = make_tracker()
+    tracker.update_cell(0, (0, 0, 100, 100))
+    tracker.update_cell(1, (0, -50, 100, 100))
+
+    assert tracker.update_cell(1, (0, 0, 50, 50))
+    assert tracker.get_union() == (0, 0, 100, 100)
+    assert tracker.get_stats()['recomputes'] == 1
+
+
+def test_interior_cell_change_keeps_union():
+    tracker = make_tracker()
+    tracker.update_cell(0, (0, 0, 100, 100))
+    tracker.update_cell(1, (10, 10, 90, 90))
+
+    assert not tracker.update_cell(1, (20, 20, 80, 80))
+    assert tracker.get_stats()['recomputes'] == 0
+
+
+def test_clearing_all_cells():
+    tracker = make_tracker()
+    tracker.update_cell(0, (0, 0, 100, 100))
+    assert tracker.update_cell(0, None)
+    assert tracker.get_union() is None
+
+
+def test_matches_full_recomputation():
+    tracker = make_tracker()
+    cells = [None] * 9
+    updates = [
+        (0, (0, 0, 100, 100)), (4, (-30, 0, 60, 140)), (8, (10, -40, 200, 50)),
+        (4, None), (8, (0, 0, 10, 10)), (2, (-5, -5, 5, 5)), (0, None),
+    ]
+    for position, bounds in updates:
+        tracker.update_cell(position, bounds)
+        cells[position] = bounds
+        expected = None
+        for cell in cells:
+            expected = union_of(expected, cell)
+        assert tracker.get_union() == expected
+
+
+def test_resize_and_out_of_range():
+    tracker = make_tracker()
+    tracker.update_cell(0, (0, 0, 100, 100))
+    assert not tracker.update_cell(9, (0, 0, 500, 500))
+
+    tracker.resize(25)
+    assert tracker.get_union() is None
+    assert tracker.update_cell(24, (0, 0, 1, 1))
@@ -0,0 +1,102 @@
+# encoding: utf-8
+
+"""
+重繪排程器測試：同一畫格內的請求合併、幀率節流與範圍累積
+"""
+
+import pytest
+
+from NineBoxView.core.redraw_scheduler import MAX_FPS, MIN_FPS, RedrawScheduler
+
+
+class FakeClock(object):
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def harness():
+    """回傳 (排程器, 時鐘, 已排程的延遲列表, 已執行的範圍列表)"""
+    clock = FakeClock()
+    scheduled = []
+    performed = []
+    scheduler = RedrawScheduler(scheduled.append, performed.append, max_fps=10, clock=clock)
+    return scheduler, clock, scheduled, performed
+
+
+def test_first_request_flushes_immediately(harness):
+    scheduler, _, scheduled, performed = harness
+    scheduler.request()
+    assert performed == [None] and scheduled == []
+
+
+def test_requests_within_interval_are_coalesced(harness):
+    scheduler, clock, scheduled, performed = harness
+    scheduler.request()
+    clock.now += 0.02
+    for _ in range(5):
+        scheduler.request()
+
+    assert performed == [None]
+    assert scheduled == [pytest.approx(0.08)]
+    assert scheduler.get_stats()['coalesced'] == 4
+
+    clock.now += 0.08
+    scheduler.flush()
+    assert performed == [None, None]
+    assert scheduler.get_stats()['frames'] == 2
+
+
+def test_partial_rects_accumulate_until_full_request(harness):
+    scheduler, clock, _, performed = harness
+    scheduler.request()
+    clock.now += 0.01
+    scheduler.request('a')
+    scheduler.request('b')
+    scheduler.flush()
+    assert performed[-1] == ['a', 'b']
+
+    clock.now += 0.01
+    scheduler.request('c')
+    scheduler.request()
+    scheduler.request('d')
+    scheduler.flush()
+    assert performed[-1] is None
+
+
+def test_request_after_interval_is_not_throttled(harness):
+    scheduler, clock, scheduled, performed = harness
+    scheduler.request('a')
+    clock.now += 0.5
+    scheduler.request('b')
+    assert performed == [['a'], ['b']] and scheduled == []
+
+
+def test_empty_flush_does_nothing(harness):
+    scheduler, _, _, performed = harness
+    scheduler.flush()
+    assert performed == [] and scheduler.get_stats()['frames'] == 0
+
+
+def test_schedule_failure_flushes_immediately():
+    clock = FakeClock()
+    performed = []
+
+    def failing_schedule(delay):
+        raise RuntimeError('no run loop')
+
+    scheduler = RedrawScheduler(failing_schedule, performed.append, clock=clock)
+    scheduler.request()
+    scheduler.request('a')
+    assert performed == [None, ['a']]
+
+
+@pytest.mark.parametrize('value, expected', [
+    (30, 30), (0, MIN_FPS), (1000, MAX_FPS), ('fast', 60),
+])
+def test_max_fps_is_clamped(value, expected):
+    scheduler = RedrawScheduler(lambda delay: None, lambda rects: None, max_fps=value)
+    assert scheduler.get_stats()['max_fps'] == expected
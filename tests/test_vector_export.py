@@ -0,0 +1,89 @@
+# encoding: utf-8
+
+"""
+向量匯出測試：檔案輸出的往返驗證與中途失敗時的原子性
+"""
+
+import re
+import xml.etree.ElementTree as ElementTree
+
+import pytest
+
+from NineBoxView.core.outline_geometry import RecordingPen
+from NineBoxView.core.vector_export import export_cells_to_path
+
+SVG_NAMESPACE = '{http://www.w3.org/2000/svg}'
+
+
+def square_commands():
+    """記錄一個 100 × 100 的封閉正方形與一條開放路徑"""
+    pen = RecordingPen()
+    pen.moveTo((0, 0))
+    pen.lineTo((100, 0))
+    pen.lineTo((100, 100))
+    pen.lineTo((0, 100))
+    pen.closePath()
+    pen.moveTo((0, 50))
+    pen.lineTo((100, 50))
+    pen.endPath()
+    return pen.value
+
+
+def test_svg_round_trip(tmp_path):
+    path = tmp_path / 'grid.svg'
+    written = export_cells_to_path(str(path), 200, 100, [(square_commands(), 0.5, 10, 20)])
+
+    assert written == 1
+    root = ElementTree.parse(str(path)).getroot()
+    assert root.tag == SVG_NAMESPACE + 'svg'
+    assert root.get('width') == '200' and root.get('height') == '100'
+
+    paths = root.findall('.//%spath' % SVG_NAMESPACE)
+    filled = [element for element in paths if element.get('fill') != 'none']
+    stroked = [element for element in paths if element.get('fill') == 'none']
+    assert filled[0].get('d') == 'M10 20L60 20L60 70L10 70Z'
+    assert stroked[0].get('d') == 'M10 45L60 45'
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_pdf_round_trip(tmp_path):
+    path = tmp_path / 'grid.pdf'
+    export_cells_to_path(str(path), 200, 100, [(square_commands(), 1.0, 0, 0)], is_black=True)
+
+    data = path.read_bytes()
+    assert data.startswith(b'%PDF-1.4\n') and data.endswith(b'%%EOF\n')
+    assert b'/MediaBox [0 0 200 100]' in data
+    assert b'0 0 m\n100 0 l\n100 100 l\n0 100 l\nh\nf\n' in data
+
+    # 交叉參照表的位移指向各物件的開頭
+    xref_offset = int(re.search(br'startxref\n(\d+)\n', data).group(1))
+    assert data[xref_offset:].startswith(b'xref\n')
+    offsets = re.findall(br'(\d{10}) 00000 n ', data[xref_offset:])
+    for number, offset in enumerate(offsets, 1):
+        assert data[int(offset):].startswith(b'%d 0 obj\n' % number)
+
+    # 內容串流長度與記錄的長度一致
+    length = int(re.search(br'5 0 obj\n(\d+)\n', data).group(1))
+    start = data.index(b'stream\n') + len(b'stream\n')
+    assert data[start:start + length + len(b'endstream')].endswith(b'endstream')
+
+
+def test_failure_keeps_existing_file(tmp_path):
+    path = tmp_path / 'grid.svg'
+    path.write_bytes(b'previous export')
+
+    def failing_cells():
+        yield (square_commands(), 1.0, 0, 0)
+        raise RuntimeError('layer read failed')
+
+    with pytest.raises(RuntimeError):
+        export_cells_to_path(str(path), 200, 100, failing_cells())
+
+    assert path.read_bytes() == b'previous export'
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_unsupported_extension(tmp_path):
+    with pytest.raises(ValueError):
+        export_cells_to_path(str(tmp_path / 'grid.png'), 200, 100, [])
+    assert list(tmp_path.iterdir()) == []
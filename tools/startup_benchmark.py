@@ -0,0 +1,166 @@
+# encoding: utf-8
+
+"""
+StartupBenchmark - 外掛啟動匯入時間量測（開發工具，不隨外掛發佈）
+在獨立的 Python 行程中依 Glyphs 載入外掛的方式匯入 plugin.py，量測耗時並與固定預算比較
+（objc、AppKit、GlyphsApp 等宿主模組先行匯入，計時只涵蓋外掛本身），
+同時列出被連帶載入的 NineBoxView 模組，確認延遲匯入沒有被破壞；
+另外量測第一次 showWindow_ 匯入控制器的耗時（僅供參考，不計入預算）
+
+plugin.py 需要 GlyphsApp 模組，請以 Glyphs 內建的 Python 執行，並指定 GlyphsApp 所在目錄：
+    python3 tools/startup_benchmark.py --glyphs-path "/Applications/Glyphs 3.app/Contents/Scripts"
+"""
+
+from __future__ import division, print_function, unicode_literals
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import traceback
+
+# 啟動階段匯入預算（毫秒）：Glyphs 啟動時只應載入 plugin.py 與 GlyphsApp
+STARTUP_IMPORT_BUDGET_MS = 50.0
+
+# 啟動階段不應被載入的模組（延遲至第一次 showWindow_）
+DEFERRED_MODULES = (
+    'NineBoxViewController',
+    'NineBoxViewWindow',
+    'NineBoxView.core.menu_manager',
+    'NineBoxView.core.input_recognition',
+    'NineBoxView.core.theme_detector',
+    'NineBoxView.core.light_table_support',
+    'NineBoxView.ui.preview_view',
+    'NineBoxView.ui.search_panel',
+    'NineBoxView.ui.controls_panel',
+    'NineBoxView.ui.lock_fields_panel',
+)
+
+# 每個目標重複量測的次數（取最小值以排除雜訊）
+DEFAULT_REPEAT = 5
+
+# 量測目標：plugin.py 以檔案路徑載入（與 Glyphs 載入外掛相同），控制器以模組名稱匯入
+TARGET_PLUGIN = 'plugin'
+TARGET_CONTROLLER = 'controller'
+
+# Glyphs 啟動時早已載入的宿主模組（量測前先匯入，不計入外掛的匯入時間）
+HOST_MODULES = ('objc', 'Foundation', 'AppKit', 'GlyphsApp', 'GlyphsApp.plugins')
+
+# 子行程執行的量測程式（argv: 目標, Resources 目錄, 宿主模組）
+_PROBE_SOURCE = (
+    "import importlib, importlib.util, os, sys, time\n"
+    "target, resources, host = sys.argv[1], sys.argv[2], sys.argv[3]\n"
+    "sys.path.insert(0, resources)\n"
+    "for name in filter(None, host.split(',')):\n"
+    "    importlib.import_module(name)\n"
+    "start = time.perf_counter()\n"
+    "if target == 'plugin':\n"
+    "    spec = importlib.util.spec_from_file_location('plugin', os.path.join(resources, 'plugin.py'))\n"
+    "    spec.loader.exec_module(importlib.util.module_from_spec(spec))\n"
+    "else:\n"
+    "    __import__('NineBoxViewController')\n"
+    "elapsed = (time.perf_counter() - start) * 1000.0\n"
+    "loaded = sorted(name for name in sys.modules if name.startswith('NineBoxView'))\n"
+    "print(repr((elapsed, loaded)))\n"
+)
+
+
+def resources_path():
+    """取得外掛的 Contents/Resources 目錄"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(root, 'Nine Box View.glyphsPlugin', 'Contents', 'Resources')
+
+
+def measure_import(target, repeat=DEFAULT_REPEAT, python=None, glyphs_path=None):
+    """在乾淨的子行程中量測匯入時間
+
+    Args:
+        target (str): TARGET_PLUGIN 或 TARGET_CONTROLLER
+        repeat (int): 重複次數
+        python (str): Python 直譯器路徑（None 時使用目前的直譯器）
+        glyphs_path (str): GlyphsApp 模組所在目錄
+
+    Returns:
+        tuple: (最短耗時毫秒, 被載入的 NineBoxView 模組列表)，失敗時為 (None, [])
+    """
+    best = None
+    loaded = []
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        path for path in (glyphs_path, env.get('PYTHONPATH')) if path
+    )
+    # 不寫入 .pyc，但允許讀取既有快取（與 Glyphs 啟動時相同）
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+
+    for _ in range(max(1, repeat)):
+        try:
+            output = subprocess.check_output(
+                [python or sys.executable, '-c', _PROBE_SOURCE, target, resources_path(), ','.join(HOST_MODULES)],
+                env=env, stderr=subprocess.STDOUT
+            )
+            elapsed, loaded = ast.literal_eval(output.decode('utf-8').strip().splitlines()[-1])
+            best = elapsed if best is None else min(best, elapsed)
+        except subprocess.CalledProcessError as error:
+            print(error.output.decode('utf-8', 'replace'))
+            return None, []
+        except Exception:
+            print(traceback.format_exc())
+            return None, []
+    return best, loaded
+
+
+def run_startup_benchmark(budget_ms=STARTUP_IMPORT_BUDGET_MS, repeat=DEFAULT_REPEAT,
+                          python=None, glyphs_path=None):
+    """量測 plugin.py 的啟動匯入並檢查預算
+
+    Args:
+        budget_ms (float): 匯入時間預算（毫秒）
+        repeat (int): 重複次數
+        python (str): Python 直譯器路徑
+        glyphs_path (str): GlyphsApp 模組所在目錄
+
+    Returns:
+        dict: {'elapsed_ms', 'budget_ms', 'within_budget', 'loaded', 'eager_deferred',
+               'first_open_ms', 'passed'}
+    """
+    elapsed, loaded = measure_import(TARGET_PLUGIN, repeat, python, glyphs_path)
+    eager = [name for name in DEFERRED_MODULES if name in loaded]
+    within_budget = elapsed is not None and elapsed <= budget_ms
+    first_open = None
+    if elapsed is not None:
+        first_open, _ = measure_import(TARGET_CONTROLLER, repeat, python, glyphs_path)
+    return {
+        'elapsed_ms': elapsed,
+        'budget_ms': budget_ms,
+        'within_budget': within_budget,
+        'loaded': loaded,
+        'eager_deferred': eager,
+        'first_open_ms': first_open,
+        'passed': within_budget and not eager
+    }
+
+
+def main(argv=None):
+    """命令列進入點（未通過時回傳非零結束碼）"""
+    parser = argparse.ArgumentParser(description='Measure the Nine Box View startup import time.')
+    parser.add_argument('--python', help='Python interpreter (defaults to the current one)')
+    parser.add_argument('--glyphs-path', help='directory containing the GlyphsApp module')
+    parser.add_argument('--budget', type=float, default=STARTUP_IMPORT_BUDGET_MS, help='budget in ms')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='runs per target')
+    args = parser.parse_args(argv)
+
+    result = run_startup_benchmark(args.budget, args.repeat, args.python, args.glyphs_path)
+    elapsed = result['elapsed_ms']
+    print("plugin.py import: %s ms (budget %.1f ms)" % (
+        '%.2f' % elapsed if elapsed is not None else 'failed', result['budget_ms']))
+    if result['first_open_ms'] is not None:
+        print("First showWindow_ import: %.2f ms" % result['first_open_ms'])
+    print("Loaded modules: %s" % (', '.join(result['loaded']) or 'none'))
+    if result['eager_deferred']:
+        print("Deferred modules loaded at startup: %s" % ', '.join(result['eager_deferred']))
+    print("PASS" if result['passed'] else "FAIL")
+    return 0 if result['passed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())